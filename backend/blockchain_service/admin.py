@@ -1,3 +1,44 @@
 from django.contrib import admin
 
-# Blockchain models will be registered in Sprint 4.
+from .models import (
+    ChainSubmission,
+    IndexerCheckpoint,
+    MerkleAnchor,
+    OnChainTrade,
+    TradeProof,
+)
+
+
+@admin.register(ChainSubmission)
+class ChainSubmissionAdmin(admin.ModelAdmin):
+    list_display = ["tx_hash", "status", "trade_count", "block_number", "submitted_at", "confirmed_at"]
+    list_filter = ["status", "submitted_at"]
+    search_fields = ["tx_hash"]
+    ordering = ["-submitted_at"]
+
+
+@admin.register(MerkleAnchor)
+class MerkleAnchorAdmin(admin.ModelAdmin):
+    list_display = ["root", "trade_count", "tx_hash", "created_at"]
+    search_fields = ["root", "tx_hash"]
+    ordering = ["-created_at"]
+
+
+@admin.register(TradeProof)
+class TradeProofAdmin(admin.ModelAdmin):
+    list_display = ["transaction", "anchor", "leaf_index"]
+    search_fields = ["transaction__id", "anchor__root"]
+    raw_id_fields = ["transaction", "anchor"]
+
+
+@admin.register(IndexerCheckpoint)
+class IndexerCheckpointAdmin(admin.ModelAdmin):
+    list_display = ["name", "last_block", "updated_at"]
+
+
+@admin.register(OnChainTrade)
+class OnChainTradeAdmin(admin.ModelAdmin):
+    list_display = ["transaction_id", "stock_symbol", "price", "quantity", "block_number", "recorded_at"]
+    list_filter = ["stock_symbol"]
+    search_fields = ["transaction__id", "tx_hash"]
+    raw_id_fields = ["transaction"]
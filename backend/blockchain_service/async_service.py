@@ -0,0 +1,353 @@
+"""
+Asyncio variant of the blockchain service for request paths.
+
+``blockchain_status`` and the verify endpoints only read from the node, so
+they use ``AsyncWeb3`` instead of the blocking ``BlockchainService``: a slow
+node then parks a coroutine instead of holding a request worker thread.
+
+  - One pooled aiohttp session per event loop (``BLOCKCHAIN_RPC_POOL_SIZE``
+    connections), closed and rebuilt when the view runs on a different loop
+  - Every RPC is bounded by ``BLOCKCHAIN_RPC_TIMEOUT`` seconds
+  - Results, Merkle proof checks and the verification cache are shared with
+    the sync service (service.py); writes (recording, anchoring) stay there.
+    ``BlockchainService.verify_transactions`` runs this module's bulk verify
+    through ``verify_transactions_sync``
+"""
+
+import asyncio
+import json
+import logging
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .service import (
+    CONTRACT_ARTIFACTS_PATH,
+    NOT_FOUND_RESULT,
+    VERIFY_CACHE_KEY,
+    BlockchainService,
+    _as_uuid,
+    _inclusion_result,
+    _proof_mismatch,
+    _trade_result,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Module-level singleton
+# ---------------------------------------------------------------------------
+_async_service_instance = None
+
+
+def get_async_blockchain_service():
+    """Return the module-level AsyncBlockchainService singleton."""
+    global _async_service_instance
+    if _async_service_instance is None:
+        _async_service_instance = AsyncBlockchainService()
+    return _async_service_instance
+
+
+def reset_async_blockchain_service():
+    """Reset the singleton (useful in tests)."""
+    global _async_service_instance
+    _async_service_instance = None
+
+
+class AsyncBlockchainService:
+    """Read-only AsyncWeb3 client for the TransactionLedger contract."""
+
+    def __init__(self):
+        self._web3 = None
+        self._contract = None
+        self._session = None
+        self._loop = None  # event loop the pooled session belongs to
+        self._abi = None
+        self._account_address = None
+
+    @property
+    def timeout(self):
+        return float(getattr(settings, "BLOCKCHAIN_RPC_TIMEOUT", 5))
+
+    async def _rpc(self, awaitable):
+        """Await one RPC with the per-call timeout."""
+        return await asyncio.wait_for(awaitable, timeout=self.timeout)
+
+    # ------------------------------------------------------------------
+    # Initialization
+    # ------------------------------------------------------------------
+
+    async def _ensure_initialized(self):
+        """Connect (once per event loop) and load the contract."""
+        if not getattr(settings, "BLOCKCHAIN_ENABLED", False):
+            return False
+
+        loop = asyncio.get_running_loop()
+        if self._web3 is not None and self._loop is loop:
+            return self._contract is not None
+        await self.close()
+
+        session = None
+        try:
+            from aiohttp import ClientSession, ClientTimeout, TCPConnector
+            from web3 import AsyncHTTPProvider, AsyncWeb3
+
+            rpc_url = getattr(settings, "BLOCKCHAIN_RPC_URL", "http://127.0.0.1:8545")
+            provider = AsyncHTTPProvider(rpc_url)
+            session = ClientSession(
+                connector=TCPConnector(
+                    limit=getattr(settings, "BLOCKCHAIN_RPC_POOL_SIZE", 20)
+                ),
+                timeout=ClientTimeout(total=self.timeout),
+            )
+            await provider.cache_async_session(session)
+            web3 = AsyncWeb3(provider)
+
+            if not await self._rpc(web3.is_connected()):
+                logger.warning("Cannot connect to blockchain node at %s", rpc_url)
+                await session.close()
+                return False
+
+            contract = self._load_contract(web3)
+        except Exception as exc:
+            logger.error("Failed to initialize async blockchain service: %s", _error_message(exc))
+            if session is not None:
+                await session.close()
+            return False
+
+        self._web3, self._contract, self._loop = web3, contract, loop
+        self._session = session
+        self._account_address = _account_address()
+        return contract is not None
+
+    async def close(self):
+        """Close the pooled session (if any); the next call reconnects."""
+        session, loop = self._session, self._loop
+        self._web3 = self._contract = self._session = self._loop = None
+        if session is None or session.closed:
+            return
+        try:
+            current = asyncio.get_running_loop()
+            if loop is not None and loop is not current and loop.is_running():
+                # Still serving another thread: close it on its own loop
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+            else:
+                await session.close()
+        except Exception as exc:
+            logger.warning("Error closing blockchain RPC session: %s", _error_message(exc))
+
+    def _load_contract(self, web3):
+        from web3 import Web3
+
+        address = BlockchainService._get_contract_address()
+        if not address or not CONTRACT_ARTIFACTS_PATH.exists():
+            logger.warning("Contract artifacts or address missing – async reads disabled")
+            return None
+        if self._abi is None:
+            with open(CONTRACT_ARTIFACTS_PATH, "r", encoding="utf-8") as fh:
+                self._abi = json.load(fh)["abi"]
+        return web3.eth.contract(
+            address=Web3.to_checksum_address(address), abi=self._abi
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def get_status(self):
+        """Async counterpart of ``BlockchainService.get_status``."""
+        if not await self._ensure_initialized():
+            return {
+                "status": "disconnected",
+                "network": "hardhat-local",
+                "message": "Blockchain service is not connected. Is Hardhat node running?",
+            }
+
+        try:
+            chain_id, block_number, trade_count = await asyncio.gather(
+                self._rpc(self._web3.eth.chain_id),
+                self._rpc(self._web3.eth.block_number),
+                self._rpc(self._contract.functions.tradeCount().call()),
+            )
+            return {
+                "status": "connected",
+                "network": "hardhat-local",
+                "chainId": chain_id,
+                "blockNumber": block_number,
+                "contractAddress": self._contract.address,
+                "accountAddress": self._account_address,
+                "tradeCount": trade_count,
+            }
+        except Exception as exc:
+            logger.error("Error getting blockchain status: %s", _error_message(exc))
+            return {
+                "status": "error",
+                "network": "hardhat-local",
+                "message": _error_message(exc),
+            }
+
+    async def verify_transaction(self, transaction_id):
+        """Async counterpart of ``BlockchainService.verify_transaction``."""
+        try:
+            transaction_id = _as_uuid(transaction_id)
+        except ValueError as exc:
+            return {"verified": False, "error": str(exc)}
+
+        cached = await _aget_cached(transaction_id)
+        if cached is not None:
+            return cached
+
+        if not await self._ensure_initialized():
+            return {"verified": False, "error": "Blockchain not available"}
+
+        try:
+            proof = await sync_to_async(BlockchainService._get_trade_proof)(
+                transaction_id
+            )
+            if proof is not None:
+                result = await self._verify_inclusion(proof, {})
+            else:
+                functions = self._contract.functions
+                exists, timestamp = await self._rpc(
+                    functions.verifyTrade(transaction_id.bytes).call()
+                )
+                if not exists:
+                    return dict(NOT_FOUND_RESULT)
+                trade_data = await self._rpc(
+                    functions.getTrade(transaction_id.bytes).call()
+                )
+                result = _trade_result(*trade_data[:4], timestamp)
+
+            await _aset_cached({transaction_id: result})
+            return result
+
+        except Exception as exc:
+            logger.error("Error verifying TX %s: %s", transaction_id, _error_message(exc))
+            return {"verified": False, "error": _error_message(exc)}
+
+    async def verify_transactions(self, transaction_ids):
+        """Async counterpart of ``BlockchainService.verify_transactions``."""
+        transaction_ids = list(dict.fromkeys(transaction_ids))
+        keys = {VERIFY_CACHE_KEY.format(tx_id=tx_id): str(tx_id) for tx_id in transaction_ids}
+        try:
+            found = await cache.aget_many(list(keys))
+        except Exception:
+            found = {}
+        results = {keys[key]: result for key, result in found.items()}
+        missing = [tx_id for tx_id in transaction_ids if str(tx_id) not in results]
+        if not missing:
+            return results
+
+        if not await self._ensure_initialized():
+            for tx_id in missing:
+                results[str(tx_id)] = {"verified": False, "error": "Blockchain not available"}
+            return results
+
+        verified = {}
+        try:
+            proofs = await sync_to_async(_get_trade_proofs)(missing)
+            roots = {}
+            for tx_id, proof in proofs.items():
+                verified[tx_id] = await self._verify_inclusion(proof, roots)
+
+            on_chain = [tx_id for tx_id in missing if tx_id not in proofs]
+            if on_chain:
+                trades = await self._rpc(
+                    self._contract.functions.getTrades(
+                        [tx_id.bytes for tx_id in on_chain]
+                    ).call()
+                )
+                for tx_id, trade in zip(on_chain, trades):
+                    verified[tx_id] = (
+                        _trade_result(*trade[1:5], trade[7])
+                        if trade[8]
+                        else dict(NOT_FOUND_RESULT)
+                    )
+
+        except Exception as exc:
+            logger.error("Error verifying %d TX(s): %s", len(missing), _error_message(exc))
+            for tx_id in missing:
+                verified.setdefault(
+                    tx_id, {"verified": False, "error": _error_message(exc)}
+                )
+
+        await _aset_cached(verified)
+        results.update((str(tx_id), result) for tx_id, result in verified.items())
+        return results
+
+    async def _verify_inclusion(self, trade_proof, roots):
+        mismatch = _proof_mismatch(trade_proof)
+        if mismatch is not None:
+            return mismatch
+
+        root = trade_proof.anchor.root
+        if root not in roots:
+            roots[root] = await self._rpc(
+                self._contract.functions.verifyRoot(root).call()
+            )
+        return _inclusion_result(trade_proof, *roots[root])
+
+
+def verify_transactions_sync(transaction_ids):
+    """
+    ``AsyncBlockchainService.verify_transactions`` for sync callers.
+
+    Runs on a throwaway client whose session is closed before the event loop
+    ``async_to_sync`` created for the call goes away.
+    """
+
+    async def _verify():
+        service = AsyncBlockchainService()
+        try:
+            return await service.verify_transactions(transaction_ids)
+        finally:
+            await service.close()
+
+    return async_to_sync(_verify)()
+
+
+def _error_message(exc):
+    # asyncio.TimeoutError has an empty message
+    return str(exc) or type(exc).__name__
+
+
+def _account_address():
+    """Address of the recording account (derived locally, no RPC)."""
+    from eth_account import Account
+
+    private_key = getattr(settings, "BLOCKCHAIN_PRIVATE_KEY", "")
+    return Account.from_key(private_key).address if private_key else None
+
+
+def _get_trade_proofs(transaction_ids):
+    from .models import TradeProof
+
+    return {
+        proof.transaction_id: proof
+        for proof in TradeProof.objects.select_related(
+            "anchor", "transaction__stock"
+        ).filter(transaction_id__in=transaction_ids)
+    }
+
+
+async def _aget_cached(transaction_id):
+    try:
+        return await cache.aget(VERIFY_CACHE_KEY.format(tx_id=transaction_id))
+    except Exception:
+        return None
+
+
+async def _aset_cached(results):
+    entries = {
+        VERIFY_CACHE_KEY.format(tx_id=tx_id): result
+        for tx_id, result in results.items()
+        if result.get("verified")
+    }
+    if not entries:
+        return
+    try:
+        await cache.aset_many(entries, timeout=None)
+    except Exception as exc:
+        logger.warning("Verification cache write failed: %s", exc)
@@ -0,0 +1,208 @@
+"""
+Event-log indexer for the TransactionLedger contract.
+
+Mirrors every ``TradeRecorded`` event into ``OnChainTrade`` so the chain can
+be audited against ``Transaction`` with SQL joins instead of one
+``getTrade`` RPC per trade.
+
+  - Logs are read in block ranges of ``BLOCKCHAIN_INDEXER_BLOCK_RANGE``
+    starting after the block stored in ``IndexerCheckpoint``; each range is
+    upserted and the checkpoint advanced in one DB transaction, so the
+    indexer can be stopped and resumed at any point
+  - Blocks newer than ``head - BLOCKCHAIN_INDEXER_CONFIRMATIONS`` are left
+    for the next run
+  - Upserts are idempotent: re-scanning a range rewrites the same rows
+
+Run by the ``index_chain_events`` management command and the
+``blockchain.index_trade_events`` beat task.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.db.models.functions import Floor
+
+from .models import ChainSubmission, IndexerCheckpoint, OnChainTrade
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = "trade_recorded"
+INDEXER_LOCK_KEY = "blockchain:indexer:lock"
+INDEXER_LOCK_TIMEOUT = 600
+
+UPSERT_FIELDS = [
+    "stock_symbol",
+    "price",
+    "quantity",
+    "total_value",
+    "buyer_id",
+    "seller_id",
+    "recorded_at",
+    "block_number",
+    "tx_hash",
+    "log_index",
+]
+
+
+def get_checkpoint():
+    checkpoint, _ = IndexerCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+    return checkpoint
+
+
+def reset_checkpoint(from_block):
+    """Make the next run start (again) at ``from_block``."""
+    IndexerCheckpoint.objects.update_or_create(
+        name=CHECKPOINT_NAME, defaults={"last_block": from_block - 1}
+    )
+
+
+def index_trade_events(block_range=None, max_ranges=None):
+    """
+    Index ``TradeRecorded`` events from the checkpoint up to the confirmed
+    head.
+
+    Args:
+        block_range: blocks per ``get_logs`` call
+            (default ``BLOCKCHAIN_INDEXER_BLOCK_RANGE``).
+        max_ranges: stop after this many ranges (``None`` = until caught up).
+
+    Returns:
+        dict with ``status`` (indexed / skipped / busy), ``indexed`` event
+        count and the checkpoint's ``lastBlock``.
+    """
+    from .service import get_blockchain_service
+
+    service = get_blockchain_service()
+    block_range = block_range or getattr(settings, "BLOCKCHAIN_INDEXER_BLOCK_RANGE", 2000)
+    confirmations = getattr(settings, "BLOCKCHAIN_INDEXER_CONFIRMATIONS", 0)
+
+    head = service.get_block_number()
+    if head is None:
+        return {"status": "skipped", "indexed": 0, "lastBlock": None}
+    head -= confirmations
+
+    if not cache.add(INDEXER_LOCK_KEY, 1, timeout=INDEXER_LOCK_TIMEOUT):
+        return {"status": "busy", "indexed": 0, "lastBlock": None}
+
+    indexed = ranges = 0
+    try:
+        checkpoint = get_checkpoint()
+        while checkpoint.last_block < head and (
+            max_ranges is None or ranges < max_ranges
+        ):
+            from_block = checkpoint.last_block + 1
+            to_block = min(from_block + block_range - 1, head)
+            events = service.get_trade_events(from_block, to_block)
+            with db_transaction.atomic():
+                upsert_trade_events(events)
+                checkpoint.last_block = to_block
+                checkpoint.save(update_fields=["last_block", "updated_at"])
+            indexed += len(events)
+            ranges += 1
+    finally:
+        cache.delete(INDEXER_LOCK_KEY)
+
+    if indexed:
+        logger.info(
+            "Indexed %d TradeRecorded event(s) up to block %d",
+            indexed,
+            checkpoint.last_block,
+        )
+    return {"status": "indexed", "indexed": indexed, "lastBlock": checkpoint.last_block}
+
+
+def upsert_trade_events(events):
+    """Bulk-upsert decoded ``TradeRecorded`` events into ``OnChainTrade``."""
+    rows = [
+        OnChainTrade(
+            transaction_id=uuid.UUID(bytes=bytes(event["transactionId"])),
+            stock_symbol=event["stockSymbol"],
+            price=event["price"],
+            quantity=event["quantity"],
+            total_value=event["totalValue"],
+            buyer_id=uuid.UUID(bytes=bytes(event["buyerId"])),
+            seller_id=uuid.UUID(bytes=bytes(event["sellerId"])),
+            recorded_at=datetime.fromtimestamp(event["timestamp"], tz=dt_timezone.utc),
+            block_number=event["blockNumber"],
+            tx_hash=event["transactionHash"],
+            log_index=event["logIndex"],
+        )
+        for event in events
+    ]
+    if rows:
+        OnChainTrade.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["transaction"],
+            update_fields=UPSERT_FIELDS,
+        )
+    return len(rows)
+
+
+def find_mismatches(limit=100):
+    """
+    Compare the indexed chain records with ``Transaction``.
+
+    - ``missingOnChain``: trades with a ``blockchain_hash`` (not Merkle
+      anchored) that have no event, although their submission was mined at
+      or below the checkpoint
+    - ``unknownOnChain``: events whose trade does not exist in the DB
+    - ``mismatched``: events whose fields differ from the trade row
+
+    Returns:
+        dict with ``lastBlock`` and, per category, ``count`` and up to
+        ``limit`` transaction ``ids``.
+    """
+    from transactions.models import Transaction
+
+    last_block = get_checkpoint().last_block
+    not_yet_indexed = ChainSubmission.objects.filter(
+        Q(status=ChainSubmission.SubmissionStatus.PENDING)
+        | Q(block_number__gt=last_block)
+    ).values("tx_hash")
+
+    missing = (
+        Transaction.objects.filter(
+            blockchain_hash__isnull=False,
+            merkle_proof__isnull=True,
+            chain_record__isnull=True,
+        )
+        .exclude(blockchain_hash__in=not_yet_indexed)
+        .order_by("executed_at")
+        .values_list("id", flat=True)
+    )
+    unknown = (
+        OnChainTrade.objects.filter(
+            ~Exists(Transaction.objects.filter(pk=OuterRef("transaction_id")))
+        )
+        .values_list("transaction_id", flat=True)
+    )
+    mismatched = (
+        OnChainTrade.objects.filter(
+            Exists(Transaction.objects.filter(pk=OuterRef("transaction_id")))
+        )
+        .exclude(
+            stock_symbol=F("transaction__stock__symbol"),
+            price=Floor("transaction__price"),
+            quantity=F("transaction__quantity"),
+            total_value=Floor("transaction__total_value"),
+            buyer_id=F("transaction__buyer_id"),
+            seller_id=F("transaction__seller_id"),
+        )
+        .values_list("transaction_id", flat=True)
+    )
+
+    def _summary(qs):
+        return {"count": qs.count(), "ids": [str(i) for i in qs[:limit]]}
+
+    return {
+        "lastBlock": last_block,
+        "missingOnChain": _summary(missing),
+        "unknownOnChain": _summary(unknown),
+        "mismatched": _summary(mismatched),
+    }
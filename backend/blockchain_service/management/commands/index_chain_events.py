@@ -0,0 +1,74 @@
+"""
+Management command to mirror TradeRecorded events into the database.
+
+Usage:
+    python manage.py index_chain_events                  # resume from checkpoint
+    python manage.py index_chain_events --from-block 0   # re-index from block 0
+    python manage.py index_chain_events --report         # + chain/DB mismatch report
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blockchain_service.indexer import (
+    find_mismatches,
+    index_trade_events,
+    reset_checkpoint,
+)
+
+
+class Command(BaseCommand):
+    help = "Index TradeRecorded contract events and report chain/DB mismatches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from-block",
+            type=int,
+            help="Restart indexing at this block instead of the stored checkpoint",
+        )
+        parser.add_argument(
+            "--block-range",
+            type=int,
+            help="Blocks per log query (default BLOCKCHAIN_INDEXER_BLOCK_RANGE)",
+        )
+        parser.add_argument(
+            "--report",
+            action="store_true",
+            help="Print trades that are missing, unknown or different on-chain",
+        )
+
+    def handle(self, *args, **options):
+        if options["from_block"] is not None:
+            reset_checkpoint(options["from_block"])
+
+        try:
+            result = index_trade_events(block_range=options["block_range"])
+        except Exception as exc:
+            raise CommandError(f"Indexing failed: {exc}")
+
+        if result["status"] == "skipped":
+            raise CommandError(
+                "Blockchain not available. Ensure the Hardhat node is running "
+                "and BLOCKCHAIN_ENABLED=True"
+            )
+        if result["status"] == "busy":
+            raise CommandError("Another indexer run is in progress")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {result['indexed']} event(s); "
+                f"checkpoint at block {result['lastBlock']}"
+            )
+        )
+
+        if options["report"]:
+            report = find_mismatches()
+            for key, label in (
+                ("missingOnChain", "Recorded in DB but not on-chain"),
+                ("unknownOnChain", "On-chain but not in DB"),
+                ("mismatched", "Fields differ"),
+            ):
+                entry = report[key]
+                style = self.style.WARNING if entry["count"] else self.style.SUCCESS
+                self.stdout.write(style(f"{label}: {entry['count']}"))
+                for tx_id in entry["ids"]:
+                    self.stdout.write(f"  {tx_id}")
@@ -0,0 +1,74 @@
+"""
+Merkle trees for anchoring windows of trades on-chain.
+
+In ``BLOCKCHAIN_ANCHOR_MODE="merkle"`` the recorder stores only the root of
+a tree built over a window of Transactions (``anchorRoot`` in the contract);
+every trade keeps its inclusion proof in ``TradeProof``.
+
+Hashing matches ``TransactionLedger.verifyInclusion``:
+  - leaf   = keccak256(abi.encode(id, symbol, price, quantity, total,
+             buyerId, sellerId))  – same fields as ``recordTrade``
+  - parent = keccak256(min(a, b) ++ max(a, b))  (sorted pair, so a proof is
+             just the list of sibling hashes)
+  - an odd node at the end of a level is carried up unchanged
+"""
+
+from eth_abi import encode
+from eth_utils import keccak
+
+LEAF_TYPES = ["bytes16", "string", "uint256", "uint256", "uint256", "bytes16", "bytes16"]
+
+
+def trade_leaf(transaction):
+    """Leaf hash (bytes32) of a ``transactions.models.Transaction``."""
+    from .service import BlockchainService
+
+    return keccak(encode(LEAF_TYPES, list(BlockchainService._trade_args(transaction))))
+
+
+def hash_pair(a, b):
+    return keccak(a + b) if a < b else keccak(b + a)
+
+
+def build_levels(leaves):
+    """All tree levels, leaves first and the single root last."""
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(levels):
+    return levels[-1][0]
+
+
+def merkle_proof(levels, index):
+    """Sibling hashes from leaf ``index`` up to the root."""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf, proof, root):
+    node = leaf
+    for sibling in proof:
+        node = hash_pair(node, sibling)
+    return node == root
+
+
+def to_hex(value):
+    return "0x" + value.hex()
+
+
+def from_hex(value):
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
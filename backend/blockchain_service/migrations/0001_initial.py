@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChainSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tx_hash', models.CharField(max_length=66, unique=True)),
+                ('trade_count', models.PositiveIntegerField(default=1)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('reverted', 'Reverted'), ('dropped', 'Dropped')], default='pending', max_length=10)),
+                ('block_number', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Chain Submission',
+                'verbose_name_plural': 'Chain Submissions',
+                'ordering': ['submitted_at'],
+                'indexes': [models.Index(fields=['status', 'submitted_at'], name='chainsub_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain_service', '0001_initial'),
+        ('transactions', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MerkleAnchor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('root', models.CharField(max_length=66, unique=True)),
+                ('trade_count', models.PositiveIntegerField()),
+                ('tx_hash', models.CharField(blank=True, max_length=66, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Merkle Anchor',
+                'verbose_name_plural': 'Merkle Anchors',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TradeProof',
+            fields=[
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='merkle_proof', serialize=False, to='transactions.transaction')),
+                ('leaf_index', models.PositiveIntegerField()),
+                ('proof', models.JSONField(default=list)),
+                ('anchor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='proofs', to='blockchain_service.merkleanchor')),
+            ],
+            options={
+                'verbose_name': 'Trade Proof',
+                'verbose_name_plural': 'Trade Proofs',
+            },
+        ),
+    ]
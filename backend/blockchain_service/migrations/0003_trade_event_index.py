@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain_service', '0002_merkle_anchoring'),
+        ('transactions', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_block', models.BigIntegerField(default=-1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Indexer Checkpoint',
+                'verbose_name_plural': 'Indexer Checkpoints',
+            },
+        ),
+        migrations.CreateModel(
+            name='OnChainTrade',
+            fields=[
+                ('transaction', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='chain_record', serialize=False, to='transactions.transaction')),
+                ('stock_symbol', models.CharField(max_length=32)),
+                ('price', models.DecimalField(decimal_places=0, max_digits=30)),
+                ('quantity', models.DecimalField(decimal_places=0, max_digits=30)),
+                ('total_value', models.DecimalField(decimal_places=0, max_digits=30)),
+                ('buyer_id', models.UUIDField()),
+                ('seller_id', models.UUIDField()),
+                ('recorded_at', models.DateTimeField()),
+                ('block_number', models.PositiveBigIntegerField()),
+                ('tx_hash', models.CharField(max_length=66)),
+                ('log_index', models.PositiveIntegerField()),
+            ],
+            options={
+                'verbose_name': 'On-chain Trade',
+                'verbose_name_plural': 'On-chain Trades',
+                'ordering': ['block_number', 'log_index'],
+                'indexes': [models.Index(fields=['block_number'], name='chaintrade_block_idx'), models.Index(fields=['tx_hash'], name='chaintrade_txhash_idx')],
+            },
+        ),
+    ]
@@ -2,7 +2,154 @@
 Blockchain Service Models.
 Sprint 4 - Blockchain Integration
 
-No additional Django models are needed.  The deployed contract address is
-stored in ``contract_address.json`` (managed by the service module), and
-the on-chain transaction hash is stored on ``Transaction.blockchain_hash``.
+The deployed contract address is stored in ``contract_address.json``
+(managed by the service module), and the on-chain transaction hash is
+stored on ``Transaction.blockchain_hash``.
+
+``ChainSubmission`` tracks chain transactions that were sent without
+waiting for their receipt; the receipt poller
+(``blockchain.poll_receipts``) confirms them, or hands their trades back to
+the recorder when they revert or get dropped.
+
+In Merkle anchoring mode (``BLOCKCHAIN_ANCHOR_MODE="merkle"``) a window of
+trades is anchored as one ``MerkleAnchor`` root, and each trade keeps its
+``TradeProof`` so it can be verified locally (see merkle.py).
+
+``OnChainTrade`` mirrors the contract's ``TradeRecorded`` events (filled by
+the event-log indexer, see indexer.py, from the block stored in
+``IndexerCheckpoint``) so chain/DB audits run as SQL joins.
 """
+
+from django.db import models
+
+
+class ChainSubmission(models.Model):
+    """A submitted (fire-and-forget) chain transaction awaiting its receipt."""
+
+    class SubmissionStatus(models.TextChoices):
+        PENDING = "pending", "Pending"
+        CONFIRMED = "confirmed", "Confirmed"
+        REVERTED = "reverted", "Reverted"
+        DROPPED = "dropped", "Dropped"
+
+    tx_hash = models.CharField(max_length=66, unique=True)
+    trade_count = models.PositiveIntegerField(default=1)
+    status = models.CharField(
+        max_length=10,
+        choices=SubmissionStatus.choices,
+        default=SubmissionStatus.PENDING,
+    )
+    block_number = models.PositiveBigIntegerField(null=True, blank=True)
+    submitted_at = models.DateTimeField(auto_now_add=True)
+    confirmed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["submitted_at"]
+        indexes = [
+            models.Index(
+                fields=["status", "submitted_at"], name="chainsub_status_idx"
+            ),
+        ]
+        verbose_name = "Chain Submission"
+        verbose_name_plural = "Chain Submissions"
+
+    def __str__(self):
+        return f"{self.tx_hash} ({self.status}, {self.trade_count} trade(s))"
+
+
+class MerkleAnchor(models.Model):
+    """Merkle root of a window of trades, anchored with ``anchorRoot``."""
+
+    root = models.CharField(max_length=66, unique=True)
+    trade_count = models.PositiveIntegerField()
+    tx_hash = models.CharField(max_length=66, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Merkle Anchor"
+        verbose_name_plural = "Merkle Anchors"
+
+    def __str__(self):
+        return f"{self.root} ({self.trade_count} trade(s))"
+
+
+class TradeProof(models.Model):
+    """Inclusion proof of one trade in a ``MerkleAnchor`` root."""
+
+    transaction = models.OneToOneField(
+        "transactions.Transaction",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="merkle_proof",
+    )
+    anchor = models.ForeignKey(
+        MerkleAnchor,
+        on_delete=models.CASCADE,
+        related_name="proofs",
+    )
+    leaf_index = models.PositiveIntegerField()
+    # Sibling hashes (hex) from the leaf up to the root
+    proof = models.JSONField(default=list)
+
+    class Meta:
+        verbose_name = "Trade Proof"
+        verbose_name_plural = "Trade Proofs"
+
+    def __str__(self):
+        return f"Proof of TX {self.transaction_id} in {self.anchor.root}"
+
+
+class IndexerCheckpoint(models.Model):
+    """Last block an event-log indexer has fully processed."""
+
+    name = models.CharField(max_length=50, unique=True)
+    last_block = models.BigIntegerField(default=-1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Indexer Checkpoint"
+        verbose_name_plural = "Indexer Checkpoints"
+
+    def __str__(self):
+        return f"{self.name} @ block {self.last_block}"
+
+
+class OnChainTrade(models.Model):
+    """
+    A ``TradeRecorded`` event as indexed from the chain.
+
+    Keyed by the trade's Transaction id but without a DB constraint: the
+    chain may hold trades the DB does not know (that is a mismatch to
+    report, not an integrity error).
+    """
+
+    transaction = models.OneToOneField(
+        "transactions.Transaction",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        primary_key=True,
+        related_name="chain_record",
+    )
+    stock_symbol = models.CharField(max_length=32)
+    price = models.DecimalField(max_digits=30, decimal_places=0)
+    quantity = models.DecimalField(max_digits=30, decimal_places=0)
+    total_value = models.DecimalField(max_digits=30, decimal_places=0)
+    buyer_id = models.UUIDField()
+    seller_id = models.UUIDField()
+    recorded_at = models.DateTimeField()
+    block_number = models.PositiveBigIntegerField()
+    tx_hash = models.CharField(max_length=66)
+    log_index = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["block_number", "log_index"]
+        indexes = [
+            models.Index(fields=["block_number"], name="chaintrade_block_idx"),
+            models.Index(fields=["tx_hash"], name="chaintrade_txhash_idx"),
+        ]
+        verbose_name = "On-chain Trade"
+        verbose_name_plural = "On-chain Trades"
+
+    def __str__(self):
+        return f"{self.transaction_id} @ block {self.block_number}"
@@ -5,11 +5,22 @@ Sprint 4 - Web3.py integration with Hardhat local network
 Provides:
   - Connection to the local Hardhat Ethereum network (localhost:8545)
   - Deployment & interaction with the TransactionLedger smart contract
-  - Recording matched stock transactions on-chain
-  - Verification of on-chain transaction records
+  - Recording matched stock transactions on-chain (one by one, or in
+    batches through ``recordTrades``)
+  - Merkle anchoring mode: only the root of a window of trades goes on-chain
+    (``anchorRoot``); see merkle.py
+  - Reading ``TradeRecorded`` event logs for the indexer (indexer.py)
+  - Verification of on-chain transaction records (or of a trade's stored
+    inclusion proof against its anchored root), one by one or in bulk with a
+    single ``getTrades`` read; successful results are cached forever since
+    recorded trades are immutable
 
 Architecture:
   - Singleton service with lazy initialization
+  - Fire-and-forget submission: nonces come from a shared counter
+    (``NonceManager``), gas prices and single-call gas estimates are cached
+    (batches are estimated per call), and receipts are confirmed later by
+    the ``blockchain.poll_receipts`` task
   - Non-blocking: matching engine works even if blockchain is unavailable
   - Contract ABI read from Hardhat artifacts (contracts/artifacts/)
   - Deployed address stored in contract_address.json
@@ -18,9 +29,12 @@ Architecture:
 import json
 import logging
 import os
+import time
+import uuid
 from pathlib import Path
 
 from django.conf import settings
+from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +55,20 @@ CONTRACT_ADDRESS_FILE = Path(
 )
 
 
+NONCE_CACHE_KEY = "blockchain:nonce:{address}"
+GAS_CACHE_KEY = "blockchain:gas:{key}"
+GAS_CACHE_TIMEOUT = 3600
+GAS_HEADROOM = 1.2
+GAS_PRICE_TTL = 15  # seconds
+VERIFY_CACHE_KEY = "blockchain:verify:{tx_id}"
+
+NOT_FOUND_RESULT = {
+    "verified": False,
+    "onChain": False,
+    "message": "Transaction not found on blockchain",
+}
+
+
 # ---------------------------------------------------------------------------
 # Module-level singleton
 # ---------------------------------------------------------------------------
@@ -63,9 +91,171 @@ def reset_blockchain_service():
         _service_instance._contract = None
         _service_instance._web3 = None
         _service_instance._account = None
+        _service_instance._nonces = None
     _service_instance = None
 
 
+def is_recordable(transaction):
+    """
+    Whether ``recordTrades`` can store the trade: the contract skips
+    (``TradeRejected``) trades whose on-chain price or quantity is zero.
+    """
+    return int(transaction.price) > 0 and transaction.quantity > 0
+
+
+def _as_uuid(value):
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+def _trade_result(stock_symbol, price, quantity, total_value, timestamp):
+    return {
+        "verified": True,
+        "onChain": True,
+        "stockSymbol": stock_symbol,
+        "price": price,
+        "quantity": quantity,
+        "totalValue": total_value,
+        "timestamp": timestamp,
+    }
+
+
+def _proof_mismatch(trade_proof):
+    """Failure result when the stored row no longer matches its proof."""
+    from .merkle import from_hex, trade_leaf, verify_proof
+
+    root = trade_proof.anchor.root
+    if verify_proof(
+        trade_leaf(trade_proof.transaction),
+        [from_hex(h) for h in trade_proof.proof],
+        from_hex(root),
+    ):
+        return None
+    return {
+        "verified": False,
+        "onChain": False,
+        "merkleRoot": root,
+        "message": "Transaction does not match its Merkle proof",
+    }
+
+
+def _inclusion_result(trade_proof, anchored, timestamp):
+    """Verification result of a proof-checked trade given its root status."""
+    root = trade_proof.anchor.root
+    if not anchored:
+        return {
+            "verified": False,
+            "onChain": False,
+            "merkleRoot": root,
+            "message": "Merkle root not anchored on blockchain",
+        }
+
+    tx = trade_proof.transaction
+    return {
+        "verified": True,
+        "onChain": True,
+        "stockSymbol": tx.stock.symbol,
+        "price": int(tx.price),
+        "quantity": tx.quantity,
+        "totalValue": int(tx.total_value),
+        "timestamp": timestamp,
+        "merkleRoot": root,
+        "merkleProof": trade_proof.proof,
+        "leafIndex": trade_proof.leaf_index,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Verification cache
+# ---------------------------------------------------------------------------
+# On-chain records never change, so a successful verification is cached
+# without expiry. Failures (not found yet, node errors) are never cached.
+
+def _get_cached_verification(transaction_id):
+    try:
+        return cache.get(VERIFY_CACHE_KEY.format(tx_id=transaction_id))
+    except Exception:
+        return None
+
+
+def _cache_verifications(results):
+    """Cache the successful ones of ``{transaction_id: result}``."""
+    entries = {
+        VERIFY_CACHE_KEY.format(tx_id=tx_id): result
+        for tx_id, result in results.items()
+        if result.get("verified")
+    }
+    if not entries:
+        return
+    try:
+        cache.set_many(entries, timeout=None)
+    except Exception as exc:
+        logger.warning("Verification cache write failed: %s", exc)
+
+
+def _to_hex(value):
+    """HexBytes / bytes / str → ``0x``-prefixed hex string."""
+    hash_hex = value if isinstance(value, str) else value.hex()
+    if not hash_hex.startswith("0x"):
+        hash_hex = "0x" + hash_hex
+    return hash_hex
+
+
+# ---------------------------------------------------------------------------
+# Nonce manager
+# ---------------------------------------------------------------------------
+class NonceManager:
+    """
+    Hands out account nonces from a shared counter in the Django cache
+    (Redis in production), so every worker process can send concurrently
+    without asking the node or colliding on the same nonce.
+
+    The counter is seeded from the node's pending transaction count the
+    first time (or after ``reset``); ``cache.incr`` is atomic in Redis.
+    """
+
+    def __init__(self, web3, address):
+        self._web3 = web3
+        self.address = address
+        self.key = NONCE_CACHE_KEY.format(address=address.lower())
+
+    def allocate(self):
+        """Return the next unused nonce."""
+        for _attempt in range(2):
+            try:
+                seeded = cache.get(self.key) is not None
+            except Exception as exc:
+                return self._node_nonce(exc)
+            if not seeded:
+                # Node errors propagate: the send cannot go out anyway
+                chain_nonce = self._web3.eth.get_transaction_count(
+                    self.address, "pending"
+                )
+                try:
+                    # Only the first process to seed wins; others reuse its value
+                    cache.add(self.key, chain_nonce, timeout=None)
+                except Exception as exc:
+                    return self._node_nonce(exc)
+            try:
+                return cache.incr(self.key) - 1
+            except ValueError:
+                # Key expired/evicted between seeding and incr: seed once more
+                continue
+            except Exception as exc:
+                return self._node_nonce(exc)
+        return self._node_nonce("counter evicted twice in a row")
+
+    def _node_nonce(self, reason):
+        logger.warning("Shared nonce counter unavailable, asking node: %s", reason)
+        return self._web3.eth.get_transaction_count(self.address, "pending")
+
+    def reset(self):
+        """Forget the counter; the next allocation resyncs from the node."""
+        try:
+            cache.delete(self.key)
+        except Exception as exc:
+            logger.warning("Nonce counter reset failed: %s", exc)
+
+
 # ---------------------------------------------------------------------------
 # Service class
 # ---------------------------------------------------------------------------
@@ -77,6 +267,8 @@ class BlockchainService:
         self._contract = None
         self._account = None
         self._initialized = False
+        self._nonces = None
+        self._gas_price_cache = None  # (price, expires_at)
 
     # ------------------------------------------------------------------
     # Initialization
@@ -227,7 +419,10 @@ class BlockchainService:
 
     def record_transaction(self, transaction):
         """
-        Record a Transaction on the blockchain.
+        Submit a Transaction to the blockchain (fire-and-forget).
+
+        The chain transaction is sent without waiting for its receipt;
+        ``poll_receipts`` confirms it later (see ``ChainSubmission``).
 
         Args:
             transaction: ``transactions.models.Transaction`` instance.
@@ -243,64 +438,228 @@ class BlockchainService:
             return None
 
         try:
-            # Convert Python UUIDs → bytes16
-            tx_id_bytes = transaction.id.bytes
-            buyer_id_bytes = transaction.buyer.id.bytes
-            seller_id_bytes = transaction.seller.id.bytes
-
             tx_func = self._contract.functions.recordTrade(
-                tx_id_bytes,
-                transaction.stock.symbol,
-                int(transaction.price),
-                transaction.quantity,
-                int(transaction.total_value),
-                buyer_id_bytes,
-                seller_id_bytes,
+                *self._trade_args(transaction)
             )
-
-            # Build, sign, send
-            nonce = self._web3.eth.get_transaction_count(self._account.address)
-            gas_estimate = tx_func.estimate_gas({"from": self._account.address})
-
-            built_tx = tx_func.build_transaction(
-                {
-                    "from": self._account.address,
-                    "nonce": nonce,
-                    "gas": gas_estimate + 10_000,
-                    "gasPrice": self._web3.eth.gas_price,
-                }
+            hash_hex = self._submit(tx_func, "recordTrade")
+            logger.info(
+                "TX %s submitted on-chain – hash %s", transaction.id, hash_hex
             )
+            return hash_hex
 
-            signed_tx = self._web3.eth.account.sign_transaction(
-                built_tx, self._account.key
+        except Exception as exc:
+            logger.error(
+                "Error recording TX %s on blockchain: %s",
+                transaction.id,
+                exc,
             )
-            raw = signed_tx.raw_transaction
-            tx_hash = self._web3.eth.send_raw_transaction(raw)
+            return None
 
-            receipt = self._web3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+    def record_transactions(self, transactions):
+        """
+        Submit a batch of Transactions with a single ``recordTrades`` call
+        (fire-and-forget, like ``record_transaction``).
 
-            if receipt["status"] == 1:
-                hash_hex = receipt["transactionHash"].hex()
-                if not hash_hex.startswith("0x"):
-                    hash_hex = "0x" + hash_hex
-                logger.info(
-                    "TX %s recorded on-chain – hash %s", transaction.id, hash_hex
-                )
-                return hash_hex
+        Trades already on the ledger are skipped by the contract, so a batch
+        can safely be resubmitted. Trades the contract cannot store (see
+        ``is_recordable``) are dropped with a warning instead of being sent.
 
-            logger.error(
-                "On-chain TX reverted for transaction %s", transaction.id
+        Args:
+            transactions: list of ``transactions.models.Transaction``
+                (``stock`` should be select_related).
+
+        Returns:
+            ``str`` – hex hash of the batch transaction **or** ``None``.
+        """
+        invalid = [tx for tx in transactions if not is_recordable(tx)]
+        if invalid:
+            logger.warning(
+                "Not recording %d TX(s) with zero on-chain price/quantity: %s",
+                len(invalid),
+                ", ".join(str(tx.id) for tx in invalid),
             )
+            transactions = [tx for tx in transactions if is_recordable(tx)]
+        if not transactions:
             return None
 
+        if not self.is_available():
+            logger.warning(
+                "Blockchain not available – skipping on-chain recording of %d TX(s)",
+                len(transactions),
+            )
+            return None
+
+        try:
+            tx_func = self._contract.functions.recordTrades(
+                [self._trade_args(tx) for tx in transactions]
+            )
+            # Batch gas depends on the contents, not just the length:
+            # estimate every batch instead of reusing a cached figure
+            hash_hex = self._submit(tx_func)
+            logger.info(
+                "%d TX(s) submitted on-chain – hash %s", len(transactions), hash_hex
+            )
+            return hash_hex
+
         except Exception as exc:
             logger.error(
-                "Error recording TX %s on blockchain: %s",
-                transaction.id,
+                "Error recording batch of %d TX(s) on blockchain: %s",
+                len(transactions),
                 exc,
             )
             return None
 
+    def anchor_root(self, root, trade_count):
+        """
+        Submit the Merkle root of a window of trades (fire-and-forget).
+
+        Args:
+            root: ``0x``-prefixed hex root (see merkle.py).
+            trade_count: number of leaves in the tree.
+
+        Returns:
+            ``str`` – hex tx hash **or** ``None`` on failure.
+        """
+        if not self.is_available():
+            logger.warning(
+                "Blockchain not available – skipping anchoring of %d TX(s)",
+                trade_count,
+            )
+            return None
+
+        try:
+            tx_func = self._contract.functions.anchorRoot(root, trade_count)
+            hash_hex = self._submit(tx_func, "anchorRoot")
+            logger.info(
+                "Merkle root %s (%d TX(s)) submitted on-chain – hash %s",
+                root,
+                trade_count,
+                hash_hex,
+            )
+            return hash_hex
+
+        except Exception as exc:
+            logger.error("Error anchoring Merkle root %s: %s", root, exc)
+            return None
+
+    def get_receipt_status(self, tx_hash):
+        """
+        Non-blocking receipt lookup for a submitted transaction.
+
+        Returns:
+            ``dict`` with ``status`` – ``"confirmed"``, ``"reverted"`` or
+            ``"pending"`` (not mined yet / unknown to the node) – and
+            ``blockNumber`` when mined, or ``None`` when unavailable.
+        """
+        if not self.is_available():
+            return None
+
+        from web3.exceptions import TransactionNotFound
+
+        try:
+            receipt = self._web3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return {"status": "pending", "blockNumber": None}
+        if receipt is None:
+            return {"status": "pending", "blockNumber": None}
+        return {
+            "status": "confirmed" if receipt["status"] == 1 else "reverted",
+            "blockNumber": receipt["blockNumber"],
+        }
+
+    @staticmethod
+    def _trade_args(transaction):
+        """recordTrade arguments / TradeInput tuple (UUIDs → bytes16)."""
+        return (
+            transaction.id.bytes,
+            transaction.stock.symbol,
+            int(transaction.price),
+            transaction.quantity,
+            int(transaction.total_value),
+            transaction.buyer_id.bytes,
+            transaction.seller_id.bytes,
+        )
+
+    # ------------------------------------------------------------------
+    # Submission (nonce / gas management)
+    # ------------------------------------------------------------------
+
+    def _submit(self, tx_func, gas_key=None):
+        """
+        Build, sign and send a contract call without waiting for the receipt.
+
+        The nonce comes from the shared ``NonceManager`` and the gas limit /
+        price from caches, so a send costs one RPC round trip instead of four.
+        Without a ``gas_key`` the gas limit is estimated for this call.
+
+        Gas is worked out before a nonce is taken, and a nonce that was taken
+        but not sent resets the counter, so a failure never leaves a gap that
+        would hold up every later transaction of the account.
+        """
+        gas = self._gas_limit(tx_func, gas_key)
+        gas_price = self._gas_price()
+
+        nonces = self._nonce_manager()
+        nonce = nonces.allocate()
+        try:
+            built_tx = tx_func.build_transaction(
+                {
+                    "from": self._account.address,
+                    "nonce": nonce,
+                    "gas": gas,
+                    "gasPrice": gas_price,
+                }
+            )
+            signed_tx = self._web3.eth.account.sign_transaction(
+                built_tx, self._account.key
+            )
+            tx_hash = self._web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception:
+            # The allocated nonce was not used (or ours was out of date):
+            # resync from the node on the next send.
+            nonces.reset()
+            raise
+        return _to_hex(tx_hash)
+
+    def reset_nonce(self):
+        """Resync the shared nonce counter from the node on the next send."""
+        if self._account is not None:
+            self._nonce_manager().reset()
+
+    def _nonce_manager(self):
+        if self._nonces is None:
+            self._nonces = NonceManager(self._web3, self._account.address)
+        return self._nonces
+
+    def _gas_limit(self, tx_func, gas_key):
+        """Gas estimate cached per function signature (fresh if no ``gas_key``)."""
+        if gas_key is None:
+            estimate = tx_func.estimate_gas({"from": self._account.address})
+            return int(estimate * GAS_HEADROOM) + 10_000
+
+        key = GAS_CACHE_KEY.format(key=gas_key)
+        try:
+            estimate = cache.get(key)
+        except Exception:
+            estimate = None
+        if estimate is None:
+            estimate = tx_func.estimate_gas({"from": self._account.address})
+            try:
+                cache.set(key, estimate, timeout=GAS_CACHE_TIMEOUT)
+            except Exception as exc:
+                logger.warning("Gas estimate cache write failed: %s", exc)
+        # Headroom: the cached estimate came from a different call
+        return int(estimate * GAS_HEADROOM) + 10_000
+
+    def _gas_price(self):
+        now = time.monotonic()
+        if self._gas_price_cache is None or self._gas_price_cache[1] <= now:
+            self._gas_price_cache = (
+                self._web3.eth.gas_price,
+                now + GAS_PRICE_TTL,
+            )
+        return self._gas_price_cache[0]
+
     # ------------------------------------------------------------------
     # Verify transaction
     # ------------------------------------------------------------------
@@ -315,43 +674,114 @@ class BlockchainService:
         Returns:
             ``dict`` with verification details.
         """
-        if not self.is_available():
-            return {"verified": False, "error": "Blockchain not available"}
-
         try:
-            import uuid as uuid_mod
+            transaction_id = _as_uuid(transaction_id)
+        except ValueError as exc:
+            return {"verified": False, "error": str(exc)}
 
-            if isinstance(transaction_id, str):
-                transaction_id = uuid_mod.UUID(transaction_id)
+        cached = _get_cached_verification(transaction_id)
+        if cached is not None:
+            return cached
 
-            tx_id_bytes = transaction_id.bytes
+        if not self.is_available():
+            return {"verified": False, "error": "Blockchain not available"}
 
-            exists, timestamp = self._contract.functions.verifyTrade(
-                tx_id_bytes
-            ).call()
+        try:
+            proof = self._get_trade_proof(transaction_id)
+            if proof is not None:
+                result = self._verify_inclusion(proof)
+            else:
+                tx_id_bytes = transaction_id.bytes
+
+                exists, timestamp = self._contract.functions.verifyTrade(
+                    tx_id_bytes
+                ).call()
+                if not exists:
+                    return dict(NOT_FOUND_RESULT)
 
-            if exists:
                 trade_data = self._contract.functions.getTrade(tx_id_bytes).call()
-                return {
-                    "verified": True,
-                    "onChain": True,
-                    "stockSymbol": trade_data[0],
-                    "price": trade_data[1],
-                    "quantity": trade_data[2],
-                    "totalValue": trade_data[3],
-                    "timestamp": timestamp,
-                }
+                result = _trade_result(*trade_data[:4], timestamp)
 
-            return {
-                "verified": False,
-                "onChain": False,
-                "message": "Transaction not found on blockchain",
-            }
+            _cache_verifications({transaction_id: result})
+            return result
 
         except Exception as exc:
             logger.error("Error verifying TX %s: %s", transaction_id, exc)
             return {"verified": False, "error": str(exc)}
 
+    def verify_transactions(self, transaction_ids):
+        """
+        Verify many transactions at once.
+
+        Cached results are served first; Merkle-anchored trades are checked
+        locally (one ``verifyRoot`` per distinct root) and the rest are
+        fetched with a single ``getTrades`` read. This is the async service's
+        implementation (async_service.py), run to completion.
+
+        Args:
+            transaction_ids: iterable of ``uuid.UUID``.
+
+        Returns:
+            ``dict`` mapping the string id to its verification details.
+        """
+        from .async_service import verify_transactions_sync
+
+        return verify_transactions_sync(transaction_ids)
+
+    @staticmethod
+    def _get_trade_proof(transaction_id):
+        from .models import TradeProof
+
+        return (
+            TradeProof.objects.select_related("anchor", "transaction__stock")
+            .filter(transaction_id=transaction_id)
+            .first()
+        )
+
+    def _verify_inclusion(self, trade_proof):
+        """
+        Verify a Merkle-anchored trade: the proof is checked locally against
+        the leaf recomputed from the stored row, so only the root lookup
+        touches the node.
+        """
+        mismatch = _proof_mismatch(trade_proof)
+        if mismatch is not None:
+            return mismatch
+
+        anchored = self._contract.functions.verifyRoot(trade_proof.anchor.root).call()
+        return _inclusion_result(trade_proof, *anchored)
+
+    # ------------------------------------------------------------------
+    # Event logs (indexer)
+    # ------------------------------------------------------------------
+
+    def get_block_number(self):
+        """Latest block number, or ``None`` when unavailable."""
+        if not self.is_available():
+            return None
+        return self._web3.eth.block_number
+
+    def get_trade_events(self, from_block, to_block):
+        """
+        ``TradeRecorded`` events emitted in ``[from_block, to_block]``.
+
+        Returns:
+            list of dicts with the event fields plus ``blockNumber``,
+            ``transactionHash`` (hex) and ``logIndex``.
+        """
+        logs = self._contract.events.TradeRecorded().get_logs(
+            from_block=from_block, to_block=to_block
+        )
+        return [
+            {
+                **log["args"],
+                "blockNumber": log["blockNumber"],
+                "transactionHash": _to_hex(log["transactionHash"]),
+                "logIndex": log["logIndex"],
+            }
+            for log in logs
+        ]
+
     # ------------------------------------------------------------------
     # Deploy contract (used by management command)
     # ------------------------------------------------------------------
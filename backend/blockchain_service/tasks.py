@@ -2,18 +2,53 @@
 Celery tasks for blockchain transaction recording.
 Sprint 4 - Blockchain Integration
 
-After the matching engine creates a Transaction, a Celery task is fired
-(via ``transaction.on_commit``) to record the trade on the private Hardhat
-blockchain.  In dev mode (``CELERY_TASK_ALWAYS_EAGER=True``), the task
-executes synchronously inside the same request.
+After a matching pass commits, the engine schedules the batch recorder
+(``schedule_batch_recording`` via ``transaction.on_commit``). The recorder
+collects every unrecorded Transaction (``blockchain_hash IS NULL``) and
+submits them ``BLOCKCHAIN_BATCH_SIZE`` at a time through the contract's
+``recordTrades`` function - one chain transaction per batch instead of one
+per trade - then writes the hash back with a single ``bulk_update``.
+
+The task is delayed by ``BLOCKCHAIN_BATCH_DELAY`` seconds so a burst of
+matches shares batches, and at most one run is scheduled per window. In dev
+mode (``CELERY_TASK_ALWAYS_EAGER=True``), it executes synchronously inside
+the same request. A Celery Beat entry re-runs it as a safety net.
+
+``record_transaction_on_blockchain`` (one trade per chain transaction) is
+kept for manual re-recording of a single trade.
+
+With ``BLOCKCHAIN_ANCHOR_MODE="merkle"`` each batch (of up to
+``BLOCKCHAIN_MERKLE_WINDOW`` trades) is anchored as a single Merkle root
+instead, and every trade gets a stored ``TradeProof``; the chain cost per
+batch no longer depends on the number of trades.
+
+Submissions are fire-and-forget: the recorder does not wait for receipts,
+it stores a ``ChainSubmission`` per chain transaction and moves on to the
+next batch. ``poll_receipts`` later confirms mined submissions, and clears
+the hash of reverted or dropped ones so their trades are recorded again.
+
+``index_trade_events_task`` periodically mirrors ``TradeRecorded`` events
+into ``OnChainTrade`` for audits (see indexer.py).
 """
 
 import logging
 
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 
+BATCH_SCHEDULED_KEY = "blockchain:batch:scheduled"
+BATCH_LOCK_KEY = "blockchain:batch:lock"
+BATCH_LOCK_TIMEOUT = 300
+# Upper bound on chain transactions per run, so one run never holds the
+# worker indefinitely; the remainder is picked up by the next run.
+MAX_BATCHES_PER_RUN = 20
+
+POLL_SCHEDULED_KEY = "blockchain:poll:scheduled"
+POLL_DELAY = 5
+
 
 @shared_task(
     name="blockchain.record_transaction",
@@ -56,6 +91,7 @@ def record_transaction_on_blockchain(self, transaction_id):
         if tx_hash:
             tx.blockchain_hash = tx_hash
             tx.save(update_fields=["blockchain_hash"])
+            _track_submission(tx_hash, 1)
             logger.info(
                 "TX %s blockchain_hash updated: %s", transaction_id, tx_hash
             )
@@ -87,3 +123,251 @@ def record_transaction_on_blockchain(self, transaction_id):
             exc_info=True,
         )
         raise self.retry(exc=exc)
+
+
+def schedule_batch_recording():
+    """
+    Schedule the batch recorder unless a run is already scheduled for the
+    current window. Called from ``transaction.on_commit`` by the matching
+    engine.
+    """
+    delay = float(getattr(settings, "BLOCKCHAIN_BATCH_DELAY", 0) or 0)
+    try:
+        if not cache.add(BATCH_SCHEDULED_KEY, 1, timeout=max(int(delay) + 1, 1)):
+            return
+    except Exception as exc:
+        logger.warning("Blockchain batch de-duplication failed: %s", exc)
+    record_pending_transactions.apply_async(countdown=delay or None)
+
+
+@shared_task(
+    name="blockchain.record_pending_transactions",
+    bind=True,
+    acks_late=True,
+)
+def record_pending_transactions(self, batch_size=None):
+    """
+    Record every unrecorded Transaction on the blockchain in batches and
+    store the batch transaction hash on each row.
+
+    Args:
+        batch_size: trades per ``recordTrades`` call
+            (default ``BLOCKCHAIN_BATCH_SIZE``).
+
+    Returns:
+        dict with result info.
+    """
+    from transactions.models import Transaction
+
+    from .service import get_blockchain_service
+
+    merkle_mode = getattr(settings, "BLOCKCHAIN_ANCHOR_MODE", "trades") == "merkle"
+    if merkle_mode:
+        batch_size = batch_size or getattr(settings, "BLOCKCHAIN_MERKLE_WINDOW", 1024)
+    else:
+        batch_size = batch_size or getattr(settings, "BLOCKCHAIN_BATCH_SIZE", 50)
+
+    # Trades committed from now on need a new run
+    cache.delete(BATCH_SCHEDULED_KEY)
+    if not cache.add(BATCH_LOCK_KEY, 1, timeout=BATCH_LOCK_TIMEOUT):
+        logger.info("Blockchain batch recorder already running – skipping")
+        return {"status": "busy", "recorded": 0, "batches": 0}
+
+    recorded = batches = 0
+    status = "recorded"
+    try:
+        service = get_blockchain_service()
+        while batches < MAX_BATCHES_PER_RUN:
+            unrecorded = Transaction.objects.filter(
+                blockchain_hash__isnull=True,
+                status=Transaction.TransactionStatus.CONFIRMED,
+            )
+            if not merkle_mode:
+                # Trades recordTrades would reject (see is_recordable) stay
+                # unrecorded instead of being re-picked on every run
+                unrecorded = unrecorded.filter(price__gte=1, quantity__gt=0)
+            pending = list(
+                unrecorded.select_related("stock")
+                .order_by("executed_at", "id")[:batch_size]
+            )
+            if not pending:
+                break
+
+            if merkle_mode:
+                tx_hash = _anchor_window(service, pending)
+            else:
+                tx_hash = service.record_transactions(pending)
+            if not tx_hash:
+                logger.warning(
+                    "Blockchain batch recording returned None for %d TX(s) (node down?)",
+                    len(pending),
+                )
+                status = "skipped"
+                break
+
+            for tx in pending:
+                tx.blockchain_hash = tx_hash
+            Transaction.objects.bulk_update(pending, ["blockchain_hash"])
+            _track_submission(tx_hash, len(pending))
+            recorded += len(pending)
+            batches += 1
+            if len(pending) < batch_size:
+                break
+    finally:
+        cache.delete(BATCH_LOCK_KEY)
+
+    if recorded:
+        logger.info(
+            "Recorded %d TX(s) on-chain in %d batch transaction(s)", recorded, batches
+        )
+    return {"status": status, "recorded": recorded, "batches": batches}
+
+
+def _anchor_window(service, transactions):
+    """
+    Anchor the Merkle root of ``transactions`` and store every trade's
+    inclusion proof. Returns the chain tx hash, or ``None`` when the
+    submission failed (nothing is stored then).
+    """
+    from django.db import transaction as db_transaction
+
+    from .merkle import build_levels, merkle_proof, merkle_root, to_hex, trade_leaf
+    from .models import MerkleAnchor, TradeProof
+
+    levels = build_levels([trade_leaf(tx) for tx in transactions])
+    root = to_hex(merkle_root(levels))
+
+    tx_hash = service.anchor_root(root, len(transactions))
+    if not tx_hash:
+        return None
+
+    with db_transaction.atomic():
+        # A dropped window that is re-anchored unchanged keeps its root
+        anchor, _ = MerkleAnchor.objects.update_or_create(
+            root=root,
+            defaults={"trade_count": len(transactions), "tx_hash": tx_hash},
+        )
+        TradeProof.objects.filter(transaction__in=transactions).delete()
+        TradeProof.objects.bulk_create(
+            [
+                TradeProof(
+                    transaction=tx,
+                    anchor=anchor,
+                    leaf_index=i,
+                    proof=[to_hex(h) for h in merkle_proof(levels, i)],
+                )
+                for i, tx in enumerate(transactions)
+            ]
+        )
+    return tx_hash
+
+
+def _track_submission(tx_hash, trade_count):
+    """Remember a sent chain transaction and make sure the poller runs."""
+    from .models import ChainSubmission
+
+    ChainSubmission.objects.get_or_create(
+        tx_hash=tx_hash, defaults={"trade_count": trade_count}
+    )
+    schedule_receipt_polling()
+
+
+def schedule_receipt_polling():
+    """Schedule ``poll_receipts`` unless a run is already scheduled."""
+    try:
+        if not cache.add(POLL_SCHEDULED_KEY, 1, timeout=POLL_DELAY + 1):
+            return
+    except Exception as exc:
+        logger.warning("Receipt poll de-duplication failed: %s", exc)
+    poll_receipts.apply_async(countdown=POLL_DELAY)
+
+
+@shared_task(name="blockchain.poll_receipts", acks_late=True)
+def poll_receipts(limit=200):
+    """
+    Check the receipts of pending chain submissions.
+
+    - mined with status 1 -> ``confirmed`` (block number stored)
+    - mined with status 0 -> ``reverted``; the trades lose their hash and
+      are re-recorded by the next batch run
+    - still unknown after ``BLOCKCHAIN_RECEIPT_TIMEOUT`` seconds ->
+      ``dropped``; same as reverted, and the shared nonce counter is resynced
+      because the node never accepted that nonce
+
+    Returns:
+        dict with counts per outcome.
+    """
+    from datetime import timedelta
+
+    from django.utils import timezone
+    from transactions.models import Transaction
+
+    from .models import ChainSubmission
+    from .service import get_blockchain_service
+
+    cache.delete(POLL_SCHEDULED_KEY)
+    counts = {"confirmed": 0, "reverted": 0, "dropped": 0, "pending": 0}
+
+    service = get_blockchain_service()
+    submissions = list(
+        ChainSubmission.objects.filter(
+            status=ChainSubmission.SubmissionStatus.PENDING
+        ).order_by("submitted_at")[:limit]
+    )
+    if not submissions:
+        return counts
+
+    timeout = getattr(settings, "BLOCKCHAIN_RECEIPT_TIMEOUT", 300)
+    deadline = timezone.now() - timedelta(seconds=timeout)
+    now = timezone.now()
+    retry = []
+
+    for submission in submissions:
+        receipt = service.get_receipt_status(submission.tx_hash)
+        if receipt is None:
+            # Node unavailable - try again later
+            counts["pending"] += 1
+            continue
+
+        if receipt["status"] == "confirmed":
+            submission.status = ChainSubmission.SubmissionStatus.CONFIRMED
+        elif receipt["status"] == "reverted":
+            submission.status = ChainSubmission.SubmissionStatus.REVERTED
+        elif submission.submitted_at > deadline:
+            counts["pending"] += 1
+            continue
+        else:
+            submission.status = ChainSubmission.SubmissionStatus.DROPPED
+
+        submission.block_number = receipt["blockNumber"]
+        submission.confirmed_at = now
+        submission.save(update_fields=["status", "block_number", "confirmed_at"])
+        counts[submission.status] += 1
+        if submission.status != ChainSubmission.SubmissionStatus.CONFIRMED:
+            retry.append(submission)
+
+    if retry:
+        Transaction.objects.filter(
+            blockchain_hash__in=[s.tx_hash for s in retry]
+        ).update(blockchain_hash=None)
+        if any(s.status == ChainSubmission.SubmissionStatus.DROPPED for s in retry):
+            service.reset_nonce()
+        logger.warning(
+            "%d chain submission(s) reverted/dropped – re-queueing their trades",
+            len(retry),
+        )
+        schedule_batch_recording()
+    # Still-pending submissions are picked up by the periodic beat entry
+    return counts
+
+
+@shared_task(name="blockchain.index_trade_events", acks_late=True)
+def index_trade_events_task():
+    """Advance the TradeRecorded event indexer (see indexer.py)."""
+    from .indexer import index_trade_events
+
+    try:
+        return index_trade_events()
+    except Exception as exc:
+        logger.error("TradeRecorded indexing failed: %s", exc)
+        return {"status": "error", "indexed": 0, "lastBlock": None}
@@ -11,12 +11,19 @@ Test categories:
   2. Celery task tests (record_transaction_on_blockchain)
   3. API endpoint tests (/blockchain/status/, /blockchain/verify/)
   4. Integration test (matching engine → blockchain recording)
+  5. Singleton / reset
+  6. Batched recording (recordTrades, record_pending_transactions)
+  7. Fire-and-forget submission (nonce manager, gas cache, poll_receipts)
+  8. Merkle anchoring (merkle.py, anchorRoot, proof-based verification)
+  9. Verification cache and bulk verify (getTrades, POST /blockchain/verify/)
+ 10. Async service (AsyncWeb3) and async views
+ 11. TradeRecorded event indexer (checkpoint, upsert, mismatch report)
 """
 
 import json
 import uuid
 from decimal import Decimal
-from unittest.mock import MagicMock, PropertyMock, patch
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
 
 from django.test import TestCase, override_settings
 from rest_framework import status
@@ -422,10 +429,10 @@ class BlockchainStatusAPITest(TestCase):
     def tearDown(self):
         reset_blockchain_service()
 
-    @patch("blockchain_service.views.get_blockchain_service")
+    @patch("blockchain_service.views.get_async_blockchain_service")
     def test_status_endpoint_connected(self, mock_get_service):
         """Status returns connected info."""
-        mock_service = MagicMock()
+        mock_service = AsyncMock()
         mock_service.get_status.return_value = {
             "status": "connected",
             "network": "hardhat-local",
@@ -440,14 +447,14 @@ class BlockchainStatusAPITest(TestCase):
         response = self.client.get("/api/v1/blockchain/status/")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["status"], "connected")
-        self.assertEqual(response.data["chainId"], 31337)
-        self.assertEqual(response.data["tradeCount"], 3)
+        self.assertEqual(response.json()["status"], "connected")
+        self.assertEqual(response.json()["chainId"], 31337)
+        self.assertEqual(response.json()["tradeCount"], 3)
 
-    @patch("blockchain_service.views.get_blockchain_service")
+    @patch("blockchain_service.views.get_async_blockchain_service")
     def test_status_endpoint_disconnected(self, mock_get_service):
         """Status returns disconnected when node is down."""
-        mock_service = MagicMock()
+        mock_service = AsyncMock()
         mock_service.get_status.return_value = {
             "status": "disconnected",
             "network": "hardhat-local",
@@ -458,12 +465,12 @@ class BlockchainStatusAPITest(TestCase):
         response = self.client.get("/api/v1/blockchain/status/")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["status"], "disconnected")
+        self.assertEqual(response.json()["status"], "disconnected")
 
     def test_status_endpoint_no_auth_required(self):
         """Status endpoint does not require authentication."""
-        with patch("blockchain_service.views.get_blockchain_service") as mock_get:
-            mock_service = MagicMock()
+        with patch("blockchain_service.views.get_async_blockchain_service") as mock_get:
+            mock_service = AsyncMock()
             mock_service.get_status.return_value = {"status": "disconnected"}
             mock_get.return_value = mock_service
 
@@ -488,20 +495,20 @@ class BlockchainVerifyAPITest(TestCase):
     def tearDown(self):
         reset_blockchain_service()
 
-    @patch("blockchain_service.views.get_blockchain_service")
+    @patch("blockchain_service.views.get_async_blockchain_service")
     def test_verify_requires_auth(self, mock_get_service):
         """Verify endpoint requires authentication."""
         tx_id = uuid.uuid4()
         response = self.client.get(f"/api/v1/blockchain/verify/{tx_id}/")
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
-    @patch("blockchain_service.views.get_blockchain_service")
+    @patch("blockchain_service.views.get_async_blockchain_service")
     def test_verify_authenticated_success(self, mock_get_service):
         """Authenticated user can verify a transaction."""
         self.client.force_authenticate(user=self.user)
         tx_id = uuid.uuid4()
 
-        mock_service = MagicMock()
+        mock_service = AsyncMock()
         mock_service.verify_transaction.return_value = {
             "verified": True,
             "onChain": True,
@@ -516,16 +523,16 @@ class BlockchainVerifyAPITest(TestCase):
         response = self.client.get(f"/api/v1/blockchain/verify/{tx_id}/")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data["verified"])
-        self.assertEqual(response.data["stockSymbol"], "FOLD1")
+        self.assertTrue(response.json()["verified"])
+        self.assertEqual(response.json()["stockSymbol"], "FOLD1")
 
-    @patch("blockchain_service.views.get_blockchain_service")
+    @patch("blockchain_service.views.get_async_blockchain_service")
     def test_verify_not_found_on_chain(self, mock_get_service):
         """Verify returns not found for unrecorded transaction."""
         self.client.force_authenticate(user=self.user)
         tx_id = uuid.uuid4()
 
-        mock_service = MagicMock()
+        mock_service = AsyncMock()
         mock_service.verify_transaction.return_value = {
             "verified": False,
             "onChain": False,
@@ -536,7 +543,7 @@ class BlockchainVerifyAPITest(TestCase):
         response = self.client.get(f"/api/v1/blockchain/verify/{tx_id}/")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertFalse(response.data["verified"])
+        self.assertFalse(response.json()["verified"])
 
 
 # =====================================================================
@@ -725,3 +732,1195 @@ class BlockchainServiceSingletonTest(TestCase):
         reset_blockchain_service()
         s2 = get_blockchain_service()
         self.assertIsNot(s1, s2)
+
+
+# =====================================================================
+# 6. Batched Recording Tests (recordTrades)
+# =====================================================================
+
+def _mocked_web3_service(tx_hash_hex="0x" + "ab" * 32):
+    """BlockchainService with a fully mocked Web3 / contract."""
+    service = BlockchainService()
+    service._web3 = MagicMock()
+    service._web3.is_connected.return_value = True
+    service._account = MagicMock()
+    service._account.address = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+    service._account.key = b"\x00" * 32
+    service._contract = MagicMock()
+    service._contract.functions.recordTrades.return_value.estimate_gas.return_value = 500000
+
+    signed = MagicMock()
+    signed.raw_transaction = b"\x00" * 32
+    service._web3.eth.account.sign_transaction.return_value = signed
+    service._web3.eth.get_transaction_count.return_value = 0
+    service._web3.eth.gas_price = 1000000000
+    service._web3.eth.send_raw_transaction.return_value = bytes.fromhex(
+        tx_hash_hex[2:]
+    )
+    service._initialized = True
+    return service
+
+
+class BlockchainBatchRecordingTest(TestCase):
+    """Tests for BlockchainService.record_transactions and the batch task."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        reset_blockchain_service()
+        self.buyer, self.seller = _create_test_users()
+        self.stock = _create_test_stock()
+
+    def tearDown(self):
+        reset_blockchain_service()
+
+    def _transactions(self, count):
+        return [
+            _create_test_transaction(self.buyer, self.seller, self.stock, price=50000 + i)
+            for i in range(count)
+        ]
+
+    def test_record_transactions_single_call(self):
+        """A batch is sent as one recordTrades call with one tuple per trade."""
+        txs = self._transactions(3)
+        service = _mocked_web3_service()
+
+        result = service.record_transactions(txs)
+
+        self.assertEqual(result, "0x" + "ab" * 32)
+        service._contract.functions.recordTrades.assert_called_once()
+        (trades,), _ = service._contract.functions.recordTrades.call_args
+        self.assertEqual(len(trades), 3)
+        self.assertEqual(
+            trades[0],
+            (
+                txs[0].id.bytes, "BCTST", 50000, 10, 500000,
+                self.buyer.id.bytes, self.seller.id.bytes,
+            ),
+        )
+        service._web3.eth.send_raw_transaction.assert_called_once()
+
+    def test_record_transactions_send_failure(self):
+        service = _mocked_web3_service()
+        service._web3.eth.send_raw_transaction.side_effect = ValueError("nonce too low")
+        self.assertIsNone(service.record_transactions(self._transactions(1)))
+
+    def test_record_transactions_empty(self):
+        service = _mocked_web3_service()
+        self.assertIsNone(service.record_transactions([]))
+        service._contract.functions.recordTrades.assert_not_called()
+
+    def test_record_transactions_drops_unrecordable(self):
+        """Trades with a zero on-chain price are not sent (the contract skips them)."""
+        good = _create_test_transaction(self.buyer, self.seller, self.stock)
+        bad = _create_test_transaction(self.buyer, self.seller, self.stock, price=0.5)
+        service = _mocked_web3_service()
+
+        with self.assertLogs("blockchain_service.service", "WARNING"):
+            service.record_transactions([bad, good])
+
+        (trades,), _ = service._contract.functions.recordTrades.call_args
+        self.assertEqual([t[0] for t in trades], [good.id.bytes])
+
+        service._contract.functions.recordTrades.reset_mock()
+        self.assertIsNone(service.record_transactions([bad]))
+        service._contract.functions.recordTrades.assert_not_called()
+
+    @patch("blockchain_service.service.get_blockchain_service")
+    def test_task_records_in_batches_and_bulk_updates(self, mock_get_service):
+        """5 trades with batch size 2 → 3 chain transactions, all hashes set."""
+        txs = self._transactions(5)
+        hashes = ["0x" + c * 64 for c in "123"]
+        mock_service = MagicMock()
+        mock_service.record_transactions.side_effect = hashes
+        mock_get_service.return_value = mock_service
+
+        from .tasks import record_pending_transactions
+
+        result = record_pending_transactions(batch_size=2)
+
+        self.assertEqual(result, {"status": "recorded", "recorded": 5, "batches": 3})
+        self.assertEqual(
+            [len(c.args[0]) for c in mock_service.record_transactions.call_args_list],
+            [2, 2, 1],
+        )
+        stored = dict(
+            Transaction.objects.filter(id__in=[t.id for t in txs])
+            .values_list("id", "blockchain_hash")
+        )
+        # Oldest trades go first
+        self.assertEqual(stored[txs[0].id], hashes[0])
+        self.assertEqual(stored[txs[4].id], hashes[2])
+
+    @patch("blockchain_service.service.get_blockchain_service")
+    def test_task_skips_recorded_rows(self, mock_get_service):
+        """Rows that already have a hash are not submitted again."""
+        done, pending = self._transactions(2)
+        Transaction.objects.filter(id=done.id).update(blockchain_hash="0x" + "ee" * 32)
+        mock_service = MagicMock()
+        mock_service.record_transactions.return_value = "0x" + "cd" * 32
+        mock_get_service.return_value = mock_service
+
+        from .tasks import record_pending_transactions
+
+        result = record_pending_transactions()
+
+        self.assertEqual(result["recorded"], 1)
+        (submitted,), _ = mock_service.record_transactions.call_args
+        self.assertEqual([t.id for t in submitted], [pending.id])
+
+    @patch("blockchain_service.service.get_blockchain_service")
+    def test_task_leaves_unrecordable_rows_out(self, mock_get_service):
+        """A trade the contract would reject is not re-picked on every run."""
+        bad = _create_test_transaction(self.buyer, self.seller, self.stock, price=0.5)
+        good = _create_test_transaction(self.buyer, self.seller, self.stock)
+        mock_service = MagicMock()
+        mock_service.record_transactions.return_value = "0x" + "cd" * 32
+        mock_get_service.return_value = mock_service
+
+        from .tasks import record_pending_transactions
+
+        self.assertEqual(record_pending_transactions()["recorded"], 1)
+        (submitted,), _ = mock_service.record_transactions.call_args
+        self.assertEqual([t.id for t in submitted], [good.id])
+
+        mock_service.record_transactions.reset_mock()
+        self.assertEqual(record_pending_transactions()["batches"], 0)
+        mock_service.record_transactions.assert_not_called()
+        bad.refresh_from_db()
+        self.assertIsNone(bad.blockchain_hash)
+
+    @patch("blockchain_service.service.get_blockchain_service")
+    def test_task_node_down_keeps_rows_pending(self, mock_get_service):
+        txs = self._transactions(2)
+        mock_service = MagicMock()
+        mock_service.record_transactions.return_value = None
+        mock_get_service.return_value = mock_service
+
+        from .tasks import record_pending_transactions
+
+        result = record_pending_transactions()
+
+        self.assertEqual(result["status"], "skipped")
+        self.assertEqual(
+            Transaction.objects.filter(
+                id__in=[t.id for t in txs], blockchain_hash__isnull=True
+            ).count(),
+            2,
+        )
+
+    def test_task_single_flight(self):
+        """A second run while one holds the lock does nothing."""
+        from django.core.cache import cache
+
+        from .tasks import BATCH_LOCK_KEY, record_pending_transactions
+
+        cache.add(BATCH_LOCK_KEY, 1)
+        self.assertEqual(record_pending_transactions()["status"], "busy")
+
+    @override_settings(BLOCKCHAIN_BATCH_DELAY=2)
+    def test_schedule_is_deduplicated_per_window(self):
+        """Many matching passes in one window schedule a single run."""
+        from .tasks import record_pending_transactions, schedule_batch_recording
+
+        with patch.object(record_pending_transactions, "apply_async") as apply_async:
+            for _ in range(10):
+                schedule_batch_recording()
+
+        apply_async.assert_called_once_with(countdown=2.0)
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    @patch("blockchain_service.service.get_blockchain_service")
+    def test_matching_pass_records_in_one_batch(self, mock_get_service):
+        """A multi-fill matching pass is recorded with one recordTrades call."""
+        from orders.matching import match_order
+
+        mock_service = MagicMock()
+        mock_service.record_transactions.return_value = "0x" + "fa" * 32
+        mock_service.get_receipt_status.return_value = {
+            "status": "pending", "blockNumber": None,
+        }
+        mock_get_service.return_value = mock_service
+
+        PortfolioHolding.objects.create(
+            user=self.seller, stock=self.stock, quantity=100,
+            average_buy_price=Decimal("45000"),
+        )
+        for price in ("50000", "50100", "50200"):
+            Order.objects.create(
+                user=self.seller, stock=self.stock, type=Order.OrderType.SELL,
+                price=Decimal(price), quantity=5,
+            )
+        buy = Order.objects.create(
+            user=self.buyer, stock=self.stock, type=Order.OrderType.BUY,
+            price=Decimal("50200"), quantity=15,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transactions = match_order(str(buy.id))
+
+        self.assertEqual(len(transactions), 3)
+        mock_service.record_transactions.assert_called_once()
+        self.assertEqual(
+            Transaction.objects.filter(blockchain_hash="0x" + "fa" * 32).count(), 3
+        )
+
+
+# =====================================================================
+# 7. Fire-and-forget Submission Tests
+# =====================================================================
+
+class BlockchainSubmissionTest(TestCase):
+    """Nonce manager, gas cache and the receipt poller."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        reset_blockchain_service()
+        self.buyer, self.seller = _create_test_users()
+        self.stock = _create_test_stock()
+
+    def tearDown(self):
+        reset_blockchain_service()
+
+    def _built_nonces(self, service):
+        calls = service._contract.functions.recordTrades.return_value.build_transaction
+        return [c.args[0]["nonce"] for c in calls.call_args_list]
+
+    def test_submit_does_not_wait_for_receipt(self):
+        service = _mocked_web3_service()
+        tx = _create_test_transaction(self.buyer, self.seller, self.stock)
+
+        self.assertEqual(service.record_transactions([tx]), "0x" + "ab" * 32)
+        service._web3.eth.wait_for_transaction_receipt.assert_not_called()
+
+    def test_nonces_are_allocated_locally(self):
+        """The node is asked once; consecutive sends get consecutive nonces."""
+        service = _mocked_web3_service()
+        service._web3.eth.get_transaction_count.return_value = 7
+        tx = _create_test_transaction(self.buyer, self.seller, self.stock)
+
+        for _ in range(3):
+            service.record_transactions([tx])
+
+        self.assertEqual(self._built_nonces(service), [7, 8, 9])
+        service._web3.eth.get_transaction_count.assert_called_once()
+
+    def test_nonce_counter_is_shared_between_workers(self):
+        """Two service instances (workers) never reuse a nonce."""
+        first, second = _mocked_web3_service(), _mocked_web3_service()
+        tx = _create_test_transaction(self.buyer, self.seller, self.stock)
+
+        first.record_transactions([tx])
+        second.record_transactions([tx])
+        first.record_transactions([tx])
+
+        self.assertEqual(self._built_nonces(first), [0, 2])
+        self.assertEqual(self._built_nonces(second), [1])
+
+    def test_send_failure_resyncs_nonce(self):
+        service = _mocked_web3_service()
+        tx = _create_test_transaction(self.buyer, self.seller, self.stock)
+        service._web3.eth.send_raw_transaction.side_effect = ValueError("nonce too low")
+        service.record_transactions([tx])
+
+        service._web3.eth.send_raw_transaction.side_effect = None
+        service._web3.eth.get_transaction_count.return_value = 4
+        service.record_transactions([tx])
+
+        self.assertEqual(self._built_nonces(service), [0, 4])
+
+    def test_gas_failure_does_not_use_up_a_nonce(self):
+        """A failed estimate happens before allocation: the next send reuses the nonce."""
+        service = _mocked_web3_service()
+        service._web3.eth.get_transaction_count.return_value = 3
+        tx = _create_test_transaction(self.buyer, self.seller, self.stock)
+        func = service._contract.functions.recordTrades.return_value
+        func.estimate_gas.side_effect = [ValueError("execution reverted"), 500000]
+
+        self.assertIsNone(service.record_transactions([tx]))
+        service.record_transactions([tx])
+
+        self.assertEqual(self._built_nonces(service), [3])
+
+    def test_sign_failure_resyncs_nonce(self):
+        service = _mocked_web3_service()
+        tx = _create_test_transaction(self.buyer, self.seller, self.stock)
+        service._web3.eth.account.sign_transaction.side_effect = ValueError("bad key")
+        service.record_transactions([tx])
+
+        service._web3.eth.account.sign_transaction.side_effect = None
+        service.record_transactions([tx])
+
+        self.assertEqual(self._built_nonces(service), [0, 0])
+
+    def test_nonce_allocation_is_bounded(self):
+        """Node errors propagate and an evicted counter is re-seeded only once."""
+        from django.core.cache import cache
+
+        from .service import NonceManager
+
+        web3 = MagicMock()
+        manager = NonceManager(web3, "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266")
+        web3.eth.get_transaction_count.side_effect = ValueError("node error")
+        with self.assertRaisesMessage(ValueError, "node error"):
+            manager.allocate()
+        self.assertEqual(web3.eth.get_transaction_count.call_count, 1)
+
+        web3.eth.get_transaction_count.side_effect = None
+        web3.eth.get_transaction_count.return_value = 9
+        with patch.object(cache, "incr", side_effect=ValueError("missing key")) as incr:
+            self.assertEqual(manager.allocate(), 9)
+        self.assertEqual(incr.call_count, 2)
+
+    def test_gas_estimate_is_cached(self):
+        service = _mocked_web3_service()
+        func = service._contract.functions.recordTrade.return_value
+        func.estimate_gas.return_value = 200000
+        tx = _create_test_transaction(self.buyer, self.seller, self.stock)
+
+        service.record_transaction(tx)
+        service.record_transaction(tx)
+
+        func.estimate_gas.assert_called_once()
+        gas = [c.args[0]["gas"] for c in func.build_transaction.call_args_list]
+        self.assertEqual(gas, [int(200000 * 1.2) + 10_000] * 2)
+
+    def test_batch_gas_is_estimated_per_batch(self):
+        """Same-size batches can need different gas: no per-length cache."""
+        service = _mocked_web3_service()
+        func = service._contract.functions.recordTrades.return_value
+        func.estimate_gas.side_effect = [500000, 800000]
+        tx = _create_test_transaction(self.buyer, self.seller, self.stock)
+
+        service.record_transactions([tx])
+        service.record_transactions([tx])
+
+        self.assertEqual(func.estimate_gas.call_count, 2)
+        gas = [c.args[0]["gas"] for c in func.build_transaction.call_args_list]
+        self.assertEqual(
+            gas, [int(500000 * 1.2) + 10_000, int(800000 * 1.2) + 10_000]
+        )
+
+    def test_receipt_status(self):
+        from web3.exceptions import TransactionNotFound
+
+        service = _mocked_web3_service()
+        service._web3.eth.get_transaction_receipt.return_value = {
+            "status": 1, "blockNumber": 12,
+        }
+        self.assertEqual(
+            service.get_receipt_status("0x" + "ab" * 32),
+            {"status": "confirmed", "blockNumber": 12},
+        )
+        service._web3.eth.get_transaction_receipt.side_effect = TransactionNotFound("x")
+        self.assertEqual(
+            service.get_receipt_status("0x" + "ab" * 32)["status"], "pending"
+        )
+
+    @patch("blockchain_service.service.get_blockchain_service")
+    def test_recorder_tracks_submissions(self, mock_get_service):
+        from .models import ChainSubmission
+        from .tasks import poll_receipts, record_pending_transactions
+
+        for i in range(3):
+            _create_test_transaction(self.buyer, self.seller, self.stock, price=50000 + i)
+        mock_service = MagicMock()
+        mock_service.record_transactions.side_effect = ["0x" + "1" * 64, "0x" + "2" * 64]
+        mock_get_service.return_value = mock_service
+
+        with patch.object(poll_receipts, "apply_async") as apply_async:
+            record_pending_transactions(batch_size=2)
+
+        self.assertEqual(
+            list(ChainSubmission.objects.values_list("trade_count", "status")),
+            [(2, "pending"), (1, "pending")],
+        )
+        # Scheduled once for both submissions
+        apply_async.assert_called_once()
+
+    @patch("blockchain_service.service.get_blockchain_service")
+    def test_poll_confirms_and_requeues_reverted(self, mock_get_service):
+        from .models import ChainSubmission
+        from .tasks import poll_receipts, record_pending_transactions
+
+        ok_tx = _create_test_transaction(self.buyer, self.seller, self.stock)
+        bad_tx = _create_test_transaction(self.buyer, self.seller, self.stock)
+        ok_hash, bad_hash = "0x" + "a" * 64, "0x" + "b" * 64
+        Transaction.objects.filter(id=ok_tx.id).update(blockchain_hash=ok_hash)
+        Transaction.objects.filter(id=bad_tx.id).update(blockchain_hash=bad_hash)
+        ChainSubmission.objects.create(tx_hash=ok_hash)
+        ChainSubmission.objects.create(tx_hash=bad_hash)
+
+        mock_service = MagicMock()
+        mock_service.get_receipt_status.side_effect = lambda h: {
+            "status": "confirmed" if h == ok_hash else "reverted",
+            "blockNumber": 5,
+        }
+        mock_get_service.return_value = mock_service
+
+        with patch.object(record_pending_transactions, "apply_async") as apply_async:
+            result = poll_receipts()
+
+        self.assertEqual(result["confirmed"], 1)
+        self.assertEqual(result["reverted"], 1)
+        self.assertEqual(
+            ChainSubmission.objects.get(tx_hash=ok_hash).block_number, 5
+        )
+        ok_tx.refresh_from_db()
+        bad_tx.refresh_from_db()
+        self.assertEqual(ok_tx.blockchain_hash, ok_hash)
+        self.assertIsNone(bad_tx.blockchain_hash)
+        apply_async.assert_called_once()
+        mock_service.reset_nonce.assert_not_called()
+
+    @override_settings(BLOCKCHAIN_RECEIPT_TIMEOUT=60)
+    @patch("blockchain_service.service.get_blockchain_service")
+    def test_poll_drops_stale_submissions(self, mock_get_service):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from .models import ChainSubmission
+        from .tasks import poll_receipts, record_pending_transactions
+
+        fresh = ChainSubmission.objects.create(tx_hash="0x" + "c" * 64)
+        stale = ChainSubmission.objects.create(tx_hash="0x" + "d" * 64)
+        ChainSubmission.objects.filter(pk=stale.pk).update(
+            submitted_at=timezone.now() - timedelta(seconds=120)
+        )
+        mock_service = MagicMock()
+        mock_service.get_receipt_status.return_value = {
+            "status": "pending", "blockNumber": None,
+        }
+        mock_get_service.return_value = mock_service
+
+        with patch.object(record_pending_transactions, "apply_async"):
+            result = poll_receipts()
+
+        self.assertEqual(result["pending"], 1)
+        self.assertEqual(result["dropped"], 1)
+        fresh.refresh_from_db()
+        stale.refresh_from_db()
+        self.assertEqual(fresh.status, ChainSubmission.SubmissionStatus.PENDING)
+        self.assertEqual(stale.status, ChainSubmission.SubmissionStatus.DROPPED)
+        mock_service.reset_nonce.assert_called_once()
+
+
+# =====================================================================
+# 8. Merkle Anchoring Tests
+# =====================================================================
+
+class MerkleTreeTest(TestCase):
+    """Tree construction and inclusion proofs (merkle.py)."""
+
+    def _leaves(self, count):
+        from eth_utils import keccak
+
+        return [keccak(text=f"trade-{i}") for i in range(count)]
+
+    def test_every_proof_verifies(self):
+        from .merkle import build_levels, merkle_proof, merkle_root, verify_proof
+
+        for count in (1, 2, 3, 5, 8, 13):
+            leaves = self._leaves(count)
+            levels = build_levels(leaves)
+            root = merkle_root(levels)
+            for i, leaf in enumerate(leaves):
+                self.assertTrue(
+                    verify_proof(leaf, merkle_proof(levels, i), root), (count, i)
+                )
+
+    def test_wrong_leaf_or_proof_fails(self):
+        from .merkle import build_levels, merkle_proof, merkle_root, verify_proof
+
+        leaves = self._leaves(4)
+        levels = build_levels(leaves)
+        root = merkle_root(levels)
+        self.assertFalse(verify_proof(leaves[1], merkle_proof(levels, 0), root))
+        self.assertFalse(verify_proof(self._leaves(5)[4], merkle_proof(levels, 0), root))
+
+    def test_proof_length_is_logarithmic(self):
+        from .merkle import build_levels, merkle_proof
+
+        levels = build_levels(self._leaves(1024))
+        self.assertEqual(len(merkle_proof(levels, 517)), 10)
+
+    def test_empty_tree_rejected(self):
+        from .merkle import build_levels
+
+        with self.assertRaises(ValueError):
+            build_levels([])
+
+
+@override_settings(BLOCKCHAIN_ANCHOR_MODE="merkle")
+class MerkleAnchoringTest(TestCase):
+    """Recorder in Merkle mode and proof-based verify_transaction."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        reset_blockchain_service()
+        self.buyer, self.seller = _create_test_users()
+        self.stock = _create_test_stock()
+        self.txs = [
+            _create_test_transaction(self.buyer, self.seller, self.stock, price=50000 + i)
+            for i in range(5)
+        ]
+
+    def tearDown(self):
+        reset_blockchain_service()
+
+    def _anchor(self):
+        from .tasks import poll_receipts, record_pending_transactions
+
+        service = _mocked_web3_service()
+        with patch(
+            "blockchain_service.service.get_blockchain_service", return_value=service
+        ), patch.object(poll_receipts, "apply_async"):
+            result = record_pending_transactions()
+        return service, result
+
+    def test_window_anchored_as_single_root(self):
+        from .models import MerkleAnchor, TradeProof
+
+        service, result = self._anchor()
+
+        self.assertEqual(result, {"status": "recorded", "recorded": 5, "batches": 1})
+        service._contract.functions.anchorRoot.assert_called_once()
+        service._contract.functions.recordTrades.assert_not_called()
+        anchor = MerkleAnchor.objects.get()
+        (root, count), _ = service._contract.functions.anchorRoot.call_args
+        self.assertEqual((anchor.root, anchor.trade_count), (root, 5))
+        self.assertEqual(anchor.tx_hash, "0x" + "ab" * 32)
+        self.assertEqual(TradeProof.objects.filter(anchor=anchor).count(), 5)
+        self.assertEqual(
+            Transaction.objects.filter(blockchain_hash=anchor.tx_hash).count(), 5
+        )
+
+    def test_verify_checks_proof_locally(self):
+        from .models import MerkleAnchor
+
+        service, _ = self._anchor()
+        service._contract.functions.verifyRoot.return_value.call.return_value = (
+            True, 1700000000,
+        )
+
+        result = service.verify_transaction(str(self.txs[3].id))
+
+        self.assertTrue(result["verified"])
+        self.assertEqual(result["merkleRoot"], MerkleAnchor.objects.get().root)
+        self.assertEqual(result["price"], 50003)
+        self.assertEqual(result["leafIndex"], 3)
+        self.assertEqual(result["timestamp"], 1700000000)
+        # One root lookup instead of verifyTrade + getTrade
+        service._contract.functions.verifyTrade.assert_not_called()
+        service._contract.functions.getTrade.assert_not_called()
+
+    def test_verify_detects_tampered_row(self):
+        service, _ = self._anchor()
+        service._contract.functions.verifyRoot.return_value.call.return_value = (
+            True, 1700000000,
+        )
+        Transaction.objects.filter(id=self.txs[1].id).update(price=Decimal("1"))
+
+        result = service.verify_transaction(str(self.txs[1].id))
+
+        self.assertFalse(result["verified"])
+        service._contract.functions.verifyRoot.assert_not_called()
+
+    def test_verify_requires_anchored_root(self):
+        service, _ = self._anchor()
+        service._contract.functions.verifyRoot.return_value.call.return_value = (
+            False, 0,
+        )
+
+        result = service.verify_transaction(str(self.txs[0].id))
+
+        self.assertFalse(result["verified"])
+        self.assertFalse(result["onChain"])
+
+    def test_reanchoring_replaces_proofs(self):
+        """Trades of a dropped window get new proofs when anchored again."""
+        from .models import TradeProof
+
+        self._anchor()
+        Transaction.objects.update(blockchain_hash=None)
+        extra = _create_test_transaction(self.buyer, self.seller, self.stock, price=60000)
+
+        self._anchor()
+
+        self.assertEqual(TradeProof.objects.count(), 6)
+        self.assertEqual(
+            TradeProof.objects.values("anchor").distinct().count(), 1
+        )
+        self.assertTrue(TradeProof.objects.filter(transaction=extra).exists())
+
+
+# =====================================================================
+# 9. Verification Cache / Bulk Verify Tests
+# =====================================================================
+
+def _chain_trade(tx_id, symbol="FOLD1", price=50000, exists=True):
+    """Trade struct tuple as returned by getTrades."""
+    return (
+        tx_id.bytes, symbol, price, 10, price * 10,
+        b"\x00" * 16, b"\x00" * 16, 1700000000 if exists else 0, exists,
+    )
+
+
+class BlockchainVerifyCacheTest(TestCase):
+    """Immutable verification cache and verify_transactions."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        from .async_service import AsyncBlockchainService
+
+        cache.clear()
+        reset_blockchain_service()
+        self.service = _mocked_web3_service()
+        functions = self.service._contract.functions
+        functions.verifyTrade.return_value.call.return_value = (True, 1700000000)
+        functions.getTrade.return_value.call.return_value = (
+            "FOLD1", 50000, 10, 500000, b"\x00" * 16, b"\x00" * 16, 1700000000,
+        )
+
+        # verify_transactions runs on a throwaway AsyncBlockchainService
+        self.contract = MagicMock()
+
+        async def _connected(async_service):
+            async_service._contract = self.contract
+            return True
+
+        patcher = patch.object(
+            AsyncBlockchainService, "_ensure_initialized",
+            autospec=True, side_effect=_connected,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _chain_read(self, function, result=None, side_effect=None):
+        """Awaitable ``<function>(...).call()`` on the async client's contract."""
+        getattr(self.contract.functions, function).return_value.call = AsyncMock(
+            return_value=result, side_effect=side_effect
+        )
+        return getattr(self.contract.functions, function)
+
+    def tearDown(self):
+        reset_blockchain_service()
+
+    def test_successful_verification_is_cached(self):
+        tx_id = uuid.uuid4()
+        first = self.service.verify_transaction(str(tx_id))
+        second = self.service.verify_transaction(tx_id)
+
+        self.assertTrue(first["verified"])
+        self.assertEqual(first, second)
+        self.service._contract.functions.verifyTrade.assert_called_once()
+        self.service._contract.functions.getTrade.assert_called_once()
+
+    def test_cached_result_served_while_node_down(self):
+        tx_id = uuid.uuid4()
+        self.service.verify_transaction(tx_id)
+        self.service._initialized = False
+
+        with override_settings(BLOCKCHAIN_ENABLED=False):
+            self.assertTrue(self.service.verify_transaction(tx_id)["verified"])
+
+    def test_not_found_is_not_cached(self):
+        tx_id = uuid.uuid4()
+        verify = self.service._contract.functions.verifyTrade.return_value.call
+        verify.return_value = (False, 0)
+        self.assertFalse(self.service.verify_transaction(tx_id)["verified"])
+
+        verify.return_value = (True, 1700000000)
+        self.assertTrue(self.service.verify_transaction(tx_id)["verified"])
+
+    def test_bulk_verify_uses_single_read(self):
+        known, unknown = uuid.uuid4(), uuid.uuid4()
+        get_trades = self._chain_read("getTrades", [
+            _chain_trade(known, price=51000),
+            _chain_trade(unknown, exists=False),
+        ])
+
+        results = self.service.verify_transactions([known, unknown])
+
+        get_trades.assert_called_once_with([known.bytes, unknown.bytes])
+        self.assertTrue(results[str(known)]["verified"])
+        self.assertEqual(results[str(known)]["price"], 51000)
+        self.assertFalse(results[str(unknown)]["verified"])
+        self.service._contract.functions.verifyTrade.assert_not_called()
+
+    def test_bulk_verify_skips_cached_ids(self):
+        cached, fresh = uuid.uuid4(), uuid.uuid4()
+        self.service.verify_transaction(cached)
+        get_trades = self._chain_read("getTrades", [_chain_trade(fresh)])
+
+        results = self.service.verify_transactions([cached, fresh])
+
+        get_trades.assert_called_once_with([fresh.bytes])
+        self.assertEqual(set(results), {str(cached), str(fresh)})
+        # Now both are cached: no further reads
+        self.service.verify_transactions([cached, fresh])
+        get_trades.assert_called_once()
+
+    @override_settings(BLOCKCHAIN_ANCHOR_MODE="merkle")
+    def test_bulk_verify_merkle_looks_up_each_root_once(self):
+        from .tasks import poll_receipts, record_pending_transactions
+
+        buyer, seller = _create_test_users()
+        stock = _create_test_stock()
+        txs = [
+            _create_test_transaction(buyer, seller, stock, price=50000 + i)
+            for i in range(4)
+        ]
+        with patch(
+            "blockchain_service.service.get_blockchain_service",
+            return_value=self.service,
+        ), patch.object(poll_receipts, "apply_async"):
+            record_pending_transactions()
+        verify_root = self._chain_read("verifyRoot", (True, 1700000000))
+
+        results = self.service.verify_transactions([tx.id for tx in txs])
+
+        self.assertTrue(all(r["verified"] for r in results.values()))
+        verify_root.assert_called_once()
+        self.contract.functions.getTrades.assert_not_called()
+
+    def test_bulk_verify_error_not_cached(self):
+        tx_id = uuid.uuid4()
+        self._chain_read("getTrades", side_effect=Exception("execution reverted"))
+        self.assertIn("error", self.service.verify_transactions([tx_id])[str(tx_id)])
+
+        self._chain_read("getTrades", [_chain_trade(tx_id)])
+        self.assertTrue(self.service.verify_transactions([tx_id])[str(tx_id)]["verified"])
+
+
+class BlockchainBulkVerifyAPITest(TestCase):
+    """Tests for POST /api/v1/blockchain/verify/."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="bulkverifier",
+            email="bulkverifier@test.com",
+            password="Test1234!",
+            first_name="Bulk",
+            last_name="Verifier",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_requires_auth(self):
+        response = APIClient().post(
+            "/api/v1/blockchain/verify/", {"ids": [str(uuid.uuid4())]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @patch("blockchain_service.views.get_async_blockchain_service")
+    def test_bulk_verify(self, mock_get_service):
+        ids = [uuid.uuid4(), uuid.uuid4()]
+        mock_service = AsyncMock()
+        mock_service.verify_transactions.return_value = {
+            str(ids[0]): {"verified": True, "onChain": True},
+            str(ids[1]): {"verified": False, "onChain": False},
+        }
+        mock_get_service.return_value = mock_service
+
+        response = self.client.post(
+            "/api/v1/blockchain/verify/",
+            {"ids": [str(i) for i in ids]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_service.verify_transactions.assert_called_once_with(ids)
+        self.assertTrue(response.json()["results"][str(ids[0])]["verified"])
+
+    def test_rejects_invalid_ids(self):
+        for payload in ({}, {"ids": []}, {"ids": "abc"}, {"ids": ["not-a-uuid"]}):
+            response = self.client.post(
+                "/api/v1/blockchain/verify/", payload, format="json"
+            )
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST, payload
+            )
+
+    def test_rejects_too_many_ids(self):
+        from .views import MAX_BULK_VERIFY
+
+        response = self.client.post(
+            "/api/v1/blockchain/verify/",
+            {"ids": [str(uuid.uuid4()) for _ in range(MAX_BULK_VERIFY + 1)]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# =====================================================================
+# 10. Async Service / Async View Tests
+# =====================================================================
+
+def _mocked_async_service():
+    """AsyncBlockchainService bound to the running loop with mocked AsyncWeb3."""
+    import asyncio
+
+    from .async_service import AsyncBlockchainService
+
+    service = AsyncBlockchainService()
+    service._web3 = MagicMock()
+    service._contract = MagicMock()
+    service._contract.address = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+    service._loop = asyncio.get_running_loop()
+    return service
+
+
+def _async_call(service, function, result=None, side_effect=None):
+    """Make ``contract.functions.<function>(...).call()`` awaitable."""
+    getattr(service._contract.functions, function).return_value.call = AsyncMock(
+        return_value=result, side_effect=side_effect
+    )
+
+
+def _awaitable(value):
+    async def _value():
+        return value
+
+    return _value()
+
+
+@override_settings(BLOCKCHAIN_ENABLED=True, BLOCKCHAIN_RPC_TIMEOUT=0.2)
+class AsyncBlockchainServiceTest(TestCase):
+    """AsyncBlockchainService reads with mocked AsyncWeb3."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    async def test_status(self):
+        service = _mocked_async_service()
+        service._web3.eth.chain_id = _awaitable(31337)
+        service._web3.eth.block_number = _awaitable(42)
+        _async_call(service, "tradeCount", 7)
+
+        result = await service.get_status()
+
+        self.assertEqual(result["status"], "connected")
+        self.assertEqual(result["chainId"], 31337)
+        self.assertEqual(result["blockNumber"], 42)
+        self.assertEqual(result["tradeCount"], 7)
+
+    @override_settings(BLOCKCHAIN_ENABLED=False)
+    async def test_status_disabled(self):
+        from .async_service import AsyncBlockchainService
+
+        result = await AsyncBlockchainService().get_status()
+        self.assertEqual(result["status"], "disconnected")
+
+    async def test_verify_and_cache(self):
+        service = _mocked_async_service()
+        _async_call(service, "verifyTrade", (True, 1700000000))
+        _async_call(
+            service, "getTrade",
+            ("FOLD1", 50000, 10, 500000, b"\x00" * 16, b"\x00" * 16, 1700000000),
+        )
+        tx_id = uuid.uuid4()
+
+        first = await service.verify_transaction(str(tx_id))
+        second = await service.verify_transaction(tx_id)
+
+        self.assertTrue(first["verified"])
+        self.assertEqual(first["stockSymbol"], "FOLD1")
+        self.assertEqual(first, second)
+        service._contract.functions.verifyTrade.assert_called_once()
+        # The sync service reads the same cache
+        self.assertEqual(BlockchainService().verify_transaction(tx_id), first)
+
+    async def test_slow_node_times_out(self):
+        import asyncio
+
+        async def _slow(*args, **kwargs):
+            await asyncio.sleep(5)
+
+        service = _mocked_async_service()
+        _async_call(service, "verifyTrade", side_effect=_slow)
+
+        result = await service.verify_transaction(uuid.uuid4())
+
+        self.assertFalse(result["verified"])
+        self.assertIn("error", result)
+
+    async def test_bulk_verify_single_read(self):
+        service = _mocked_async_service()
+        known, unknown = uuid.uuid4(), uuid.uuid4()
+        _async_call(
+            service, "getTrades",
+            [_chain_trade(known), _chain_trade(unknown, exists=False)],
+        )
+
+        results = await service.verify_transactions([known, unknown])
+
+        service._contract.functions.getTrades.assert_called_once_with(
+            [known.bytes, unknown.bytes]
+        )
+        self.assertTrue(results[str(known)]["verified"])
+        self.assertFalse(results[str(unknown)]["verified"])
+
+    async def test_session_rebuilt_for_new_loop(self):
+        """A client bound to another event loop is not reused; its session is closed."""
+        import asyncio
+
+        service = _mocked_async_service()
+        old_loop = asyncio.new_event_loop()
+        old_loop.close()
+        service._loop = old_loop
+        old_session = service._session = MagicMock(closed=False, close=AsyncMock())
+
+        with patch("web3.AsyncWeb3") as MockWeb3:
+            MockWeb3.return_value.is_connected = AsyncMock(return_value=False)
+            self.assertFalse(await service._ensure_initialized())
+            MockWeb3.assert_called_once()
+        old_session.close.assert_awaited_once()
+        self.assertIsNone(service._session)
+
+
+class AsyncBlockchainViewAuthTest(TestCase):
+    """JWT authentication on the async blockchain views."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="asyncverifier",
+            email="asyncverifier@test.com",
+            password="Test1234!",
+            first_name="Async",
+            last_name="Verifier",
+        )
+
+    def _bearer(self, token):
+        return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    @patch("blockchain_service.views.get_async_blockchain_service")
+    def test_valid_jwt_accepted(self, mock_get_service):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        mock_service = AsyncMock()
+        mock_service.verify_transaction.return_value = {"verified": True}
+        mock_get_service.return_value = mock_service
+        token = RefreshToken.for_user(self.user).access_token
+
+        response = self.client.get(
+            f"/api/v1/blockchain/verify/{uuid.uuid4()}/", **self._bearer(token)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()["verified"])
+
+    def test_invalid_jwt_rejected(self):
+        response = self.client.get(
+            f"/api/v1/blockchain/verify/{uuid.uuid4()}/", **self._bearer("garbage")
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+
+    def test_missing_credentials_rejected(self):
+        response = self.client.post(
+            "/api/v1/blockchain/verify/",
+            data=json.dumps({"ids": [str(uuid.uuid4())]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("detail", response.json())
+
+    async def test_permission_classes_checked(self):
+        """Authenticated users still go through the permission classes (403)."""
+        from asgiref.sync import sync_to_async
+        from django.test import RequestFactory
+        from rest_framework.permissions import IsAdminUser
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        from .views import _authenticate
+
+        token = await sync_to_async(
+            lambda: str(RefreshToken.for_user(self.user).access_token)
+        )()
+        request = RequestFactory().get("/", **self._bearer(token))
+
+        user, error = await _authenticate(request)
+        self.assertEqual(user, self.user)
+        self.assertIsNone(error)
+
+        user, error = await _authenticate(request, [IsAdminUser])
+        self.assertIsNone(user)
+        self.assertEqual(error.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_wrong_method(self):
+        response = self.client.post("/api/v1/blockchain/status/")
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+# =====================================================================
+# 11. Event-log Indexer Tests
+# =====================================================================
+
+def _trade_event(tx, block, log_index=0, **overrides):
+    """Decoded TradeRecorded event for a Transaction."""
+    event = {
+        "transactionId": tx.id.bytes,
+        "stockSymbol": tx.stock.symbol,
+        "price": int(tx.price),
+        "quantity": tx.quantity,
+        "totalValue": int(tx.total_value),
+        "buyerId": tx.buyer_id.bytes,
+        "sellerId": tx.seller_id.bytes,
+        "timestamp": 1700000000 + block,
+        "blockNumber": block,
+        "transactionHash": "0x" + f"{block:064x}",
+        "logIndex": log_index,
+    }
+    event.update(overrides)
+    return event
+
+
+class TradeEventIndexerTest(TestCase):
+    """indexer.py with a mocked log source."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.buyer, self.seller = _create_test_users()
+        self.stock = _create_test_stock()
+        self.txs = [
+            _create_test_transaction(self.buyer, self.seller, self.stock, price=50000 + i)
+            for i in range(4)
+        ]
+        # Trade i was recorded in block i + 1
+        self.events = {i + 1: [_trade_event(tx, i + 1)] for i, tx in enumerate(self.txs)}
+        for i, tx in enumerate(self.txs):
+            Transaction.objects.filter(id=tx.id).update(
+                blockchain_hash="0x" + f"{i + 1:064x}"
+            )
+        self.service = MagicMock()
+        self.service.get_block_number.return_value = 4
+        self.service.get_trade_events.side_effect = lambda start, end: [
+            event
+            for block in range(start, end + 1)
+            for event in self.events.get(block, [])
+        ]
+        patcher = patch(
+            "blockchain_service.service.get_blockchain_service",
+            return_value=self.service,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_indexes_in_ranges_and_checkpoints(self):
+        from .indexer import get_checkpoint, index_trade_events
+        from .models import OnChainTrade
+
+        result = index_trade_events(block_range=2)
+
+        self.assertEqual(result, {"status": "indexed", "indexed": 4, "lastBlock": 4})
+        self.assertEqual(
+            [c.args for c in self.service.get_trade_events.call_args_list],
+            [(0, 1), (2, 3), (4, 4)],
+        )
+        self.assertEqual(get_checkpoint().last_block, 4)
+        row = OnChainTrade.objects.get(transaction_id=self.txs[2].id)
+        self.assertEqual(row.block_number, 3)
+        self.assertEqual(row.price, 50002)
+        self.assertEqual(row.buyer_id, self.buyer.id)
+
+    def test_resumes_from_checkpoint(self):
+        from .indexer import index_trade_events
+
+        index_trade_events(block_range=1, max_ranges=2)
+        self.service.get_trade_events.reset_mock()
+
+        result = index_trade_events(block_range=10)
+
+        # Blocks 0 and 1 were done (the checkpoint starts before block 0)
+        self.service.get_trade_events.assert_called_once_with(2, 4)
+        self.assertEqual(result["indexed"], 3)
+
+    @override_settings(BLOCKCHAIN_INDEXER_CONFIRMATIONS=2)
+    def test_waits_for_confirmations(self):
+        from .indexer import index_trade_events
+
+        self.assertEqual(index_trade_events()["lastBlock"], 2)
+
+    def test_reindex_is_idempotent(self):
+        from .indexer import index_trade_events, reset_checkpoint
+        from .models import OnChainTrade
+
+        index_trade_events()
+        reset_checkpoint(0)
+        index_trade_events()
+
+        self.assertEqual(OnChainTrade.objects.count(), 4)
+
+    def test_node_down_skips(self):
+        from .indexer import index_trade_events
+
+        self.service.get_block_number.return_value = None
+        self.assertEqual(index_trade_events()["status"], "skipped")
+
+    def test_failed_range_keeps_checkpoint(self):
+        from .indexer import get_checkpoint, index_trade_events
+
+        self.service.get_trade_events.side_effect = [
+            [], self.events[1], Exception("query returned more than 10000 results"),
+        ]
+        with self.assertRaises(Exception):
+            index_trade_events(block_range=1)
+        self.assertEqual(get_checkpoint().last_block, 1)
+        # The lock was released
+        self.service.get_trade_events.side_effect = None
+        self.service.get_trade_events.return_value = []
+        self.assertEqual(index_trade_events()["status"], "indexed")
+
+    def test_mismatch_report(self):
+        from .indexer import find_mismatches, index_trade_events
+
+        stranger = uuid.uuid4()
+        self.events[2] = [_trade_event(self.txs[1], 2, quantity=99)]
+        self.events[3] = [
+            _trade_event(self.txs[2], 3),
+            _trade_event(self.txs[2], 3, log_index=1, transactionId=stranger.bytes),
+        ]
+        del self.events[4]
+        index_trade_events()
+
+        report = find_mismatches()
+
+        self.assertEqual(report["lastBlock"], 4)
+        self.assertEqual(report["missingOnChain"]["ids"], [str(self.txs[3].id)])
+        self.assertEqual(report["unknownOnChain"]["ids"], [str(stranger)])
+        self.assertEqual(report["mismatched"]["ids"], [str(self.txs[1].id)])
+
+    def test_unindexed_submissions_not_reported_missing(self):
+        from .indexer import find_mismatches, index_trade_events
+        from .models import ChainSubmission
+
+        del self.events[4]
+        # Trade 4's submission has not been mined yet
+        ChainSubmission.objects.create(tx_hash="0x" + f"{4:064x}")
+        index_trade_events()
+
+        self.assertEqual(find_mismatches()["missingOnChain"]["count"], 0)
+
+    def test_management_command(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command("index_chain_events", "--report", stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("Indexed 4 event(s); checkpoint at block 4", output)
+        self.assertIn("Fields differ: 0", output)
@@ -6,6 +6,7 @@ app_name = "blockchain_service"
 
 urlpatterns = [
     path("status/", views.blockchain_status, name="blockchain_status"),
+    path("verify/", views.verify_transactions, name="verify_transactions"),
     path(
         "verify/<uuid:tx_id>/",
         views.verify_transaction,
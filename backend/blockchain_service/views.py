@@ -5,37 +5,153 @@ Sprint 4 - Blockchain Integration
 Endpoints:
   GET  /api/v1/blockchain/status/              – Blockchain connection status
   GET  /api/v1/blockchain/verify/<uuid:tx_id>/ – Verify a transaction on-chain
+  POST /api/v1/blockchain/verify/              – Verify many transactions at once
+
+These views only read from the node, so they are native async views backed
+by ``AsyncBlockchainService`` (AsyncWeb3): waiting on RPC latency does not
+hold a worker thread. DRF's ``APIView`` is sync-only, so ``_authenticate``
+runs the same checks an ``APIView`` would: the configured
+``DEFAULT_AUTHENTICATION_CLASSES`` (simplejwt's ``JWTAuthentication``) and
+``DEFAULT_PERMISSION_CLASSES`` (``IsAuthenticated``), with DRF's 401/403
+responses.
 """
 
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.response import Response
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .async_service import get_async_blockchain_service
+
+MAX_BULK_VERIFY = 100
+
+
+async def _authenticate(request, permission_classes=None):
+    """
+    Authenticate and authorize a plain Django request like ``APIView`` does.
+
+    Args:
+        permission_classes: DRF permission classes
+            (default ``DEFAULT_PERMISSION_CLASSES``).
+
+    Returns ``(user, None)`` on success or ``(None, JsonResponse)`` with the
+    same 401 / 403 body DRF would send.
+    """
+    drf_request = Request(
+        request,
+        authenticators=[
+            auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ],
+    )
+    if permission_classes is None:
+        permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
+
+    def _check_permissions():
+        # Same order and exceptions as APIView.initial / permission_denied
+        user = drf_request.user
+        for permission in (cls() for cls in permission_classes):
+            if permission.has_permission(drf_request, None):
+                continue
+            if drf_request.authenticators and not drf_request.successful_authenticator:
+                raise exceptions.NotAuthenticated()
+            raise exceptions.PermissionDenied(getattr(permission, "message", None))
+        return user
 
-from .service import get_blockchain_service
+    try:
+        user = await sync_to_async(_check_permissions)()
+    except (exceptions.AuthenticationFailed, exceptions.NotAuthenticated) as exc:
+        return None, _unauthorized(drf_request, exc.detail)
+    except exceptions.PermissionDenied as exc:
+        return None, JsonResponse(
+            {"detail": exc.detail}, status=status.HTTP_403_FORBIDDEN
+        )
+    return user, None
 
 
-@api_view(["GET"])
-@permission_classes([AllowAny])
-def blockchain_status(request):
+def _unauthorized(drf_request, detail):
+    response = JsonResponse(
+        {"detail": detail}, status=status.HTTP_401_UNAUTHORIZED
+    )
+    authenticator = drf_request._authenticator or (
+        drf_request.authenticators[0] if drf_request.authenticators else None
+    )
+    if authenticator is not None:
+        response["WWW-Authenticate"] = authenticator.authenticate_header(
+            drf_request
+        )
+    return response
+
+
+@require_GET
+async def blockchain_status(request):
     """
     Return the current status of the blockchain service.
 
     Includes connection info, chain ID, block number, contract address,
     and on-chain trade count.
     """
-    service = get_blockchain_service()
-    return Response(service.get_status())
+    service = get_async_blockchain_service()
+    return JsonResponse(await service.get_status())
 
 
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-def verify_transaction(request, tx_id):
+@require_GET
+async def verify_transaction(request, tx_id):
     """
     Verify that a transaction is recorded on the blockchain.
 
     Returns on-chain data (stock symbol, price, quantity, total value,
     timestamp) if the record exists, or a not-found indicator otherwise.
     """
-    service = get_blockchain_service()
-    result = service.verify_transaction(str(tx_id))
-    return Response(result)
+    _user, error = await _authenticate(request)
+    if error is not None:
+        return error
+
+    service = get_async_blockchain_service()
+    return JsonResponse(await service.verify_transaction(str(tx_id)))
+
+
+@csrf_exempt  # JWT only, like DRF's APIView
+@require_POST
+async def verify_transactions(request):
+    """
+    Verify up to ``MAX_BULK_VERIFY`` transactions in one request.
+
+    Body: ``{"ids": ["<uuid>", ...]}``
+
+    Returns ``{"results": {"<uuid>": {...}, ...}}`` with the same per-id
+    payload as the single verify endpoint.
+    """
+    _user, error = await _authenticate(request)
+    if error is not None:
+        return error
+
+    try:
+        ids = json.loads(request.body or b"{}").get("ids")
+    except (ValueError, AttributeError):
+        ids = None
+    if not isinstance(ids, list) or not ids:
+        return JsonResponse(
+            {"error": "ids must be a non-empty list of transaction ids"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(ids) > MAX_BULK_VERIFY:
+        return JsonResponse(
+            {"error": f"At most {MAX_BULK_VERIFY} ids per request"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        tx_ids = [uuid.UUID(str(tx_id)) for tx_id in ids]
+    except ValueError:
+        return JsonResponse(
+            {"error": "Invalid transaction id"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    service = get_async_blockchain_service()
+    return JsonResponse({"results": await service.verify_transactions(tx_ids)})
@@ -19,12 +19,33 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
-# Celery Beat: periodic tasks (Stop-Loss / Take-Profit trigger check)
+# Celery Beat: periodic tasks (Stop-Loss / Take-Profit trigger check,
+# on-chain recording sweep)
 app.conf.beat_schedule = {
     "check-conditional-orders": {
         "task": "orders.check_conditional_orders",
         "schedule": 30.0,  # every 30 seconds
     },
+    "record-pending-blockchain-transactions": {
+        "task": "blockchain.record_pending_transactions",
+        "schedule": 30.0,  # safety net for batches that failed to record
+    },
+    "poll-blockchain-receipts": {
+        "task": "blockchain.poll_receipts",
+        "schedule": 10.0,  # confirm fire-and-forget submissions
+    },
+    "index-blockchain-trade-events": {
+        "task": "blockchain.index_trade_events",
+        "schedule": 60.0,  # mirror TradeRecorded events for audits
+    },
+    "reconcile-unread-notification-counts": {
+        "task": "notifications.reconcile_unread_counts",
+        "schedule": 300.0,  # repair drifted unread counters
+    },
+    "archive-read-notifications": {
+        "task": "notifications.archive_read_notifications",
+        "schedule": 3600.0,  # move old read notifications to the archive
+    },
 }
 
 
@@ -5,14 +5,17 @@ Sprint 5 - Real-time notifications + stock price updates.
 Routes:
   ws://host/ws/notifications/  → NotificationConsumer (auth required)
   ws://host/ws/stocks/         → StockPriceConsumer (public)
+  ws://host/ws/book/<symbol>/  → OrderBookConsumer (public)
 """
 
 from django.urls import path
 
 from notifications.consumers import NotificationConsumer
+from orders.consumers import OrderBookConsumer
 from stocks.consumers import StockPriceConsumer
 
 websocket_urlpatterns = [
     path("ws/notifications/", NotificationConsumer.as_asgi()),
     path("ws/stocks/", StockPriceConsumer.as_asgi()),
+    path("ws/book/<str:symbol>/", OrderBookConsumer.as_asgi()),
 ]
@@ -270,6 +270,13 @@ if not _use_eager and os.environ.get("USE_SQLITE", "False").lower() in ("true",
 CELERY_TASK_ALWAYS_EAGER = _use_eager
 CELERY_TASK_EAGER_PROPAGATES = _use_eager  # Propagate exceptions in eager mode
 
+# Single-writer matching partitions: 0 = all matching on the default queue.
+# N > 0 routes each symbol's match_order tasks to one of matching.0..N-1
+# (consistent hashing, see orders/partitions.py); run one worker per queue:
+#   celery -A config worker -Q matching.0 --concurrency=1
+MATCHING_PARTITIONS = int(os.environ.get("MATCHING_PARTITIONS", "0"))
+CELERY_TASK_ROUTES = ("orders.partitions.route_task",)
+
 
 # =============================================================================
 # Blockchain Configuration (Sprint 4)
@@ -290,6 +297,24 @@ BLOCKCHAIN_PRIVATE_KEY = os.environ.get(
 )
 # Set explicitly after deployment, or leave empty to read from contract_address.json
 BLOCKCHAIN_CONTRACT_ADDRESS = os.environ.get("BLOCKCHAIN_CONTRACT_ADDRESS", "")
+# Batched recording: trades per recordTrades() call, and how long (seconds)
+# the recorder waits after a match so one chain transaction covers a burst
+BLOCKCHAIN_BATCH_SIZE = int(os.environ.get("BLOCKCHAIN_BATCH_SIZE", "50"))
+BLOCKCHAIN_BATCH_DELAY = float(os.environ.get("BLOCKCHAIN_BATCH_DELAY", "2"))
+# "trades" stores every trade in the contract; "merkle" anchors one Merkle
+# root per window of up to BLOCKCHAIN_MERKLE_WINDOW trades
+BLOCKCHAIN_ANCHOR_MODE = os.environ.get("BLOCKCHAIN_ANCHOR_MODE", "trades")
+BLOCKCHAIN_MERKLE_WINDOW = int(os.environ.get("BLOCKCHAIN_MERKLE_WINDOW", "1024"))
+# Async read path (status / verify views): per-RPC timeout and HTTP pool size
+BLOCKCHAIN_RPC_TIMEOUT = float(os.environ.get("BLOCKCHAIN_RPC_TIMEOUT", "5"))
+BLOCKCHAIN_RPC_POOL_SIZE = int(os.environ.get("BLOCKCHAIN_RPC_POOL_SIZE", "20"))
+# TradeRecorded event indexer: blocks per log query, and how many blocks
+# behind the head to stay (reorg safety; 0 on the local Hardhat node)
+BLOCKCHAIN_INDEXER_BLOCK_RANGE = int(os.environ.get("BLOCKCHAIN_INDEXER_BLOCK_RANGE", "2000"))
+BLOCKCHAIN_INDEXER_CONFIRMATIONS = int(os.environ.get("BLOCKCHAIN_INDEXER_CONFIRMATIONS", "0"))
+# Seconds a submitted chain transaction may stay unmined before it is treated
+# as dropped and its trades are re-recorded
+BLOCKCHAIN_RECEIPT_TIMEOUT = int(os.environ.get("BLOCKCHAIN_RECEIPT_TIMEOUT", "300"))
 
 
 # =============================================================================
@@ -325,6 +350,33 @@ else:
         }
     }
 
+# Ticker conflation: stock price updates are coalesced per symbol and sent
+# at most once per interval (seconds). 0 = send every update immediately.
+STOCK_TICKER_FLUSH_INTERVAL = float(
+    os.environ.get("STOCK_TICKER_FLUSH_INTERVAL", "0.1")
+)
+
+# Lifetime (seconds) of cached /stocks/<symbol>/history/ payloads; they are
+# invalidated per symbol on trades, this only bounds staleness of lookback windows
+STOCK_CHART_CACHE_TIMEOUT = int(os.environ.get("STOCK_CHART_CACHE_TIMEOUT", "300"))
+# Lifetime (seconds) of the per-stock chart version keys (re-seeded on expiry)
+STOCK_CHART_VERSION_TIMEOUT = int(os.environ.get("STOCK_CHART_VERSION_TIMEOUT", "86400"))
+
+# Rows fetched per server-side cursor round trip (and encoded per chunk) by
+# the market data export (stocks/export.py)
+STOCK_EXPORT_CHUNK_SIZE = int(os.environ.get("STOCK_EXPORT_CHUNK_SIZE", "5000"))
+
+
+# =============================================================================
+# Notifications
+# =============================================================================
+# Retention: read notifications older than this many days are
+# moved to ArchivedNotification, in batches (notifications/retention.py)
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get("NOTIFICATION_RETENTION_DAYS", "90"))
+NOTIFICATION_ARCHIVE_BATCH_SIZE = int(
+    os.environ.get("NOTIFICATION_ARCHIVE_BATCH_SIZE", "5000")
+)
+
 
 # =============================================================================
 # SIWE (Sign-In with Ethereum) Configuration (Sprint 5)
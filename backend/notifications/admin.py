@@ -1,12 +1,29 @@
 from django.contrib import admin
 
-from .models import Notification
+from .models import ArchivedNotification, Notification
 
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ["id", "user", "title", "type", "read", "created_at"]
-    list_filter = ["type", "read", "created_at"]
-    search_fields = ["user__email", "title", "message"]
+    list_display = ["id", "user", "display_title", "type", "read", "created_at"]
+    list_filter = ["type", "template", "read", "created_at"]
+    search_fields = ["user__email", "title", "message", "template"]
     ordering = ["-created_at"]
     raw_id_fields = ["user"]
+
+    @admin.display(description="Title")
+    def display_title(self, obj):
+        return obj.rendered.title
+
+
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    list_display = ["id", "user", "display_title", "type", "created_at", "archived_at"]
+    list_filter = ["type", "template", "created_at"]
+    search_fields = ["user__email", "title", "message", "template"]
+    ordering = ["-created_at"]
+    raw_id_fields = ["user"]
+
+    @admin.display(description="Title")
+    def display_title(self, obj):
+        return obj.rendered.title
@@ -5,3 +5,7 @@ class NotificationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "notifications"
     verbose_name = "Notification Service"
+
+    def ready(self):
+        # Keep the denormalized unread counters in sync with ORM-level changes
+        from . import signals  # noqa: F401
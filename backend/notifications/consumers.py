@@ -10,9 +10,12 @@ to the user's group and pushed to their WebSocket connection in real-time.
 import json
 import logging
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.contrib.auth.models import AnonymousUser
 
+from .utils import notification_group_name
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,6 +40,20 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
                 "createdAt": "ISO datetime"
             }
         }
+
+        {
+            "type": "unread_count",
+            "data": {"unreadCount": 3}
+        }
+
+    Several notifications created together (e.g. one matching pass) arrive
+    as a single ``notification.batch`` group message and are sent to the
+    client as the usual per-notification messages.
+
+    ``unread_count`` is pushed whenever the user's unread counter changes
+    (new notifications, reads, reconciliation), so clients do not need to
+    poll ``/notifications/unread-count/``. Send ``{"action": "unread_count"}``
+    to get the current value.
     """
 
     async def connect(self):
@@ -48,7 +65,7 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
             return
 
         # Join user-specific notification group
-        self.group_name = f"notifications_{self.user.id}"
+        self.group_name = notification_group_name(self.user.id)
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
         logger.info(
@@ -68,8 +85,9 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
             )
 
     async def receive_json(self, content, **kwargs):
-        """Client-to-server messages (currently not used, but could be for acks)."""
-        pass
+        """Client-to-server messages: ``{"action": "unread_count"}``."""
+        if isinstance(content, dict) and content.get("action") == "unread_count":
+            await self._send_unread_count(await self._get_unread_count(self.user.id))
 
     # --- Group message handlers ---
 
@@ -89,3 +107,40 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
                 "data": event["data"],
             }
         )
+        if "unreadCount" in event:
+            await self._send_unread_count(event["unreadCount"])
+
+    async def notification_batch(self, event):
+        """
+        Handle several notifications for this user sent as one message.
+
+        Called when channel layer sends:
+            {
+                "type": "notification.batch",
+                "data": [ ... notification payloads ... ]
+            }
+        """
+        for data in event["data"]:
+            await self.send_json({"type": "notification", "data": data})
+        if "unreadCount" in event:
+            await self._send_unread_count(event["unreadCount"])
+
+    async def notification_unread(self, event):
+        """
+        Handle an unread counter change.
+
+        Called when channel layer sends:
+            {"type": "notification.unread", "unreadCount": 3}
+        """
+        await self._send_unread_count(event["unreadCount"])
+
+    # --- Helpers ---
+
+    async def _send_unread_count(self, count):
+        await self.send_json({"type": "unread_count", "data": {"unreadCount": count}})
+
+    @database_sync_to_async
+    def _get_unread_count(self, user_id):
+        from .counters import get_unread_count
+
+        return get_unread_count(user_id)
@@ -0,0 +1,174 @@
+"""
+Per-user unread notification counters.
+
+``User.unread_notifications`` is a denormalized count of the user's unread
+notifications, so ``unread_count`` and the WebSocket push read one column
+instead of running ``COUNT(*)`` over ``Notification`` on every poll.
+
+  - Incremented on create: the post_save signal (notifications/signals.py)
+    for single rows, ``increment_unread`` for the matching engine's
+    ``bulk_create``
+  - Decremented by ``mark_read`` / ``mark_all_read`` by the number of rows
+    that actually flipped, so concurrent requests cannot double-count
+  - Every change is an ``F()`` update inside the caller's DB transaction;
+    ``reconcile_unread_counts`` (beat task) repairs drift from writes that
+    bypass these paths (raw SQL, admin bulk actions, ...)
+"""
+
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db import transaction as db_transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    PositiveIntegerField,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+MARK_ALL_READ_BATCH = 1000
+
+
+def increment_unread(counts):
+    """
+    Add new unread notifications to the counters.
+
+    Args:
+        counts: dict of user_id -> number of new unread notifications
+    """
+    counts = {user_id: count for user_id, count in counts.items() if count}
+    if not counts:
+        return
+    get_user_model().objects.filter(pk__in=counts).update(
+        unread_notifications=F("unread_notifications")
+        + Case(
+            *[When(pk=user_id, then=Value(count)) for user_id, count in counts.items()],
+            default=Value(0),
+            output_field=PositiveIntegerField(),
+        )
+    )
+
+
+def decrement_unread(user_id, count):
+    """Subtract ``count`` notifications that became read (never below zero)."""
+    if not count:
+        return
+    get_user_model().objects.filter(pk=user_id).update(
+        unread_notifications=Greatest(F("unread_notifications") - count, Value(0))
+    )
+
+
+def get_unread_count(user_id):
+    return (
+        get_user_model()
+        .objects.filter(pk=user_id)
+        .values_list("unread_notifications", flat=True)
+        .first()
+        or 0
+    )
+
+
+def get_unread_counts(user_ids):
+    """dict of user_id -> unread count, in one query."""
+    return dict(
+        get_user_model()
+        .objects.filter(pk__in=user_ids)
+        .values_list("pk", "unread_notifications")
+    )
+
+
+def mark_read(notification):
+    """
+    Mark one notification as read.
+
+    Returns:
+        True if it was unread (and the counter was decremented).
+    """
+    with db_transaction.atomic():
+        updated = Notification.objects.filter(pk=notification.pk, read=False).update(
+            read=True
+        )
+        decrement_unread(notification.user_id, updated)
+    notification.read = True
+    if updated:
+        schedule_unread_push([notification.user_id])
+    return bool(updated)
+
+
+def mark_all_read(user_id):
+    """
+    Mark all of a user's notifications as read, ``MARK_ALL_READ_BATCH`` rows
+    per UPDATE (each batch with its counter decrement in one transaction).
+
+    Returns:
+        Number of notifications marked as read.
+    """
+    unread = Notification.objects.filter(user_id=user_id, read=False)
+    total = 0
+    while True:
+        with db_transaction.atomic():
+            ids = list(unread.values_list("pk", flat=True)[:MARK_ALL_READ_BATCH])
+            if not ids:
+                break
+            updated = unread.filter(pk__in=ids).update(read=True)
+            decrement_unread(user_id, updated)
+        total += updated
+        if len(ids) < MARK_ALL_READ_BATCH:
+            break
+    if total:
+        schedule_unread_push([user_id])
+    return total
+
+
+def reconcile_unread_counts():
+    """
+    Reset every counter that differs from the actual number of unread rows.
+
+    Returns:
+        Number of users whose counter was repaired.
+    """
+    User = get_user_model()
+    actual = Coalesce(
+        Subquery(
+            Notification.objects.filter(user=OuterRef("pk"), read=False)
+            .order_by()
+            .values("user")
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        Value(0),
+    )
+    drifted = list(
+        User.objects.annotate(actual=actual)
+        .exclude(unread_notifications=F("actual"))
+        .values_list("pk", flat=True)
+    )
+    if not drifted:
+        return 0
+
+    # Recount inside the UPDATE so notifications created since the scan
+    # are not lost
+    User.objects.filter(pk__in=drifted).update(unread_notifications=actual)
+    logger.info("Repaired unread notification counters for %d user(s)", len(drifted))
+    schedule_unread_push(drifted)
+    return len(drifted)
+
+
+def schedule_unread_push(user_ids):
+    """Push the new counters over WebSocket after DB commit."""
+    try:
+        from .utils import broadcast_unread_counts
+
+        user_ids = list(user_ids)
+        db_transaction.on_commit(lambda: broadcast_unread_counts(user_ids))
+    except Exception as exc:
+        logger.warning("Could not schedule unread count push: %s", exc)
@@ -0,0 +1,47 @@
+"""
+Management command to move old read notifications into the archive table.
+
+Usage:
+    python manage.py archive_notifications               # NOTIFICATION_RETENTION_DAYS
+    python manage.py archive_notifications --days 30     # custom retention
+    python manage.py archive_notifications --dry-run     # only count
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.retention import archivable_notifications, archive_read_notifications
+
+
+class Command(BaseCommand):
+    help = "Archive read notifications older than the retention period"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Retention period in days (default NOTIFICATION_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Rows per batch (default NOTIFICATION_ARCHIVE_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print how many notifications would be archived",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] is not None and options["days"] < 0:
+            raise CommandError("--days must not be negative")
+
+        if options["dry_run"]:
+            count = archivable_notifications(options["days"]).count()
+            self.stdout.write(f"{count} notification(s) would be archived")
+            return
+
+        archived = archive_read_notifications(
+            days=options["days"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} notification(s)"))
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:03
+
+import django.db.models.deletion
+import notifications.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_templates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(blank=True, default='', max_length=200)),
+                ('title_fa', models.CharField(blank=True, default='', max_length=200)),
+                ('message', models.TextField(blank=True, default='')),
+                ('message_fa', models.TextField(blank=True, default='')),
+                ('template', models.CharField(blank=True, default='', max_length=50)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('type', models.CharField(choices=[('order_matched', 'Order Matched'), ('order_cancelled', 'Order Cancelled'), ('price_alert', 'Price Alert'), ('system', 'System'), ('transaction', 'Transaction')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archived Notification',
+                'verbose_name_plural': 'Archived Notifications',
+                'ordering': ['-created_at'],
+            },
+            bases=(notifications.models.RenderedTextMixin, models.Model),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at'], name='notif_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'read', '-created_at'], name='notif_user_read_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivednotification',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivednotification',
+            index=models.Index(fields=['user', '-created_at'], name='archnotif_user_created_idx'),
+        ),
+    ]
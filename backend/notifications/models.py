@@ -2,12 +2,34 @@ import uuid
 
 from django.conf import settings
 from django.db import models
+from django.utils.functional import cached_property
 
+from .rendering import RenderedNotification, render
 
-class Notification(models.Model):
+
+class RenderedTextMixin:
+    """``rendered`` for models with text columns + ``template``/``params``."""
+
+    @cached_property
+    def rendered(self):
+        """Title and message (EN/FA), from the template or the text columns."""
+        if self.template:
+            rendered = render(self.template, self.params)
+            if rendered is not None:
+                return rendered
+        return RenderedNotification(
+            self.title, self.title_fa, self.message, self.message_fa
+        )
+
+
+class Notification(RenderedTextMixin, models.Model):
     """
     Represents a notification sent to a user.
     Maps to frontend Notification interface.
+
+    System notifications store a ``template`` key and its ``params`` and
+    leave the four text columns empty; the text is rendered on read (see
+    ``rendered`` and notifications/rendering.py).
     """
 
     class NotificationType(models.TextChoices):
@@ -22,11 +44,18 @@ class Notification(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="notifications",
+        db_index=False,  # leading column of the composite indexes below
+    )
+    title = models.CharField(max_length=200, blank=True, default="")
+    title_fa = models.CharField(
+        max_length=200, blank=True, default="", verbose_name="Title (Farsi)"
     )
-    title = models.CharField(max_length=200)
-    title_fa = models.CharField(max_length=200, verbose_name="Title (Farsi)")
-    message = models.TextField()
-    message_fa = models.TextField(verbose_name="Message (Farsi)")
+    message = models.TextField(blank=True, default="")
+    message_fa = models.TextField(
+        blank=True, default="", verbose_name="Message (Farsi)"
+    )
+    template = models.CharField(max_length=50, blank=True, default="")
+    params = models.JSONField(default=dict, blank=True)
     type = models.CharField(max_length=20, choices=NotificationType.choices)
     read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -35,6 +64,54 @@ class Notification(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Notification"
         verbose_name_plural = "Notifications"
+        indexes = [
+            # List view (user filter, newest first)
+            models.Index(fields=["user", "-created_at"], name="notif_user_created_idx"),
+            # read filter / unread scans, mark_all_read batches
+            models.Index(
+                fields=["user", "read", "-created_at"], name="notif_user_read_created_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.rendered.title} - {self.user.username}"
+
+
+class ArchivedNotification(RenderedTextMixin, models.Model):
+    """
+    Read notification moved out of ``Notification`` by the retention job
+    (notifications/retention.py) once older than
+    ``NOTIFICATION_RETENTION_DAYS``.
+
+    Same content columns (templated rows keep only ``template``/``params``)
+    without ``read`` and with a single ``(user, created_at)`` index, so the
+    hot table only holds recent and unread rows.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_notifications",
+        db_index=False,
+    )
+    title = models.CharField(max_length=200, blank=True, default="")
+    title_fa = models.CharField(max_length=200, blank=True, default="")
+    message = models.TextField(blank=True, default="")
+    message_fa = models.TextField(blank=True, default="")
+    template = models.CharField(max_length=50, blank=True, default="")
+    params = models.JSONField(default=dict, blank=True)
+    type = models.CharField(max_length=20, choices=Notification.NotificationType.choices)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Archived Notification"
+        verbose_name_plural = "Archived Notifications"
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="archnotif_user_created_idx"),
+        ]
 
     def __str__(self):
-        return f"{self.title} - {self.user.username}"
+        return f"{self.rendered.title} - {self.user_id}"
@@ -0,0 +1,90 @@
+"""
+Notification templates.
+
+System notifications (e.g. one per side of every fill) are stored as a
+template key plus a compact JSON ``params`` blob instead of four rendered
+English/Farsi strings. The text is rendered on read, by
+``NotificationSerializer`` and ``broadcast_notifications``.
+
+Each template string is parsed once (``_compile``) into literal / field
+segments, so rendering is a join over pre-split parts.
+"""
+
+import logging
+from collections import namedtuple
+from functools import lru_cache
+from string import Formatter
+
+logger = logging.getLogger(__name__)
+
+RenderedNotification = namedtuple(
+    "RenderedNotification", ["title", "title_fa", "message", "message_fa"]
+)
+
+ORDER_MATCHED_BUY = "order_matched_buy"
+ORDER_MATCHED_SELL = "order_matched_sell"
+
+TEMPLATES = {
+    ORDER_MATCHED_BUY: RenderedNotification(
+        title="Order Matched: Bought {quantity} {symbol}",
+        title_fa="سفارش تطبیق شد: خرید {quantity} سهم {name_fa}",
+        message=(
+            "Your buy order for {quantity} shares of {name} ({symbol}) "
+            "was matched at {price:,.0f} IRR per share. Total: {total:,.0f} IRR."
+        ),
+        message_fa=(
+            "سفارش خرید شما برای {quantity} سهم {name_fa} ({symbol}) "
+            "با قیمت {price:,.0f} ریال به ازای هر سهم تطبیق شد. مجموع: {total:,.0f} ریال."
+        ),
+    ),
+    ORDER_MATCHED_SELL: RenderedNotification(
+        title="Order Matched: Sold {quantity} {symbol}",
+        title_fa="سفارش تطبیق شد: فروش {quantity} سهم {name_fa}",
+        message=(
+            "Your sell order for {quantity} shares of {name} ({symbol}) "
+            "was matched at {price:,.0f} IRR per share. Total: {total:,.0f} IRR."
+        ),
+        message_fa=(
+            "سفارش فروش شما برای {quantity} سهم {name_fa} ({symbol}) "
+            "با قیمت {price:,.0f} ریال به ازای هر سهم تطبیق شد. مجموع: {total:,.0f} ریال."
+        ),
+    ),
+}
+
+
+def _compile(text):
+    """Split a format string into ``(literal, field, format_spec)`` parts."""
+    return tuple(
+        (literal, field, spec or "")
+        for literal, field, spec, _conversion in Formatter().parse(text)
+    )
+
+
+@lru_cache(maxsize=None)
+def compiled_template(key):
+    """Pre-split parts of the four strings of a template (cached per key)."""
+    return RenderedNotification(*(_compile(text) for text in TEMPLATES[key]))
+
+
+def _render_parts(parts, params):
+    return "".join(
+        literal + (format(params[field], spec) if field is not None else "")
+        for literal, field, spec in parts
+    )
+
+
+def render(key, params):
+    """
+    Render a template with its params.
+
+    Returns:
+        ``RenderedNotification``, or ``None`` when the key is unknown or a
+        param is missing (logged).
+    """
+    try:
+        return RenderedNotification(
+            *(_render_parts(parts, params) for parts in compiled_template(key))
+        )
+    except (KeyError, TypeError, ValueError) as exc:
+        logger.warning("Cannot render notification template %r: %s", key, exc)
+        return None
@@ -0,0 +1,91 @@
+"""
+Retention job for the Notification table.
+
+Read notifications older than ``NOTIFICATION_RETENTION_DAYS`` are moved to
+``ArchivedNotification`` so ``Notification`` only holds recent and unread
+rows and its indexes stay small.
+
+  - Rows move ``NOTIFICATION_ARCHIVE_BATCH_SIZE`` at a time, oldest first;
+    each batch is one INSERT into the archive and one ``QuerySet.delete()``
+    of the batch's primary keys, in one DB transaction, so the job can be
+    stopped and resumed at any point
+  - Unread notifications are never archived, so the unread counters
+    (notifications/counters.py) are unaffected
+  - Batches lock their rows with ``SKIP LOCKED`` where supported, so a
+    concurrent run or a user marking rows read does not block the job
+
+Run by the ``archive_notifications`` management command and the
+``notifications.archive_read_notifications`` beat task.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction as db_transaction
+from django.utils import timezone
+
+from .models import ArchivedNotification, Notification
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FIELDS = [
+    "id",
+    "user_id",
+    "title",
+    "title_fa",
+    "message",
+    "message_fa",
+    "template",
+    "params",
+    "type",
+    "created_at",
+]
+
+
+def archivable_notifications(days=None):
+    """Read notifications created more than ``days`` days ago."""
+    if days is None:
+        days = getattr(settings, "NOTIFICATION_RETENTION_DAYS", 90)
+    cutoff = timezone.now() - timedelta(days=days)
+    return Notification.objects.filter(read=True, created_at__lt=cutoff)
+
+
+def archive_read_notifications(days=None, batch_size=None, max_batches=None):
+    """
+    Move old read notifications into ``ArchivedNotification``.
+
+    Args:
+        days: retention period (default ``NOTIFICATION_RETENTION_DAYS``).
+        batch_size: rows per batch (default ``NOTIFICATION_ARCHIVE_BATCH_SIZE``).
+        max_batches: stop after this many batches (``None`` = until done).
+
+    Returns:
+        Number of notifications archived.
+    """
+    batch_size = batch_size or getattr(settings, "NOTIFICATION_ARCHIVE_BATCH_SIZE", 5000)
+    candidates = archivable_notifications(days).order_by("created_at")
+    if connection.features.has_select_for_update_skip_locked:
+        candidates = candidates.select_for_update(skip_locked=True)
+
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        with db_transaction.atomic():
+            rows = list(candidates.values(*ARCHIVE_FIELDS)[:batch_size])
+            if not rows:
+                break
+            ArchivedNotification.objects.bulk_create(
+                [ArchivedNotification(**row) for row in rows],
+                ignore_conflicts=True,
+            )
+            # Regular delete: post_delete (unread counters) still fires, and
+            # returns early for these read rows
+            Notification.objects.filter(pk__in=[row["id"] for row in rows]).delete()
+        archived += len(rows)
+        batches += 1
+        if len(rows) < batch_size:
+            break
+
+    if archived:
+        logger.info("Archived %d read notification(s)", archived)
+    return archived
@@ -4,11 +4,18 @@ from .models import Notification
 
 
 class NotificationSerializer(serializers.ModelSerializer):
-    """Serializer for Notification model - maps to frontend Notification interface."""
+    """
+    Serializer for Notification model - maps to frontend Notification interface.
+
+    Text fields come from ``Notification.rendered`` so templated rows are
+    rendered here, on read.
+    """
 
     userId = serializers.UUIDField(source="user_id", read_only=True)
-    titleFa = serializers.CharField(source="title_fa", read_only=True)
-    messageFa = serializers.CharField(source="message_fa", read_only=True)
+    title = serializers.CharField(source="rendered.title", read_only=True)
+    titleFa = serializers.CharField(source="rendered.title_fa", read_only=True)
+    message = serializers.CharField(source="rendered.message", read_only=True)
+    messageFa = serializers.CharField(source="rendered.message_fa", read_only=True)
     createdAt = serializers.DateTimeField(source="created_at", read_only=True)
 
     class Meta:
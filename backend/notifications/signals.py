@@ -0,0 +1,30 @@
+"""
+Notification model signals.
+
+Keep ``User.unread_notifications`` (notifications/counters.py) in sync for
+notifications created or deleted through the ORM one at a time. The
+matching engine creates its notifications with ``bulk_create`` (no
+signals) and calls ``increment_unread`` itself.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .counters import decrement_unread, increment_unread, schedule_unread_push
+from .models import Notification
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw or not created or instance.read:
+        return
+    increment_unread({instance.user_id: 1})
+    schedule_unread_push([instance.user_id])
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    if instance.read:
+        return
+    decrement_unread(instance.user_id, 1)
+    schedule_unread_push([instance.user_id])
@@ -0,0 +1,38 @@
+"""
+Celery tasks for notifications.
+
+``reconcile_unread_counts_task`` periodically repairs the denormalized
+unread counters (notifications/counters.py) against the Notification table.
+``archive_read_notifications_task`` runs the retention job
+(notifications/retention.py).
+"""
+
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="notifications.reconcile_unread_counts", acks_late=True)
+def reconcile_unread_counts_task():
+    """Reset drifted ``User.unread_notifications`` counters."""
+    from .counters import reconcile_unread_counts
+
+    try:
+        return {"repaired": reconcile_unread_counts()}
+    except Exception as exc:
+        logger.error("Unread counter reconciliation failed: %s", exc)
+        return {"repaired": 0}
+
+
+@shared_task(name="notifications.archive_read_notifications", acks_late=True)
+def archive_read_notifications_task():
+    """Move old read notifications to the archive table (see retention.py)."""
+    from .retention import archive_read_notifications
+
+    try:
+        return {"archived": archive_read_notifications()}
+    except Exception as exc:
+        logger.error("Notification archival failed: %s", exc)
+        return {"archived": 0}
@@ -8,6 +8,10 @@ BourseChain - تست‌های اعلان‌ها (Notifications)
   - علامت‌گذاری خوانده شده
   - شمارش خوانده نشده
   - Sprint 5: WebSocket consumer + broadcast tests
+  - ارسال دسته‌ای اعلان‌های یک matching pass (یک پیام برای هر کاربر)
+  - اعلان‌های قالب‌دار (template + params، رندر هنگام خواندن)
+  - شمارنده‌ی denormalized اعلان‌های خوانده نشده + push از WebSocket
+  - بایگانی اعلان‌های خوانده شده‌ی قدیمی (retention)
 
 اجرا:
   python manage.py test notifications -v2
@@ -129,8 +133,8 @@ class TestNotificationAfterMatch(NotificationTestMixin, TestCase):
 
         notifs = Notification.objects.filter(user=self.buyer, type="order_matched")
         self.assertEqual(notifs.count(), 1)
-        self.assertIn("Bought", notifs.first().title)
-        self.assertIn("100", notifs.first().title)
+        self.assertIn("Bought", notifs.first().rendered.title)
+        self.assertIn("100", notifs.first().rendered.title)
 
     def test_seller_receives_notification(self):
         """فروشنده بعد از match اعلان دریافت کند."""
@@ -138,7 +142,7 @@ class TestNotificationAfterMatch(NotificationTestMixin, TestCase):
 
         notifs = Notification.objects.filter(user=self.seller, type="order_matched")
         self.assertEqual(notifs.count(), 1)
-        self.assertIn("Sold", notifs.first().title)
+        self.assertIn("Sold", notifs.first().rendered.title)
 
     def test_notifications_are_bilingual(self):
         """اعلان‌ها باید دوزبانه (FA/EN) باشند."""
@@ -146,13 +150,13 @@ class TestNotificationAfterMatch(NotificationTestMixin, TestCase):
 
         notif = Notification.objects.filter(user=self.buyer).first()
         # انگلیسی
-        self.assertTrue(len(notif.title) > 0)
-        self.assertTrue(len(notif.message) > 0)
+        self.assertTrue(len(notif.rendered.title) > 0)
+        self.assertTrue(len(notif.rendered.message) > 0)
         # فارسی
-        self.assertTrue(len(notif.title_fa) > 0)
-        self.assertTrue(len(notif.message_fa) > 0)
-        self.assertIn("خرید", notif.title_fa)
-        self.assertIn("فولاد", notif.message_fa)
+        self.assertTrue(len(notif.rendered.title_fa) > 0)
+        self.assertTrue(len(notif.rendered.message_fa) > 0)
+        self.assertIn("خرید", notif.rendered.title_fa)
+        self.assertIn("فولاد", notif.rendered.message_fa)
 
     def test_notifications_are_unread_by_default(self):
         """اعلان‌های match باید خوانده نشده باشند."""
@@ -389,3 +393,553 @@ class TestNotificationBroadcast(NotificationTestMixin, TestCase):
             broadcast_notification(notif)
         except Exception:
             self.fail("broadcast_notification raised an exception")
+
+
+# =============================================================================
+# 6. تست ارسال دسته‌ای اعلان‌ها (یک پیام برای هر کاربر)
+# =============================================================================
+
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+class TestNotificationBatching(NotificationTestMixin, TestCase):
+    """یک matching pass: یک bulk_create و حداکثر یک group_send برای هر کاربر."""
+
+    def _notification(self, user, title="N"):
+        return Notification.objects.create(
+            user=user, title=title, title_fa=title,
+            message="m", message_fa="m", type="system",
+        )
+
+    def test_one_message_per_user(self):
+        """چند اعلان یک کاربر باید در یک پیام notification.batch ارسال شوند."""
+        from notifications.utils import broadcast_notifications
+
+        buyer_notifs = [self._notification(self.buyer, f"B{i}") for i in range(3)]
+        seller_notif = self._notification(self.seller, "S")
+
+        layer = MagicMock()
+        layer.group_send = AsyncMock()
+        with patch("notifications.utils.get_channel_layer", return_value=layer):
+            broadcast_notifications([*buyer_notifs, seller_notif])
+
+        self.assertEqual(layer.group_send.await_count, 2)
+        sent = {call.args[0]: call.args[1] for call in layer.group_send.await_args_list}
+        batch = sent[f"notifications_{self.buyer.id}"]
+        self.assertEqual(batch["type"], "notification.batch")
+        self.assertEqual([d["title"] for d in batch["data"]], ["B0", "B1", "B2"])
+        single = sent[f"notifications_{self.seller.id}"]
+        self.assertEqual(single["type"], "notification.message")
+        self.assertEqual(single["data"]["title"], "S")
+
+    def test_matching_sweep_single_insert_and_broadcast(self):
+        """یک sweep با چند fill: یک INSERT اعلان و یک broadcast."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for price in ("8500", "8510", "8520"):
+            Order.objects.create(
+                user=self.seller, stock=self.stock,
+                type="sell", price=Decimal(price), quantity=10,
+            )
+        buy = Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="buy", price=Decimal("8520"), quantity=30,
+        )
+
+        with patch("notifications.utils.broadcast_notifications") as broadcast, \
+                self.captureOnCommitCallbacks(execute=True), \
+                CaptureQueriesContext(connection) as ctx:
+            transactions = match_order(str(buy.id))
+
+        self.assertEqual(len(transactions), 3)
+        inserts = [
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].startswith('INSERT INTO "notifications_notification"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        broadcast.assert_called_once()
+        (notifs,), _ = broadcast.call_args
+        self.assertEqual(len(notifs), 6)
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+)
+class TestNotificationBatchWebSocket(TransactionTestCase):
+    """consumer باید پیام batch را به پیام‌های تکی تبدیل کند (پروتکل کلاینت تغییر نمی‌کند)."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="wsbatch", email="wsbatch@test.com", password="TestPass1234!",
+        )
+
+    async def test_batch_unpacked(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from config.ws_auth import JWTAuthMiddleware
+        from channels.routing import URLRouter
+        from django.urls import path
+        from notifications.consumers import NotificationConsumer
+
+        token = await sync_to_async(lambda: str(AccessToken.for_user(self.user)))()
+        app = JWTAuthMiddleware(
+            URLRouter([path("ws/notifications/", NotificationConsumer.as_asgi())])
+        )
+        communicator = WebsocketCommunicator(app, f"/ws/notifications/?token={token}")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await get_channel_layer().group_send(
+            f"notifications_{self.user.id}",
+            {
+                "type": "notification.batch",
+                "data": [{"id": "a", "title": "First"}, {"id": "b", "title": "Second"}],
+            },
+        )
+
+        first = await communicator.receive_json_from()
+        second = await communicator.receive_json_from()
+        self.assertEqual(first, {"type": "notification", "data": {"id": "a", "title": "First"}})
+        self.assertEqual(second["data"]["title"], "Second")
+        await communicator.disconnect()
+
+
+# =============================================================================
+# 7. تست اعلان‌های قالب‌دار (template + params)
+# =============================================================================
+
+from notifications import rendering
+
+
+class TestNotificationTemplates(NotificationTestMixin, APITestCase):
+    """اعلان‌های match فقط کلید قالب و params را ذخیره می‌کنند و هنگام خواندن رندر می‌شوند."""
+
+    def _create_match(self):
+        Order.objects.create(
+            user=self.seller, stock=self.stock,
+            type="sell", price=Decimal("8500"), quantity=100,
+        )
+        self.seller_holding.quantity -= 100
+        self.seller_holding.save()
+        self.buyer.cash_balance -= Decimal("850000")
+        self.buyer.save()
+        buy = Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="buy", price=Decimal("8500"), quantity=100,
+        )
+        match_order(str(buy.id))
+
+    def test_match_stores_template_not_text(self):
+        """ستون‌های متنی خالی و فقط template/params ذخیره شوند."""
+        self._create_match()
+
+        notif = Notification.objects.get(user=self.buyer)
+        self.assertEqual(notif.template, rendering.ORDER_MATCHED_BUY)
+        self.assertEqual(notif.title, "")
+        self.assertEqual(notif.message_fa, "")
+        self.assertEqual(notif.params["symbol"], "FOLD")
+        self.assertEqual(notif.params["quantity"], 100)
+
+    def test_render_matches_previous_text(self):
+        """متن رندر شده همان متن قبلی (قالب f-string) باشد."""
+        params = {
+            "quantity": 100, "symbol": "FOLD", "name": "Foolad",
+            "name_fa": "فولاد مبارکه", "price": 8500.0, "total": 850000.0,
+        }
+        rendered = rendering.render(rendering.ORDER_MATCHED_SELL, params)
+        self.assertEqual(rendered.title, "Order Matched: Sold 100 FOLD")
+        self.assertEqual(
+            rendered.message,
+            "Your sell order for 100 shares of Foolad (FOLD) was matched at "
+            "8,500 IRR per share. Total: 850,000 IRR.",
+        )
+        self.assertIn("فولاد مبارکه", rendered.message_fa)
+
+    def test_templates_compiled_once(self):
+        """قالب‌ها یک بار parse و cache شوند."""
+        first = rendering.compiled_template(rendering.ORDER_MATCHED_BUY)
+        self.assertIs(rendering.compiled_template(rendering.ORDER_MATCHED_BUY), first)
+
+    def test_unknown_template_falls_back_to_columns(self):
+        """قالب ناشناخته یا param ناقص به ستون‌های متنی برگردد."""
+        notif = Notification.objects.create(
+            user=self.buyer, template="no_such_template", params={},
+            title="Fallback", type="system",
+        )
+        self.assertEqual(notif.rendered.title, "Fallback")
+
+        notif = Notification(
+            user=self.buyer, template=rendering.ORDER_MATCHED_BUY,
+            params={"quantity": 1}, title="Partial", type="system",
+        )
+        self.assertEqual(notif.rendered.title, "Partial")
+
+    def test_api_returns_rendered_text(self):
+        """API متن رندر شده را برگرداند."""
+        self._create_match()
+        response = self.client.post("/api/v1/auth/login/", {
+            "email": self.buyer.email, "password": "TestPass1234!",
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+        response = self.client.get("/api/v1/notifications/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data["results"]
+        self.assertEqual(data[0]["title"], "Order Matched: Bought 100 FOLD")
+        self.assertIn("خرید", data[0]["titleFa"])
+        self.assertIn("8,500", data[0]["messageFa"])
+        self.assertNotIn("params", data[0])
+
+    def test_broadcast_payload_rendered(self):
+        """payload ارسالی WebSocket هم متن رندر شده داشته باشد."""
+        from notifications.utils import serialize_notification
+
+        self._create_match()
+        notif = Notification.objects.get(user=self.seller)
+        payload = serialize_notification(notif)
+        self.assertEqual(payload["title"], "Order Matched: Sold 100 FOLD")
+        self.assertIn("فروش", payload["titleFa"])
+
+
+# =============================================================================
+# 8. تست شمارنده‌ی اعلان‌های خوانده نشده (User.unread_notifications)
+# =============================================================================
+
+from notifications import counters
+
+
+class TestUnreadCounters(NotificationTestMixin, APITestCase):
+    """شمارنده با ایجاد زیاد، با خواندن کم و با reconciliation اصلاح شود."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def _login(self, user):
+        response = self.client.post("/api/v1/auth/login/", {
+            "email": user.email, "password": "TestPass1234!",
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def _notification(self, user, read=False):
+        return Notification.objects.create(
+            user=user, title="N", title_fa="N",
+            message="m", message_fa="m", type="system", read=read,
+        )
+
+    def _counter(self, user):
+        user.refresh_from_db(fields=["unread_notifications"])
+        return user.unread_notifications
+
+    def test_create_increments(self):
+        """ایجاد اعلان خوانده نشده شمارنده را یکی زیاد کند (خوانده شده نه)."""
+        self._notification(self.buyer)
+        self._notification(self.buyer)
+        self._notification(self.buyer, read=True)
+        self.assertEqual(self._counter(self.buyer), 2)
+
+    def test_match_bulk_create_increments(self):
+        """اعلان‌های bulk_create در match هم شمرده شوند."""
+        Order.objects.create(
+            user=self.seller, stock=self.stock,
+            type="sell", price=Decimal("8500"), quantity=10,
+        )
+        buy = Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="buy", price=Decimal("8500"), quantity=10,
+        )
+        match_order(str(buy.id))
+        self.assertEqual(self._counter(self.buyer), 1)
+        self.assertEqual(self._counter(self.seller), 1)
+
+    def test_unread_count_endpoint_uses_counter(self):
+        """endpoint مقدار شمارنده را بدون COUNT(*) برگرداند."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for _ in range(3):
+            self._notification(self.buyer)
+        self._login(self.buyer)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/v1/notifications/unread-count/")
+        self.assertEqual(response.data["unreadCount"], 3)
+        self.assertFalse(
+            any("COUNT(" in q["sql"] and "notifications_notification" in q["sql"]
+                for q in ctx.captured_queries)
+        )
+
+    def test_mark_read_decrements_once(self):
+        """علامت خوانده شدن دوباره، شمارنده را دوباره کم نکند."""
+        notif = self._notification(self.buyer)
+        self._notification(self.buyer)
+        self._login(self.buyer)
+
+        for _ in range(2):
+            response = self.client.patch(
+                f"/api/v1/notifications/{notif.id}/", {"read": True}, format="json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._counter(self.buyer), 1)
+
+    def test_mark_all_read_batches(self):
+        """mark_all_read در دسته‌های محدود اجرا و شمارنده صفر شود."""
+        for _ in range(5):
+            self._notification(self.buyer)
+        self._notification(self.seller)
+
+        with patch.object(counters, "MARK_ALL_READ_BATCH", 2):
+            marked = counters.mark_all_read(self.buyer.id)
+
+        self.assertEqual(marked, 5)
+        self.assertEqual(self._counter(self.buyer), 0)
+        self.assertEqual(self._counter(self.seller), 1)
+        self.assertFalse(Notification.objects.filter(user=self.buyer, read=False).exists())
+
+    def test_delete_unread_decrements(self):
+        """حذف اعلان خوانده نشده شمارنده را کم کند."""
+        notif = self._notification(self.buyer)
+        notif.delete()
+        self.assertEqual(self._counter(self.buyer), 0)
+
+    def test_counter_never_negative(self):
+        """کم کردن بیش از مقدار شمارنده آن را منفی نکند."""
+        counters.decrement_unread(self.buyer.id, 5)
+        self.assertEqual(self._counter(self.buyer), 0)
+
+    def test_reconcile_repairs_drift(self):
+        """reconciliation شمارنده‌های اشتباه را اصلاح کند."""
+        from notifications.tasks import reconcile_unread_counts_task
+
+        self._notification(self.buyer)
+        self._notification(self.buyer)
+        Notification.objects.filter(user=self.buyer).update(read=True)  # بدون شمارنده
+        User.objects.filter(pk=self.seller.pk).update(unread_notifications=7)
+
+        self.assertEqual(reconcile_unread_counts_task(), {"repaired": 2})
+        self.assertEqual(self._counter(self.buyer), 0)
+        self.assertEqual(self._counter(self.seller), 0)
+        self.assertEqual(counters.reconcile_unread_counts(), 0)
+
+    def test_full_user_save_keeps_counter(self):
+        """save() کامل کاربر (ویرایش پروفایل) شمارنده را بازنویسی نکند."""
+        user = User.objects.get(pk=self.buyer.pk)  # counter 0 in memory
+        self._notification(self.buyer)
+        self._notification(self.buyer)
+
+        user.first_name = "Updated"
+        user.save()
+        self.assertEqual(self._counter(self.buyer), 2)
+
+        self._login(self.buyer)
+        response = self.client.patch("/api/v1/auth/profile/", {"first_name": "Again"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._counter(self.buyer), 2)
+
+    def test_migration_backfills_counters(self):
+        """مایگریشن شمارنده‌ها را از اعلان‌های خوانده نشده‌ی موجود پر کند."""
+        import importlib
+
+        from django.apps import apps
+
+        migration = importlib.import_module(
+            "users.migrations.0003_backfill_unread_notifications"
+        )
+        self._notification(self.buyer)
+        self._notification(self.buyer)
+        self._notification(self.seller, read=True)
+        User.objects.update(unread_notifications=0)  # rows that predate the column
+
+        migration.backfill_unread_notifications(apps, None)
+        self.assertEqual(self._counter(self.buyer), 2)
+        self.assertEqual(self._counter(self.seller), 0)
+
+    def test_broadcast_carries_unread_count(self):
+        """پیام‌های اعلان unreadCount کاربر را همراه داشته باشند."""
+        from notifications.utils import broadcast_notifications
+
+        notifs = [self._notification(self.buyer) for _ in range(2)]
+        layer = MagicMock()
+        layer.group_send = AsyncMock()
+        with patch("notifications.utils.get_channel_layer", return_value=layer):
+            broadcast_notifications(notifs)
+
+        (group, message), _ = layer.group_send.await_args
+        self.assertEqual(group, f"notifications_{self.buyer.id}")
+        self.assertEqual(message["unreadCount"], 2)
+
+    def test_mark_read_pushes_counter(self):
+        """بعد از خواندن، شمارنده‌ی جدید از WebSocket push شود."""
+        notif = self._notification(self.buyer)
+        self._notification(self.buyer)
+
+        layer = MagicMock()
+        layer.group_send = AsyncMock()
+        with patch("notifications.utils.get_channel_layer", return_value=layer), \
+                self.captureOnCommitCallbacks(execute=True):
+            counters.mark_read(notif)
+
+        layer.group_send.assert_awaited_once_with(
+            f"notifications_{self.buyer.id}",
+            {"type": "notification.unread", "unreadCount": 1},
+        )
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+)
+class TestUnreadCountWebSocket(TransactionTestCase):
+    """consumer شمارنده را push کند و به درخواست unread_count پاسخ دهد."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="wsunread", email="wsunread@test.com", password="TestPass1234!",
+        )
+        User.objects.filter(pk=self.user.pk).update(unread_notifications=4)
+
+    async def _connect(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from config.ws_auth import JWTAuthMiddleware
+        from channels.routing import URLRouter
+        from django.urls import path
+        from notifications.consumers import NotificationConsumer
+
+        token = await sync_to_async(lambda: str(AccessToken.for_user(self.user)))()
+        app = JWTAuthMiddleware(
+            URLRouter([path("ws/notifications/", NotificationConsumer.as_asgi())])
+        )
+        communicator = WebsocketCommunicator(app, f"/ws/notifications/?token={token}")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_unread_push_and_request(self):
+        communicator = await self._connect()
+
+        await get_channel_layer().group_send(
+            f"notifications_{self.user.id}",
+            {"type": "notification.unread", "unreadCount": 9},
+        )
+        self.assertEqual(
+            await communicator.receive_json_from(),
+            {"type": "unread_count", "data": {"unreadCount": 9}},
+        )
+
+        await communicator.send_json_to({"action": "unread_count"})
+        self.assertEqual(
+            await communicator.receive_json_from(),
+            {"type": "unread_count", "data": {"unreadCount": 4}},
+        )
+        await communicator.disconnect()
+
+    async def test_batch_followed_by_unread_count(self):
+        communicator = await self._connect()
+
+        await get_channel_layer().group_send(
+            f"notifications_{self.user.id}",
+            {"type": "notification.batch", "data": [{"id": "a"}], "unreadCount": 5},
+        )
+        self.assertEqual((await communicator.receive_json_from())["type"], "notification")
+        self.assertEqual(
+            await communicator.receive_json_from(),
+            {"type": "unread_count", "data": {"unreadCount": 5}},
+        )
+        await communicator.disconnect()
+
+
+# =============================================================================
+# 9. تست بایگانی اعلان‌های قدیمی (retention)
+# =============================================================================
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from notifications.models import ArchivedNotification
+from notifications.retention import archive_read_notifications
+
+
+@override_settings(NOTIFICATION_RETENTION_DAYS=30)
+class TestNotificationRetention(NotificationTestMixin, TestCase):
+    """اعلان‌های خوانده شده‌ی قدیمی‌تر از N روز به جدول بایگانی منتقل شوند."""
+
+    def _notification(self, days_old, read=True, **kwargs):
+        notif = Notification.objects.create(
+            user=self.buyer, type="system", read=read,
+            **({"title": "Old", "title_fa": "قدیمی"} | kwargs),
+        )
+        Notification.objects.filter(pk=notif.pk).update(
+            created_at=timezone.now() - timedelta(days=days_old)
+        )
+        return notif
+
+    def test_archives_only_old_read(self):
+        """فقط اعلان‌های خوانده شده و قدیمی منتقل شوند."""
+        old_read = self._notification(40)
+        old_unread = self._notification(40, read=False)
+        recent_read = self._notification(5)
+
+        self.assertEqual(archive_read_notifications(), 1)
+
+        self.assertFalse(Notification.objects.filter(pk=old_read.pk).exists())
+        self.assertTrue(Notification.objects.filter(pk=old_unread.pk).exists())
+        self.assertTrue(Notification.objects.filter(pk=recent_read.pk).exists())
+        archived = ArchivedNotification.objects.get(pk=old_read.pk)
+        self.assertEqual(archived.user_id, self.buyer.id)
+        self.assertEqual(archived.rendered.title, "Old")
+
+    def test_batches(self):
+        """انتقال در دسته‌های محدود انجام شود."""
+        for _ in range(5):
+            self._notification(40)
+
+        self.assertEqual(archive_read_notifications(batch_size=2, max_batches=2), 4)
+        self.assertEqual(ArchivedNotification.objects.count(), 4)
+        self.assertEqual(archive_read_notifications(batch_size=2), 1)
+        self.assertEqual(Notification.objects.count(), 0)
+
+    def test_templated_rows_stay_compact(self):
+        """اعلان‌های قالب‌دار فقط template/params را در بایگانی نگه دارند."""
+        from notifications import rendering
+
+        notif = self._notification(
+            40, title="", title_fa="", template=rendering.ORDER_MATCHED_BUY,
+            params={
+                "quantity": 10, "symbol": "FOLD", "name": "Foolad",
+                "name_fa": "فولاد مبارکه", "price": 8500.0, "total": 85000.0,
+            },
+        )
+        archive_read_notifications()
+
+        archived = ArchivedNotification.objects.get(pk=notif.pk)
+        self.assertEqual(archived.title, "")
+        self.assertEqual(archived.rendered.title, "Order Matched: Bought 10 FOLD")
+
+    def test_unread_counter_unchanged(self):
+        """بایگانی روی شمارنده‌ی خوانده نشده اثری نداشته باشد."""
+        self._notification(40)
+        self._notification(40, read=False)
+
+        archive_read_notifications()
+
+        self.buyer.refresh_from_db(fields=["unread_notifications"])
+        self.assertEqual(self.buyer.unread_notifications, 1)
+
+    def test_command(self):
+        """دستور archive_notifications با --dry-run و بدون آن."""
+        self._notification(40)
+        self._notification(10)
+
+        out = StringIO()
+        call_command("archive_notifications", "--dry-run", stdout=out)
+        self.assertIn("1 notification(s) would be archived", out.getvalue())
+        self.assertEqual(ArchivedNotification.objects.count(), 0)
+
+        out = StringIO()
+        call_command("archive_notifications", "--days", "7", stdout=out)
+        self.assertIn("Archived 2", out.getvalue())
@@ -5,6 +5,15 @@ Sprint 5 - Real-time notification push.
 These functions are called from the matching engine (orders/matching.py)
 after creating Notification objects, to push them to connected WebSocket
 clients in real-time.
+
+A matching pass hands all of its notifications to
+``broadcast_notifications`` at once: each affected user gets a single
+channel-layer message (``notification.batch`` when there is more than one),
+and all messages go out in one ``async_to_sync`` hop.
+
+Every message also carries the user's ``unreadCount``
+(notifications/counters.py); ``broadcast_unread_counts`` pushes counter
+changes that come without a new notification (reads, reconciliation).
 """
 
 import logging
@@ -12,9 +21,31 @@ import logging
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 
+from .counters import get_unread_counts
+
 logger = logging.getLogger(__name__)
 
 
+def notification_group_name(user_id):
+    return f"notifications_{user_id}"
+
+
+def serialize_notification(notification):
+    """Notification -> payload matching the frontend Notification interface."""
+    rendered = notification.rendered
+    return {
+        "id": str(notification.id),
+        "userId": str(notification.user_id),
+        "title": rendered.title,
+        "titleFa": rendered.title_fa,
+        "message": rendered.message,
+        "messageFa": rendered.message_fa,
+        "type": notification.type,
+        "read": notification.read,
+        "createdAt": notification.created_at.isoformat(),
+    }
+
+
 def broadcast_notification(notification):
     """
     Broadcast a notification to the user's WebSocket group.
@@ -22,37 +53,80 @@ def broadcast_notification(notification):
     Args:
         notification: Notification model instance (already saved to DB)
     """
+    broadcast_notifications([notification])
+
+
+def broadcast_notifications(notifications):
+    """
+    Broadcast saved notifications, one channel-layer message per user.
+
+    Args:
+        notifications: Notification model instances (already saved to DB)
+    """
+    if not notifications:
+        return
     try:
         channel_layer = get_channel_layer()
         if channel_layer is None:
             logger.debug("No channel layer available, skipping WS broadcast")
             return
 
-        group_name = f"notifications_{notification.user_id}"
-
-        # Serialize notification data (matching frontend Notification interface)
-        data = {
-            "id": str(notification.id),
-            "userId": str(notification.user_id),
-            "title": notification.title,
-            "titleFa": notification.title_fa,
-            "message": notification.message,
-            "messageFa": notification.message_fa,
-            "type": notification.type,
-            "read": notification.read,
-            "createdAt": notification.created_at.isoformat(),
-        }
-
-        async_to_sync(channel_layer.group_send)(
-            group_name,
-            {
-                "type": "notification.message",
-                "data": data,
-            },
-        )
+        per_user = {}
+        for notification in notifications:
+            per_user.setdefault(notification.user_id, []).append(
+                serialize_notification(notification)
+            )
+        unread = get_unread_counts(per_user)
+
+        messages = []
+        for user_id, items in per_user.items():
+            message = (
+                {"type": "notification.message", "data": items[0]}
+                if len(items) == 1
+                else {"type": "notification.batch", "data": items}
+            )
+            if user_id in unread:
+                message["unreadCount"] = unread[user_id]
+            messages.append((notification_group_name(user_id), message))
+
+        _send_all(channel_layer, messages)
         logger.info(
-            "Broadcast notification to %s: %s", group_name, notification.title
+            "Broadcast %d notification(s) to %d user(s)",
+            len(notifications),
+            len(per_user),
         )
     except Exception as e:
         # Never let WebSocket broadcasting break the main flow
         logger.warning("Failed to broadcast notification via WebSocket: %s", e)
+
+
+def broadcast_unread_counts(user_ids):
+    """Push the current unread counters of ``user_ids`` to their groups."""
+    if not user_ids:
+        return
+    try:
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        _send_all(
+            channel_layer,
+            [
+                (
+                    notification_group_name(user_id),
+                    {"type": "notification.unread", "unreadCount": count},
+                )
+                for user_id, count in get_unread_counts(user_ids).items()
+            ],
+        )
+    except Exception as e:
+        logger.warning("Failed to push unread counts via WebSocket: %s", e)
+
+
+def _send_all(channel_layer, messages):
+    """Send ``(group, message)`` pairs in one ``async_to_sync`` hop."""
+
+    async def _send():
+        for group, message in messages:
+            await channel_layer.group_send(group, message)
+
+    async_to_sync(_send)()
@@ -2,6 +2,7 @@ from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from . import counters
 from .models import Notification
 from .serializers import NotificationSerializer
 
@@ -26,18 +27,19 @@ class NotificationDetailView(generics.RetrieveUpdateAPIView):
         return Notification.objects.filter(user=self.request.user)
 
     def perform_update(self, serializer):
+        # Flip read + decrement the unread counter only if it was unread
+        counters.mark_read(serializer.instance)
         serializer.save(read=True)
 
 
 @api_view(["POST"])
 def mark_all_read(request):
     """Mark all notifications as read for the authenticated user."""
-    count = Notification.objects.filter(user=request.user, read=False).update(read=True)
+    count = counters.mark_all_read(request.user.id)
     return Response({"message": f"{count} notifications marked as read."})
 
 
 @api_view(["GET"])
 def unread_count(request):
-    """Get the count of unread notifications."""
-    count = Notification.objects.filter(user=request.user, read=False).count()
-    return Response({"unreadCount": count})
+    """Get the count of unread notifications (denormalized counter, no COUNT(*))."""
+    return Response({"unreadCount": request.user.unread_notifications})
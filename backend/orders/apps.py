@@ -5,3 +5,7 @@ class OrdersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "orders"
     verbose_name = "Order Service"
+
+    def ready(self):
+        # Keep the in-memory order book in sync with ORM-level order changes
+        from . import signals  # noqa: F401
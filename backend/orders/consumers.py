@@ -0,0 +1,136 @@
+"""
+WebSocket consumer for streaming a stock's order book depth.
+
+Clients subscribe to one symbol and receive a full L2 snapshot first, then
+sequence-numbered level diffs as the book changes (orders/orderbook.py
+publishes them through orders/utils.py). This replaces polling
+``/api/v1/orders/book/<symbol>/``.
+
+This is a public endpoint - no authentication required.
+"""
+
+import logging
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .utils import book_group_name, serialize_levels
+
+logger = logging.getLogger(__name__)
+
+
+class OrderBookConsumer(AsyncJsonWebsocketConsumer):
+    """
+    WebSocket consumer for one symbol's order book.
+
+    Connection (no auth required):
+        ws://host/ws/book/FOLD/
+
+    Messages sent to client (JSON):
+        {
+            "type": "book_snapshot",
+            "symbol": "FOLD",
+            "sequence": 41,
+            "bids": [{"price": 8740.0, "quantity": 1200, "count": 3}, ...],
+            "asks": [{"price": 8760.0, "quantity": 500, "count": 1}, ...]
+        }
+        {
+            "type": "book_diff",
+            "symbol": "FOLD",
+            "sequence": 42,
+            "bids": [{"price": 8740.0, "quantity": 700, "count": 2}],
+            "asks": [{"price": 8760.0, "quantity": 0, "count": 0}]
+        }
+
+    A diff carries the new absolute quantity of every changed level;
+    quantity 0 removes the level. Diffs with a sequence <= the snapshot's are
+    already included in it. If a diff's sequence is not last + 1, the client
+    missed an update and should send ``{"action": "resync"}`` to get a fresh
+    snapshot.
+    """
+
+    async def connect(self):
+        self.symbol = self.scope["url_route"]["kwargs"]["symbol"].upper()
+        self.stock_id = await self._get_stock_id(self.symbol)
+        if self.stock_id is None:
+            logger.info("WebSocket book connection rejected: unknown %s", self.symbol)
+            await self.close()
+            return
+
+        # Join before taking the snapshot so no diff can fall in between
+        self.group_name = book_group_name(self.stock_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self._send_snapshot()
+        logger.info(
+            "WebSocket book connected: symbol=%s channel=%s",
+            self.symbol,
+            self.channel_name,
+        )
+
+    async def disconnect(self, close_code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(
+                self.group_name, self.channel_name
+            )
+
+    async def receive_json(self, content, **kwargs):
+        """Client-to-server messages: ``{"action": "resync"}``."""
+        if isinstance(content, dict) and content.get("action") == "resync":
+            await self._send_snapshot()
+
+    # --- Group message handlers ---
+
+    async def book_diff(self, event):
+        """
+        Handle a level diff broadcast from the channel layer.
+
+        Called when channel layer sends:
+            {"type": "book.diff", "sequence": 42, "bids": [...], "asks": [...]}
+        """
+        await self._send_update("book_diff", event)
+
+    async def book_snapshot(self, event):
+        """Full top of book pushed when there was no snapshot to diff against."""
+        await self._send_update("book_snapshot", event)
+
+    # --- Helpers ---
+
+    async def _send_update(self, message_type, event):
+        await self.send_json(
+            {
+                "type": message_type,
+                "symbol": self.symbol,
+                "sequence": event["sequence"],
+                "bids": event["bids"],
+                "asks": event["asks"],
+            }
+        )
+
+    async def _send_snapshot(self):
+        depth = await self._get_depth(self.stock_id)
+        await self.send_json(
+            {
+                "type": "book_snapshot",
+                "symbol": self.symbol,
+                "sequence": depth.get("sequence", 0),
+                "bids": serialize_levels(depth["bids"]),
+                "asks": serialize_levels(depth["asks"]),
+            }
+        )
+
+    @database_sync_to_async
+    def _get_stock_id(self, symbol):
+        from stocks.models import Stock
+
+        return (
+            Stock.objects.filter(symbol=symbol, is_active=True)
+            .values_list("id", flat=True)
+            .first()
+        )
+
+    @database_sync_to_async
+    def _get_depth(self, stock_id):
+        from .orderbook import get_depth
+
+        return get_depth(stock_id)
@@ -9,6 +9,15 @@ The matching engine follows a price-time priority algorithm:
 - For SELL orders: matches against the highest available BUY orders first
 - At the same price level, orders that arrived first get matched first (FIFO)
 
+Order book:
+- Resting orders live in a resident per-symbol book (orders/orderbook.py).
+  Incoming orders are matched in memory; only the resting orders actually
+  filled are locked and re-read, and all order rows touched by one pass are
+  written back with a single bulk_update.
+- All fills produced by one incoming order are settled together
+  (_settle_fills): a market order sweeping 50 levels costs a handful of
+  statements instead of ~10 writes per fill.
+
 Cash/Stock flow:
 - Buy order creation: cash is reserved (deducted from balance)
 - Sell order creation: stock is reserved (deducted from holdings)
@@ -26,22 +35,42 @@ WebSocket (Sprint 5):
 """
 
 import logging
+from collections import Counter, defaultdict
 from decimal import Decimal
 
+from django.contrib.auth import get_user_model
 from django.db import transaction as db_transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.utils import timezone
 
+from notifications.counters import increment_unread
 from notifications.models import Notification
+from notifications.rendering import ORDER_MATCHED_BUY, ORDER_MATCHED_SELL
+from stocks.bars import record_trades
 from transactions.models import Transaction
 
 from .models import Order, PortfolioHolding
+from .orderbook import (
+    OPEN_STATUSES,
+    get_order_book,
+    is_book_order,
+    mark_changed,
+    mark_uncrossable,
+)
 
 logger = logging.getLogger(__name__)
 
+# How many times a pass re-plans after finding the book out of sync with the DB
+MAX_BOOK_SYNC_ATTEMPTS = 3
+
+# Upper bound on taker re-matches when uncrossing one book
+MAX_UNCROSS_PASSES = 1000
+
 
 def match_order(order_id):
     """
     Try to match an order against existing orders in the book.
-    Skips Stop-Loss and Take-Profit (handled by check_conditional_orders task).
+    Skips Stop-Loss and Take-Profit (fired by orders/triggers.py after trades).
     """
     try:
         order = Order.objects.select_related("stock", "user").get(
@@ -59,90 +88,160 @@ def match_order(order_id):
         logger.debug(f"Order {order_id} is conditional, skipped from matching")
         return []
 
-    if order.type == Order.OrderType.BUY:
-        return _match_buy_order(order)
-    else:
-        return _match_sell_order(order)
+    book = get_order_book(order.stock_id)
+    with book.lock:
+        try:
+            return _match_against_book(book, order)
+        except Exception:
+            # The DB transaction rolled back; the in-memory book may not have
+            # been, so force a reload before the next match on this symbol
+            book.stale = True
+            raise
 
 
-def _match_buy_order(buy_order):
+def match_crossed_book(stock_id):
     """
-    Match a buy order against existing sell orders.
-    - Limit: sell_price <= buy_price
-    - Market: match any sell order (price stores reservation amount)
-    Sorted by: 1) Price ASC (cheapest first), 2) Created time ASC (FIFO)
+    Uncross a stock's book: while it crosses, re-match the crossing orders
+    as takers (see OrderBook.crossing_takers) until one of them trades.
+
+    Used by the periodic sweep (orders.match_all_pending) instead of
+    re-matching every resting order.
     """
-    base_qs = Order.objects.filter(
-        stock=buy_order.stock,
-        type=Order.OrderType.SELL,
-        status__in=[Order.OrderStatus.PENDING, Order.OrderStatus.PARTIAL],
-    ).exclude(user=buy_order.user).select_related("stock", "user")
+    transactions = []
+    for _ in range(MAX_UNCROSS_PASSES):
+        book = get_order_book(stock_id)
+        with book.lock:
+            taker_ids = book.crossing_takers()
+        if not taker_ids:
+            break
+        matched = []
+        for taker_id in taker_ids:
+            matched = match_order(taker_id)
+            if matched:
+                break
+        if not matched:
+            # No crossing order can trade (only self-trades left): the sweep
+            # skips the book until it changes
+            mark_uncrossable(stock_id)
+            break
+        transactions.extend(matched)
+    return transactions
+
 
-    if buy_order.execution_type == Order.ExecutionType.MARKET:
-        matching_sells = base_qs.order_by("price", "created_at")
+@db_transaction.atomic
+def _match_against_book(book, order):
+    """
+    Match an incoming order against the resident book and write the result
+    back as one batch.
+
+    1. Plan fills in memory (price-time priority, see OrderBook.plan).
+    2. Lock only the resting orders about to be filled and check they still
+       match what the book believes; if not, reload the book and re-plan.
+    3. Execute fills in memory, settle them in one batch (_settle_fills) and
+       write all touched orders with one bulk_update.
+    4. Apply the outcome to the book and rest any remainder of the order.
+    """
+    order = (
+        Order.objects.select_for_update(of=("self",))
+        .select_related("stock", "user")
+        .filter(pk=order.pk, status__in=OPEN_STATUSES)
+        .first()
+    )
+    if order is None:
+        return []
+
+    for _attempt in range(MAX_BOOK_SYNC_ATTEMPTS):
+        book.discard(order.id)
+        fills = book.plan(order)
+        makers = _lock_planned_makers(fills)
+        if makers is not None:
+            break
+        logger.info(
+            f"Order book for {order.stock.symbol} out of sync with DB, reloading"
+        )
+        book.reload()
     else:
-        matching_sells = base_qs.filter(price__lte=buy_order.price).order_by(
-            "price", "created_at"
+        logger.warning(
+            f"Order book for {order.stock.symbol} kept changing, skipping match "
+            f"for order {order.id}"
         )
+        # Still rest it and republish: this pass is where other processes'
+        # books and the shared depth learn about an ORM-created order
+        book.upsert(order)
+        mark_changed(order.stock_id)
+        return []
 
-    transactions = []
-
-    for sell_order in matching_sells:
-        if buy_order.filled_quantity >= buy_order.quantity:
-            break  # Buy order fully filled
+    # Share one Stock / User instance per row so consecutive fills accumulate
+    users = {order.user_id: order.user}
+    for maker in makers.values():
+        maker.stock = order.stock
+        maker.user = users.setdefault(maker.user_id, maker.user)
 
-        tx = _execute_match(buy_order, sell_order)
+    is_buy = order.type == Order.OrderType.BUY
+    transactions = []
+    for entry, _qty in fills:
+        maker = makers[entry.order_id]
+        if is_buy:
+            tx = _execute_match(order, maker)
+        else:
+            tx = _execute_match(maker, order)
         if tx:
             transactions.append(tx)
 
-    return transactions
+    _settle_fills(order.stock, transactions)
 
+    # Batch write-back of every order touched in this pass
+    touched = [order, *makers.values()]
+    now = timezone.now()
+    for o in touched:
+        o.updated_at = now
+    Order.objects.bulk_update(touched, ["filled_quantity", "status", "updated_at"])
 
-def _match_sell_order(sell_order):
-    """
-    Match a sell order against existing buy orders.
-    - Limit: buy_price >= sell_price
-    - Market: match any buy order
-    Sorted by: 1) Price DESC (highest first), 2) Created time ASC (FIFO)
-    """
-    base_qs = Order.objects.filter(
-        stock=sell_order.stock,
-        type=Order.OrderType.BUY,
-        status__in=[Order.OrderStatus.PENDING, Order.OrderStatus.PARTIAL],
-    ).exclude(user=sell_order.user).select_related("stock", "user")
-
-    if sell_order.execution_type == Order.ExecutionType.MARKET:
-        matching_buys = base_qs.order_by("-price", "created_at")
-    else:
-        matching_buys = base_qs.filter(
-            price__gte=sell_order.price
-        ).order_by("-price", "created_at")
+    for o in touched:
+        book.upsert(o)
+    mark_changed(order.stock_id)
 
-    transactions = []
+    return transactions
 
-    for buy_order in matching_buys:
-        if sell_order.filled_quantity >= sell_order.quantity:
-            break  # Sell order fully filled
 
-        tx = _execute_match(buy_order, sell_order)
-        if tx:
-            transactions.append(tx)
+def _lock_planned_makers(fills):
+    """
+    Lock the resting orders a plan wants to fill and verify the book's view.
 
-    return transactions
+    Returns:
+        ``{order_id: Order}`` or ``None`` when any row disagrees with the book
+        (filled/cancelled elsewhere, or never committed).
+    """
+    if not fills:
+        return {}
+
+    ids = [entry.order_id for entry, _ in fills]
+    makers = (
+        Order.objects.select_for_update(of=("self",))
+        .select_related("user")
+        .in_bulk(ids)
+    )
+    for entry, _ in fills:
+        maker = makers.get(entry.order_id)
+        if (
+            maker is None
+            or not is_book_order(maker)
+            or maker.remaining_quantity != entry.remaining
+            or maker.price != entry.price
+        ):
+            return None
+    return makers
 
 
-@db_transaction.atomic
 def _execute_match(buy_order, sell_order):
     """
-    Execute a match between a buy order and a sell order.
-    Uses database-level atomic transaction to ensure consistency.
+    Execute a match between a buy order and a sell order in memory.
+    Both orders are already locked and up to date; nothing is written here.
+    The returned (unsaved) Transaction is persisted, together with every other
+    fill of the pass, by ``_settle_fills``.
 
     Execution price = maker's price (the order that was already in the book).
     """
-    # Refresh from DB to get latest filled_quantity (prevent race conditions)
-    buy_order.refresh_from_db()
-    sell_order.refresh_from_db()
-
     buy_remaining = buy_order.quantity - buy_order.filled_quantity
     sell_remaining = sell_order.quantity - sell_order.filled_quantity
 
@@ -165,8 +264,7 @@ def _execute_match(buy_order, sell_order):
         f"(Buy #{buy_order.id} <-> Sell #{sell_order.id})"
     )
 
-    # --- 1. Create Transaction ---
-    tx = Transaction.objects.create(
+    tx = Transaction(
         buy_order=buy_order,
         sell_order=sell_order,
         stock=buy_order.stock,
@@ -178,59 +276,144 @@ def _execute_match(buy_order, sell_order):
         status=Transaction.TransactionStatus.CONFIRMED,
     )
 
-    # --- 2. Update Order filled quantities and statuses ---
     buy_order.filled_quantity += matched_qty
     sell_order.filled_quantity += matched_qty
 
     _update_order_status(buy_order)
     _update_order_status(sell_order)
 
-    buy_order.save(update_fields=["filled_quantity", "status", "updated_at"])
-    sell_order.save(update_fields=["filled_quantity", "status", "updated_at"])
-
-    # --- 3. Update cash balances ---
-    # Buy side: Cash was reserved at buy_order.price on creation.
-    # If execution_price < buy_order.price, refund the price difference.
-    if execution_price < buy_order.price:
-        price_diff = buy_order.price - execution_price
-        refund = price_diff * matched_qty
-        buy_order.user.cash_balance += refund
-        buy_order.user.save(update_fields=["cash_balance"])
-
-    # Sell side: Seller receives cash at execution price
-    sell_order.user.cash_balance += total_value
-    sell_order.user.save(update_fields=["cash_balance"])
-
-    # --- 4. Update Portfolio Holdings ---
-    # Buyer gets stock
-    buyer_holding, _ = PortfolioHolding.objects.get_or_create(
-        user=buy_order.user,
-        stock=buy_order.stock,
-        defaults={"quantity": 0, "average_buy_price": Decimal("0")},
+    return tx
+
+
+def _settle_fills(stock, transactions):
+    """
+    Persist every fill of one matching pass with a handful of statements,
+    independent of the number of fills:
+
+    1. Transactions: one bulk_create
+    2. Cash: one UPDATE with per-user aggregated F() deltas
+    3. Buyer holdings: one locked SELECT (+ bulk_create for new holdings)
+       and one bulk_update
+    4. Stock price & volume: one save with the final state
+    5. Intraday bars: one merge per touched (interval, bucket)
+    6. Notifications: one bulk_create
+    Order rows are written by the caller with one bulk_update.
+    """
+    if not transactions:
+        return
+
+    Transaction.objects.bulk_create(transactions)
+    _apply_cash_deltas(transactions)
+    _apply_buyer_holdings(stock, transactions)
+    _apply_stock_price(stock, transactions)
+    record_trades(stock.id, transactions)
+    _send_match_notifications(transactions)
+
+    # Broadcast stock price update via WebSocket (Sprint 5) - final state once
+    _schedule_ws_stock_update(stock)
+    # New bars: drop this symbol's cached chart payloads
+    _schedule_chart_invalidation(stock)
+
+    # Schedule blockchain recording (Sprint 4) - batched, one recordTrades
+    # call per BLOCKCHAIN_BATCH_SIZE trades.
+    # Uses on_commit so the Celery task fires only after the DB transaction
+    # commits successfully.  If the blockchain is unavailable the task
+    # silently logs a warning and the Transactions keep blockchain_hash=NULL
+    # until the next run.
+    _schedule_blockchain_recording()
+
+    # Fire Stop-Loss/Take-Profit orders whose trigger this pass crossed
+    prices = [tx.price for tx in transactions]
+    _schedule_trigger_check(stock, min(prices), max(prices))
+
+
+def _apply_cash_deltas(transactions):
+    """
+    Buy side: cash was reserved at buy_order.price on creation; refund the
+    price difference when the execution price is lower.
+    Sell side: seller receives cash at execution price.
+    """
+    deltas = defaultdict(Decimal)
+    for tx in transactions:
+        if tx.price < tx.buy_order.price:
+            deltas[tx.buyer_id] += (tx.buy_order.price - tx.price) * tx.quantity
+        deltas[tx.seller_id] += tx.total_value
+
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    User = get_user_model()
+    User.objects.filter(pk__in=deltas).update(
+        cash_balance=F("cash_balance")
+        + Case(
+            *[When(pk=user_id, then=Value(delta)) for user_id, delta in deltas.items()],
+            default=Value(Decimal("0")),
+            output_field=DecimalField(max_digits=15, decimal_places=2),
+        )
     )
-    # Update weighted average buy price
-    old_total_cost = buyer_holding.quantity * buyer_holding.average_buy_price
-    new_cost = matched_qty * execution_price
-    new_quantity = buyer_holding.quantity + matched_qty
-    if new_quantity > 0:
-        buyer_holding.average_buy_price = (old_total_cost + new_cost) / new_quantity
-    buyer_holding.quantity = new_quantity
-    buyer_holding.save(update_fields=["quantity", "average_buy_price"])
+
+
+def _apply_buyer_holdings(stock, transactions):
+    """Credit bought shares and update the weighted average buy price."""
+    bought = defaultdict(lambda: [0, Decimal("0")])  # user_id -> [qty, cost]
+    for tx in transactions:
+        bought[tx.buyer_id][0] += tx.quantity
+        bought[tx.buyer_id][1] += tx.quantity * tx.price
+
+    def _locked_holdings():
+        return {
+            h.user_id: h
+            for h in PortfolioHolding.objects.select_for_update().filter(
+                stock=stock, user_id__in=bought
+            )
+        }
+
+    holdings = _locked_holdings()
+    missing = [user_id for user_id in bought if user_id not in holdings]
+    if missing:
+        PortfolioHolding.objects.bulk_create(
+            [
+                PortfolioHolding(
+                    user_id=user_id,
+                    stock=stock,
+                    quantity=0,
+                    average_buy_price=Decimal("0"),
+                )
+                for user_id in missing
+            ],
+            ignore_conflicts=True,
+        )
+        holdings = _locked_holdings()
+
+    for user_id, (qty, cost) in bought.items():
+        holding = holdings[user_id]
+        old_total_cost = holding.quantity * holding.average_buy_price
+        new_quantity = holding.quantity + qty
+        if new_quantity > 0:
+            holding.average_buy_price = (old_total_cost + cost) / new_quantity
+        holding.quantity = new_quantity
 
     # Seller's stock was already deducted from holdings on order creation
+    PortfolioHolding.objects.bulk_update(
+        holdings.values(), ["quantity", "average_buy_price"]
+    )
+
+
+def _apply_stock_price(stock, transactions):
+    """Replay the fills on the stock in memory, then save it once."""
+    for tx in transactions:
+        stock.previous_close = stock.current_price
+        stock.current_price = tx.price
+        stock.change = stock.current_price - stock.previous_close
+        if stock.previous_close > 0:
+            stock.change_percent = (stock.change / stock.previous_close) * 100
+        stock.volume += tx.quantity
+        if tx.price > stock.high_24h:
+            stock.high_24h = tx.price
+        if stock.low_24h == 0 or tx.price < stock.low_24h:
+            stock.low_24h = tx.price
 
-    # --- 5. Update Stock Price & Volume ---
-    stock = buy_order.stock
-    stock.previous_close = stock.current_price
-    stock.current_price = execution_price
-    stock.change = stock.current_price - stock.previous_close
-    if stock.previous_close > 0:
-        stock.change_percent = (stock.change / stock.previous_close) * 100
-    stock.volume += matched_qty
-    if execution_price > stock.high_24h:
-        stock.high_24h = execution_price
-    if stock.low_24h == 0 or execution_price < stock.low_24h:
-        stock.low_24h = execution_price
     stock.save(
         update_fields=[
             "current_price",
@@ -244,22 +427,6 @@ def _execute_match(buy_order, sell_order):
         ]
     )
 
-    # --- 6. Send Notifications ---
-    _send_match_notifications(
-        buy_order, sell_order, matched_qty, execution_price, total_value
-    )
-
-    # --- 7. Broadcast stock price update via WebSocket (Sprint 5) ---
-    _schedule_ws_stock_update(stock)
-
-    # --- 8. Schedule blockchain recording (Sprint 4) ---
-    # Uses on_commit so the Celery task fires only after the DB transaction
-    # commits successfully.  If the blockchain is unavailable the task
-    # silently logs a warning and the Transaction keeps blockchain_hash=NULL.
-    _schedule_blockchain_recording(tx)
-
-    return tx
-
 
 def _update_order_status(order):
     """Update order status based on filled quantity."""
@@ -269,78 +436,91 @@ def _update_order_status(order):
         order.status = Order.OrderStatus.PARTIAL
 
 
-def _schedule_blockchain_recording(tx):
-    """Schedule a Celery task to record the transaction on-chain after DB commit."""
+def _schedule_blockchain_recording():
+    """Schedule the batch on-chain recorder after DB commit."""
     try:
-        from blockchain_service.tasks import record_transaction_on_blockchain
+        from blockchain_service.tasks import schedule_batch_recording
 
-        tx_id = str(tx.id)
-        db_transaction.on_commit(
-            lambda: record_transaction_on_blockchain.delay(tx_id)
-        )
+        db_transaction.on_commit(schedule_batch_recording)
     except Exception as exc:
         # Never let blockchain scheduling break the matching engine
         logger.warning("Could not schedule blockchain recording: %s", exc)
 
 
-def _send_match_notifications(buy_order, sell_order, quantity, price, total_value):
-    """Send bilingual notifications to both buyer and seller, and broadcast via WebSocket."""
-    stock_symbol = buy_order.stock.symbol
-    stock_name = buy_order.stock.name
-    stock_name_fa = buy_order.stock.name_fa
-
-    price_fmt = f"{price:,.0f}"
-    total_fmt = f"{total_value:,.0f}"
-
-    # Notification for buyer
-    buyer_notif = Notification.objects.create(
-        user=buy_order.user,
-        title=f"Order Matched: Bought {quantity} {stock_symbol}",
-        title_fa=f"سفارش تطبیق شد: خرید {quantity} سهم {stock_name_fa}",
-        message=(
-            f"Your buy order for {quantity} shares of {stock_name} ({stock_symbol}) "
-            f"was matched at {price_fmt} IRR per share. Total: {total_fmt} IRR."
-        ),
-        message_fa=(
-            f"سفارش خرید شما برای {quantity} سهم {stock_name_fa} ({stock_symbol}) "
-            f"با قیمت {price_fmt} ریال به ازای هر سهم تطبیق شد. مجموع: {total_fmt} ریال."
-        ),
+def _send_match_notifications(transactions):
+    """
+    Send bilingual notifications to both buyer and seller of every fill
+    (one bulk_create for the whole pass), and broadcast via WebSocket
+    (one message per affected user).
+    """
+    notifications = []
+    for tx in transactions:
+        notifications.extend(_build_match_notifications(tx))
+
+    Notification.objects.bulk_create(notifications)
+    # bulk_create sends no signals: bump the unread counters here
+    increment_unread(Counter(n.user_id for n in notifications))
+
+    # Sprint 5: Broadcast notifications via WebSocket (scheduled via on_commit),
+    # one batched message per affected user
+    _schedule_ws_notifications(notifications)
+
+
+def _build_match_notifications(tx):
+    """
+    Build the (unsaved) buyer and seller notifications for one fill.
+
+    Only the template key and its params are stored; the text is rendered
+    when the notification is read (notifications/rendering.py).
+    """
+    params = {
+        "quantity": tx.quantity,
+        "symbol": tx.stock.symbol,
+        "name": tx.stock.name,
+        "name_fa": tx.stock.name_fa,
+        "price": float(tx.price),
+        "total": float(tx.total_value),
+    }
+
+    buyer_notif = Notification(
+        user=tx.buyer,
+        template=ORDER_MATCHED_BUY,
+        params=params,
         type=Notification.NotificationType.ORDER_MATCHED,
     )
-
-    # Notification for seller
-    seller_notif = Notification.objects.create(
-        user=sell_order.user,
-        title=f"Order Matched: Sold {quantity} {stock_symbol}",
-        title_fa=f"سفارش تطبیق شد: فروش {quantity} سهم {stock_name_fa}",
-        message=(
-            f"Your sell order for {quantity} shares of {stock_name} ({stock_symbol}) "
-            f"was matched at {price_fmt} IRR per share. Total: {total_fmt} IRR."
-        ),
-        message_fa=(
-            f"سفارش فروش شما برای {quantity} سهم {stock_name_fa} ({stock_symbol}) "
-            f"با قیمت {price_fmt} ریال به ازای هر سهم تطبیق شد. مجموع: {total_fmt} ریال."
-        ),
+    seller_notif = Notification(
+        user=tx.seller,
+        template=ORDER_MATCHED_SELL,
+        params=params,
         type=Notification.NotificationType.ORDER_MATCHED,
     )
 
-    # Sprint 5: Broadcast notifications via WebSocket (scheduled via on_commit)
-    _schedule_ws_notification(buyer_notif)
-    _schedule_ws_notification(seller_notif)
+    return buyer_notif, seller_notif
 
 
-def _schedule_ws_notification(notification):
-    """Schedule WebSocket notification broadcast after DB commit."""
+def _schedule_ws_notifications(notifications):
+    """Schedule one batched WebSocket notification broadcast after DB commit."""
     try:
-        from notifications.utils import broadcast_notification
+        from notifications.utils import broadcast_notifications
 
-        # Use a local variable to capture the notification for the lambda
-        notif = notification
-        db_transaction.on_commit(lambda: broadcast_notification(notif))
+        # Capture the list for the lambda
+        notifs = list(notifications)
+        db_transaction.on_commit(lambda: broadcast_notifications(notifs))
     except Exception as exc:
         logger.warning("Could not schedule WS notification: %s", exc)
 
 
+def _schedule_trigger_check(stock, low, high):
+    """Schedule conditional-order triggering for the traded range after DB commit."""
+    try:
+        from .triggers import fire_triggers
+
+        stock_id = stock.id
+        db_transaction.on_commit(lambda: fire_triggers(stock_id, low, high))
+    except Exception as exc:
+        logger.warning("Could not schedule trigger check: %s", exc)
+
+
 def _schedule_ws_stock_update(stock):
     """Schedule WebSocket stock price broadcast after DB commit."""
     try:
@@ -351,3 +531,14 @@ def _schedule_ws_stock_update(stock):
         db_transaction.on_commit(lambda: broadcast_stock_price(stock_ref))
     except Exception as exc:
         logger.warning("Could not schedule WS stock update: %s", exc)
+
+
+def _schedule_chart_invalidation(stock):
+    """Schedule invalidation of the symbol's cached chart payloads after DB commit."""
+    try:
+        from stocks.chart_cache import bump_chart_version
+
+        stock_id = stock.id
+        db_transaction.on_commit(lambda: bump_chart_version(stock_id))
+    except Exception as exc:
+        logger.warning("Could not schedule chart cache invalidation: %s", exc)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_add_execution_type_and_trigger_price'),
+        ('stocks', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'partial'])), fields=['stock', 'type', 'price', 'created_at'], name='order_open_book_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'partial'])), fields=['stock', 'execution_type', 'created_at'], name='order_open_exec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('execution_type__in', ['stop_loss', 'take_profit']), ('status__in', ['pending', 'partial'])), fields=['stock', 'trigger_price'], name='order_open_trigger_idx'),
+        ),
+    ]
@@ -4,28 +4,42 @@ from django.conf import settings
 from django.db import models
 
 
+# Order choices live at module level so ``Order.Meta`` (whose body cannot see
+# the enclosing class) can use them in index conditions; use them as
+# ``Order.OrderType`` / ``Order.ExecutionType`` / ``Order.OrderStatus``.
+class OrderType(models.TextChoices):
+    BUY = "buy", "Buy"
+    SELL = "sell", "Sell"
+
+
+class ExecutionType(models.TextChoices):
+    LIMIT = "limit", "Limit"
+    MARKET = "market", "Market"
+    STOP_LOSS = "stop_loss", "Stop-Loss"
+    TAKE_PROFIT = "take_profit", "Take-Profit"
+
+
+class OrderStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    MATCHED = "matched", "Matched"
+    PARTIAL = "partial", "Partially Filled"
+    CANCELLED = "cancelled", "Cancelled"
+    EXPIRED = "expired", "Expired"
+
+
+# Orders still on the book (partial indexes below, orderbook / matching)
+OPEN_STATUSES = (OrderStatus.PENDING, OrderStatus.PARTIAL)
+
+
 class Order(models.Model):
     """
     Represents a buy/sell order in the brokerage system.
     Maps to frontend Order interface.
     """
 
-    class OrderType(models.TextChoices):
-        BUY = "buy", "Buy"
-        SELL = "sell", "Sell"
-
-    class ExecutionType(models.TextChoices):
-        LIMIT = "limit", "Limit"
-        MARKET = "market", "Market"
-        STOP_LOSS = "stop_loss", "Stop-Loss"
-        TAKE_PROFIT = "take_profit", "Take-Profit"
-
-    class OrderStatus(models.TextChoices):
-        PENDING = "pending", "Pending"
-        MATCHED = "matched", "Matched"
-        PARTIAL = "partial", "Partially Filled"
-        CANCELLED = "cancelled", "Cancelled"
-        EXPIRED = "expired", "Expired"
+    OrderType = OrderType
+    ExecutionType = ExecutionType
+    OrderStatus = OrderStatus
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(
@@ -58,6 +72,34 @@ class Order(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Order"
         verbose_name_plural = "Orders"
+        # Partial indexes over the open book only (pending/partial): matched
+        # and cancelled history never bloats the hot matching/book queries.
+        indexes = [
+            # Best bid/ask and L2 aggregation: stock + side, price-time order
+            models.Index(
+                fields=["stock", "type", "price", "created_at"],
+                name="order_open_book_idx",
+                condition=models.Q(status__in=OPEN_STATUSES),
+            ),
+            # Book (re)loads and crossing sweep: stock + execution type, FIFO
+            models.Index(
+                fields=["stock", "execution_type", "created_at"],
+                name="order_open_exec_idx",
+                condition=models.Q(status__in=OPEN_STATUSES),
+            ),
+            # Conditional trigger index loads: pending SL/TP by trigger price
+            models.Index(
+                fields=["stock", "trigger_price"],
+                name="order_open_trigger_idx",
+                condition=models.Q(
+                    status__in=OPEN_STATUSES,
+                    execution_type__in=[
+                        ExecutionType.STOP_LOSS,
+                        ExecutionType.TAKE_PROFIT,
+                    ],
+                ),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.get_type_display()} {self.quantity} {self.stock.symbol} @ {self.price}"
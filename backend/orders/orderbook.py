@@ -0,0 +1,666 @@
+"""
+BourseChain In-Memory Order Book
+Resident per-symbol price-time priority book used by the matching engine.
+
+Each stock gets one ``OrderBook`` holding two ``BookSide`` instances:
+- Bids: price levels sorted DESC (highest first)
+- Asks: price levels sorted ASC (cheapest first)
+Every price level is a FIFO queue of resting orders, so iterating a side
+yields orders in exactly the same price-time priority as the old
+``order_by("price", "created_at")`` queries, without touching the DB.
+
+Lifecycle:
+- Books are built from pending/partial ``Order`` rows (one query per symbol)
+  lazily on first use, or for all symbols at once on Celery worker start.
+- The matching engine plans fills against the book, locks only the orders it
+  is about to fill, and writes the results back as a batch.
+- ``orders.signals`` mirrors ORM-level changes (API create/cancel, admin)
+  into any book loaded in the same process. New orders reach other
+  processes through ``match_order(order_id)``, which rests the remainder.
+
+Cross-process coherency:
+- A per-symbol generation counter lives in the Django cache (Redis in
+  production). Every process that changes an open book bumps it after
+  commit; a process whose own bump is not the next value knows another
+  process touched the book and reloads it before the next match.
+- The engine additionally validates the rows it is about to fill against
+  the DB (see ``orders.matching``), so a stale book can never settle a
+  wrong fill - at worst it costs one reload.
+- A book that crosses only with its own user (self-trade prevention) is
+  marked uncrossable at its current generation, so the periodic crossing
+  sweep skips it until the book changes.
+
+L2 depth:
+- Every price level keeps a running total of remaining quantity, so the
+  aggregated depth (price -> total quantity, order count) is maintained
+  incrementally on rest, fill and cancel instead of GROUP BY queries.
+- The top levels are published to the cache with the generation they were
+  built at (``orderbook:depth:{stock_id}``); ``order_book_view`` serves that
+  snapshot as long as the generation still matches.
+- Each publish that changes the top levels gets the next per-stock sequence
+  number and is streamed as a level diff to ``/ws/book/<symbol>/``
+  (orders/consumers.py); clients that see a gap ask for a fresh snapshot.
+- Books are resident in web and worker processes, so a publish (read the
+  previous snapshot, diff, take a sequence number, store, broadcast) runs
+  under a per-stock cache lock; otherwise two publishers could diff against
+  the same previous snapshot and stream gapless diffs that drift from the
+  book. The lock is never waited for (publishes run on the matching path):
+  a publisher that cannot get it pushes a full snapshot instead, and a lock
+  holder whose sequence number shows such a publish got in between does
+  the same.
+"""
+
+import logging
+import threading
+import uuid
+from bisect import bisect_left, insort
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+
+from .models import OPEN_STATUSES, Order
+
+logger = logging.getLogger(__name__)
+
+BOOK_EXECUTION_TYPES = (Order.ExecutionType.LIMIT, Order.ExecutionType.MARKET)
+
+GENERATION_CACHE_KEY = "orderbook:gen:{stock_id}"
+DEPTH_CACHE_KEY = "orderbook:depth:{stock_id}"
+DEPTH_SEQUENCE_CACHE_KEY = "orderbook:seq:{stock_id}"
+DEPTH_LOCK_CACHE_KEY = "orderbook:depth-lock:{stock_id}"
+UNCROSSABLE_CACHE_KEY = "orderbook:uncrossable:{stock_id}"
+# Seconds an "only self-trades cross" verdict is trusted without a change
+UNCROSSABLE_TIMEOUT = 3600
+DEPTH_LEVELS = 10
+# Seconds a publisher may hold the depth lock (bounds a crashed holder)
+DEPTH_LOCK_TIMEOUT = 5
+
+
+@dataclass(eq=False)
+class BookEntry:
+    """A resting order as seen by the book (only what matching needs)."""
+
+    order_id: object
+    user_id: object
+    type: str
+    execution_type: str
+    price: Decimal
+    remaining: int
+    created_at: datetime
+
+    @classmethod
+    def from_order(cls, order):
+        return cls(
+            order_id=order.id,
+            user_id=order.user_id,
+            type=order.type,
+            execution_type=order.execution_type,
+            price=order.price,
+            remaining=order.quantity - order.filled_quantity,
+            created_at=order.created_at,
+        )
+
+
+def is_book_order(order):
+    """Return True when an order belongs in the resting book."""
+    return (
+        order.status in OPEN_STATUSES
+        and order.execution_type in BOOK_EXECUTION_TYPES
+        and order.quantity > order.filled_quantity
+    )
+
+
+class BookSide:
+    """One side of the book: sorted price levels, each a FIFO queue."""
+
+    def __init__(self, descending):
+        self.descending = descending
+        self._prices = []  # ascending; iterated reversed for bids
+        self._levels = {}  # price -> deque[BookEntry]
+        self._volume = {}  # price -> total remaining quantity
+
+    def __len__(self):
+        return sum(len(level) for level in self._levels.values())
+
+    def add(self, entry):
+        level = self._levels.get(entry.price)
+        if level is None:
+            level = self._levels[entry.price] = deque()
+            insort(self._prices, entry.price)
+        self._volume[entry.price] = self._volume.get(entry.price, 0) + entry.remaining
+        if not level or level[-1].created_at <= entry.created_at:
+            level.append(entry)
+            return
+        # Out-of-order arrival (e.g. re-added after an ORM save): keep FIFO
+        for i, existing in enumerate(level):
+            if existing.created_at > entry.created_at:
+                level.insert(i, entry)
+                return
+        level.append(entry)
+
+    def remove(self, entry):
+        level = self._levels.get(entry.price)
+        if level is None:
+            return
+        try:
+            level.remove(entry)
+        except ValueError:
+            return
+        self._volume[entry.price] -= entry.remaining
+        if not level:
+            del self._levels[entry.price]
+            del self._volume[entry.price]
+            del self._prices[bisect_left(self._prices, entry.price)]
+
+    def reduce(self, entry, quantity):
+        """Apply a partial fill to a resting entry, keeping level totals."""
+        entry.remaining -= quantity
+        self._volume[entry.price] -= quantity
+
+    def prices(self):
+        """Price levels in priority order."""
+        return reversed(self._prices) if self.descending else iter(self._prices)
+
+    def best_price(self):
+        if not self._prices:
+            return None
+        return self._prices[-1] if self.descending else self._prices[0]
+
+    def entries(self):
+        """All resting entries in price-time priority order."""
+        for price in self.prices():
+            yield from self._levels[price]
+
+    def level(self, price):
+        return self._levels.get(price, ())
+
+    def depth(self, limit=None):
+        """
+        Aggregated L2 levels in priority order:
+        ``[(price, total_remaining, order_count), ...]``.
+        """
+        levels = []
+        for price in self.prices():
+            if limit is not None and len(levels) >= limit:
+                break
+            levels.append((price, self._volume[price], len(self._levels[price])))
+        return levels
+
+
+class OrderBook:
+    """Price-time priority book for a single stock."""
+
+    def __init__(self, stock_id):
+        self.stock_id = stock_id
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self._entries = {}
+        self.generation = None
+        self.stale = False
+        self.lock = threading.RLock()
+
+    def __contains__(self, order_id):
+        return order_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def side(self, order_type):
+        return self.bids if order_type == Order.OrderType.BUY else self.asks
+
+    def get(self, order_id):
+        return self._entries.get(order_id)
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def add_entry(self, entry):
+        self.discard(entry.order_id)
+        self._entries[entry.order_id] = entry
+        self.side(entry.type).add(entry)
+
+    def upsert(self, order):
+        """Reflect the current state of an ``Order`` instance in the book."""
+        if is_book_order(order):
+            self.add_entry(BookEntry.from_order(order))
+        else:
+            self.discard(order.id)
+
+    def discard(self, order_id):
+        entry = self._entries.pop(order_id, None)
+        if entry is not None:
+            self.side(entry.type).remove(entry)
+        return entry
+
+    def fill(self, order_id, quantity):
+        """Reduce a resting order by a filled quantity, dropping it when done."""
+        entry = self._entries.get(order_id)
+        if entry is None:
+            return
+        self.side(entry.type).reduce(entry, quantity)
+        if entry.remaining <= 0:
+            self.discard(order_id)
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def plan(self, order):
+        """
+        Plan fills for an incoming order without mutating the book.
+
+        - BUY: walk asks cheapest first; Limit stops at ask > buy price.
+        - SELL: walk bids highest first; Limit stops at bid < sell price.
+        - Market orders take any price.
+        - Orders of the same user are skipped (self-trade prevention).
+
+        Returns:
+            list of ``(BookEntry, matched_qty)`` in execution order.
+        """
+        is_buy = order.type == Order.OrderType.BUY
+        opposite = self.asks if is_buy else self.bids
+        is_limit = order.execution_type != Order.ExecutionType.MARKET
+
+        remaining = order.quantity - order.filled_quantity
+        fills = []
+        for entry in opposite.entries():
+            if remaining <= 0:
+                break
+            if is_limit:
+                if is_buy and entry.price > order.price:
+                    break
+                if not is_buy and entry.price < order.price:
+                    break
+            if entry.user_id == order.user_id or entry.remaining <= 0:
+                continue
+            qty = min(remaining, entry.remaining)
+            fills.append((entry, qty))
+            remaining -= qty
+        return fills
+
+    def crossing_takers(self):
+        """
+        Return the ids of the orders that can be re-matched to uncross the
+        book, in the order to try them (empty when the book does not cross).
+
+        The book crosses when best bid >= best ask, or when a resting market
+        order (which takes any price) faces a non-empty opposite side. The
+        newer of the two crossing orders comes first, as if it had just
+        arrived, so the older one keeps maker price priority; the older one
+        follows, since it can still reach a deeper level when the newer one
+        only faces its own user's orders. Resting market orders come last.
+        Together they find every cross self-trade prevention allows.
+        """
+        best_bid = next(self.bids.entries(), None)
+        best_ask = next(self.asks.entries(), None)
+        if best_bid is None or best_ask is None:
+            return []
+
+        takers = []
+        if best_bid.price >= best_ask.price:
+            newer, older = sorted(
+                (best_bid, best_ask), key=lambda e: e.created_at, reverse=True
+            )
+            takers = [newer.order_id, older.order_id]
+
+        for entry in (*self.bids.entries(), *self.asks.entries()):
+            if (
+                entry.execution_type == Order.ExecutionType.MARKET
+                and entry.order_id not in takers
+            ):
+                takers.append(entry.order_id)
+        return takers
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load_orders(self, orders):
+        for order in orders:
+            self.add_entry(BookEntry.from_order(order))
+
+    def reload(self, orders=None):
+        """Rebuild the book from pending/partial rows in the DB."""
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self._entries = {}
+        self.generation = current_generation(self.stock_id)
+        self.stale = False
+        if orders is None:
+            orders = _open_orders_queryset().filter(stock_id=self.stock_id)
+        self.load_orders(orders)
+        logger.debug(
+            "Order book loaded for stock %s (%d orders)", self.stock_id, len(self)
+        )
+
+
+def _open_orders_queryset():
+    return Order.objects.filter(
+        status__in=OPEN_STATUSES,
+        execution_type__in=BOOK_EXECUTION_TYPES,
+    ).order_by("created_at")
+
+
+# ---------------------------------------------------------------------------
+# Generation counter (shared cache)
+# ---------------------------------------------------------------------------
+
+
+def current_generation(stock_id, key_template=GENERATION_CACHE_KEY):
+    try:
+        return cache.get(key_template.format(stock_id=stock_id), 0)
+    except Exception as exc:
+        logger.warning("Order book generation lookup failed: %s", exc)
+        return None
+
+
+def bump_generation(stock_id, key_template=GENERATION_CACHE_KEY):
+    """Increment the shared generation; return the new value (or None)."""
+    key = key_template.format(stock_id=stock_id)
+    try:
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+    except Exception as exc:
+        logger.warning("Order book generation bump failed: %s", exc)
+        return None
+
+
+def mark_changed(stock_id):
+    """
+    Announce (after commit) that this process changed the book of a stock.
+
+    If the resulting generation is exactly one past what the local book had
+    seen, nobody else touched it and the local copy stays authoritative.
+    """
+
+    def _bump():
+        new_gen = bump_generation(stock_id)
+        book = _books.get(stock_id)
+        if book is None:
+            return
+        if new_gen is not None and book.generation is not None and new_gen == book.generation + 1:
+            book.generation = new_gen
+        else:
+            book.stale = True
+        _republish_depth(stock_id)
+
+    db_transaction.on_commit(_bump)
+
+
+def mark_uncrossable(stock_id):
+    """
+    Record (after commit, i.e. after the pass's own generation bump) that
+    the book crosses but nothing in it can trade.
+    """
+
+    def _record():
+        generation = current_generation(stock_id)
+        if generation is None:
+            return
+        try:
+            cache.set(
+                UNCROSSABLE_CACHE_KEY.format(stock_id=stock_id),
+                generation,
+                timeout=UNCROSSABLE_TIMEOUT,
+            )
+        except Exception as exc:
+            logger.warning("Uncrossable book marker write failed: %s", exc)
+
+    db_transaction.on_commit(_record)
+
+
+def uncrossable_books(stock_ids):
+    """
+    The ``stock_ids`` marked uncrossable whose book has not changed since
+    (same generation), with one cache round trip.
+    """
+    keys = {
+        stock_id: (
+            UNCROSSABLE_CACHE_KEY.format(stock_id=stock_id),
+            GENERATION_CACHE_KEY.format(stock_id=stock_id),
+        )
+        for stock_id in stock_ids
+    }
+    try:
+        found = cache.get_many([key for pair in keys.values() for key in pair])
+    except Exception as exc:
+        logger.warning("Uncrossable book marker lookup failed: %s", exc)
+        return set()
+    return {
+        stock_id
+        for stock_id, (marker_key, generation_key) in keys.items()
+        if marker_key in found and found[marker_key] == found.get(generation_key, 0)
+    }
+
+
+def mark_depth_changed(stock_id):
+    """
+    Refresh the published depth (after commit) for a change that does not
+    move the generation, i.e. a new order rested through the ORM.
+    """
+
+    def _refresh():
+        if stock_id in _books:
+            _republish_depth(stock_id)
+        else:
+            _delete_depth(stock_id)
+
+    db_transaction.on_commit(_refresh)
+
+
+# ---------------------------------------------------------------------------
+# L2 depth snapshot (shared cache)
+# ---------------------------------------------------------------------------
+
+
+def build_depth(book, limit=DEPTH_LEVELS):
+    """Top ``limit`` levels per side, tagged with the book's generation."""
+    with book.lock:
+        return {
+            "generation": book.generation,
+            "bids": book.bids.depth(limit),
+            "asks": book.asks.depth(limit),
+        }
+
+
+def publish_depth(book):
+    """
+    Store the book's depth snapshot in the shared cache and return it.
+
+    Levels that changed since the previously published snapshot are pushed
+    to the ``/ws/book/<symbol>/`` stream under the next per-stock sequence
+    number; with no previous snapshot to diff against, without the depth
+    lock, or when a lock-less publish happened since ``previous`` was read,
+    the full top of book is pushed instead so subscribers resync.
+    """
+    from .utils import broadcast_book_update, diff_levels
+
+    key = DEPTH_CACHE_KEY.format(stock_id=book.stock_id)
+    with _depth_lock(book.stock_id) as locked:
+        snapshot = build_depth(book)
+        previous = None
+        if locked:
+            try:
+                previous = cache.get(key)
+            except Exception as exc:
+                logger.warning("Order book depth lookup failed: %s", exc)
+
+        if previous is not None:
+            bids = diff_levels(previous["bids"], snapshot["bids"])
+            asks = diff_levels(previous["asks"], snapshot["asks"])
+            if bids or asks:
+                snapshot["sequence"] = _next_sequence(book.stock_id)
+                expected = previous.get("sequence", 0) + 1
+            else:
+                snapshot["sequence"] = expected = previous.get("sequence", 0)
+                current = current_generation(book.stock_id, DEPTH_SEQUENCE_CACHE_KEY)
+                if current is not None and current != expected:
+                    snapshot["sequence"] = _next_sequence(book.stock_id)
+            if snapshot["sequence"] != expected:
+                # A lock-less publisher got in between: our diff is stale
+                previous = None
+        if previous is None:
+            bids, asks = snapshot["bids"], snapshot["asks"]
+            if "sequence" not in snapshot:
+                snapshot["sequence"] = _next_sequence(book.stock_id)
+
+        changed = bool(bids or asks) or previous is None
+        try:
+            cache.set(key, snapshot, timeout=None)
+        except Exception as exc:
+            logger.warning("Order book depth publish failed: %s", exc)
+
+        # Still under the lock, so diffs go out in sequence order
+        if changed and snapshot["sequence"] is not None:
+            broadcast_book_update(
+                book.stock_id,
+                snapshot["sequence"],
+                bids,
+                asks,
+                snapshot=previous is None,
+            )
+    return snapshot
+
+
+@contextmanager
+def _depth_lock(stock_id):
+    """
+    Per-stock cross-process lock (``cache.add``) around a depth publish.
+
+    Yields whether it was acquired; a single attempt, never a wait.
+    """
+    key = DEPTH_LOCK_CACHE_KEY.format(stock_id=stock_id)
+    token = uuid.uuid4().hex
+    acquired = False
+    try:
+        acquired = cache.add(key, token, timeout=DEPTH_LOCK_TIMEOUT)
+    except Exception as exc:
+        logger.warning("Order book depth lock failed: %s", exc)
+    if not acquired:
+        logger.debug("Order book depth lock busy for stock %s", stock_id)
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                # Only release our own lock (it may have expired and been retaken)
+                if cache.get(key) == token:
+                    cache.delete(key)
+            except Exception as exc:
+                logger.warning("Order book depth unlock failed: %s", exc)
+
+
+def _next_sequence(stock_id):
+    return bump_generation(stock_id, DEPTH_SEQUENCE_CACHE_KEY)
+
+
+def _republish_depth(stock_id):
+    """Publish the depth of a resident book, reloading it first if stale."""
+    try:
+        publish_depth(get_order_book(stock_id))
+    except Exception as exc:
+        logger.warning("Order book depth refresh failed: %s", exc)
+
+
+def _delete_depth(stock_id):
+    try:
+        cache.delete(DEPTH_CACHE_KEY.format(stock_id=stock_id))
+    except Exception as exc:
+        logger.warning("Order book depth invalidation failed: %s", exc)
+
+
+def get_depth(stock_id):
+    """
+    Return the L2 depth snapshot of a stock.
+
+    Served straight from the shared cache while its generation matches the
+    book's; otherwise rebuilt from the resident book (which reloads itself
+    from the DB if another process changed it) and re-published.
+    """
+    try:
+        snapshot = cache.get(DEPTH_CACHE_KEY.format(stock_id=stock_id))
+    except Exception as exc:
+        logger.warning("Order book depth lookup failed: %s", exc)
+        snapshot = None
+    if snapshot is not None:
+        gen = current_generation(stock_id)
+        if gen is not None and snapshot["generation"] == gen:
+            return snapshot
+    return publish_depth(get_order_book(stock_id))
+
+
+# ---------------------------------------------------------------------------
+# Process-wide registry
+# ---------------------------------------------------------------------------
+
+_books = {}
+_registry_lock = threading.Lock()
+
+
+def get_order_book(stock_id):
+    """
+    Return the resident book for a stock, (re)loading it when it is missing
+    or another process has changed it since it was loaded.
+    """
+    book = _books.get(stock_id)
+    if book is None:
+        with _registry_lock:
+            book = _books.get(stock_id)
+            if book is None:
+                book = _books[stock_id] = OrderBook(stock_id)
+                book.stale = True
+
+    with book.lock:
+        if not book.stale:
+            gen = current_generation(stock_id)
+            if gen is not None and gen == book.generation:
+                return book
+        book.reload()
+    return book
+
+
+def get_loaded_order_book(stock_id):
+    """Return the book only if it is already resident in this process."""
+    return _books.get(stock_id)
+
+
+def invalidate_order_book(stock_id):
+    """Drop the resident book so the next access rebuilds it from the DB."""
+    with _registry_lock:
+        _books.pop(stock_id, None)
+
+
+def reset_order_books():
+    """Drop every resident book (useful in tests)."""
+    with _registry_lock:
+        _books.clear()
+
+
+def warm_order_books():
+    """
+    Build books for every symbol with open orders in a single query.
+    Called on Celery worker start so the first match pays no load cost.
+    """
+    by_stock = {}
+    for order in _open_orders_queryset():
+        by_stock.setdefault(order.stock_id, []).append(order)
+
+    with _registry_lock:
+        for stock_id, orders in by_stock.items():
+            book = OrderBook(stock_id)
+            book.reload(orders)
+            _books[stock_id] = book
+
+    logger.info(
+        "Warmed %d order book(s) with %d resting orders",
+        len(by_stock),
+        sum(len(v) for v in by_stock.values()),
+    )
+    return len(by_stock)
@@ -0,0 +1,108 @@
+"""
+Single-writer matching partitions.
+
+When ``MATCHING_PARTITIONS`` > 0, every matching task (``orders.match_order``,
+``orders.match_crossed_book``) is routed to a queue chosen by consistent
+hashing of the stock symbol:
+
+    FOLD  -> matching.2
+    SHPN  -> matching.0
+    ...
+
+Each partition queue is consumed by exactly one worker process
+(``celery -A config worker -Q matching.N --concurrency=1``), so every order
+book has a single serialized writer: no row-lock waits between workers and
+the resident in-memory book (orders/orderbook.py) never goes stale. Different
+symbols still scale out across partitions, cores and nodes.
+
+A hash ring with virtual nodes is used (instead of ``hash % N``) so that
+changing the partition count only moves ~1/N of the symbols to new queues.
+
+With ``MATCHING_PARTITIONS = 0`` (default / dev) tasks go to the default
+queue exactly as before.
+"""
+
+import hashlib
+from bisect import bisect
+from functools import lru_cache
+
+from django.conf import settings
+
+# Tasks that write an order book and must run on the symbol's partition
+PARTITIONED_TASKS = {"orders.match_order", "orders.match_crossed_book"}
+QUEUE_PREFIX = "matching"
+VIRTUAL_NODES = 64
+
+
+def _hash(key):
+    """Stable 64-bit hash (Python's hash() is randomized per process)."""
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring mapping keys to partition numbers."""
+
+    def __init__(self, partitions, vnodes=VIRTUAL_NODES):
+        self.partitions = partitions
+        points = sorted(
+            (_hash(f"{QUEUE_PREFIX}.{p}#{v}"), p)
+            for p in range(partitions)
+            for v in range(vnodes)
+        )
+        self._keys = [h for h, _ in points]
+        self._nodes = [p for _, p in points]
+
+    def get(self, key):
+        if not self._keys:
+            return None
+        idx = bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._nodes[idx]
+
+
+@lru_cache(maxsize=8)
+def _ring(partitions):
+    return HashRing(partitions)
+
+
+def partition_count():
+    return int(getattr(settings, "MATCHING_PARTITIONS", 0) or 0)
+
+
+def queue_name(partition):
+    return f"{QUEUE_PREFIX}.{partition}"
+
+
+def partition_for_symbol(symbol):
+    """Return the partition number for a symbol, or None when disabled."""
+    partitions = partition_count()
+    if partitions <= 0:
+        return None
+    return _ring(partitions).get(symbol.upper())
+
+
+def queue_for_symbol(symbol):
+    """Return the matching queue for a symbol, or None when disabled."""
+    partition = partition_for_symbol(symbol)
+    return queue_name(partition) if partition is not None else None
+
+
+def all_queues():
+    return [queue_name(p) for p in range(partition_count())]
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """
+    Celery router (see ``CELERY_TASK_ROUTES``).
+
+    Routes the matching tasks by their ``symbol`` kwarg; all other tasks
+    fall through to the default routing.
+    """
+    if name not in PARTITIONED_TASKS:
+        return None
+    symbol = (kwargs or {}).get("symbol")
+    if not symbol:
+        return None
+    queue = queue_for_symbol(symbol)
+    if queue is None:
+        return None
+    return {"queue": queue, "routing_key": queue}
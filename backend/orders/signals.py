@@ -0,0 +1,68 @@
+"""
+Order model signals.
+
+Keeps the resident in-memory order book (orders/orderbook.py) and the
+conditional trigger index (orders/triggers.py) in sync with
+ORM-level changes made outside the matching engine: orders created or
+cancelled through the API, admin edits, conditional orders being converted
+to market orders, etc.
+
+The matching engine itself writes orders with ``bulk_update`` (no signals)
+and updates the book directly.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Order
+from .orderbook import (
+    get_loaded_order_book,
+    is_book_order,
+    mark_changed,
+    mark_depth_changed,
+)
+from .triggers import (
+    CONDITIONAL_TYPES,
+    get_loaded_trigger_index,
+    mark_triggers_changed,
+)
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    book = get_loaded_order_book(instance.stock_id)
+    if book is not None:
+        with book.lock:
+            book.upsert(instance)
+    # New orders are handed to the engine via match_order(), which rests them
+    # in the owning book and, on every path, bumps the generation and
+    # republishes depth (so a snapshot published meanwhile by a process that
+    # has not seen the order is replaced); only out-of-band changes need to
+    # be announced here.
+    if not created:
+        mark_changed(instance.stock_id)
+    elif is_book_order(instance):
+        mark_depth_changed(instance.stock_id)
+
+    index = get_loaded_trigger_index(instance.stock_id)
+    if index is not None:
+        with index.lock:
+            index.upsert(instance)
+    if instance.execution_type in CONDITIONAL_TYPES:
+        mark_triggers_changed(instance.stock_id)
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    book = get_loaded_order_book(instance.stock_id)
+    if book is not None:
+        with book.lock:
+            book.discard(instance.id)
+    mark_changed(instance.stock_id)
+
+    index = get_loaded_trigger_index(instance.stock_id)
+    if index is not None:
+        with index.lock:
+            index.discard(instance.id)
@@ -10,10 +10,23 @@ In production, tasks are sent to RabbitMQ and processed by Celery workers.
 import logging
 
 from celery import shared_task
+from celery.signals import worker_process_init
 
 logger = logging.getLogger(__name__)
 
 
+@worker_process_init.connect
+def warm_order_books_on_worker_start(**kwargs):
+    """Load the resident order books once per worker process."""
+    from .orderbook import warm_order_books
+
+    try:
+        warm_order_books()
+    except Exception as exc:
+        # Books load lazily on first match anyway
+        logger.warning(f"[Celery] Could not warm order books: {exc}")
+
+
 @shared_task(
     name="orders.match_order",
     bind=True,
@@ -21,12 +34,14 @@ logger = logging.getLogger(__name__)
     default_retry_delay=5,
     acks_late=True,
 )
-def match_order_task(self, order_id):
+def match_order_task(self, order_id, symbol=None):
     """
     Celery task to match an order asynchronously.
 
     Args:
         order_id: UUID string of the order to match
+        symbol: stock symbol; only used to route the task to its matching
+            partition (see orders/partitions.py)
 
     Returns:
         dict with match results
@@ -50,111 +65,158 @@ def match_order_task(self, order_id):
         raise self.retry(exc=exc)
 
 
+def dispatch_match_order(order_id, symbol):
+    """
+    Queue matching for an order on its symbol's partition queue.
+
+    With MATCHING_PARTITIONS=0 this is a plain ``match_order_task.delay``.
+    """
+    return match_order_task.apply_async(
+        args=[str(order_id)], kwargs={"symbol": symbol}
+    )
+
+
+@shared_task(
+    name="orders.match_crossed_book",
+    bind=True,
+    max_retries=3,
+    default_retry_delay=5,
+    acks_late=True,
+)
+def match_crossed_book_task(self, stock_id, symbol=None):
+    """
+    Uncross one stock's order book (see matching.match_crossed_book).
+
+    Args:
+        stock_id: primary key of the stock
+        symbol: stock symbol; only used to route the task to its partition
+    """
+    from .matching import match_crossed_book
+
+    try:
+        transactions = match_crossed_book(stock_id)
+        if transactions:
+            logger.info(
+                f"[Celery] Uncrossed {symbol or stock_id}: "
+                f"{len(transactions)} transaction(s) created"
+            )
+        return {
+            "stock_id": stock_id,
+            "symbol": symbol,
+            "transactions_created": len(transactions),
+        }
+    except Exception as exc:
+        logger.error(
+            f"[Celery] Error uncrossing book {symbol or stock_id}: {exc}",
+            exc_info=True,
+        )
+        raise self.retry(exc=exc)
+
+
+def find_crossed_books():
+    """
+    Return ``[(stock_id, symbol)]`` for active stocks whose book crosses.
+
+    One GROUP BY over the open book: best bid / best ask per stock, plus
+    whether a resting market order faces a non-empty opposite side. Books
+    whose last uncross found only self-trades are left out until they
+    change (see orderbook.mark_uncrossable).
+    """
+    from django.db.models import Count, Max, Min, Q
+
+    from .models import Order
+    from .orderbook import uncrossable_books
+
+    books = (
+        Order.objects.filter(
+            status__in=[Order.OrderStatus.PENDING, Order.OrderStatus.PARTIAL],
+            execution_type__in=[Order.ExecutionType.LIMIT, Order.ExecutionType.MARKET],
+            stock__is_active=True,
+        )
+        .values("stock_id", "stock__symbol")
+        .annotate(
+            best_bid=Max("price", filter=Q(type=Order.OrderType.BUY)),
+            best_ask=Min("price", filter=Q(type=Order.OrderType.SELL)),
+            market_orders=Count(
+                "id", filter=Q(execution_type=Order.ExecutionType.MARKET)
+            ),
+        )
+        .order_by()
+    )
+
+    crossed = []
+    for book in books:
+        if book["best_bid"] is None or book["best_ask"] is None:
+            continue
+        if book["best_bid"] >= book["best_ask"] or book["market_orders"]:
+            crossed.append((book["stock_id"], book["stock__symbol"]))
+    if not crossed:
+        return crossed
+    stuck = uncrossable_books([stock_id for stock_id, _symbol in crossed])
+    return [(stock_id, symbol) for stock_id, symbol in crossed if stock_id not in stuck]
+
+
 @shared_task(name="orders.match_all_pending")
 def match_all_pending_task():
     """
-    Periodic task to attempt matching all pending/partial orders.
+    Periodic sweep: run matching only on books that actually cross.
     Excludes Stop-Loss/Take-Profit (handled by check_conditional_orders_task).
-    """
-    from .models import Order
 
-    pending_orders = Order.objects.filter(
-        status__in=[Order.OrderStatus.PENDING, Order.OrderStatus.PARTIAL],
-        execution_type__in=[Order.ExecutionType.LIMIT, Order.ExecutionType.MARKET],
-    ).values_list("id", flat=True)
+    Costs O(symbols) - one aggregate query and one task per crossed book -
+    instead of one task per resting order.
+    """
+    from stocks.models import Stock
 
-    count = 0
-    for order_id in pending_orders:
-        match_order_task.delay(str(order_id))
-        count += 1
+    crossed = find_crossed_books()
+    for stock_id, symbol in crossed:
+        match_crossed_book_task.apply_async(
+            args=[stock_id], kwargs={"symbol": symbol}
+        )
 
-    logger.info(f"[Celery] Queued {count} pending orders for matching")
-    return {"queued": count}
+    active = Stock.objects.filter(is_active=True).count()
+    result = {
+        "crossed": len(crossed),
+        "uncrossed": max(active - len(crossed), 0),
+        "crossed_symbols": [symbol for _, symbol in crossed],
+    }
+    logger.info(
+        f"[Celery] Crossing sweep: {result['crossed']} crossed, "
+        f"{result['uncrossed']} uncrossed"
+    )
+    return result
 
 
 @shared_task(name="orders.check_conditional_orders")
 def check_conditional_orders_task():
     """
-    Check Stop-Loss and Take-Profit orders; convert triggered ones to market and match.
+    Safety net for Stop-Loss and Take-Profit orders.
     Run periodically via Celery Beat (e.g. every 30 seconds).
+
+    Triggers normally fire right after each trade (orders/triggers.py); this
+    sweep catches price moves that did not come from the matching engine
+    (e.g. admin price edits). It probes each stock's trigger index at the
+    current price instead of scanning every conditional order.
     """
-    from django.db import transaction as db_transaction
+    from stocks.models import Stock
 
-    from .matching import match_order
-    from .models import Order, PortfolioHolding
+    from .models import Order
+    from .partitions import partition_count
+    from .triggers import CONDITIONAL_TYPES, fire_triggers
 
-    from .views import _get_order_book_prices
+    stocks = (
+        Stock.objects.filter(
+            orders__status__in=[Order.OrderStatus.PENDING, Order.OrderStatus.PARTIAL],
+            orders__execution_type__in=CONDITIONAL_TYPES,
+        )
+        .distinct()
+        .values_list("id", "current_price")
+    )
 
     triggered = 0
-    for order in Order.objects.filter(
-        status__in=[Order.OrderStatus.PENDING, Order.OrderStatus.PARTIAL],
-        execution_type__in=[
-            Order.ExecutionType.STOP_LOSS,
-            Order.ExecutionType.TAKE_PROFIT,
-        ],
-    ).select_related("stock", "user"):
-        stock = order.stock
-        trigger = order.trigger_price
-        current = stock.current_price
-
-        should_trigger = False
-        if order.execution_type == Order.ExecutionType.STOP_LOSS:
-            if order.type == Order.OrderType.SELL and current <= trigger:
-                should_trigger = True
-            elif order.type == Order.OrderType.BUY and current >= trigger:
-                should_trigger = True
-        elif order.execution_type == Order.ExecutionType.TAKE_PROFIT:
-            if order.type == Order.OrderType.SELL and current >= trigger:
-                should_trigger = True
-            elif order.type == Order.OrderType.BUY and current <= trigger:
-                should_trigger = True
-
-        if not should_trigger:
-            continue
-
-        try:
-            with db_transaction.atomic():
-                if order.type == Order.OrderType.SELL:
-                    holding = PortfolioHolding.objects.select_for_update().filter(
-                        user=order.user, stock=stock
-                    ).first()
-                    if not holding or holding.quantity < order.quantity:
-                        order.status = Order.OrderStatus.CANCELLED
-                        order.save(update_fields=["status", "updated_at"])
-                        logger.warning(
-                            f"Conditional sell {order.id} cancelled: insufficient holdings"
-                        )
-                        continue
-                    holding.quantity -= order.quantity
-                    holding.save(update_fields=["quantity"])
-                    best_ask, best_bid = _get_order_book_prices(stock)
-                    order.price = best_bid if best_bid else stock.current_price
-                else:
-                    best_ask, _ = _get_order_book_prices(stock)
-                    price = best_ask if best_ask else stock.current_price
-                    if price <= 0:
-                        continue
-                    total = price * order.quantity
-                    user = type(order.user).objects.select_for_update().get(
-                        pk=order.user.pk
-                    )
-                    if user.cash_balance < total:
-                        order.status = Order.OrderStatus.CANCELLED
-                        order.save(update_fields=["status", "updated_at"])
-                        logger.warning(
-                            f"Conditional buy {order.id} cancelled: insufficient cash"
-                        )
-                        continue
-                    user.cash_balance -= total
-                    user.save(update_fields=["cash_balance"])
-                    order.price = price
-
-                order.execution_type = Order.ExecutionType.MARKET
-                order.save(update_fields=["execution_type", "price", "updated_at"])
-                triggered += 1
-                match_order(str(order.id))
-        except Exception as exc:
-            logger.exception(f"Failed to trigger conditional order {order.id}: {exc}")
+    for stock_id, current in stocks:
+        triggered += fire_triggers(
+            stock_id, current, current, match_inline=not partition_count()
+        )
 
     if triggered:
         logger.info(f"[Celery] Triggered {triggered} conditional orders")
@@ -9,6 +9,14 @@ BourseChain - Sprint 3 Tests: Matching Engine + Order System
   - تست الگوریتم Matching Engine (price-time priority)
   - تست API سفارش‌گذاری (ساخت، لغو، لیست)
   - تست API پورتفولیو و دفتر سفارشات
+  - تست Order Book درون حافظه
+  - تست پارتیشن‌بندی تک‌نویسنده Matching بر اساس نماد
+  - تست تسویه دسته‌ای fillها
+  - تست جاروی دفترهای متقاطع
+  - تست موتور Trigger سفارشات شرطی
+  - تست ایندکس‌های جزئی دفتر باز (EXPLAIN)
+  - تست snapshot افزایشی L2 دفتر سفارشات
+  - تست استریم WebSocket دفتر سفارشات (snapshot + diff)
 
 اجرا:
   $env:USE_SQLITE="True"; $env:USE_LOCMEM_CACHE="True"
@@ -19,8 +27,14 @@ BourseChain - Sprint 3 Tests: Matching Engine + Order System
 
 from decimal import Decimal
 
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
 from django.contrib.auth import get_user_model
-from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
@@ -30,6 +44,18 @@ from transactions.models import Transaction
 
 from .matching import match_order
 from .models import Order, PortfolioHolding
+from .orderbook import (
+    BookEntry,
+    BookSide,
+    bump_generation,
+    get_depth,
+    get_order_book,
+    mark_changed,
+    reset_order_books,
+)
+from .partitions import partition_for_symbol, queue_for_symbol, route_task
+from .tasks import check_conditional_orders_task, match_all_pending_task
+from .triggers import get_trigger_index, reset_trigger_indexes
 
 User = get_user_model()
 
@@ -44,6 +70,10 @@ class OrderTestMixin:
 
     def setUp(self):
         """ساخت کاربران و سهام تست."""
+        # دفترهای درون حافظه و snapshotهای cache از تست قبلی پاک شوند
+        cache.clear()
+        reset_order_books()
+
         # سهام تست
         self.stock = Stock.objects.create(
             symbol="FOLD",
@@ -346,10 +376,10 @@ class TestMatchingEngine(OrderTestMixin, TestCase):
         self.assertEqual(buyer_notifs.count(), 1)
         self.assertEqual(seller_notifs.count(), 1)
         # بررسی دوزبانه بودن
-        self.assertIn("Bought", buyer_notifs.first().title)
-        self.assertIn("خرید", buyer_notifs.first().title_fa)
-        self.assertIn("Sold", seller_notifs.first().title)
-        self.assertIn("فروش", seller_notifs.first().title_fa)
+        self.assertIn("Bought", buyer_notifs.first().rendered.title)
+        self.assertIn("خرید", buyer_notifs.first().rendered.title_fa)
+        self.assertIn("Sold", seller_notifs.first().rendered.title)
+        self.assertIn("فروش", seller_notifs.first().rendered.title_fa)
 
     # ── تست ۲: تطبیق جزئی (Partial Fill) ──
 
@@ -1214,3 +1244,895 @@ class TestOrderBookAPI(OrderTestMixin, APITestCase):
         data = response.data
 
         self.assertEqual(data["spread"], 200.0)  # 8600 - 8400
+
+
+# =============================================================================
+# 8. تست Order Book درون حافظه (orders/orderbook.py)
+# =============================================================================
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class TestInMemoryOrderBook(OrderTestMixin, TestCase):
+    """تست‌های دفتر سفارشات مقیم در حافظه و همگام‌سازی آن با دیتابیس."""
+
+    def setUp(self):
+        super().setUp()
+        reset_order_books()
+
+    def tearDown(self):
+        reset_order_books()
+
+    def _sell(self, price, qty):
+        return Order.objects.create(
+            user=self.seller, stock=self.stock,
+            type="sell", price=Decimal(str(price)), quantity=qty,
+        )
+
+    def _buy(self, price, qty):
+        return Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="buy", price=Decimal(str(price)), quantity=qty,
+        )
+
+    def test_book_loads_open_orders_in_priority_order(self):
+        """بارگذاری دفتر: asks صعودی، bids نزولی و FIFO در هر سطح قیمت."""
+        first = self._sell(8500, 10)
+        second = self._sell(8500, 20)
+        cheap = self._sell(8400, 5)
+        self._buy(8300, 10)
+        high_bid = self._buy(8350, 10)
+        Order.objects.create(
+            user=self.seller, stock=self.stock, type="sell",
+            price=Decimal("8000"), quantity=10, status="cancelled",
+        )
+
+        book = get_order_book(self.stock.id)
+
+        asks = [e.order_id for e in book.asks.entries()]
+        self.assertEqual(asks, [cheap.id, first.id, second.id])
+        self.assertEqual(book.bids.best_price(), Decimal("8350"))
+        self.assertEqual(next(book.bids.entries()).order_id, high_bid.id)
+
+    def test_book_tracks_orm_created_orders(self):
+        """سفارشی که بعد از بارگذاری دفتر ساخته می‌شود باید وارد دفتر شود."""
+        book = get_order_book(self.stock.id)
+        sell = self._sell(8500, 10)
+        self.assertIn(sell.id, book)
+
+    def test_book_updated_after_match(self):
+        """بعد از تطبیق، باقیمانده سفارش maker در دفتر به‌روز شود."""
+        sell = self._sell(8500, 100)
+        self._reserve_cash_for(8500, 40)
+        buy = self._buy(8500, 40)
+
+        match_order(str(buy.id))
+
+        book = get_order_book(self.stock.id)
+        self.assertEqual(book.get(sell.id).remaining, 60)
+        self.assertNotIn(buy.id, book)
+
+    def test_unmatched_order_rests_in_book(self):
+        """سفارش limit بدون طرف مقابل باید در دفتر باقی بماند."""
+        buy = self._buy(8000, 10)
+        match_order(str(buy.id))
+        book = get_order_book(self.stock.id)
+        self.assertIn(buy.id, book)
+        self.assertEqual(book.bids.best_price(), Decimal("8000"))
+
+    def test_stale_book_is_reloaded_before_settlement(self):
+        """اگر دیتابیس پشت سر دفتر تغییر کند، دفتر دوباره بارگذاری شود."""
+        stale = self._sell(8400, 50)
+        fresh = self._sell(8500, 50)
+        get_order_book(self.stock.id)
+
+        # تغییر مستقیم در دیتابیس (بدون signal) - دفتر از آن خبر ندارد
+        Order.objects.filter(id=stale.id).update(status="cancelled")
+
+        self._reserve_cash_for(8500, 50)
+        buy = self._buy(8500, 50)
+        transactions = match_order(str(buy.id))
+
+        self.assertEqual(len(transactions), 1)
+        self.assertEqual(transactions[0].sell_order_id, fresh.id)
+        stale.refresh_from_db()
+        self.assertEqual(stale.filled_quantity, 0)
+
+    def test_cancel_removes_order_from_book(self):
+        """لغو سفارش (save با status=cancelled) آن را از دفتر حذف کند."""
+        sell = self._sell(8500, 10)
+        book = get_order_book(self.stock.id)
+        sell.status = Order.OrderStatus.CANCELLED
+        sell.save(update_fields=["status", "updated_at"])
+        self.assertNotIn(sell.id, book)
+
+    def _reserve_cash_for(self, price, qty):
+        self.buyer.cash_balance -= Decimal(str(price)) * qty
+        self.buyer.save(update_fields=["cash_balance"])
+
+
+# =============================================================================
+# 9. تست پارتیشن‌بندی Matching بر اساس نماد (orders/partitions.py)
+# =============================================================================
+
+
+class TestMatchingPartitions(TestCase):
+    """هر نماد باید همیشه به یک صف (یک نویسنده) برود."""
+
+    SYMBOLS = [f"SYM{i}" for i in range(200)]
+
+    @override_settings(MATCHING_PARTITIONS=0)
+    def test_disabled_by_default(self):
+        """با MATCHING_PARTITIONS=0 مسیریابی پیش‌فرض Celery استفاده شود."""
+        self.assertIsNone(queue_for_symbol("FOLD"))
+        self.assertIsNone(
+            route_task("orders.match_order", [], {"symbol": "FOLD"}, {})
+        )
+
+    @override_settings(MATCHING_PARTITIONS=4)
+    def test_symbol_always_routes_to_same_queue(self):
+        """یک نماد همیشه به یک صف ثابت برود."""
+        queue = queue_for_symbol("FOLD")
+        self.assertIn(queue, ["matching.0", "matching.1", "matching.2", "matching.3"])
+        for _ in range(5):
+            self.assertEqual(queue_for_symbol("FOLD"), queue)
+        self.assertEqual(
+            route_task("orders.match_order", ["id"], {"symbol": "FOLD"}, {}),
+            {"queue": queue, "routing_key": queue},
+        )
+
+    @override_settings(MATCHING_PARTITIONS=4)
+    def test_other_tasks_not_routed(self):
+        """فقط تسک match_order پارتیشن‌بندی شود."""
+        self.assertIsNone(
+            route_task("blockchain.record_transaction", [], {"symbol": "FOLD"}, {})
+        )
+
+    def test_symbols_spread_across_partitions(self):
+        """نمادها بین همه پارتیشن‌ها پخش شوند."""
+        with self.settings(MATCHING_PARTITIONS=4):
+            used = {partition_for_symbol(s) for s in self.SYMBOLS}
+        self.assertEqual(used, {0, 1, 2, 3})
+
+    def test_adding_partition_moves_few_symbols(self):
+        """هش سازگار: افزودن یک پارتیشن فقط بخش کوچکی از نمادها را جابه‌جا کند."""
+        with self.settings(MATCHING_PARTITIONS=4):
+            before = {s: partition_for_symbol(s) for s in self.SYMBOLS}
+        with self.settings(MATCHING_PARTITIONS=5):
+            after = {s: partition_for_symbol(s) for s in self.SYMBOLS}
+        moved = sum(1 for s in self.SYMBOLS if before[s] != after[s])
+        # انتظار حدود 1/5؛ با hash % N تقریباً 4/5 جابه‌جا می‌شدند
+        self.assertLess(moved, len(self.SYMBOLS) * 0.4)
+        for s in self.SYMBOLS:
+            if before[s] != after[s]:
+                self.assertEqual(after[s], 4)
+
+
+# =============================================================================
+# 10. تست تسویه دسته‌ای (Batched Settlement)
+# =============================================================================
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class TestBatchedSettlement(OrderTestMixin, TestCase):
+    """همه fillهای یک سفارش ورودی با تعداد ثابتی کوئری تسویه شوند."""
+
+    def setUp(self):
+        super().setUp()
+        reset_order_books()
+
+    def tearDown(self):
+        reset_order_books()
+
+    def _sweep(self, levels):
+        """چند سطح فروش بساز و با یک سفارش خرید همه را جارو کن."""
+        for i in range(levels):
+            self.seller_holding.quantity -= 10
+            self.seller_holding.save(update_fields=["quantity"])
+            Order.objects.create(
+                user=self.seller, stock=self.stock,
+                type="sell", price=Decimal(8000 + i * 10), quantity=10,
+            )
+        price = Decimal(8000 + levels * 10)
+        self.buyer.cash_balance -= price * levels * 10
+        self.buyer.save(update_fields=["cash_balance"])
+        buy = Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="buy", price=price, quantity=levels * 10,
+        )
+        get_order_book(self.stock.id)
+        with CaptureQueriesContext(connection) as ctx:
+            transactions = match_order(str(buy.id))
+        self.assertEqual(len(transactions), levels)
+        return len(ctx.captured_queries)
+
+    def test_query_count_independent_of_fill_count(self):
+        """جاروی 3 سطح و 15 سطح باید تعداد کوئری یکسانی داشته باشند."""
+        small = self._sweep(3)
+        Order.objects.all().delete()
+        Transaction.objects.all().delete()
+        PortfolioHolding.objects.filter(user=self.buyer).delete()
+        reset_order_books()
+        large = self._sweep(15)
+        self.assertEqual(small, large)
+
+    def test_sweep_totals_are_aggregated(self):
+        """پول فروشنده، سهام خریدار و حجم معاملات پس از جارو درست باشند."""
+        seller_cash = self.seller.cash_balance
+        volume = self.stock.volume
+
+        self._sweep(5)
+
+        self.seller.refresh_from_db()
+        self.stock.refresh_from_db()
+        expected_total = sum(Decimal(8000 + i * 10) * 10 for i in range(5))
+        self.assertEqual(self.seller.cash_balance, seller_cash + expected_total)
+        holding = PortfolioHolding.objects.get(user=self.buyer, stock=self.stock)
+        self.assertEqual(holding.quantity, 50)
+        self.assertEqual(holding.average_buy_price, expected_total / 50)
+        self.assertEqual(self.stock.volume, volume + 50)
+        self.assertEqual(self.stock.current_price, Decimal("8040"))
+        self.assertEqual(
+            Notification.objects.filter(type="order_matched").count(), 10
+        )
+
+
+# =============================================================================
+# 11. تست جاروی دوره‌ای دفترهای متقاطع (match_all_pending)
+# =============================================================================
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, MATCHING_PARTITIONS=0)
+class TestCrossingSweep(OrderTestMixin, TestCase):
+    """جارو فقط دفترهایی که bid >= ask دارند را تطبیق دهد."""
+
+    def setUp(self):
+        super().setUp()
+        reset_order_books()
+        self.other_stock = Stock.objects.create(
+            symbol="SHPN", name="Pars Oil", name_fa="شپنا",
+            current_price=Decimal("4320"), previous_close=Decimal("4480"),
+            sector="Energy", sector_fa="انرژی",
+        )
+
+    def tearDown(self):
+        reset_order_books()
+
+    def test_sweep_matches_only_crossed_books(self):
+        """دفتر متقاطع تطبیق شود و دفتر غیرمتقاطع دست نخورد."""
+        # FOLD: bid 8600 >= ask 8500 → متقاطع
+        Order.objects.create(
+            user=self.seller, stock=self.stock,
+            type="sell", price=Decimal("8500"), quantity=10,
+        )
+        Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="buy", price=Decimal("8600"), quantity=10,
+        )
+        # SHPN: bid 4000 < ask 4300 → غیرمتقاطع
+        Order.objects.create(
+            user=self.seller, stock=self.other_stock,
+            type="sell", price=Decimal("4300"), quantity=10,
+        )
+        Order.objects.create(
+            user=self.buyer, stock=self.other_stock,
+            type="buy", price=Decimal("4000"), quantity=10,
+        )
+
+        result = match_all_pending_task()
+
+        self.assertEqual(result["crossed"], 1)
+        self.assertEqual(result["uncrossed"], 1)
+        self.assertEqual(result["crossed_symbols"], ["FOLD"])
+        tx = Transaction.objects.get()
+        self.assertEqual(tx.stock, self.stock)
+        # maker = سفارش قدیمی‌تر (فروش) → قیمت اجرا 8500
+        self.assertEqual(tx.price, Decimal("8500"))
+
+    def test_self_trade_only_book_is_left_alone(self):
+        """دفتری که فقط با خودِ کاربر متقاطع است تطبیق نشود و هر بار دوباره صف نشود."""
+        from unittest.mock import patch
+
+        Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="sell", price=Decimal("8500"), quantity=10,
+        )
+        Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="buy", price=Decimal("8600"), quantity=10,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = match_all_pending_task()
+
+        self.assertEqual(result["crossed"], 1)
+        self.assertEqual(Transaction.objects.count(), 0)
+
+        # دفعه‌ی بعد، تا وقتی دفتر تغییر نکرده، دوباره صف نشود
+        with patch("orders.tasks.match_crossed_book_task.apply_async") as queued:
+            result = match_all_pending_task()
+        self.assertEqual(result["crossed"], 0)
+        queued.assert_not_called()
+
+        # هر تغییری در دفتر (نسل جدید) دوباره آن را در جارو می‌آورد
+        with self.captureOnCommitCallbacks(execute=True):
+            mark_changed(self.stock.id)
+        with patch("orders.tasks.match_crossed_book_task.apply_async") as queued:
+            result = match_all_pending_task()
+        self.assertEqual(result["crossed"], 1)
+        queued.assert_called_once()
+
+    def test_older_crossing_order_reaches_deeper_level(self):
+        """اگر سفارش جدیدتر فقط به سفارش خودِ کاربر برسد، سفارش قدیمی‌تر سطح عمیق‌تر را تطبیق دهد."""
+        # B1 (خریدار، 8600، قدیمی‌تر) × S1 (همان کاربر، 8500، جدیدتر) → self-trade
+        # B1 × S2 (کاربر دیگر، 8550) هنوز متقاطع است
+        Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="buy", price=Decimal("8600"), quantity=10,
+        )
+        s2 = Order.objects.create(
+            user=self.seller, stock=self.stock,
+            type="sell", price=Decimal("8550"), quantity=10,
+        )
+        Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="sell", price=Decimal("8500"), quantity=10,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            match_all_pending_task()
+
+        tx = Transaction.objects.get()
+        self.assertEqual(tx.sell_order_id, s2.id)
+        # قیمت اجرا = قیمت سفارش قدیمی‌تر (B1)
+        self.assertEqual(tx.price, Decimal("8600"))
+
+    def test_every_resting_market_order_is_tried(self):
+        """سفارش بازار اول که فقط با خودش روبه‌روست، مانع تطبیق سفارش بازار بعدی نشود."""
+        Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="sell", price=Decimal("8500"), quantity=10,
+        )
+        Order.objects.create(
+            user=self.buyer, stock=self.stock, type="buy",
+            execution_type="market", price=Decimal("8000"), quantity=10,
+        )
+        market = Order.objects.create(
+            user=self.seller, stock=self.stock, type="buy",
+            execution_type="market", price=Decimal("7900"), quantity=10,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            match_all_pending_task()
+
+        tx = Transaction.objects.get()
+        self.assertEqual(tx.buy_order_id, market.id)
+
+    def test_empty_market_reports_all_uncrossed(self):
+        """بدون سفارش، همه سهام‌های فعال غیرمتقاطع گزارش شوند."""
+        result = match_all_pending_task()
+        self.assertEqual(result["crossed"], 0)
+        self.assertEqual(result["uncrossed"], 2)
+
+
+# =============================================================================
+# 12. تست موتور Trigger سفارشات شرطی (Stop-Loss / Take-Profit)
+# =============================================================================
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, MATCHING_PARTITIONS=0)
+class TestConditionalTriggers(OrderTestMixin, TestCase):
+    """سفارشات شرطی بلافاصله بعد از معامله‌ای که از trigger عبور کند فعال شوند."""
+
+    def setUp(self):
+        super().setUp()
+        reset_order_books()
+        reset_trigger_indexes()
+
+    def tearDown(self):
+        reset_order_books()
+        reset_trigger_indexes()
+
+    def _conditional(self, user, type_, execution_type, trigger, qty=10):
+        return Order.objects.create(
+            user=user, stock=self.stock, type=type_,
+            execution_type=execution_type, price=Decimal(str(trigger)),
+            trigger_price=Decimal(str(trigger)), quantity=qty,
+        )
+
+    def test_index_pulls_only_crossed_range(self):
+        """فقط triggerهای داخل بازه معامله برگردانده شوند."""
+        sl_sell = self._conditional(self.seller, "sell", "stop_loss", 8400)
+        tp_sell = self._conditional(self.seller, "sell", "take_profit", 9000)
+        sl_buy = self._conditional(self.buyer, "buy", "stop_loss", 8800)
+        tp_buy = self._conditional(self.buyer, "buy", "take_profit", 8000)
+
+        index = get_trigger_index(self.stock.id)
+
+        # قیمت بین 8700 و 8750 → هیچ‌کدام
+        self.assertEqual(index.crossed(Decimal("8700"), Decimal("8750")), [])
+        # سقوط تا 8350 → فقط Stop-Loss فروش
+        self.assertEqual(index.crossed(Decimal("8350"), Decimal("8750")), [sl_sell.id])
+        # رشد تا 9000 → Stop-Loss خرید و Take-Profit فروش
+        self.assertCountEqual(
+            index.crossed(Decimal("8700"), Decimal("9000")), [sl_buy.id, tp_sell.id]
+        )
+        # سقوط تا 7900 → Stop-Loss فروش و Take-Profit خرید
+        self.assertCountEqual(
+            index.crossed(Decimal("7900"), Decimal("8700")), [sl_sell.id, tp_buy.id]
+        )
+
+    def test_trade_fires_stop_loss_immediately(self):
+        """معامله زیر trigger باید Stop-Loss فروش را همان لحظه اجرا کند."""
+        stop = self._conditional(self.seller, "sell", "stop_loss", 8450, qty=50)
+        get_trigger_index(self.stock.id)
+
+        # خریدار: 100 سهم @ 8400 در دفتر
+        self.buyer.cash_balance -= Decimal("8400") * 100
+        self.buyer.save(update_fields=["cash_balance"])
+        Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="buy", price=Decimal("8400"), quantity=100,
+        )
+        # فروشنده: 10 سهم @ 8400 → معامله @ 8400 (زیر 8450)
+        self.seller_holding.quantity -= 10
+        self.seller_holding.save(update_fields=["quantity"])
+        sell = Order.objects.create(
+            user=self.seller, stock=self.stock,
+            type="sell", price=Decimal("8400"), quantity=10,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            match_order(str(sell.id))
+
+        stop.refresh_from_db()
+        self.assertEqual(stop.execution_type, "market")
+        self.assertEqual(stop.status, "matched")
+        self.assertEqual(stop.filled_quantity, 50)
+        self.assertEqual(Transaction.objects.count(), 2)
+        self.assertNotIn(stop.id, get_trigger_index(self.stock.id))
+
+    def test_untouched_trigger_does_not_fire(self):
+        """معامله‌ای که به trigger نرسد آن را فعال نکند."""
+        stop = self._conditional(self.seller, "sell", "stop_loss", 8000, qty=50)
+        Order.objects.create(
+            user=self.buyer, stock=self.stock,
+            type="buy", price=Decimal("8400"), quantity=10,
+        )
+        sell = Order.objects.create(
+            user=self.seller, stock=self.stock,
+            type="sell", price=Decimal("8400"), quantity=10,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            match_order(str(sell.id))
+
+        stop.refresh_from_db()
+        self.assertEqual(stop.execution_type, "stop_loss")
+        self.assertEqual(stop.status, "pending")
+
+    def test_periodic_safety_net_uses_current_price(self):
+        """تسک دوره‌ای با قیمت فعلی سهم triggerها را فعال کند."""
+        stop = self._conditional(self.seller, "sell", "stop_loss", 8800, qty=50)
+        # قیمت فعلی 8750 <= 8800 و خریداری در دفتر وجود ندارد
+        result = check_conditional_orders_task()
+
+        self.assertEqual(result["triggered"], 1)
+        stop.refresh_from_db()
+        self.assertEqual(stop.execution_type, "market")
+        self.seller_holding.refresh_from_db()
+        self.assertEqual(self.seller_holding.quantity, 4950)
+
+
+# =============================================================================
+# 13. تست ایندکس‌های دفتر باز (EXPLAIN) - جلوگیری از Sequential Scan
+# =============================================================================
+
+
+class TestOpenBookIndexes(OrderTestMixin, TestCase):
+    """
+    کوئری‌های داغ دفتر سفارشات را واقعاً اجرا می‌کند، SQL آن‌ها را ضبط و
+    با EXPLAIN بررسی می‌کند که هیچ‌کدام روی جدول سفارشات Seq Scan نکنند.
+    """
+
+    TABLE = Order._meta.db_table
+
+    def setUp(self):
+        super().setUp()
+        reset_order_books()
+        reset_trigger_indexes()
+        for price in ("8600", "8650", "8700"):
+            Order.objects.create(
+                user=self.buyer, stock=self.stock,
+                type="buy", price=Decimal(price), quantity=10,
+            )
+        for price in ("8800", "8850"):
+            Order.objects.create(
+                user=self.seller, stock=self.stock,
+                type="sell", price=Decimal(price), quantity=10,
+            )
+        Order.objects.create(
+            user=self.seller, stock=self.stock, type="sell",
+            execution_type="stop_loss", price=Decimal("8400"),
+            trigger_price=Decimal("8400"), quantity=10,
+        )
+
+    def tearDown(self):
+        reset_order_books()
+        reset_trigger_indexes()
+
+    def _plan(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # روی جداول کوچک تست، planner در هر حال Seq Scan را ترجیح می‌دهد
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+    def _is_seq_scan(self, plan):
+        if connection.vendor == "postgresql":
+            return f"Seq Scan on {self.TABLE}" in plan
+        # SQLite: "SCAN orders_order" بدون "USING ... INDEX" یعنی خواندن کل جدول
+        return any(
+            line.startswith(f"SCAN {self.TABLE}") and "INDEX" not in line
+            for line in plan.splitlines()
+        )
+
+    def _assert_indexed(self, label, func, index=None):
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        queries = [
+            q["sql"] for q in ctx.captured_queries
+            if f'"{self.TABLE}"' in q["sql"] and q["sql"].lstrip().upper().startswith("SELECT")
+        ]
+        self.assertTrue(queries, f"{label}: no order queries captured")
+        for sql in queries:
+            plan = self._plan(sql)
+            self.assertFalse(
+                self._is_seq_scan(plan),
+                f"{label} falls back to a sequential scan:\n{sql}\n{plan}",
+            )
+            if index:
+                self.assertIn(index, plan, f"{label} does not use {index}:\n{plan}")
+
+    def test_best_bid_ask_uses_index(self):
+        from .views import _get_order_book_prices
+
+        self._assert_indexed(
+            "_get_order_book_prices",
+            lambda: _get_order_book_prices(self.stock),
+            index="order_open_book_idx",
+        )
+
+    def test_order_book_view_uses_index(self):
+        client = APIClient()
+        self._assert_indexed(
+            "order_book_view",
+            lambda: client.get(f"/api/v1/orders/book/{self.stock.symbol}/"),
+        )
+
+    def test_book_load_uses_index(self):
+        self._assert_indexed("get_order_book", lambda: get_order_book(self.stock.id))
+
+    def test_trigger_index_load_uses_index(self):
+        self._assert_indexed("get_trigger_index", lambda: get_trigger_index(self.stock.id))
+
+    def test_crossing_sweep_uses_index(self):
+        from .tasks import find_crossed_books
+
+        self._assert_indexed("find_crossed_books", find_crossed_books)
+
+
+# =============================================================================
+# 14. تست snapshot افزایشی L2 دفتر سفارشات (order_book_view)
+# =============================================================================
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, MATCHING_PARTITIONS=0)
+class TestDepthSnapshot(OrderTestMixin, APITestCase):
+    """عمق دفتر از snapshot کش‌شده و به‌روز شونده سرو شود، نه GROUP BY."""
+
+    URL = "/api/v1/orders/book/FOLD/"
+
+    def _order(self, user, type_, price, qty):
+        return Order.objects.create(
+            user=user, stock=self.stock, type=type_,
+            price=Decimal(price), quantity=qty,
+        )
+
+    def _order_queries(self, ctx):
+        table = Order._meta.db_table
+        return [q for q in ctx.captured_queries if f'"{table}"' in q["sql"]]
+
+    def test_book_side_level_totals(self):
+        """مجموع و تعداد هر سطح قیمت با add/fill/remove به‌روز بماند."""
+        side = BookSide(descending=True)
+        now = timezone.now()
+        a = BookEntry(1, 1, "buy", "limit", Decimal("100"), 10, now)
+        b = BookEntry(2, 2, "buy", "limit", Decimal("100"), 5, now)
+        c = BookEntry(3, 3, "buy", "limit", Decimal("101"), 7, now)
+        for entry in (a, b, c):
+            side.add(entry)
+
+        self.assertEqual(
+            side.depth(), [(Decimal("101"), 7, 1), (Decimal("100"), 15, 2)]
+        )
+        side.reduce(a, 4)
+        self.assertEqual(side.depth(limit=1), [(Decimal("101"), 7, 1)])
+        self.assertEqual(side.depth()[1], (Decimal("100"), 11, 2))
+        side.remove(b)
+        side.remove(c)
+        self.assertEqual(side.depth(), [(Decimal("100"), 6, 1)])
+
+    def test_real_order_count_per_level(self):
+        """count باید تعداد واقعی سفارشات هر سطح باشد (نه 1)."""
+        self._order(self.buyer, "buy", "8400", 100)
+        self._order(self.buyer, "buy", "8400", 50)
+        self._order(self.buyer, "buy", "8300", 10)
+
+        bids = self.client.get(self.URL).data["bids"]
+
+        self.assertEqual(bids[0], {
+            "price": 8400.0, "quantity": 150, "total": 8400.0 * 150, "count": 2,
+        })
+        self.assertEqual(bids[1]["count"], 1)
+
+    def test_repeated_requests_do_not_query_orders(self):
+        """درخواست‌های بعدی مستقیماً از snapshot سرو شوند."""
+        self._order(self.seller, "sell", "8600", 200)
+        self.client.get(self.URL)
+
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(5):
+                response = self.client.get(self.URL)
+
+        self.assertEqual(self._order_queries(ctx), [])
+        self.assertEqual(response.data["asks"][0]["quantity"], 200)
+
+    def test_resting_pass_replaces_snapshot_missing_new_order(self):
+        """snapshot کهنه‌ای که سفارش تازه‌ی ORM را ندارد، با پاس match همان سفارش جایگزین شود."""
+        from unittest.mock import patch
+
+        from .orderbook import DEPTH_CACHE_KEY
+
+        self._order(self.seller, "sell", "8600", 200)
+        stale = get_depth(self.stock.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            sell = self._order(self.seller, "sell", "8700", 50)
+        # پروسه‌ی دیگری که سفارش را ندیده، snapshot با همان نسل منتشر می‌کند
+        cache.set(DEPTH_CACHE_KEY.format(stock_id=self.stock.id), stale)
+        self.assertEqual(len(get_depth(self.stock.id)["asks"]), 1)
+
+        # حتی وقتی دفتر مدام تغییر می‌کند و match انجام نمی‌شود
+        with patch("orders.matching._lock_planned_makers", return_value=None), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(match_order(str(sell.id)), [])
+
+        self.assertEqual(
+            get_depth(self.stock.id)["asks"],
+            [(Decimal("8600"), 200, 1), (Decimal("8700"), 50, 1)],
+        )
+
+    def test_snapshot_follows_create_fill_and_cancel(self):
+        """بعد از ساخت، پر شدن و لغو سفارش، snapshot بدون GROUP BY به‌روز شود."""
+        self._order(self.seller, "sell", "8600", 200)
+        self.client.get(self.URL)
+
+        # ساخت: سفارش جدید در همان سطح
+        with self.captureOnCommitCallbacks(execute=True):
+            self._order(self.seller, "sell", "8600", 100)
+        self.assertEqual(get_depth(self.stock.id)["asks"], [(Decimal("8600"), 300, 2)])
+
+        # پر شدن: خرید 250 سهم
+        buy = self._order(self.buyer, "buy", "8600", 250)
+        with self.captureOnCommitCallbacks(execute=True):
+            match_order(str(buy.id))
+        with CaptureQueriesContext(connection) as ctx:
+            asks = self.client.get(self.URL).data["asks"]
+        self.assertEqual(self._order_queries(ctx), [])
+        self.assertEqual(asks, [{
+            "price": 8600.0, "quantity": 50, "total": 8600.0 * 50, "count": 1,
+        }])
+
+        # لغو: آخرین سفارش باقی‌مانده
+        remaining = Order.objects.get(status="partial")
+        remaining.status = Order.OrderStatus.CANCELLED
+        with self.captureOnCommitCallbacks(execute=True):
+            remaining.save()
+        self.assertEqual(self.client.get(self.URL).data["asks"], [])
+
+    def test_other_process_change_rebuilds_snapshot(self):
+        """تغییر دفتر توسط پروسه دیگر (generation جدید) snapshot را نامعتبر کند."""
+        self._order(self.buyer, "buy", "8400", 100)
+        self.client.get(self.URL)
+
+        Order.objects.filter(type="buy").update(quantity=40)
+        bump_generation(self.stock.id)
+
+        bids = self.client.get(self.URL).data["bids"]
+        self.assertEqual(bids[0]["quantity"], 40)
+
+    def test_interleaved_publishers_stay_consistent(self):
+        """
+        دو پروسه که هم‌زمان عمق را منتشر می‌کنند: دومی منتظر قفل نماند و
+        snapshot کامل بفرستد، و اولی که diffش کهنه شده هم snapshot کامل
+        بفرستد، تا اعمال پیام‌ها به ترتیب sequence به snapshot نهایی کش برسد.
+        """
+        import threading
+        from unittest.mock import patch
+
+        from .orderbook import DEPTH_CACHE_KEY
+
+        from . import utils
+        from .orderbook import OrderBook, publish_depth
+
+        now = timezone.now()
+
+        def book(*levels):
+            result = OrderBook(self.stock.id)
+            for i, (price, qty) in enumerate(levels):
+                result.add_entry(
+                    BookEntry(i, i, "buy", "limit", Decimal(price), qty, now)
+                )
+            return result
+
+        sent = []
+        real_diff = utils.diff_levels
+        a_diffing, release_a = threading.Event(), threading.Event()
+
+        def slow_diff(old, new):
+            if threading.current_thread().name == "A" and not a_diffing.is_set():
+                a_diffing.set()
+                release_a.wait(5)
+            return real_diff(old, new)
+
+        with patch.object(utils, "diff_levels", slow_diff), patch.object(
+            utils, "broadcast_book_update",
+            side_effect=lambda stock_id, seq, bids, asks, snapshot: sent.append(
+                (seq, bids, snapshot)
+            ),
+        ):
+            publish_depth(book(("98", 1)))  # baseline snapshot
+            process_a = threading.Thread(
+                target=publish_depth, args=(book(("97", 3)),), name="A"
+            )
+            latest = book(("98", 1), ("99", 5))
+            process_b = threading.Thread(target=publish_depth, args=(latest,), name="B")
+
+            process_a.start()
+            self.assertTrue(a_diffing.wait(5))
+            process_b.start()
+            process_b.join(5)
+            # B does not wait for A's lock: it publishes a full snapshot
+            self.assertFalse(process_b.is_alive())
+            self.assertEqual(len(sent), 2)
+            self.assertTrue(sent[1][2])
+            release_a.set()
+            process_a.join(5)
+
+        # Replay the stream the way a client does
+        levels = {}
+        sequences = []
+        for seq, bids, snapshot in sorted(sent, key=lambda item: item[0]):
+            sequences.append(seq)
+            if snapshot:
+                levels = {}
+            for price, qty, count in bids:
+                if qty:
+                    levels[price] = (price, qty, count)
+                else:
+                    levels.pop(price, None)
+
+        self.assertEqual(sequences, list(range(sequences[0], sequences[0] + 3)))
+        # A's diff was against the pre-B snapshot, so it was sent in full too
+        self.assertTrue(sent[2][2])
+        published = cache.get(DEPTH_CACHE_KEY.format(stock_id=self.stock.id))
+        self.assertEqual(sorted(levels.values(), reverse=True), published["bids"])
+
+
+# =============================================================================
+# 15. تست استریم WebSocket دفتر سفارشات (/ws/book/<symbol>/)
+# =============================================================================
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+)
+class TestOrderBookStream(OrderTestMixin, TransactionTestCase):
+    """اول snapshot کامل، بعد diffهای سطح قیمت با شماره ترتیب."""
+
+    def _communicator(self, symbol="FOLD"):
+        from channels.routing import URLRouter
+        from django.urls import path
+
+        from .consumers import OrderBookConsumer
+
+        app = URLRouter([path("ws/book/<str:symbol>/", OrderBookConsumer.as_asgi())])
+        return WebsocketCommunicator(app, f"/ws/book/{symbol}/")
+
+    def _order(self, user, type_, price, qty):
+        return Order.objects.create(
+            user=user, stock=self.stock, type=type_,
+            price=Decimal(price), quantity=qty,
+        )
+
+    async def _connect(self):
+        communicator = self._communicator()
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        snapshot = await communicator.receive_json_from()
+        # اولین انتشار (بدون snapshot قبلی) به گروه هم ارسال می‌شود
+        while not await communicator.receive_nothing(timeout=0.1):
+            snapshot = await communicator.receive_json_from()
+        return communicator, snapshot
+
+    def test_diff_levels(self):
+        """فقط سطوح تغییر کرده و سطوح حذف شده (با مقدار 0) گزارش شوند."""
+        from .utils import diff_levels
+
+        old = [(Decimal("100"), 10, 1), (Decimal("99"), 5, 1), (Decimal("98"), 1, 1)]
+        new = [(Decimal("100"), 10, 1), (Decimal("99"), 8, 2), (Decimal("97"), 3, 1)]
+        self.assertEqual(
+            diff_levels(old, new),
+            [(Decimal("99"), 8, 2), (Decimal("97"), 3, 1), (Decimal("98"), 0, 0)],
+        )
+
+    async def test_snapshot_on_subscribe(self):
+        """بلافاصله بعد از اتصال، snapshot کامل دفتر ارسال شود."""
+        await database_sync_to_async(self._order)(self.buyer, "buy", "8400", 100)
+        await database_sync_to_async(self._order)(self.buyer, "buy", "8400", 20)
+
+        communicator, snapshot = await self._connect()
+
+        self.assertEqual(snapshot["type"], "book_snapshot")
+        self.assertEqual(snapshot["symbol"], "FOLD")
+        self.assertEqual(
+            snapshot["bids"], [{"price": 8400.0, "quantity": 120, "count": 2}]
+        )
+        self.assertEqual(snapshot["asks"], [])
+        await communicator.disconnect()
+
+    async def test_unknown_symbol_rejected(self):
+        communicator = self._communicator("NOPE")
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+    async def test_changes_stream_sequenced_diffs(self):
+        """هر تغییر دفتر یک diff با sequence بعدی و مقدار جدید سطح بفرستد."""
+        await database_sync_to_async(self._order)(self.seller, "sell", "8600", 100)
+        communicator, snapshot = await self._connect()
+        seq = snapshot["sequence"]
+
+        # سفارش جدید در سطح جدید
+        await database_sync_to_async(self._order)(self.buyer, "buy", "8400", 50)
+        diff = await communicator.receive_json_from()
+        self.assertEqual(diff["type"], "book_diff")
+        self.assertEqual(diff["sequence"], seq + 1)
+        self.assertEqual(diff["bids"], [{"price": 8400.0, "quantity": 50, "count": 1}])
+        self.assertEqual(diff["asks"], [])
+
+        # پر شدن کامل سطح فروش → مقدار 0 در هر دو سمت
+        buy = await database_sync_to_async(self._order)(self.buyer, "buy", "8600", 100)
+        diff = await communicator.receive_json_from()  # ورود سفارش خرید به دفتر
+        self.assertEqual(diff["sequence"], seq + 2)
+        await database_sync_to_async(match_order)(str(buy.id))
+        diff = await communicator.receive_json_from()
+        self.assertEqual(diff["sequence"], seq + 3)
+        self.assertEqual(diff["bids"], [{"price": 8600.0, "quantity": 0, "count": 0}])
+        self.assertEqual(diff["asks"], [{"price": 8600.0, "quantity": 0, "count": 0}])
+        await communicator.disconnect()
+
+    async def test_resync_sends_fresh_snapshot(self):
+        """با درخواست resync، snapshot تازه ارسال شود."""
+        communicator, snapshot = await self._connect()
+        await database_sync_to_async(self._order)(self.seller, "sell", "8700", 30)
+        await communicator.receive_json_from()  # diff
+
+        await communicator.send_json_to({"action": "resync"})
+        fresh = await communicator.receive_json_from()
+
+        self.assertEqual(fresh["type"], "book_snapshot")
+        self.assertEqual(fresh["sequence"], snapshot["sequence"] + 1)
+        self.assertEqual(
+            fresh["asks"], [{"price": 8700.0, "quantity": 30, "count": 1}]
+        )
+        await communicator.disconnect()
@@ -0,0 +1,345 @@
+"""
+BourseChain Conditional Order Trigger Engine
+Indexed Stop-Loss / Take-Profit triggering.
+
+Every pending conditional order fires in one of two directions:
+- DOWN (price <= trigger): Stop-Loss SELL, Take-Profit BUY
+- UP   (price >= trigger): Stop-Loss BUY,  Take-Profit SELL
+
+Each stock gets a ``TriggerIndex`` holding one bisectable array per
+direction, sorted by ``trigger_price``. When a matching pass trades between
+``low`` and ``high``, only the crossed range is pulled:
+- DOWN: triggers >= low   -> ``down[bisect_left(down, low):]``
+- UP:   triggers <= high  -> ``up[:bisect_right(up, high)]``
+so triggers fire right after the trade commits instead of waiting for the
+periodic ``orders.check_conditional_orders`` task, which is now only a
+safety net and uses the same index.
+
+Indexes are loaded lazily per stock and kept in sync the same way as the
+resident order book (orders/orderbook.py): ORM signals update the local
+copy, and a shared generation counter tells other processes to reload.
+Activation always re-reads the order under a row lock, so a stale index can
+at worst cause a no-op lookup.
+"""
+
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+
+from django.db import transaction as db_transaction
+
+from .models import Order, PortfolioHolding
+from .orderbook import OPEN_STATUSES, bump_generation, current_generation
+
+logger = logging.getLogger(__name__)
+
+CONDITIONAL_TYPES = (Order.ExecutionType.STOP_LOSS, Order.ExecutionType.TAKE_PROFIT)
+
+TRIGGER_GENERATION_CACHE_KEY = "triggers:gen:{stock_id}"
+
+DOWN = "down"
+UP = "up"
+
+
+def trigger_direction(order):
+    """DOWN when the order fires on a falling price, UP on a rising one."""
+    is_stop = order.execution_type == Order.ExecutionType.STOP_LOSS
+    is_sell = order.type == Order.OrderType.SELL
+    return DOWN if is_stop == is_sell else UP
+
+
+def is_pending_conditional(order):
+    return (
+        order.status in OPEN_STATUSES
+        and order.execution_type in CONDITIONAL_TYPES
+        and order.trigger_price is not None
+    )
+
+
+class _SortedTriggers:
+    """Parallel arrays of trigger prices (sorted) and order ids."""
+
+    def __init__(self):
+        self.prices = []
+        self.order_ids = []
+
+    def __len__(self):
+        return len(self.prices)
+
+    def add(self, price, order_id):
+        idx = bisect_right(self.prices, price)
+        self.prices.insert(idx, price)
+        self.order_ids.insert(idx, order_id)
+
+    def remove(self, price, order_id):
+        idx = bisect_left(self.prices, price)
+        while idx < len(self.prices) and self.prices[idx] == price:
+            if self.order_ids[idx] == order_id:
+                del self.prices[idx]
+                del self.order_ids[idx]
+                return
+            idx += 1
+
+
+class TriggerIndex:
+    """Per-stock sorted trigger arrays for pending conditional orders."""
+
+    def __init__(self, stock_id):
+        self.stock_id = stock_id
+        self.down = _SortedTriggers()
+        self.up = _SortedTriggers()
+        self._entries = {}  # order_id -> (direction, trigger_price)
+        self.generation = None
+        self.stale = False
+        self.lock = threading.RLock()
+
+    def __contains__(self, order_id):
+        return order_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _array(self, direction):
+        return self.down if direction == DOWN else self.up
+
+    def upsert(self, order):
+        self.discard(order.id)
+        if is_pending_conditional(order):
+            direction = trigger_direction(order)
+            self._entries[order.id] = (direction, order.trigger_price)
+            self._array(direction).add(order.trigger_price, order.id)
+
+    def discard(self, order_id):
+        entry = self._entries.pop(order_id, None)
+        if entry is not None:
+            direction, price = entry
+            self._array(direction).remove(price, order_id)
+
+    def crossed(self, low, high):
+        """Ids of orders whose trigger lies in the range traded [low, high]."""
+        down = self.down.order_ids[bisect_left(self.down.prices, low):]
+        up = self.up.order_ids[: bisect_right(self.up.prices, high)]
+        return [*down, *up]
+
+    def reload(self):
+        self.down = _SortedTriggers()
+        self.up = _SortedTriggers()
+        self._entries = {}
+        self.generation = current_generation(
+            self.stock_id, TRIGGER_GENERATION_CACHE_KEY
+        )
+        self.stale = False
+        for order in Order.objects.filter(
+            stock_id=self.stock_id,
+            status__in=OPEN_STATUSES,
+            execution_type__in=CONDITIONAL_TYPES,
+            trigger_price__isnull=False,
+        ).only("id", "type", "execution_type", "status", "trigger_price"):
+            self.upsert(order)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide registry
+# ---------------------------------------------------------------------------
+
+_indexes = {}
+_registry_lock = threading.Lock()
+
+
+def get_trigger_index(stock_id):
+    """Return the trigger index for a stock, (re)loading it when needed."""
+    index = _indexes.get(stock_id)
+    if index is None:
+        with _registry_lock:
+            index = _indexes.get(stock_id)
+            if index is None:
+                index = _indexes[stock_id] = TriggerIndex(stock_id)
+                index.stale = True
+
+    with index.lock:
+        if not index.stale:
+            gen = current_generation(stock_id, TRIGGER_GENERATION_CACHE_KEY)
+            if gen is not None and gen == index.generation:
+                return index
+        index.reload()
+    return index
+
+
+def get_loaded_trigger_index(stock_id):
+    return _indexes.get(stock_id)
+
+
+def reset_trigger_indexes():
+    """Drop every trigger index (useful in tests)."""
+    with _registry_lock:
+        _indexes.clear()
+
+
+def mark_triggers_changed(stock_id):
+    """Announce (after commit) that this process changed a stock's triggers."""
+
+    def _bump():
+        new_gen = bump_generation(stock_id, TRIGGER_GENERATION_CACHE_KEY)
+        index = _indexes.get(stock_id)
+        if index is None:
+            return
+        if (
+            new_gen is not None
+            and index.generation is not None
+            and new_gen == index.generation + 1
+        ):
+            index.generation = new_gen
+        else:
+            index.stale = True
+
+    db_transaction.on_commit(_bump)
+
+
+# ---------------------------------------------------------------------------
+# Firing
+# ---------------------------------------------------------------------------
+
+_firing = threading.local()
+
+
+def fire_triggers(stock_id, low, high, match_inline=True):
+    """
+    Activate every conditional order of a stock whose trigger was crossed by
+    trades in ``[low, high]``.
+
+    Activated orders are matched right away, which can trade again and cross
+    further triggers (cascading stops). Re-entrant calls for the same stock
+    are folded into the running loop instead of recursing.
+
+    Returns:
+        number of orders activated.
+    """
+    active = getattr(_firing, "active", None)
+    if active is None:
+        active = _firing.active = {}
+
+    if stock_id in active:
+        pending = active[stock_id]
+        if pending is not None:
+            low, high = min(low, pending[0]), max(high, pending[1])
+        active[stock_id] = (low, high)
+        return 0
+
+    active[stock_id] = None
+    fired = 0
+    try:
+        while True:
+            fired += _fire_range(stock_id, low, high, match_inline)
+            pending = active[stock_id]
+            if pending is None:
+                break
+            active[stock_id] = None
+            low, high = pending
+    finally:
+        del active[stock_id]
+    return fired
+
+
+def _fire_range(stock_id, low, high, match_inline):
+    index = get_trigger_index(stock_id)
+    with index.lock:
+        order_ids = index.crossed(low, high)
+    if not order_ids:
+        return 0
+
+    fired = 0
+    orders = (
+        Order.objects.filter(
+            id__in=order_ids,
+            status__in=OPEN_STATUSES,
+            execution_type__in=CONDITIONAL_TYPES,
+        )
+        .select_related("stock", "user")
+        .order_by("created_at")
+    )
+    for order in orders:
+        try:
+            if activate_conditional_order(order, match_inline=match_inline):
+                fired += 1
+        except Exception as exc:
+            index.stale = True
+            logger.exception(f"Failed to trigger conditional order {order.id}: {exc}")
+    if fired:
+        logger.info(
+            f"Triggered {fired} conditional order(s) on {orders[0].stock.symbol} "
+            f"(traded {low}..{high})"
+        )
+    return fired
+
+
+def activate_conditional_order(order, match_inline=True):
+    """
+    Convert a triggered Stop-Loss/Take-Profit order into a market order:
+    reserve stock (sell) or cash (buy), then hand it to the matching engine.
+
+    Returns:
+        True when the order was converted, False when it was cancelled for
+        insufficient funds/holdings or is no longer a pending conditional.
+    """
+    from .matching import match_order
+    from .partitions import partition_count
+    from .tasks import dispatch_match_order
+    from .views import _get_order_book_prices
+
+    with db_transaction.atomic():
+        order = (
+            Order.objects.select_for_update(of=("self",))
+            .select_related("stock", "user")
+            .filter(pk=order.pk)
+            .first()
+        )
+        if order is None or not is_pending_conditional(order):
+            return False
+        stock = order.stock
+
+        if order.type == Order.OrderType.SELL:
+            holding = PortfolioHolding.objects.select_for_update().filter(
+                user=order.user, stock=stock
+            ).first()
+            if not holding or holding.quantity < order.quantity:
+                order.status = Order.OrderStatus.CANCELLED
+                order.save(update_fields=["status", "updated_at"])
+                logger.warning(
+                    f"Conditional sell {order.id} cancelled: insufficient holdings"
+                )
+                return False
+            holding.quantity -= order.quantity
+            holding.save(update_fields=["quantity"])
+            best_ask, best_bid = _get_order_book_prices(stock)
+            order.price = best_bid if best_bid else stock.current_price
+        else:
+            best_ask, _ = _get_order_book_prices(stock)
+            price = best_ask if best_ask else stock.current_price
+            if price <= 0:
+                return False
+            total = price * order.quantity
+            user = type(order.user).objects.select_for_update().get(
+                pk=order.user.pk
+            )
+            if user.cash_balance < total:
+                order.status = Order.OrderStatus.CANCELLED
+                order.save(update_fields=["status", "updated_at"])
+                logger.warning(
+                    f"Conditional buy {order.id} cancelled: insufficient cash"
+                )
+                return False
+            user.cash_balance -= total
+            user.save(update_fields=["cash_balance"])
+            order.price = price
+
+        order.execution_type = Order.ExecutionType.MARKET
+        order.save(update_fields=["execution_type", "price", "updated_at"])
+
+        if match_inline or not partition_count():
+            match_order(str(order.id))
+        else:
+            # Hand over to the symbol's single writer once committed
+            db_transaction.on_commit(
+                lambda o=order: dispatch_match_order(o.id, o.stock.symbol)
+            )
+    return True
@@ -0,0 +1,74 @@
+"""
+Utility functions for streaming order book depth via WebSocket.
+
+Called from orders/orderbook.py whenever a new L2 depth snapshot is
+published, to push the changed price levels to every client subscribed to
+``/ws/book/<symbol>/`` (see orders/consumers.py).
+"""
+
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger(__name__)
+
+
+def book_group_name(stock_id):
+    return f"orderbook_{stock_id}"
+
+
+def serialize_levels(levels):
+    """``[(price, quantity, count)]`` -> JSON-ready level dicts."""
+    return [
+        {"price": float(price), "quantity": quantity, "count": count}
+        for price, quantity, count in levels
+    ]
+
+
+def diff_levels(old, new):
+    """
+    Levels whose quantity or count changed between two depth sides.
+    Levels that disappeared are reported with quantity 0.
+    """
+    old_map = {price: (qty, count) for price, qty, count in old}
+    new_map = {price: (qty, count) for price, qty, count in new}
+    changed = [
+        (price, qty, count)
+        for price, qty, count in new
+        if old_map.get(price) != (qty, count)
+    ]
+    changed.extend(
+        (price, 0, 0) for price, _qty, _count in old if price not in new_map
+    )
+    return changed
+
+
+def broadcast_book_update(stock_id, sequence, bids, asks, snapshot=False):
+    """
+    Broadcast a depth change to the stock's book stream.
+
+    Args:
+        stock_id: Stock primary key (the group is per stock)
+        sequence: per-stock sequence number of this update
+        bids, asks: changed levels (``snapshot=False``) or the full top of
+            book (``snapshot=True``) as ``[(price, quantity, count)]``
+    """
+    try:
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            logger.debug("No channel layer available, skipping book WS broadcast")
+            return
+
+        async_to_sync(channel_layer.group_send)(
+            book_group_name(stock_id),
+            {
+                "type": "book.snapshot" if snapshot else "book.diff",
+                "sequence": sequence,
+                "bids": serialize_levels(bids),
+                "asks": serialize_levels(asks),
+            },
+        )
+    except Exception as e:
+        # Never let WebSocket broadcasting break the main flow
+        logger.warning("Failed to broadcast order book update via WebSocket: %s", e)
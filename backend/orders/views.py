@@ -8,7 +8,7 @@ import logging
 from decimal import Decimal
 
 from django.db import transaction as db_transaction
-from django.db.models import F, Sum
+from django.db.models import F
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
@@ -16,6 +16,7 @@ from rest_framework.response import Response
 from stocks.models import Stock
 
 from .models import Order, PortfolioHolding
+from .orderbook import get_depth
 
 
 def _get_order_book_prices(stock):
@@ -214,11 +215,11 @@ class OrderCreateView(generics.CreateAPIView):
         return order, None
 
     def _trigger_matching(self, order):
-        """Trigger the matching engine via Celery task."""
-        from .tasks import match_order_task
+        """Trigger the matching engine via Celery task (on the symbol's partition)."""
+        from .tasks import dispatch_match_order
 
         try:
-            match_order_task.delay(str(order.id))
+            dispatch_match_order(order.id, order.stock.symbol)
             logger.info(f"Matching task queued for order {order.id}")
         except Exception as e:
             logger.error(f"Failed to queue matching task for order {order.id}: {e}")
@@ -332,6 +333,15 @@ def portfolio_view(request):
     return Response(portfolio_data)
 
 
+def _depth_level(price, quantity, count):
+    return {
+        "price": float(price),
+        "quantity": quantity,
+        "total": float(price) * quantity,
+        "count": count,
+    }
+
+
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def order_book_view(request, symbol):
@@ -346,46 +356,11 @@ def order_book_view(request, symbol):
             {"error": "Stock not found."}, status=status.HTTP_404_NOT_FOUND
         )
 
-    # Annotate remaining quantity (quantity - filled_quantity)
-    base_qs = Order.objects.filter(
-        stock=stock, status__in=["pending", "partial"]
-    ).annotate(remaining=F("quantity") - F("filled_quantity"))
-
-    # Aggregate buy orders (bids) - remaining quantities
-    buy_orders = (
-        base_qs.filter(type="buy")
-        .values("price")
-        .annotate(total_quantity=Sum("remaining"))
-        .order_by("-price")[:10]
-    )
-
-    # Aggregate sell orders (asks) - remaining quantities
-    sell_orders = (
-        base_qs.filter(type="sell")
-        .values("price")
-        .annotate(total_quantity=Sum("remaining"))
-        .order_by("price")[:10]
-    )
-
-    bids = [
-        {
-            "price": float(o["price"]),
-            "quantity": o["total_quantity"],
-            "total": float(o["price"]) * o["total_quantity"],
-            "count": 1,
-        }
-        for o in buy_orders
-    ]
-
-    asks = [
-        {
-            "price": float(o["price"]),
-            "quantity": o["total_quantity"],
-            "total": float(o["price"]) * o["total_quantity"],
-            "count": 1,
-        }
-        for o in sell_orders
-    ]
+    # Incrementally maintained L2 snapshot (orders/orderbook.py): served
+    # from the cache / resident book, no aggregation over the Order table
+    depth = get_depth(stock.id)
+    bids = [_depth_level(*level) for level in depth["bids"]]
+    asks = [_depth_level(*level) for level in depth["asks"]]
 
     best_bid = bids[0]["price"] if bids else 0
     best_ask = asks[0]["price"] if asks else 0
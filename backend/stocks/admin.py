@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import PriceHistory, Stock
+from .models import PriceBar, PriceHistory, Stock
 
 
 @admin.register(Stock)
@@ -16,3 +16,10 @@ class PriceHistoryAdmin(admin.ModelAdmin):
     list_display = ["stock", "timestamp", "open_price", "high", "low", "close", "volume"]
     list_filter = ["stock", "timestamp"]
     ordering = ["-timestamp"]
+
+
+@admin.register(PriceBar)
+class PriceBarAdmin(admin.ModelAdmin):
+    list_display = ["stock", "interval", "start", "open_price", "high", "low", "close", "volume", "trade_count"]
+    list_filter = ["interval", "stock"]
+    ordering = ["-start"]
@@ -5,3 +5,7 @@ class StocksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "stocks"
     verbose_name = "Stock Service"
+
+    def ready(self):
+        # Invalidate cached chart payloads when daily candles change
+        from . import signals  # noqa: F401
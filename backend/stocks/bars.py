@@ -0,0 +1,192 @@
+"""
+Intraday OHLCV bars built from executed trades.
+
+The matching engine hands every pass's Transactions to ``record_trades``,
+which folds them into the 1m/5m/15m/1h ``PriceBar`` rows they fall in, in
+the same DB transaction as the fills:
+
+  - The pass is first reduced in memory to one OHLCV tuple per
+    (interval, bucket)
+  - The tuples are written with one ``INSERT ... ON CONFLICT DO UPDATE``
+    that merges into existing bars in SQL (open kept, high = GREATEST,
+    low = LEAST, close = new, volume / trade_count added), so a pass costs
+    one statement whatever the number of fills or buckets, and concurrent
+    passes on the same (possibly new) bucket combine instead of
+    overwriting each other
+  - Buckets are aligned to UTC epoch multiples of the interval
+
+Other intraday intervals (4h, 30m, ...) are not stored; the history endpoint
+rolls them up on read from the widest stored interval that divides them
+(``base_interval``).
+
+``rebuild_price_bars`` recomputes bars from ``Transaction`` (backfill /
+repair, ``build_price_bars`` management command).
+"""
+
+import logging
+from datetime import datetime, timezone as dt_timezone
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import connection, transaction as db_transaction
+
+from .models import PriceBar
+
+logger = logging.getLogger(__name__)
+
+# Stored intervals -> bucket size in seconds
+BAR_INTERVALS = {
+    PriceBar.BarInterval.ONE_MINUTE: 60,
+    PriceBar.BarInterval.FIVE_MINUTES: 5 * 60,
+    PriceBar.BarInterval.FIFTEEN_MINUTES: 15 * 60,
+    PriceBar.BarInterval.ONE_HOUR: 60 * 60,
+}
+
+# Columns of the merge upsert, in VALUES order
+_UPSERT_FIELDS = [
+    "stock",
+    "interval",
+    "start",
+    "open_price",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "trade_count",
+]
+
+
+def base_interval(seconds):
+    """Widest stored interval that evenly divides ``seconds`` (``None`` if none)."""
+    divisors = [interval for interval, size in BAR_INTERVALS.items() if seconds % size == 0]
+    return max(divisors, key=BAR_INTERVALS.get) if divisors else None
+
+
+def bucket_start(timestamp, seconds):
+    """UTC start of the ``seconds``-wide bucket ``timestamp`` falls in."""
+    epoch = int(timestamp.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % seconds, tz=dt_timezone.utc)
+
+
+def build_bars(trades):
+    """
+    Fold trades into OHLCV per stored interval.
+
+    Args:
+        trades: ``(executed_at, price, quantity)`` tuples in execution order.
+
+    Returns:
+        dict of (interval, start) -> [open, high, low, close, volume, count]
+    """
+    bars = {}
+    for executed_at, price, quantity in trades:
+        for interval, seconds in BAR_INTERVALS.items():
+            key = (interval, bucket_start(executed_at, seconds))
+            bar = bars.get(key)
+            if bar is None:
+                bars[key] = [price, price, price, price, quantity, 1]
+                continue
+            if price > bar[1]:
+                bar[1] = price
+            if price < bar[2]:
+                bar[2] = price
+            bar[3] = price
+            bar[4] += quantity
+            bar[5] += 1
+    return bars
+
+
+def record_trades(stock_id, transactions):
+    """
+    Merge one matching pass's (saved) Transactions into the stored bars
+    with one upsert.
+    """
+    bars = build_bars((tx.executed_at, tx.price, tx.quantity) for tx in transactions)
+    if not bars:
+        return
+
+    fields = [PriceBar._meta.get_field(name) for name in _UPSERT_FIELDS]
+    params = []
+    for row in _to_rows(stock_id, bars):
+        params.extend(
+            field.get_db_prep_save(getattr(row, field.attname), connection)
+            for field in fields
+        )
+
+    qn = connection.ops.quote_name
+    table = qn(PriceBar._meta.db_table)
+    column = {field.name: qn(field.column) for field in fields}
+    # MAX / MIN are SQLite's scalar GREATEST / LEAST
+    greatest, least = (
+        ("MAX", "MIN") if connection.vendor == "sqlite" else ("GREATEST", "LEAST")
+    )
+    row_placeholder = f"({', '.join(['%s'] * len(fields))})"
+    sql = (
+        f"INSERT INTO {table} ({', '.join(column.values())}) "
+        f"VALUES {', '.join([row_placeholder] * len(bars))} "
+        f"ON CONFLICT ({column['stock']}, {column['interval']}, {column['start']}) "
+        f"DO UPDATE SET "
+        f"{column['high']} = {greatest}({table}.{column['high']}, EXCLUDED.{column['high']}), "
+        f"{column['low']} = {least}({table}.{column['low']}, EXCLUDED.{column['low']}), "
+        f"{column['close']} = EXCLUDED.{column['close']}, "
+        f"{column['volume']} = {table}.{column['volume']} + EXCLUDED.{column['volume']}, "
+        f"{column['trade_count']} = "
+        f"{table}.{column['trade_count']} + EXCLUDED.{column['trade_count']}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def rebuild_price_bars(stock_ids=None, chunk_size=2000):
+    """
+    Recompute all stored bars from ``Transaction``.
+
+    Args:
+        stock_ids: limit to these stocks (``None`` = every stock with trades).
+
+    Returns:
+        Number of bars written.
+    """
+    from transactions.models import Transaction
+
+    trades = Transaction.objects.order_by("stock_id", "executed_at")
+    existing = PriceBar.objects.all()
+    if stock_ids is not None:
+        trades = trades.filter(stock_id__in=stock_ids)
+        existing = existing.filter(stock_id__in=stock_ids)
+
+    rows = trades.values_list("stock_id", "executed_at", "price", "quantity").iterator(
+        chunk_size=chunk_size
+    )
+    written = 0
+    with db_transaction.atomic():
+        existing.delete()
+        # Trades are streamed; only one stock's bars are held in memory
+        for stock_id, stock_rows in groupby(rows, key=itemgetter(0)):
+            written += _write_bars(stock_id, build_bars(row[1:] for row in stock_rows))
+
+    logger.info("Rebuilt %d price bar(s)", written)
+    return written
+
+
+def _write_bars(stock_id, bars):
+    rows = _to_rows(stock_id, bars)
+    PriceBar.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _to_rows(stock_id, bars):
+    return [
+        PriceBar(
+            stock_id=stock_id,
+            interval=interval,
+            start=start,
+            open_price=o,
+            high=h,
+            low=low,
+            close=c,
+            volume=volume,
+            trade_count=count,
+        )
+        for (interval, start), (o, h, low, c, volume, count) in bars.items()
+    ]
@@ -0,0 +1,177 @@
+"""
+Vectorized candle pipeline for the history endpoint.
+
+Rows are loaded with ``values_list`` (prices cast to float in SQL, so no
+``Decimal`` objects are built) into column arrays (``Candles``). Resampling
+is done on those arrays:
+
+  - rows are grouped by a bucket key (ISO week, month, or N-second slot);
+    keys are non-decreasing, so bucket starts are where the key changes
+  - open / close are the first / last row of each bucket, high / low /
+    volume are ``np.maximum`` / ``np.minimum`` / ``np.add`` ``.reduceat``
+    over the bucket starts
+
+``downsample`` bounds the payload of long ranges the same way (equal-count
+buckets). The result is turned into the JSON payload with one pass over the
+``tolist()`` columns.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+from .models import PriceBar, PriceHistory
+
+# Monday of ISO week: 1970-01-01 (day 0) was a Thursday
+_WEEK_OFFSET_DAYS = 3
+
+
+class Candles(NamedTuple):
+    """OHLCV columns, ascending by ``ts`` (numpy datetime64)."""
+
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def head(self, n):
+        """The first ``n`` candles."""
+        return Candles(*(column[:n] for column in self))
+
+    def tail(self, n):
+        """The last ``n`` candles."""
+        return Candles(*(column[-n:] for column in self)) if n else self
+
+
+def _price_columns():
+    return [
+        Cast(field, FloatField()) for field in ("open_price", "high", "low", "close")
+    ]
+
+
+def _from_rows(ts, rows):
+    columns = list(zip(*rows)) or [()] * 6
+    return Candles(
+        ts,
+        *(np.array(column, dtype=np.float64) for column in columns[1:5]),
+        np.array(columns[5], dtype=np.int64),
+    )
+
+
+def load_daily(symbol, start=None, end=None, limit=None):
+    """
+    Daily candles of ``symbol`` (``PriceHistory``) dated ``start`` .. ``end``
+    (inclusive, either may be ``None``), ascending; at most the newest
+    ``limit`` of them.
+    """
+    qs = PriceHistory.objects.filter(stock__symbol=symbol)
+    if start is not None:
+        qs = qs.filter(timestamp__gte=start)
+    if end is not None:
+        qs = qs.filter(timestamp__lte=end)
+    # Newest first (stock, -timestamp index), reversed after the LIMIT
+    rows = list(
+        qs.order_by("-timestamp").values_list("timestamp", *_price_columns(), "volume")[
+            :limit
+        ]
+    )
+    rows.reverse()
+    ts = np.array([row[0] for row in rows], dtype="datetime64[D]")
+    return _from_rows(ts, rows)
+
+
+def load_bars(symbol, interval, since, until=None, limit=None):
+    """
+    Stored ``interval`` bars starting in ``[since, until)`` (``until`` may be
+    ``None``), ascending; at most the newest ``limit`` of them.
+    """
+    qs = PriceBar.objects.filter(stock__symbol=symbol, interval=interval, start__gte=since)
+    if until is not None:
+        qs = qs.filter(start__lt=until)
+    rows = list(
+        qs.order_by("-start").values_list("start", *_price_columns(), "volume")[:limit]
+    )
+    rows.reverse()
+    # Aware UTC datetimes -> datetime64 (numpy has no timezone support)
+    ts = np.array([int(row[0].timestamp()) for row in rows], dtype=np.int64).astype(
+        "datetime64[s]"
+    )
+    return _from_rows(ts, rows)
+
+
+def resample(candles, keys, bucket_ts=None):
+    """
+    Merge consecutive candles with equal ``keys`` into one.
+
+    Args:
+        keys: non-decreasing int array, one per candle.
+        bucket_ts: optional callable keys -> timestamps of the merged
+            candles (default: timestamp of each bucket's first candle).
+    """
+    if len(keys) == 0:
+        return candles
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.concatenate((starts[1:], [len(keys)])) - 1
+    return Candles(
+        candles.ts[starts] if bucket_ts is None else bucket_ts(keys[starts]),
+        candles.open[starts],
+        np.maximum.reduceat(candles.high, starts),
+        np.minimum.reduceat(candles.low, starts),
+        candles.close[ends],
+        np.add.reduceat(candles.volume, starts),
+    )
+
+
+def weekly(candles):
+    """ISO-week (Monday-based) candles, stamped with each week's first day."""
+    days = candles.ts.astype("datetime64[D]").astype(np.int64)
+    return resample(candles, (days + _WEEK_OFFSET_DAYS) // 7)
+
+
+def monthly(candles):
+    """Calendar-month candles, stamped with each month's first trading day."""
+    return resample(candles, candles.ts.astype("datetime64[M]").astype(np.int64))
+
+
+def roll_up(candles, seconds):
+    """``seconds``-wide candles aligned to UTC epoch multiples of ``seconds``."""
+    epoch = candles.ts.astype("datetime64[s]").astype(np.int64)
+    return resample(
+        candles,
+        epoch // seconds,
+        bucket_ts=lambda keys: (keys * seconds).astype("datetime64[s]"),
+    )
+
+
+def downsample(candles, max_points):
+    """
+    At most ``max_points`` candles: consecutive candles are merged into
+    ``max_points`` equal-count buckets (OHLC-preserving, so the range's
+    extremes survive, unlike LTTB which keeps one point per bucket).
+    """
+    count = len(candles.ts)
+    if count <= max_points:
+        return candles
+    return resample(candles, np.arange(count) * max_points // count)
+
+
+def to_payload(candles, utc=False):
+    """Candles -> list of frontend ``PriceHistory`` dicts."""
+    stamps = np.datetime_as_string(candles.ts.astype("datetime64[s]"))
+    if utc:
+        stamps = np.char.add(stamps, "+00:00")
+    return [
+        {"timestamp": t, "open": o, "high": h, "low": low, "close": c, "volume": v}
+        for t, o, h, low, c, v in zip(
+            stamps.tolist(),
+            candles.open.tolist(),
+            candles.high.tolist(),
+            candles.low.tolist(),
+            candles.close.tolist(),
+            candles.volume.tolist(),
+        )
+    ]
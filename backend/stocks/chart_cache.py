@@ -0,0 +1,105 @@
+"""
+Versioned cache of serialized chart payloads.
+
+``/stocks/<symbol>/history/`` responses are stored as ready-to-send JSON
+bytes, keyed by stock id, query string and the stock's chart version:
+
+  - Keys use the id of an existing ``Stock`` (resolved by the view, 404
+    otherwise), so unknown or differently-cased symbols cannot create keys
+    or read a version that is never bumped
+  - ``bump_chart_version(stock_id)`` is called after a matching pass
+    commits (new trades -> new intraday bars) and when ``PriceHistory``
+    rows change (stocks/signals.py); it only invalidates that stock
+  - Old payloads are never deleted, they just stop being addressed and
+    expire after ``STOCK_CHART_CACHE_TIMEOUT`` seconds (which also bounds
+    how long a lookback window can lag behind the clock)
+  - Version keys expire after ``STOCK_CHART_VERSION_TIMEOUT`` seconds;
+    versions start from a millisecond timestamp, so a version key that
+    expired or was evicted never comes back with a number an old payload
+    still uses
+  - Each payload carries a strong ETag (content hash); clients revalidate
+    with ``If-None-Match`` and get a 304 without a body
+"""
+
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "stocks:chart:version:{stock_id}"
+PAYLOAD_KEY = "stocks:chart:{stock_id}:{version}:{query}"
+
+
+def _version_timeout():
+    return getattr(settings, "STOCK_CHART_VERSION_TIMEOUT", 86400)
+
+
+def get_chart_version(stock_id):
+    """Current chart version of the stock (``None`` if the cache is down)."""
+    key = VERSION_KEY.format(stock_id=stock_id)
+    try:
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, int(time.time() * 1000), timeout=_version_timeout())
+            version = cache.get(key)
+        return version
+    except Exception as exc:
+        logger.warning("Chart cache unavailable: %s", exc)
+        return None
+
+
+def bump_chart_version(stock_id):
+    """Invalidate every cached chart payload of the stock."""
+    key = VERSION_KEY.format(stock_id=stock_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), timeout=_version_timeout())
+    except Exception as exc:
+        logger.warning("Chart cache invalidation failed for stock %s: %s", stock_id, exc)
+
+
+def payload_key(stock_id, query_params):
+    """
+    Cache key for one stock + normalized query string at the current
+    version (``None`` if the cache is down).
+    """
+    version = get_chart_version(stock_id)
+    if version is None:
+        return None
+    query = "&".join(
+        f"{name}={value}" for name, value in sorted(query_params.items())
+    )
+    return PAYLOAD_KEY.format(
+        stock_id=stock_id, version=version, query=hashlib.md5(query.encode()).hexdigest()
+    )
+
+
+def get_payload(key):
+    """``(etag, body)`` or ``None``."""
+    if key is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception:
+        return None
+
+
+def make_etag(body):
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+def set_payload(key, body):
+    """Store serialized ``body`` bytes under ``key``; returns ``(etag, body)``."""
+    entry = (make_etag(body), body)
+    if key is None:
+        return entry
+    try:
+        cache.set(key, entry, timeout=getattr(settings, "STOCK_CHART_CACHE_TIMEOUT", 300))
+    except Exception as exc:
+        logger.warning("Chart cache write failed: %s", exc)
+    return entry
@@ -2,19 +2,26 @@
 WebSocket consumer for real-time stock price updates.
 Sprint 5 - Live stock price broadcasting.
 
-All clients join a shared group "stock_prices". When a stock price changes
-(after an order match), the new price data is broadcast to all connected
-clients in real-time.
+Clients start in the shared group "stock_prices" (whole market). A client
+that only needs a few symbols (e.g. a watchlist) sends a subscribe message
+and is moved to per-symbol groups "stock_prices_<SYMBOL>", so it only
+receives those symbols' updates.
 
 This is a public endpoint - no authentication required.
 """
 
 import logging
+import re
 
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 
+from .utils import STOCK_PRICES_GROUP, symbol_group_name
+
 logger = logging.getLogger(__name__)
 
+SYMBOL_RE = re.compile(r"^[A-Za-z0-9_.-]{1,20}$")
+MAX_SUBSCRIPTIONS = 50
+
 
 class StockPriceConsumer(AsyncJsonWebsocketConsumer):
     """
@@ -23,6 +30,14 @@ class StockPriceConsumer(AsyncJsonWebsocketConsumer):
     Connection (no auth required):
         ws://host/ws/stocks/
 
+    Messages from client (JSON):
+        {"action": "subscribe", "symbols": ["FOLD", "SHPN"]}
+        {"action": "unsubscribe", "symbols": ["SHPN"]}
+
+    The first subscribe leaves the whole-market feed; from then on only the
+    subscribed symbols are delivered. Each request is acknowledged with
+    {"type": "subscriptions", "symbols": [...]}.
+
     Messages sent to client (JSON):
         {
             "type": "stock_update",
@@ -39,23 +54,75 @@ class StockPriceConsumer(AsyncJsonWebsocketConsumer):
         }
     """
 
-    GROUP_NAME = "stock_prices"
+    GROUP_NAME = STOCK_PRICES_GROUP
+
+    # None = whole market; otherwise the set of subscribed symbols
+    symbols = None
 
     async def connect(self):
-        # All clients join the same stock_prices group (public)
+        # Until the client subscribes, it follows the whole market (public)
         await self.channel_layer.group_add(self.GROUP_NAME, self.channel_name)
         await self.accept()
         logger.info("WebSocket stock prices connected: channel=%s", self.channel_name)
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(self.GROUP_NAME, self.channel_name)
+        for group in self._groups():
+            await self.channel_layer.group_discard(group, self.channel_name)
         logger.info(
             "WebSocket stock prices disconnected: channel=%s", self.channel_name
         )
 
     async def receive_json(self, content, **kwargs):
-        """Client-to-server messages (not used)."""
-        pass
+        """Client-to-server messages: subscribe / unsubscribe symbols."""
+        if not isinstance(content, dict):
+            return
+        action = content.get("action")
+        if action not in ("subscribe", "unsubscribe"):
+            return
+        symbols = content.get("symbols")
+        if not isinstance(symbols, list):
+            await self.send_json({"type": "error", "error": "symbols must be a list"})
+            return
+        symbols = {
+            s.upper() for s in symbols if isinstance(s, str) and SYMBOL_RE.match(s)
+        }
+
+        if action == "subscribe":
+            await self._subscribe(symbols)
+        else:
+            await self._unsubscribe(symbols)
+        await self.send_json(
+            {"type": "subscriptions", "symbols": sorted(self.symbols or ())}
+        )
+
+    # --- Subscriptions ---
+
+    def _groups(self):
+        if self.symbols is None:
+            return [self.GROUP_NAME]
+        return [symbol_group_name(symbol) for symbol in self.symbols]
+
+    async def _subscribe(self, symbols):
+        if self.symbols is None:
+            # Leave the whole-market feed on the first subscription
+            await self.channel_layer.group_discard(self.GROUP_NAME, self.channel_name)
+            self.symbols = set()
+        for symbol in sorted(symbols - self.symbols):
+            if len(self.symbols) >= MAX_SUBSCRIPTIONS:
+                break
+            await self.channel_layer.group_add(
+                symbol_group_name(symbol), self.channel_name
+            )
+            self.symbols.add(symbol)
+
+    async def _unsubscribe(self, symbols):
+        if self.symbols is None:
+            return
+        for symbol in symbols & self.symbols:
+            await self.channel_layer.group_discard(
+                symbol_group_name(symbol), self.channel_name
+            )
+            self.symbols.discard(symbol)
 
     # --- Group message handlers ---
 
@@ -75,3 +142,17 @@ class StockPriceConsumer(AsyncJsonWebsocketConsumer):
                 "data": event["data"],
             }
         )
+
+    async def stock_price_batch(self, event):
+        """
+        Handle a conflated batch for the whole-market group.
+
+        Called when channel layer sends:
+            {
+                "type": "stock.price.batch",
+                "data": [ { ... stock price payload ... }, ... ]
+            }
+        Each entry reaches the client as a regular "stock_update" message.
+        """
+        for data in event["data"]:
+            await self.send_json({"type": "stock_update", "data": data})
@@ -0,0 +1,196 @@
+"""
+Bulk export of market data (``PriceHistory`` and ``Transaction``).
+
+Used by the admin export endpoint (``/stocks/export/<dataset>.<format>``)
+and the ``export_market_data`` management command:
+
+  - Rows are read with ``values_list(...).iterator(chunk_size=...)`` (a
+    server-side cursor on PostgreSQL), ``STOCK_EXPORT_CHUNK_SIZE`` rows at
+    a time, and each chunk is encoded and yielded as bytes, so an export
+    runs in constant memory whatever its size
+  - ``csv``: compact CSV (header row, ISO dates, plain decimals)
+  - ``arrow`` (Arrow IPC stream) / ``parquet``: one record batch / row
+    group per chunk; needs the optional ``pyarrow`` package
+    (``pip install -r requirements-export.txt``), otherwise the endpoint
+    answers 501 and the command refuses those formats
+"""
+
+import csv
+import io
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from itertools import islice
+
+from django.conf import settings
+
+from .models import PriceHistory
+
+# Dataset -> columns as (name, lookup, arrow type)
+COLUMNS = {
+    "price_history": [
+        ("symbol", "stock__symbol", "string"),
+        ("date", "timestamp", "date"),
+        ("open", "open_price", "decimal"),
+        ("high", "high", "decimal"),
+        ("low", "low", "decimal"),
+        ("close", "close", "decimal"),
+        ("volume", "volume", "int"),
+    ],
+    "trades": [
+        ("id", "id", "string"),
+        ("symbol", "stock__symbol", "string"),
+        ("executed_at", "executed_at", "timestamp"),
+        ("price", "price", "decimal"),
+        ("quantity", "quantity", "int"),
+        ("total_value", "total_value", "decimal"),
+        ("status", "status", "string"),
+    ],
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def arrow_available():
+    """Whether the ``arrow`` / ``parquet`` formats can be used."""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def export_rows(dataset, symbols=None, start=None, end=None):
+    """
+    ``values_list`` queryset of ``dataset`` rows, oldest first.
+
+    Args:
+        symbols: limit to these symbols (``None`` = all).
+        start / end: inclusive date range (either may be ``None``).
+
+    Raises:
+        ValueError: ``end`` is the last representable date.
+    """
+    lookups = [lookup for _name, lookup, _type in COLUMNS[dataset]]
+    if dataset == "price_history":
+        qs = PriceHistory.objects.order_by("stock_id", "timestamp")
+        if start is not None:
+            qs = qs.filter(timestamp__gte=start)
+        if end is not None:
+            qs = qs.filter(timestamp__lte=end)
+    else:
+        from transactions.models import Transaction
+
+        qs = Transaction.objects.order_by("executed_at", "id")
+        if start is not None:
+            qs = qs.filter(executed_at__gte=_utc_midnight(start))
+        if end is not None:
+            try:
+                until = end + timedelta(days=1)
+            except OverflowError:
+                raise ValueError(f"Date out of range: {end}") from None
+            qs = qs.filter(executed_at__lt=_utc_midnight(until))
+    if symbols:
+        qs = qs.filter(stock__symbol__in=symbols)
+    return qs.values_list(*lookups)
+
+
+def stream_export(dataset, file_format, symbols=None, start=None, end=None):
+    """
+    Encoded chunks (bytes) of the export; see ``export_rows`` for the filters.
+
+    The queryset is built before the first chunk is requested, so a
+    ``ValueError`` for bad bounds is raised by this call itself.
+    """
+    chunk_size = getattr(settings, "STOCK_EXPORT_CHUNK_SIZE", 5000)
+    rows = export_rows(dataset, symbols, start, end).iterator(chunk_size=chunk_size)
+    chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+    if file_format == "csv":
+        return _csv_chunks(dataset, chunks)
+    return _arrow_chunks(dataset, chunks, file_format)
+
+
+def _utc_midnight(day):
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def _csv_chunks(dataset, chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([name for name, _lookup, _type in COLUMNS[dataset]])
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # no rows: only the header was written
+        yield buffer.getvalue().encode()
+
+
+class _Drain:
+    """Write-only file object whose contents are taken after each batch."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def _arrow_schema(pa, dataset):
+    types = {
+        "string": pa.string(),
+        "date": pa.date32(),
+        "decimal": pa.decimal128(15, 2),
+        "int": pa.int64(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, _lookup, kind in COLUMNS[dataset]])
+
+
+def _arrow_chunks(dataset, chunks, file_format):
+    import pyarrow as pa
+
+    schema = _arrow_schema(pa, dataset)
+    sink = _Drain()
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    for chunk in chunks:
+        columns = [
+            # UUIDs -> str; everything else converts natively
+            [str(value) for value in column] if kind == "string" else column
+            for column, (_name, _lookup, kind) in zip(zip(*chunk), COLUMNS[dataset])
+        ]
+        writer.write_batch(pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema,
+        ))
+        yield sink.take()
+    writer.close()
+    yield sink.take()
@@ -0,0 +1,36 @@
+"""
+Management command to (re)build intraday price bars from executed trades.
+
+Usage:
+    python manage.py build_price_bars                  # all stocks
+    python manage.py build_price_bars --symbol FOLD    # one or more symbols
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stocks.bars import rebuild_price_bars
+from stocks.models import Stock
+
+
+class Command(BaseCommand):
+    help = "Rebuild 1m/5m/15m/1h PriceBar rows from Transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--symbol",
+            action="append",
+            help="Only rebuild this symbol (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        stock_ids = None
+        if options["symbol"]:
+            symbols = [s.upper() for s in options["symbol"]]
+            stock_ids = list(
+                Stock.objects.filter(symbol__in=symbols).values_list("id", flat=True)
+            )
+            if len(stock_ids) != len(set(symbols)):
+                raise CommandError(f"Unknown symbol in {', '.join(symbols)}")
+
+        written = rebuild_price_bars(stock_ids)
+        self.stdout.write(self.style.SUCCESS(f"Built {written} price bar(s)"))
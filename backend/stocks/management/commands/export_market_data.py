@@ -0,0 +1,76 @@
+"""
+Management command to export price history / trades (stocks/export.py).
+
+Usage:
+    python manage.py export_market_data price_history -o history.csv
+    python manage.py export_market_data trades --symbol FOLD --from 2025-01-01 \\
+        --to 2025-12-31 --format parquet -o trades.parquet
+    python manage.py export_market_data trades > trades.csv     # stdout
+"""
+
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stocks import export
+from stocks.models import Stock
+
+
+class Command(BaseCommand):
+    help = "Export PriceHistory or Transaction rows as CSV, Arrow IPC or Parquet"
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(export.COLUMNS))
+        parser.add_argument(
+            "--symbol",
+            action="append",
+            help="Only export this symbol (repeatable)",
+        )
+        parser.add_argument(
+            "--from", dest="start", type=date.fromisoformat, help="First day (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--to", dest="end", type=date.fromisoformat, help="Last day (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=sorted(export.CONTENT_TYPES),
+            default="csv",
+        )
+        parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+
+    def handle(self, *args, **options):
+        file_format = options["file_format"]
+        if file_format != "csv" and not export.arrow_available():
+            raise CommandError(
+                f"{file_format} export requires pyarrow "
+                "(pip install -r requirements-export.txt)"
+            )
+
+        symbols = None
+        if options["symbol"]:
+            symbols = {s.upper() for s in options["symbol"]}
+            found = set(
+                Stock.objects.filter(symbol__in=symbols).values_list("symbol", flat=True)
+            )
+            if found != symbols:
+                raise CommandError(f"Unknown symbol(s): {', '.join(sorted(symbols - found))}")
+
+        try:
+            chunks = export.stream_export(
+                options["dataset"], file_format, symbols, options["start"], options["end"]
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        if options["output"]:
+            with open(options["output"], "wb") as out:
+                written = sum(out.write(chunk) for chunk in chunks)
+            self.stdout.write(
+                self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}")
+            )
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
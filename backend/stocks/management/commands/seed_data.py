@@ -24,6 +24,7 @@ from django.utils import timezone
 
 from notifications.models import Notification
 from orders.models import Order, PortfolioHolding
+from stocks.bars import rebuild_price_bars
 from stocks.models import PriceHistory, Stock
 from transactions.models import Transaction
 
@@ -104,6 +105,7 @@ class Command(BaseCommand):
         self._ensure_demo_holdings()  # Always ensure demo user has portfolio (fixes empty demo)
         self._ensure_ali_holdings()   # Restore ali portfolio if empty so you can test with both accounts
         self._sync_holdings_from_transactions()  # Fix: buyer portfolio must reflect all confirmed transactions
+        rebuild_price_bars()  # Intraday candles for the seeded transactions
         self._create_notifications()
 
         self.stdout.write(self.style.SUCCESS("Database seeded successfully!"))
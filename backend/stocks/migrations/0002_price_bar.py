@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stocks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceBar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interval', models.CharField(choices=[('1m', '1 Minute'), ('5m', '5 Minutes'), ('15m', '15 Minutes'), ('1h', '1 Hour')], max_length=3)),
+                ('start', models.DateTimeField()),
+                ('open_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('high', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('low', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('close', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('volume', models.BigIntegerField(default=0)),
+                ('trade_count', models.PositiveIntegerField(default=0)),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_bars', to='stocks.stock')),
+            ],
+            options={
+                'verbose_name': 'Price Bar',
+                'verbose_name_plural': 'Price Bars',
+                'ordering': ['-start'],
+                'constraints': [models.UniqueConstraint(fields=('stock', 'interval', 'start'), name='unique_price_bar')],
+            },
+        ),
+    ]
@@ -61,8 +61,52 @@ class PriceHistory(models.Model):
     class Meta:
         ordering = ["-timestamp"]
         unique_together = ["stock", "timestamp"]
+        indexes = [
+            # Newest-first range scans of one stock's history (stocks/candles.py)
+            models.Index(fields=["stock", "-timestamp"], name="pricehist_stock_ts_desc_idx"),
+        ]
         verbose_name = "Price History"
         verbose_name_plural = "Price Histories"
 
     def __str__(self):
         return f"{self.stock.symbol} - {self.timestamp}"
+
+
+class PriceBar(models.Model):
+    """
+    Intraday OHLCV bar built from executed trades (stocks/bars.py).
+
+    The matching engine folds every fill into the 1m/5m/15m/1h bar it falls
+    in; wider intraday intervals are rolled up from 1h bars on read.
+    ``start`` is the UTC bucket start.
+    """
+
+    class BarInterval(models.TextChoices):
+        ONE_MINUTE = "1m", "1 Minute"
+        FIVE_MINUTES = "5m", "5 Minutes"
+        FIFTEEN_MINUTES = "15m", "15 Minutes"
+        ONE_HOUR = "1h", "1 Hour"
+
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name="price_bars")
+    interval = models.CharField(max_length=3, choices=BarInterval.choices)
+    start = models.DateTimeField()
+    open_price = models.DecimalField(max_digits=12, decimal_places=2)
+    high = models.DecimalField(max_digits=12, decimal_places=2)
+    low = models.DecimalField(max_digits=12, decimal_places=2)
+    close = models.DecimalField(max_digits=12, decimal_places=2)
+    volume = models.BigIntegerField(default=0)
+    trade_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-start"]
+        constraints = [
+            # Also the range-scan index for (stock, interval, start)
+            models.UniqueConstraint(
+                fields=["stock", "interval", "start"], name="unique_price_bar"
+            ),
+        ]
+        verbose_name = "Price Bar"
+        verbose_name_plural = "Price Bars"
+
+    def __str__(self):
+        return f"{self.stock.symbol} {self.interval} - {self.start}"
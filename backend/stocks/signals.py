@@ -0,0 +1,21 @@
+"""
+PriceHistory model signals.
+
+Invalidate the stock's cached chart payloads (stocks/chart_cache.py) when
+daily candles are written or deleted through the ORM. Intraday bars are
+invalidated by the matching engine after each pass.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .chart_cache import bump_chart_version
+from .models import PriceHistory
+
+
+@receiver(post_save, sender=PriceHistory)
+@receiver(post_delete, sender=PriceHistory)
+def price_history_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_chart_version(instance.stock_id)
@@ -7,6 +7,12 @@ BourseChain - تست‌های سهام (Stocks)
   - جزئیات سهام
   - آمار بازار
   - آپدیت قیمت
+  - WebSocket قیمت (اشتراک per-symbol، ادغام آپدیت‌ها)
+  - کندل‌های intraday واقعی از معاملات (PriceBar)
+  - کش payload نمودار (ETag / If-None-Match، invalidation با معامله)
+  - تجمیع برداری کندل‌ها با NumPy (هفتگی، ماهانه، بازه‌ی دلخواه N دقیقه)
+  - کوئری بازه‌ی تاریخ (from/to/days) و downsampling با max_points
+  - خروجی حجیم تاریخچه و معاملات (CSV / Arrow / Parquet، endpoint و command)
 
 اجرا:
   python manage.py test stocks -v2
@@ -14,6 +20,7 @@ BourseChain - تست‌های سهام (Stocks)
 """
 
 from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from django.test import TestCase
 from rest_framework import status
@@ -310,6 +317,102 @@ class TestStockPriceWebSocket(TransactionTestCase):
         await comm1.disconnect()
         await comm2.disconnect()
 
+    async def test_market_feed_unpacks_batches(self):
+        """پیام batch کل بازار به صورت stock_update جداگانه به client برسد."""
+        communicator = await self._get_communicator()
+        await communicator.connect()
+
+        await get_channel_layer().group_send(
+            "stock_prices",
+            {
+                "type": "stock.price.batch",
+                "data": [{"symbol": "FOLD"}, {"symbol": "SHPN"}],
+            },
+        )
+
+        first = await communicator.receive_json_from()
+        second = await communicator.receive_json_from()
+        self.assertEqual(first, {"type": "stock_update", "data": {"symbol": "FOLD"}})
+        self.assertEqual(second["data"]["symbol"], "SHPN")
+        await communicator.disconnect()
+
+    async def test_subscribe_receives_only_subscribed_symbols(self):
+        """بعد از subscribe فقط آپدیت نمادهای انتخاب شده برسد."""
+        from stocks.utils import symbol_group_name
+
+        communicator = await self._get_communicator()
+        await communicator.connect()
+
+        await communicator.send_json_to(
+            {"action": "subscribe", "symbols": ["fold", "SHPN"]}
+        )
+        ack = await communicator.receive_json_from()
+        self.assertEqual(ack, {"type": "subscriptions", "symbols": ["FOLD", "SHPN"]})
+
+        channel_layer = get_channel_layer()
+        # پیام کل بازار و نماد دیگر نباید برسد
+        await channel_layer.group_send(
+            "stock_prices",
+            {"type": "stock.price.update", "data": {"symbol": "FOLD"}},
+        )
+        await channel_layer.group_send(
+            symbol_group_name("KHODRO"),
+            {"type": "stock.price.update", "data": {"symbol": "KHODRO"}},
+        )
+        await channel_layer.group_send(
+            symbol_group_name("SHPN"),
+            {"type": "stock.price.update", "data": {"symbol": "SHPN"}},
+        )
+
+        response = await communicator.receive_json_from()
+        self.assertEqual(response["data"]["symbol"], "SHPN")
+        self.assertTrue(await communicator.receive_nothing(timeout=0.1))
+        await communicator.disconnect()
+
+    async def test_unsubscribe_stops_symbol_updates(self):
+        """بعد از unsubscribe آپدیت آن نماد قطع شود."""
+        from stocks.utils import symbol_group_name
+
+        communicator = await self._get_communicator()
+        await communicator.connect()
+        await communicator.send_json_to({"action": "subscribe", "symbols": ["FOLD"]})
+        await communicator.receive_json_from()
+        await communicator.send_json_to({"action": "unsubscribe", "symbols": ["FOLD"]})
+        ack = await communicator.receive_json_from()
+        self.assertEqual(ack["symbols"], [])
+
+        await get_channel_layer().group_send(
+            symbol_group_name("FOLD"),
+            {"type": "stock.price.update", "data": {"symbol": "FOLD"}},
+        )
+        self.assertTrue(await communicator.receive_nothing(timeout=0.1))
+        await communicator.disconnect()
+
+    @override_settings(STOCK_TICKER_FLUSH_INTERVAL=0)
+    async def test_broadcast_targets_symbol_group(self):
+        """broadcast_stock_price باید به گروه همان نماد ارسال شود."""
+        from asgiref.sync import sync_to_async
+
+        from stocks.utils import broadcast_stock_price
+
+        communicator = await self._get_communicator()
+        await communicator.connect()
+        await communicator.send_json_to({"action": "subscribe", "symbols": ["FOLD"]})
+        await communicator.receive_json_from()
+
+        stock = Stock(
+            symbol="FOLD", name="Foolad", name_fa="فولاد",
+            current_price=Decimal("9000"), previous_close=Decimal("8750"),
+            change=Decimal("250"), change_percent=Decimal("2.86"),
+            volume=1, high_24h=Decimal("9050"), low_24h=Decimal("8600"),
+        )
+        await sync_to_async(broadcast_stock_price)(stock)
+
+        response = await communicator.receive_json_from()
+        self.assertEqual(response["data"]["symbol"], "FOLD")
+        self.assertEqual(response["data"]["currentPrice"], 9000.0)
+        await communicator.disconnect()
+
 
 # =============================================================================
 # 6. تست broadcast utility سهام (Sprint 5)
@@ -345,3 +448,786 @@ class TestStockPriceBroadcast(TestCase):
             broadcast_stock_price(self.stock)
         except Exception:
             self.fail("broadcast_stock_price raised an exception")
+
+
+# =============================================================================
+# 7. تست ادغام (Conflation) آپدیت‌های قیمت
+# =============================================================================
+
+
+@override_settings(STOCK_TICKER_FLUSH_INTERVAL=60)
+class TestTickerConflation(TestCase):
+    """آپدیت‌های پشت سر هم یک نماد در یک پیام ادغام شوند."""
+
+    def setUp(self):
+        from stocks.utils import TickerConflator
+
+        self.conflator = TickerConflator()
+        self.stock = Stock(
+            symbol="FOLD", name="Foolad", name_fa="فولاد",
+            current_price=Decimal("9000"), previous_close=Decimal("8750"),
+            change=Decimal("250"), change_percent=Decimal("2.86"),
+            volume=1, high_24h=Decimal("9050"), low_24h=Decimal("8600"),
+        )
+
+    def tearDown(self):
+        with patch("stocks.utils._send_tickers"):
+            self.conflator.flush()
+
+    def _publish(self, symbol, price):
+        from stocks.utils import serialize_stock_price
+
+        self.stock.symbol = symbol
+        self.stock.current_price = Decimal(price)
+        self.conflator.publish(serialize_stock_price(self.stock))
+
+    def test_burst_keeps_latest_state_per_symbol(self):
+        """200 آپدیت یک نماد → یک ارسال با آخرین قیمت."""
+        with patch("stocks.utils._send_tickers") as send:
+            for i in range(200):
+                self._publish("FOLD", 9000 + i)
+            self._publish("SHPN", "4500")
+            send.assert_not_called()  # تا flush بعدی چیزی ارسال نمی‌شود
+
+            self.assertEqual(self.conflator.flush(), 2)
+
+        send.assert_called_once()
+        tickers = {d["symbol"]: d for d in send.call_args[0][0]}
+        self.assertEqual(tickers["FOLD"]["currentPrice"], 9199.0)
+        self.assertEqual(tickers["SHPN"]["currentPrice"], 4500.0)
+
+    def test_flush_sends_one_batch_to_market_group(self):
+        """هر flush: یک پیام برای هر گروه نماد + یک پیام batch برای کل بازار."""
+        from stocks.utils import _send_tickers
+
+        layer = MagicMock()
+        layer.group_send = AsyncMock()
+        with patch("stocks.utils.get_channel_layer", return_value=layer):
+            _send_tickers([{"symbol": "FOLD", "currentPrice": 1.0},
+                           {"symbol": "SHPN", "currentPrice": 2.0}])
+
+        groups = [c.args[0] for c in layer.group_send.call_args_list]
+        self.assertEqual(groups, ["stock_prices_FOLD", "stock_prices_SHPN", "stock_prices"])
+        batch = layer.group_send.call_args_list[-1].args[1]
+        self.assertEqual(batch["type"], "stock.price.batch")
+        self.assertEqual(len(batch["data"]), 2)
+
+    @override_settings(STOCK_TICKER_FLUSH_INTERVAL=0)
+    def test_zero_interval_sends_immediately(self):
+        with patch("stocks.utils._send_tickers") as send:
+            self._publish("FOLD", "9100")
+        send.assert_called_once()
+
+
+# =============================================================================
+# 8. تست کندل‌های intraday از معاملات (PriceBar)
+# =============================================================================
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+
+from django.core.cache import cache
+
+from .bars import build_bars, rebuild_price_bars, record_trades
+from .models import PriceBar
+
+
+class TestPriceBars(APITestCase):
+    """معاملات در bucketهای 1m/5m/15m/1h جمع شوند و endpoint کندل واقعی برگرداند."""
+
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+
+        cache.clear()  # cached chart payloads
+        User = get_user_model()
+        self.stock = Stock.objects.create(
+            symbol="FOLD", name="Foolad", name_fa="فولاد مبارکه",
+            current_price=Decimal("8500"), previous_close=Decimal("8500"),
+            sector="Metals", sector_fa="فلزات",
+        )
+        self.buyer = User.objects.create_user(
+            username="barbuyer", email="barbuyer@test.com",
+            password="TestPass1234!", cash_balance=Decimal("100000000"),
+        )
+        self.seller = User.objects.create_user(
+            username="barseller", email="barseller@test.com", password="TestPass1234!",
+        )
+        # Start of the current hour, so all test trades share one 1h bucket
+        now = timezone.now()
+        self.hour = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+
+    def _trades(self, *specs):
+        """(minute offset, price, quantity) -> unsaved Transactions."""
+        from transactions.models import Transaction
+
+        return [
+            Transaction(
+                stock=self.stock, price=Decimal(price), quantity=qty,
+                executed_at=self.hour + timedelta(minutes=minute, seconds=5),
+            )
+            for minute, price, qty in specs
+        ]
+
+    def _bar(self, interval, minute=0):
+        return PriceBar.objects.get(
+            stock=self.stock, interval=interval,
+            start=self.hour + timedelta(minutes=minute),
+        )
+
+    def test_build_bars_ohlcv(self):
+        """OHLCV هر bucket درست محاسبه شود."""
+        trades = [
+            (datetime(2026, 1, 1, 10, 0, 10, tzinfo=dt_timezone.utc), Decimal("100"), 5),
+            (datetime(2026, 1, 1, 10, 0, 40, tzinfo=dt_timezone.utc), Decimal("110"), 3),
+            (datetime(2026, 1, 1, 10, 3, 0, tzinfo=dt_timezone.utc), Decimal("90"), 2),
+        ]
+        bars = build_bars(trades)
+        start = datetime(2026, 1, 1, 10, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(bars[("1m", start)], [100, 110, 100, 110, 8, 2])
+        self.assertEqual(bars[("5m", start)], [100, 110, 90, 90, 10, 3])
+        self.assertEqual(len([k for k in bars if k[0] == "1m"]), 2)
+
+    def test_record_trades_merges_passes(self):
+        """دو matching pass در یک bucket با هم ادغام شوند (open ثابت، close آخرین)."""
+        record_trades(self.stock.id, self._trades((0, "100", 5), (1, "105", 1)))
+        record_trades(self.stock.id, self._trades((2, "95", 2), (3, "102", 4)))
+
+        bar = self._bar("1h")
+        self.assertEqual(
+            (bar.open_price, bar.high, bar.low, bar.close, bar.volume, bar.trade_count),
+            (Decimal("100"), Decimal("105"), Decimal("95"), Decimal("102"), 12, 4),
+        )
+        self.assertEqual(PriceBar.objects.filter(interval="1m").count(), 4)
+
+    def test_concurrent_passes_on_new_bucket(self):
+        """
+        دو pass روی bucket جدید: ادغام داخل خود upsert انجام شود (بدون خواندن
+        قبلی)، پس pass دوم مقادیر اولی را بازنویسی نکند.
+        """
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        # Both passes were built before either bar existed
+        first = self._trades((0, "100", 5), (0, "120", 1))
+        second = self._trades((0, "90", 2))
+        with CaptureQueriesContext(connection) as ctx:
+            record_trades(self.stock.id, first)
+            record_trades(self.stock.id, second)
+
+        self.assertEqual(len(ctx.captured_queries), 2)  # one upsert each, no reads
+        self.assertTrue(all("ON CONFLICT" in q["sql"] for q in ctx.captured_queries))
+        bar = self._bar("1m")
+        self.assertEqual(
+            (bar.open_price, bar.high, bar.low, bar.close, bar.volume, bar.trade_count),
+            (Decimal("100"), Decimal("120"), Decimal("90"), Decimal("90"), 8, 3),
+        )
+
+    def test_matching_records_bars(self):
+        """match_order باید کندل‌ها را در همان تراکنش بسازد."""
+        from orders.matching import match_order
+        from orders.models import Order, PortfolioHolding
+
+        PortfolioHolding.objects.create(
+            user=self.seller, stock=self.stock, quantity=0, average_buy_price=Decimal("8000"),
+        )
+        Order.objects.create(
+            user=self.seller, stock=self.stock, type="sell", price=Decimal("8500"), quantity=10,
+        )
+        buy = Order.objects.create(
+            user=self.buyer, stock=self.stock, type="buy", price=Decimal("8500"), quantity=10,
+        )
+        match_order(str(buy.id))
+
+        self.assertEqual(
+            set(PriceBar.objects.values_list("interval", flat=True)),
+            {"1m", "5m", "15m", "1h"},
+        )
+        self.assertEqual(PriceBar.objects.get(interval="1m").volume, 10)
+
+    def test_history_serves_real_candles(self):
+        """endpoint کندل‌های 1m واقعی را به ترتیب زمانی برگرداند."""
+        record_trades(self.stock.id, self._trades((0, "100", 5), (1, "105", 1)))
+
+        response = self.client.get("/api/v1/stocks/FOLD/history/?interval=1m")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0]["open"], 100.0)
+        self.assertEqual(data[1]["close"], 105.0)
+        self.assertLess(data[0]["timestamp"], data[1]["timestamp"])
+
+    def test_history_rolls_up_4h(self):
+        """4h از کندل‌های 1h ساخته شود."""
+        record_trades(self.stock.id, self._trades((0, "100", 5), (1, "105", 1)))
+        PriceBar.objects.create(
+            stock=self.stock, interval="1h", start=self.hour - timedelta(hours=1),
+            open_price=Decimal("90"), high=Decimal("120"), low=Decimal("80"),
+            close=Decimal("99"), volume=7, trade_count=1,
+        )
+
+        response = self.client.get("/api/v1/stocks/FOLD/history/?interval=4h")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sum(c["volume"] for c in response.json()), 13)
+        self.assertEqual(max(c["high"] for c in response.json()), 120.0)
+
+    def test_rebuild_from_transactions(self):
+        """rebuild_price_bars کندل‌ها را از Transaction بازسازی کند."""
+        from orders.models import Order
+        from transactions.models import Transaction
+
+        buy = Order.objects.create(
+            user=self.buyer, stock=self.stock, type="buy", price=Decimal("8500"), quantity=10,
+        )
+        sell = Order.objects.create(
+            user=self.seller, stock=self.stock, type="sell", price=Decimal("8500"), quantity=10,
+        )
+        Transaction.objects.create(
+            buy_order=buy, sell_order=sell, stock=self.stock, price=Decimal("8500"),
+            quantity=10, total_value=Decimal("85000"), buyer=self.buyer, seller=self.seller,
+        )
+        PriceBar.objects.create(
+            stock=self.stock, interval="1m", start=self.hour - timedelta(days=3),
+            open_price=1, high=1, low=1, close=1, volume=1,
+        )
+
+        self.assertEqual(rebuild_price_bars(), 4)
+        self.assertEqual(PriceBar.objects.get(interval="1h").volume, 10)
+
+
+# =============================================================================
+# 9. تست کش payload نمودار (ETag / If-None-Match)
+# =============================================================================
+
+from datetime import date
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from . import chart_cache
+
+
+class TestChartPayloadCache(APITestCase):
+    """payload نمودار از کش سرو شود و فقط برای نماد معامله‌شده باطل شود."""
+
+    def setUp(self):
+        cache.clear()
+        self.stock = Stock.objects.create(
+            symbol="FOLD", name="Foolad", name_fa="فولاد مبارکه",
+            current_price=Decimal("8500"), previous_close=Decimal("8500"),
+            sector="Metals", sector_fa="فلزات",
+        )
+        PriceHistory.objects.create(
+            stock=self.stock, timestamp=date(2026, 1, 1),
+            open_price=Decimal("8400"), high=Decimal("8600"),
+            low=Decimal("8300"), close=Decimal("8500"), volume=1000,
+        )
+        self.url = "/api/v1/stocks/FOLD/history/?interval=1D"
+
+    def test_second_request_hits_cache(self):
+        """درخواست دوم فقط با lookup سهم (بدون کوئری کندل) سرو شود."""
+        first = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(self.url)
+
+        self.assertEqual(len(ctx.captured_queries), 1)  # Stock lookup
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second.json()[0]["close"], 8500.0)
+
+    def test_etag_not_modified(self):
+        """If-None-Match با ETag فعلی → 304 بدون body."""
+        first = self.client.get(self.url)
+        etag = first["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_bump_invalidates_only_symbol(self):
+        """bump نسخه‌ی یک نماد، کش نماد دیگر را باطل نکند."""
+        other = Stock.objects.create(
+            symbol="SHPN", name="Pars Oil", name_fa="شپنا",
+            current_price=Decimal("4500"), previous_close=Decimal("4500"),
+            sector="Oil", sector_fa="نفت",
+        )
+        other_key = chart_cache.payload_key(other.id, {"interval": "1D"})
+        chart_cache.set_payload(other_key, b"[]")
+
+        first = self.client.get(self.url)
+        PriceHistory.objects.filter(stock=self.stock).update(close=Decimal("9000"))
+        self.assertEqual(self.client.get(self.url).content, first.content)  # still cached
+
+        chart_cache.bump_chart_version(self.stock.id)
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()[0]["close"], 9000.0)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertEqual(
+            chart_cache.get_payload(chart_cache.payload_key(other.id, {"interval": "1D"}))[1],
+            b"[]",
+        )
+
+    def test_price_history_save_invalidates(self):
+        """ذخیره‌ی PriceHistory از طریق ORM کش را باطل کند."""
+        self.client.get(self.url)
+        record = PriceHistory.objects.get(stock=self.stock)
+        record.close = Decimal("8800")
+        record.save()
+
+        self.assertEqual(self.client.get(self.url).json()[0]["close"], 8800.0)
+
+    def test_matching_invalidates_after_commit(self):
+        """matching pass پس از commit نسخه‌ی نماد را bump کند."""
+        from orders.matching import _schedule_chart_invalidation
+
+        version = chart_cache.get_chart_version(self.stock.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            _schedule_chart_invalidation(self.stock)
+        self.assertEqual(chart_cache.get_chart_version(self.stock.id), version + 1)
+
+    def test_unknown_symbol_creates_no_keys(self):
+        """نماد ناموجود → 404 و هیچ کلیدی در کش ساخته نشود."""
+        cache.clear()
+        response = self.client.get("/api/v1/stocks/NOPE123/history/?interval=1D")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(len(cache._cache), 0)
+
+    def test_symbol_case_shares_version(self):
+        """fold و FOLD یک نسخه داشته باشند و bump هر دو را باطل کند."""
+        first = self.client.get(self.url)
+        lower = self.client.get("/api/v1/stocks/fold/history/?interval=1D")
+        self.assertEqual(lower["ETag"], first["ETag"])
+
+        PriceHistory.objects.filter(stock=self.stock).update(close=Decimal("9100"))
+        chart_cache.bump_chart_version(self.stock.id)
+        response = self.client.get(
+            "/api/v1/stocks/fold/history/?interval=1D", HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()[0]["close"], 9100.0)
+
+    @override_settings(STOCK_CHART_VERSION_TIMEOUT=60)
+    def test_version_key_expires(self):
+        """کلید نسخه timeout محدود داشته باشد."""
+        chart_cache.get_chart_version(self.stock.id)
+        key = cache.make_key(chart_cache.VERSION_KEY.format(stock_id=self.stock.id))
+        self.assertIsNotNone(cache._expire_info[key])
+
+
+# =============================================================================
+# 10. تست تجمیع برداری کندل‌ها (stocks/candles.py)
+# =============================================================================
+
+from . import candles
+
+
+class TestCandleAggregation(APITestCase):
+    """resample هفتگی/ماهانه/N دقیقه‌ای با NumPy درست کار کند."""
+
+    def setUp(self):
+        cache.clear()
+        self.stock = Stock.objects.create(
+            symbol="FOLD", name="Foolad", name_fa="فولاد مبارکه",
+            current_price=Decimal("8500"), previous_close=Decimal("8500"),
+            sector="Metals", sector_fa="فلزات",
+        )
+        # 2026-01-26 (Mon) .. 2026-02-08 (Sun): two ISO weeks, two months
+        for day in range(14):
+            PriceHistory.objects.create(
+                stock=self.stock, timestamp=date(2026, 1, 26) + timedelta(days=day),
+                open_price=Decimal(100 + day), high=Decimal(110 + day),
+                low=Decimal(90 + day), close=Decimal(105 + day), volume=10,
+            )
+
+    def test_weekly(self):
+        """هر هفته‌ی ISO از دوشنبه شروع شود و OHLCV آن درست باشد."""
+        weekly = candles.to_payload(candles.weekly(candles.load_daily("FOLD", limit=30)))
+        self.assertEqual(len(weekly), 2)
+        self.assertEqual(weekly[0]["timestamp"], "2026-01-26T00:00:00")
+        self.assertEqual(weekly[1]["timestamp"], "2026-02-02T00:00:00")
+        self.assertEqual(
+            (weekly[0]["open"], weekly[0]["high"], weekly[0]["low"], weekly[0]["close"]),
+            (100.0, 116.0, 90.0, 111.0),
+        )
+        self.assertEqual(weekly[0]["volume"], 70)
+
+    def test_monthly_endpoint(self):
+        """interval=1M کندل ماهانه برگرداند."""
+        response = self.client.get("/api/v1/stocks/FOLD/history/?interval=1M")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual([c["timestamp"] for c in data], ["2026-01-26T00:00:00", "2026-02-01T00:00:00"])
+        self.assertEqual([c["volume"] for c in data], [60, 80])
+        self.assertEqual(data[1]["open"], 106.0)
+        self.assertEqual(data[1]["close"], 118.0)
+
+    def test_daily_payload_unchanged(self):
+        """خروجی روزانه همان قالب قبلی را داشته باشد."""
+        data = self.client.get("/api/v1/stocks/FOLD/history/?interval=1D").json()
+        self.assertEqual(len(data), 14)
+        self.assertEqual(
+            data[0],
+            {
+                "timestamp": "2026-01-26T00:00:00",
+                "open": 100.0, "high": 110.0, "low": 90.0, "close": 105.0, "volume": 10,
+            },
+        )
+
+    def test_roll_up_aligned_to_epoch(self):
+        """roll_up باید bucketها را با مضرب‌های epoch هم‌تراز کند."""
+        start = datetime(2026, 1, 1, 10, 15, tzinfo=dt_timezone.utc)
+        for i in range(4):  # 10:15, 10:30, 10:45, 11:00
+            PriceBar.objects.create(
+                stock=self.stock, interval="15m", start=start + timedelta(minutes=15 * i),
+                open_price=Decimal(100 + i), high=Decimal(200 + i), low=Decimal(50 - i),
+                close=Decimal(101 + i), volume=1, trade_count=1,
+            )
+        bars = candles.load_bars("FOLD", "15m", start - timedelta(days=1), limit=10)
+        payload = candles.to_payload(candles.roll_up(bars, 30 * 60), utc=True)
+
+        self.assertEqual(
+            [c["timestamp"] for c in payload],
+            ["2026-01-01T10:00:00+00:00", "2026-01-01T10:30:00+00:00", "2026-01-01T11:00:00+00:00"],
+        )
+        self.assertEqual(payload[1]["open"], 101.0)
+        self.assertEqual(payload[1]["high"], 202.0)
+        self.assertEqual(payload[1]["low"], 48.0)
+        self.assertEqual(payload[1]["close"], 103.0)
+        self.assertEqual(payload[1]["volume"], 2)
+
+    def test_arbitrary_interval_endpoint(self):
+        """interval=30m از کندل‌های 15m ساخته شود؛ بازه‌ی نامعتبر به 1D برگردد."""
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+        for i in range(4):
+            PriceBar.objects.create(
+                stock=self.stock, interval="15m", start=hour + timedelta(minutes=15 * i),
+                open_price=Decimal(100), high=Decimal(100 + i), low=Decimal(100),
+                close=Decimal(100), volume=i + 1, trade_count=1,
+            )
+
+        data = self.client.get("/api/v1/stocks/FOLD/history/?interval=30m").json()
+        self.assertEqual([c["volume"] for c in data], [3, 7])
+        self.assertEqual([c["high"] for c in data], [101.0, 103.0])
+
+        # 7m is rolled up from 1m; 90s is not a valid interval
+        self.assertEqual(self.client.get("/api/v1/stocks/FOLD/history/?interval=7m").json(), [])
+        fallback = self.client.get("/api/v1/stocks/FOLD/history/?interval=90s").json()
+        self.assertEqual(len(fallback), 14)
+
+    def test_empty(self):
+        """نماد بدون داده لیست خالی برگرداند."""
+        self.assertEqual(candles.to_payload(candles.weekly(candles.load_daily("NONE", limit=30))), [])
+        self.assertEqual(candles.to_payload(candles.roll_up(
+            candles.load_bars("NONE", "1h", timezone.now(), limit=10), 4 * 3600,
+        )), [])
+
+
+# =============================================================================
+# 11. تست کوئری بازه‌ی تاریخ و downsampling تاریخچه
+# =============================================================================
+
+
+class TestHistoryRange(APITestCase):
+    """from/to/days و max_points روی endpoint تاریخچه."""
+
+    url = "/api/v1/stocks/FOLD/history/"
+
+    def setUp(self):
+        cache.clear()
+        self.stock = Stock.objects.create(
+            symbol="FOLD", name="Foolad", name_fa="فولاد مبارکه",
+            current_price=Decimal("8500"), previous_close=Decimal("8500"),
+            sector="Metals", sector_fa="فلزات",
+        )
+        # 2025-01-01 .. 2025-02-09 (40 days), close = 100 + day
+        PriceHistory.objects.bulk_create([
+            PriceHistory(
+                stock=self.stock, timestamp=date(2025, 1, 1) + timedelta(days=day),
+                open_price=Decimal(100 + day), high=Decimal(200 + day),
+                low=Decimal(50 + day), close=Decimal(100 + day), volume=1,
+            )
+            for day in range(40)
+        ])
+
+    def test_default_returns_newest(self):
+        """بدون بازه، جدیدترین کندل‌ها برگردند (نه قدیمی‌ترین‌ها)."""
+        data = self.client.get(self.url, {"interval": "1D"}).json()
+        self.assertEqual(len(data), 30)
+        self.assertEqual(data[0]["timestamp"], "2025-01-11T00:00:00")
+        self.assertEqual(data[-1]["timestamp"], "2025-02-09T00:00:00")
+
+    def test_from_to(self):
+        """from/to هر دو شامل باشند."""
+        data = self.client.get(
+            self.url, {"interval": "1D", "from": "2025-01-05", "to": "2025-01-07"}
+        ).json()
+        self.assertEqual(
+            [c["timestamp"] for c in data],
+            ["2025-01-05T00:00:00", "2025-01-06T00:00:00", "2025-01-07T00:00:00"],
+        )
+
+    def test_days_counts_back_from_to(self):
+        """days بازه را از to به عقب تعیین کند."""
+        data = self.client.get(self.url, {"interval": "1D", "to": "2025-01-10", "days": 3}).json()
+        self.assertEqual(
+            [c["timestamp"][:10] for c in data], ["2025-01-08", "2025-01-09", "2025-01-10"]
+        )
+
+    def test_max_points_preserves_ohlc(self):
+        """downsampling سقف تعداد نقاط را رعایت کند و high/low/volume حفظ شوند."""
+        data = self.client.get(
+            self.url, {"interval": "1D", "from": "2025-01-01", "max_points": 7}
+        ).json()
+        self.assertEqual(len(data), 7)
+        self.assertEqual(data[0]["open"], 100.0)
+        self.assertEqual(data[-1]["close"], 139.0)
+        self.assertEqual(max(c["high"] for c in data), 239.0)
+        self.assertEqual(min(c["low"] for c in data), 50.0)
+        self.assertEqual(sum(c["volume"] for c in data), 40)
+
+    def test_intraday_range(self):
+        """بازه‌ی datetime روی کندل‌های intraday هم کار کند (to انحصاری)."""
+        start = datetime(2025, 1, 1, 10, 0, tzinfo=dt_timezone.utc)
+        PriceBar.objects.bulk_create([
+            PriceBar(
+                stock=self.stock, interval="1h", start=start + timedelta(hours=i),
+                open_price=1, high=1, low=1, close=1, volume=1,
+            )
+            for i in range(6)
+        ])
+        data = self.client.get(
+            self.url,
+            {"interval": "1h", "from": "2025-01-01T11:00:00Z", "to": "2025-01-01T14:00:00Z"},
+        ).json()
+        self.assertEqual(
+            [c["timestamp"] for c in data],
+            [
+                "2025-01-01T11:00:00+00:00",
+                "2025-01-01T12:00:00+00:00",
+                "2025-01-01T13:00:00+00:00",
+            ],
+        )
+
+    def test_invalid_params(self):
+        """پارامتر نامعتبر → 400."""
+        for params in (
+            {"from": "yesterday"},
+            {"days": "-1"},
+            {"max_points": "abc"},
+            {"from": "2025-02-01", "to": "2025-01-01"},
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_out_of_range_params(self):
+        """مقادیر خارج از محدوده‌ی datetime باید 400 بدهند، نه 500."""
+        for params in (
+            {"days": "99999999"},
+            {"days": "1000000000000"},
+            {"to": "9999-12-31"},
+            {"to": "0001-01-01", "days": "30"},
+            {"interval": "1h", "to": "0001-01-01T00:00:00"},
+            {"interval": "1D", "to": "0001-01-01T00:00:00Z"},
+            {"from": "9999-12-31T23:00:00-05:00"},
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+        # Very wide intraday intervals are bounded by MAX_HISTORY_DAYS
+        response = self.client.get(self.url, {"interval": "999999h"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_downsample_noop_when_small(self):
+        """وقتی تعداد کندل‌ها کمتر از max_points است تغییری ندهد."""
+        daily = candles.load_daily("FOLD", limit=5)
+        self.assertIs(candles.downsample(daily, 10), daily)
+
+
+# =============================================================================
+# 12. تست خروجی حجیم داده‌های بازار (stocks/export.py)
+# =============================================================================
+
+import csv
+import io
+import os
+import tempfile
+import unittest
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from . import export
+
+
+class TestMarketDataExport(APITestCase):
+    """خروجی streaming تاریخچه و معاملات با فیلتر نماد و بازه‌ی تاریخ."""
+
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        from orders.models import Order
+        from transactions.models import Transaction
+
+        User = get_user_model()
+        self.admin = User.objects.create_user(
+            username="exportadmin", email="exportadmin@test.com",
+            password="TestPass1234!", is_staff=True,
+        )
+        self.user = User.objects.create_user(
+            username="exportuser", email="exportuser@test.com", password="TestPass1234!",
+        )
+        self.stocks = {
+            symbol: Stock.objects.create(
+                symbol=symbol, name=symbol, name_fa=symbol,
+                current_price=Decimal("100"), previous_close=Decimal("100"),
+                sector="Metals", sector_fa="فلزات",
+            )
+            for symbol in ("FOLD", "SHPN")
+        }
+        for stock in self.stocks.values():
+            PriceHistory.objects.bulk_create([
+                PriceHistory(
+                    stock=stock, timestamp=date(2025, 1, 1) + timedelta(days=day),
+                    open_price=Decimal("100.50"), high=Decimal("110"),
+                    low=Decimal("90"), close=Decimal(100 + day), volume=day,
+                )
+                for day in range(5)
+            ])
+
+        buy = Order.objects.create(
+            user=self.user, stock=self.stocks["FOLD"], type="buy",
+            price=Decimal("100"), quantity=3,
+        )
+        sell = Order.objects.create(
+            user=self.admin, stock=self.stocks["FOLD"], type="sell",
+            price=Decimal("100"), quantity=3,
+        )
+        self.trade = Transaction.objects.create(
+            buy_order=buy, sell_order=sell, stock=self.stocks["FOLD"],
+            price=Decimal("100"), quantity=3, total_value=Decimal("300"),
+            buyer=self.user, seller=self.admin,
+        )
+
+    def _csv(self, response):
+        body = b"".join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(body)))
+
+    def test_admin_only(self):
+        """فقط ادمین به خروجی دسترسی داشته باشد."""
+        url = "/api/v1/stocks/export/price_history.csv"
+        self.assertIn(
+            self.client.get(url).status_code,
+            (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN),
+        )
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(STOCK_EXPORT_CHUNK_SIZE=2)
+    def test_price_history_csv(self):
+        """CSV تاریخچه با فیلتر نماد و بازه، به‌صورت چند chunk استریم شود."""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(
+            "/api/v1/stocks/export/price_history.csv",
+            {"symbols": "fold", "from": "2025-01-02", "to": "2025-01-04"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="price_history.csv"', response["Content-Disposition"])
+
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 2)  # 3 rows, 2 per chunk
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual(rows[0], ["symbol", "date", "open", "high", "low", "close", "volume"])
+        self.assertEqual(rows[1], ["FOLD", "2025-01-02", "100.50", "110.00", "90.00", "101.00", "1"])
+        self.assertEqual([row[1] for row in rows[1:]], ["2025-01-02", "2025-01-03", "2025-01-04"])
+
+    def test_trades_csv(self):
+        """CSV معاملات شامل شناسه و زمان اجرا باشد."""
+        self.client.force_authenticate(user=self.admin)
+        rows = self._csv(self.client.get("/api/v1/stocks/export/trades.csv"))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], str(self.trade.id))
+        self.assertEqual(rows[1][1:2] + rows[1][3:], ["FOLD", "100.00", "3", "300.00", "pending"])
+
+        empty = self._csv(self.client.get(
+            "/api/v1/stocks/export/trades.csv", {"to": "2000-01-01"}
+        ))
+        self.assertEqual(empty, [["id", "symbol", "executed_at", "price", "quantity", "total_value", "status"]])
+
+    def test_invalid_requests(self):
+        """dataset/format ناشناخته → 404، تاریخ نامعتبر یا خارج از بازه → 400."""
+        self.client.force_authenticate(user=self.admin)
+        self.assertEqual(
+            self.client.get("/api/v1/stocks/export/users.csv").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(
+            self.client.get("/api/v1/stocks/export/trades.xlsx").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(
+            self.client.get("/api/v1/stocks/export/trades.csv", {"from": "2025-13-01"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        # آخرین تاریخ قابل‌نمایش: به‌جای OverflowError (500) → 400
+        self.assertEqual(
+            self.client.get("/api/v1/stocks/export/trades.csv", {"to": "9999-12-31"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def test_arrow_formats_gated_without_pyarrow(self):
+        """بدون pyarrow (requirements-export.txt): arrow/parquet → 501 و CommandError."""
+        from django.core.management.base import CommandError
+
+        self.client.force_authenticate(user=self.admin)
+        with patch("stocks.export.arrow_available", return_value=False):
+            for file_format in ("arrow", "parquet"):
+                response = self.client.get(f"/api/v1/stocks/export/trades.{file_format}")
+                self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+                self.assertIn("pyarrow", response.json()["error"])
+            self.assertEqual(
+                self.client.get("/api/v1/stocks/export/trades.csv").status_code,
+                status.HTTP_200_OK,
+            )
+            with self.assertRaises(CommandError):
+                call_command(
+                    "export_market_data", "trades", "--format", "parquet",
+                    stdout=io.StringIO(),
+                )
+
+    @unittest.skipUnless(export.arrow_available(), "pyarrow not installed")
+    @override_settings(STOCK_EXPORT_CHUNK_SIZE=3)
+    def test_arrow_and_parquet(self):
+        """خروجی Arrow IPC و Parquet با pyarrow خوانده شود."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get("/api/v1/stocks/export/price_history.arrow")
+        table = pa.ipc.open_stream(b"".join(response.streaming_content)).read_all()
+        self.assertEqual(table.num_rows, 10)
+        self.assertEqual(table.column("close").to_pylist()[:2], [Decimal("100.00"), Decimal("101.00")])
+
+        response = self.client.get("/api/v1/stocks/export/trades.parquet")
+        table = pq.read_table(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(table.column("id").to_pylist(), [str(self.trade.id)])
+        self.assertEqual(table.column("quantity").to_pylist(), [3])
+
+    def test_management_command(self):
+        """command خروجی را در فایل بنویسد و نماد ناشناخته را رد کند."""
+        from django.core.management.base import CommandError
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.csv")
+            call_command(
+                "export_market_data", "price_history", "--symbol", "SHPN",
+                "--from", "2025-01-04", "-o", path, stdout=io.StringIO(),
+            )
+            with open(path, newline="") as f:
+                rows = list(csv.reader(f))
+        self.assertEqual([row[:2] for row in rows[1:]], [["SHPN", "2025-01-04"], ["SHPN", "2025-01-05"]])
+
+        with self.assertRaises(CommandError):
+            call_command("export_market_data", "trades", "--symbol", "NOPE", stdout=io.StringIO())
+        with self.assertRaises(CommandError):
+            call_command("export_market_data", "trades", "--to", "9999-12-31", stdout=io.StringIO())
@@ -8,6 +8,11 @@ urlpatterns = [
     # Public endpoints
     path("", views.StockListView.as_view(), name="stock_list"),
     path("stats/", views.market_stats, name="market_stats"),
+    path(
+        "export/<slug:dataset>.<slug:file_format>",
+        views.export_market_data,
+        name="export_market_data",
+    ),
     path("<str:symbol>/", views.StockDetailView.as_view(), name="stock_detail"),
     path("<str:symbol>/history/", views.StockPriceHistoryView.as_view(), name="stock_price_history"),
     # Admin endpoints
@@ -3,56 +3,145 @@ Utility functions for broadcasting stock price updates via WebSocket.
 Sprint 5 - Real-time stock price push.
 
 Called from the matching engine (orders/matching.py) after updating
-stock prices, to push live data to all connected WebSocket clients.
+stock prices, to push live data to connected WebSocket clients.
+
+Groups:
+  - "stock_prices"          → clients that did not subscribe (whole market)
+  - "stock_prices_<SYMBOL>" → clients subscribed to that symbol
+
+Conflation:
+  Updates are not sent one by one. ``TickerConflator`` keeps only the latest
+  state per symbol and flushes every ``STOCK_TICKER_FLUSH_INTERVAL`` seconds:
+  one message per changed symbol group plus a single batched message for the
+  whole-market group, all in one event-loop hop. A burst of 200 fills on one
+  symbol therefore costs at most two channel layer sends per interval.
 """
 
+import atexit
 import logging
+import threading
 
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+STOCK_PRICES_GROUP = "stock_prices"
 
-def broadcast_stock_price(stock):
+
+def symbol_group_name(symbol):
+    """Channel layer group for a single symbol's price updates."""
+    return f"{STOCK_PRICES_GROUP}_{symbol.upper()}"
+
+
+def serialize_stock_price(stock):
+    """Ticker payload (matching frontend Stock interface - camelCase)."""
+    return {
+        "symbol": stock.symbol,
+        "name": stock.name,
+        "nameFa": stock.name_fa,
+        "currentPrice": float(stock.current_price),
+        "previousClose": float(stock.previous_close),
+        "change": float(stock.change),
+        "changePercent": float(stock.change_percent),
+        "volume": stock.volume,
+        "high24h": float(stock.high_24h),
+        "low24h": float(stock.low_24h),
+    }
+
+
+class TickerConflator:
     """
-    Broadcast updated stock price to all WebSocket clients.
+    Coalesces ticker updates per symbol and flushes them on a timer.
 
-    Args:
-        stock: Stock model instance with updated price data
+    ``publish`` only records the latest payload of a symbol; the first
+    publish after a flush arms a one-shot timer, so an idle process runs no
+    background thread.
     """
+
+    def __init__(self):
+        self._pending = {}  # symbol -> latest payload
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @staticmethod
+    def interval():
+        return float(getattr(settings, "STOCK_TICKER_FLUSH_INTERVAL", 0) or 0)
+
+    def publish(self, data):
+        interval = self.interval()
+        with self._lock:
+            self._pending[data["symbol"]] = data
+            if interval > 0 and self._timer is None:
+                self._timer = threading.Timer(interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if interval <= 0:
+            self.flush()
+
+    def flush(self):
+        """Send every pending update now; returns the number of symbols sent."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return 0
+        _send_tickers(list(pending.values()))
+        return len(pending)
+
+
+_conflator = TickerConflator()
+atexit.register(_conflator.flush)
+
+
+def get_ticker_conflator():
+    return _conflator
+
+
+def _send_tickers(tickers):
     try:
         channel_layer = get_channel_layer()
         if channel_layer is None:
             logger.debug("No channel layer available, skipping stock WS broadcast")
             return
 
-        # Serialize stock data (matching frontend Stock interface - camelCase)
-        data = {
-            "symbol": stock.symbol,
-            "name": stock.name,
-            "nameFa": stock.name_fa,
-            "currentPrice": float(stock.current_price),
-            "previousClose": float(stock.previous_close),
-            "change": float(stock.change),
-            "changePercent": float(stock.change_percent),
-            "volume": stock.volume,
-            "high24h": float(stock.high_24h),
-            "low24h": float(stock.low_24h),
-        }
-
-        async_to_sync(channel_layer.group_send)(
-            "stock_prices",
-            {
-                "type": "stock.price.update",
-                "data": data,
-            },
+        messages = [
+            (
+                symbol_group_name(data["symbol"]),
+                {"type": "stock.price.update", "data": data},
+            )
+            for data in tickers
+        ]
+        messages.append(
+            (STOCK_PRICES_GROUP, {"type": "stock.price.batch", "data": tickers})
         )
+
+        async def _send_all():
+            for group, message in messages:
+                await channel_layer.group_send(group, message)
+
+        async_to_sync(_send_all)()
         logger.info(
-            "Broadcast stock price update: %s @ %s",
-            stock.symbol,
-            stock.current_price,
+            "Broadcast stock price update(s): %s",
+            ", ".join(f"{d['symbol']} @ {d['currentPrice']}" for d in tickers),
         )
     except Exception as e:
         # Never let WebSocket broadcasting break the main flow
         logger.warning("Failed to broadcast stock price via WebSocket: %s", e)
+
+
+def broadcast_stock_price(stock):
+    """
+    Queue an updated stock price for the symbol's subscribers and the
+    clients following the whole market (sent on the next conflated flush).
+
+    Args:
+        stock: Stock model instance with updated price data
+    """
+    try:
+        _conflator.publish(serialize_stock_price(stock))
+    except Exception as e:
+        logger.warning("Failed to queue stock price broadcast: %s", e)
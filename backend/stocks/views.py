@@ -1,23 +1,47 @@
-from datetime import datetime, timedelta
+import json
+import math
+import re
+from datetime import datetime, time, timedelta, timezone as dt_timezone
 from decimal import Decimal
 
 from django.db.models import Sum
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
-from .models import PriceHistory, Stock
+from . import candles, chart_cache, export
+from .bars import BAR_INTERVALS, base_interval
+from .models import Stock
 
-# Interval config: (limit_days, points_to_return, intraday_candles_per_day)
+# Interval config: (limit_days, points_to_return, kind), the default window
+# (newest candles) when no range (?from= / ?days=) is given
+# kind: "bars" = intraday candles from PriceBar (stocks/bars.py),
+#       "daily" = PriceHistory rows, "weekly"/"monthly" = PriceHistory resampled
+# Other "<N>m" / "<N>h" intervals are rolled up from PriceBar with
+# DEFAULT_INTRADAY_POINTS candles.
 INTERVAL_CONFIG = {
-    "1m": (1, 60, 60 * 24),
-    "5m": (1, 72, 12 * 24),
-    "15m": (3, 96, 4 * 24),
-    "1h": (7, 168, 24),
-    "4h": (14, 42, 6),
-    "1D": (30, 30, 1),
-    "1W": (90, 12, 0),  # 0 = aggregate weekly
+    "1m": (1, 60, "bars"),
+    "5m": (1, 72, "bars"),
+    "15m": (3, 96, "bars"),
+    "1h": (7, 168, "bars"),
+    "4h": (14, 42, "bars"),
+    "1D": (30, 30, "daily"),
+    "1W": (90, 12, "weekly"),
+    "1M": (365, 12, "monthly"),
 }
+DEFAULT_INTRADAY_POINTS = 120
+INTRADAY_INTERVAL_RE = re.compile(r"^(\d{1,6})([mh])$")
+# Range queries (?from= / ?to= / ?days=): candles are downsampled to
+# ?max_points= (at most MAX_HISTORY_POINTS) from at most MAX_HISTORY_ROWS
+# stored rows (the newest ones in the range)
+MAX_HISTORY_POINTS = 1000
+MAX_HISTORY_ROWS = 100_000
+# Longest lookback (?days= and interval windows), in days
+MAX_HISTORY_DAYS = 100 * 366
 from .serializers import (
     MarketStatsSerializer,
     PriceHistorySerializer,
@@ -47,110 +71,206 @@ class StockDetailView(generics.RetrieveAPIView):
     lookup_field = "symbol"
 
 
-def _synthesize_intraday(daily_records, candles_per_day):
-    """Generate intraday OHLC candles from daily data."""
-    result = []
-    for rec in daily_records:
-        o, h, l, c = float(rec.open_price), float(rec.high), float(rec.low), float(rec.close)
-        base_ts = datetime.combine(rec.timestamp, datetime.min.time())
-        vol_per = rec.volume // candles_per_day if candles_per_day else 0
-
-        for i in range(candles_per_day):
-            t = i / candles_per_day
-            # Simple interpolation
-            price = o + (c - o) * t + (h - max(o, c)) * (0.5 - abs(t - 0.5) * 2)
-            p2 = o + (c - o) * ((i + 1) / candles_per_day)
-            ts = base_ts + timedelta(hours=24 * i / candles_per_day)
-            result.append({
-                "timestamp": ts.isoformat(),
-                "open": round(price, 2),
-                "high": round(max(price, p2) * 1.002, 2),
-                "low": round(min(price, p2) * 0.998, 2),
-                "close": round(p2, 2),
-                "volume": vol_per,
-            })
-    return result
-
-
-def _aggregate_weekly(daily_records):
-    """Aggregate daily OHLC into weekly candles."""
-    from collections import defaultdict
-
-    by_week = defaultdict(list)
-    for rec in daily_records:
-        dt = rec.timestamp
-        week_key = (dt.year, dt.isocalendar()[1])
-        by_week[week_key].append(rec)
-
-    result = []
-    for (y, w), recs in sorted(by_week.items()):
-        recs_sorted = sorted(recs, key=lambda r: r.timestamp)
-        o = float(recs_sorted[0].open_price)
-        c = float(recs_sorted[-1].close)
-        h = max(float(r.high) for r in recs_sorted)
-        low = min(float(r.low) for r in recs_sorted)
-        vol = sum(r.volume for r in recs_sorted)
-        ts = recs_sorted[0].timestamp
-        result.append({
-            "timestamp": datetime.combine(ts, datetime.min.time()).isoformat(),
-            "open": o, "high": h, "low": low, "close": c, "volume": vol,
-        })
-    return result[-12:]  # last 12 weeks
+def _interval_config(interval):
+    """``(limit_days, max_points, kind, seconds)``; unknown intervals fall back to 1D."""
+    match = INTRADAY_INTERVAL_RE.match(interval)
+    seconds = None
+    if match:
+        seconds = int(match.group(1)) * (60 if match.group(2) == "m" else 3600)
+        if seconds == 0 or base_interval(seconds) is None:
+            seconds = None
+    if interval in INTERVAL_CONFIG:
+        return (*INTERVAL_CONFIG[interval], seconds)
+    if seconds is not None:
+        limit_days = min(
+            math.ceil(seconds * DEFAULT_INTRADAY_POINTS / 86400), MAX_HISTORY_DAYS
+        )
+        return limit_days, DEFAULT_INTRADAY_POINTS, "bars", seconds
+    return (*INTERVAL_CONFIG["1D"], None)
+
+
+def _shift(moment, delta):
+    """``moment + delta``; ``ValueError`` (-> 400) when out of the datetime range."""
+    try:
+        return moment + delta
+    except OverflowError:
+        raise ValueError("Date out of range") from None
+
+
+def _parse_bound(value, end=False):
+    """
+    ``from`` / ``to`` value (ISO date or datetime) -> aware datetime.
+
+    A bare date means its UTC midnight; as an upper bound, the end of that
+    day (bounds are returned half-open: ``[start, end)``).
+    """
+    if value is None:
+        return None
+    try:
+        day = parse_date(value)
+        if day is not None:
+            parsed = datetime.combine(day, time.min)
+            if end:
+                parsed = _shift(parsed, timedelta(days=1))
+        else:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                raise ValueError
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}") from None
+    if timezone.is_naive(parsed):
+        return timezone.make_aware(parsed, dt_timezone.utc)
+    try:
+        return parsed.astimezone(dt_timezone.utc)
+    except OverflowError:
+        raise ValueError("Date out of range") from None
+
+
+def _positive_int(params, name, maximum=None):
+    value = params.get(name)
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise ValueError(f"{name} must be a positive integer")
+    if maximum is not None and value > maximum:
+        raise ValueError(f"{name} must be at most {maximum}")
+    return value
+
+
+def _history_query(params):
+    """
+    Validate the history query string.
+
+    Returns:
+        ``(interval, start, end, max_points)``; ``start`` / ``end`` are aware
+        datetimes (half-open range, ``None`` = open) and ``start`` is only
+        set for range queries (``from`` or ``days``).
+
+    Raises:
+        ValueError: message for the client.
+    """
+    start = _parse_bound(params.get("from"))
+    end = _parse_bound(params.get("to"), end=True)
+    days = _positive_int(params, "days", MAX_HISTORY_DAYS)
+    max_points = _positive_int(params, "max_points")
+    if max_points is not None:
+        max_points = min(max_points, MAX_HISTORY_POINTS)
+    if start is None and days is not None:
+        start = _shift(end or timezone.now(), -timedelta(days=days))
+    if start is not None and end is not None and start >= end:
+        raise ValueError("from must be before to")
+    return params.get("interval", "1D"), start, end, max_points
+
+
+def _bar_candles(symbol, seconds, limit_days, max_points, start, end):
+    """
+    Real intraday candles from ``PriceBar``: one range scan over the widest
+    stored interval dividing ``seconds``, rolled up when wider (e.g. 4h
+    from 1h).
+    """
+    base = base_interval(seconds)
+    per_candle = seconds // BAR_INTERVALS[base]
+
+    if start is not None:
+        bars = candles.load_bars(symbol, base, start, end, MAX_HISTORY_ROWS)
+    else:
+        since = _shift(end or timezone.now(), -timedelta(days=limit_days))
+        bars = candles.load_bars(symbol, base, since, end, max_points * per_candle)
+    if per_candle > 1:
+        bars = candles.roll_up(bars, seconds)
+    return bars if start is not None else bars.tail(max_points)
+
+
+def _daily_candles(symbol, kind, limit_days, max_points, start, end):
+    """1D / 1W / 1M candles from ``PriceHistory``."""
+    # PriceHistory is dated (UTC days): [start, end) -> inclusive date range
+    last_day = None
+    if end is not None:
+        last_day = _shift(end, -timedelta(microseconds=1)).astimezone(dt_timezone.utc).date()
+    if start is not None:
+        first_day = start.astimezone(dt_timezone.utc).date()
+        daily = candles.load_daily(symbol, first_day, last_day, MAX_HISTORY_ROWS)
+    elif kind == "daily":
+        return candles.load_daily(symbol, end=last_day, limit=max_points)
+    else:
+        daily = candles.load_daily(symbol, end=last_day, limit=limit_days + 14)
+
+    if kind == "weekly":
+        daily = candles.weekly(daily)
+    elif kind == "monthly":
+        daily = candles.monthly(daily)
+    return daily if start is not None else daily.tail(max_points)
 
 
 class StockPriceHistoryView(generics.ListAPIView):
-    """Get price history for a stock. Supports interval: 1m, 5m, 15m, 1h, 4h, 1D, 1W."""
+    """
+    Get price history for a stock. Supports interval: 1m, 5m, 15m, 1h, 4h,
+    1D, 1W, 1M and any other ``<N>m`` / ``<N>h`` that a stored bar interval
+    divides (e.g. 30m, 2h).
+
+    Intraday intervals are real candles built from executed trades
+    (``PriceBar``); 1D/1W/1M come from ``PriceHistory``. Aggregation is
+    vectorized (stocks/candles.py).
+
+    Query params:
+      - ``from`` / ``to``: ISO date or datetime; ``days``: lookback from
+        ``to`` (or now) when ``from`` is not given. Without a range the
+        newest ``INTERVAL_CONFIG`` candles (up to ``to``) are returned
+      - ``max_points``: OHLC-preserving downsampling of the result
+        (capped at ``MAX_HISTORY_POINTS``)
+
+    Payloads are served pre-serialized from the chart cache
+    (stocks/chart_cache.py) with an ETag; ``If-None-Match`` gets a 304.
+    """
 
     serializer_class = PriceHistorySerializer
     permission_classes = [permissions.AllowAny]
     pagination_class = None
 
     def list(self, request, *args, **kwargs):
-        symbol = kwargs["symbol"]
-        interval = request.query_params.get("interval", "1D")
-        days = int(request.query_params.get("days", 30))
-
-        config = INTERVAL_CONFIG.get(interval, INTERVAL_CONFIG["1D"])
-        limit_days, max_points, intraday = config
-
-        qs = (
-            PriceHistory.objects.filter(stock__symbol=symbol)
-            .order_by("timestamp")[: limit_days * 2 if intraday else limit_days + 14]
+        # Canonical stock first: cache keys are per existing stock id
+        stock_id, symbol = get_object_or_404(
+            Stock.objects.values_list("id", "symbol"), symbol=kwargs["symbol"].upper()
         )
-        records = list(qs)
-
-        if intraday == 0 and interval == "1W":
-            data = _aggregate_weekly(records)
-        elif intraday > 1:
-            data = _synthesize_intraday(records[:limit_days], min(intraday, 24 * 60))
-            data = data[-max_points:]
-        elif intraday == 1:
-            # Daily - use as-is
-            data = [
-                {
-                    "timestamp": datetime.combine(r.timestamp, datetime.min.time()).isoformat(),
-                    "open": float(r.open_price),
-                    "high": float(r.high),
-                    "low": float(r.low),
-                    "close": float(r.close),
-                    "volume": r.volume,
-                }
-                for r in records[:max_points]
-            ]
+        try:
+            query = _history_query(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        key = chart_cache.payload_key(stock_id, request.query_params)
+        entry = chart_cache.get_payload(key)
+        if entry is None:
+            try:
+                payload = self._candles(symbol, query)
+            except ValueError as exc:
+                return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+            body = json.dumps(payload, separators=(",", ":")).encode()
+            entry = chart_cache.set_payload(key, body)
+
+        etag, body = entry
+        if_none_match = request.headers.get("If-None-Match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            response = HttpResponseNotModified()
         else:
-            data = [
-                {
-                    "timestamp": datetime.combine(r.timestamp, datetime.min.time()).isoformat(),
-                    "open": float(r.open_price),
-                    "high": float(r.high),
-                    "low": float(r.low),
-                    "close": float(r.close),
-                    "volume": r.volume,
-                }
-                for r in records[:max_points]
-            ]
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"  # always revalidate with If-None-Match
+        return response
 
-        return Response(data)
+    def _candles(self, symbol, query):
+        interval, start, end, max_points = query
+        limit_days, default_points, kind, seconds = _interval_config(interval)
+
+        if kind == "bars":
+            result = _bar_candles(symbol, seconds, limit_days, default_points, start, end)
+        else:
+            result = _daily_candles(symbol, kind, limit_days, default_points, start, end)
+        result = candles.downsample(result, max_points or MAX_HISTORY_POINTS)
+        return candles.to_payload(result, utc=kind == "bars")
 
 
 @api_view(["GET"])
@@ -208,3 +328,53 @@ class AdminStockDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = StockAdminSerializer
     permission_classes = [permissions.IsAdminUser]
     lookup_field = "symbol"
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def export_market_data(request, dataset, file_format):
+    """
+    Stream ``price_history`` / ``trades`` as ``csv``, ``arrow`` or
+    ``parquet`` (stocks/export.py), e.g.
+    ``/stocks/export/trades.csv?symbols=FOLD,SHPN&from=2025-01-01&to=2025-12-31``.
+
+    ``arrow`` / ``parquet`` answer 501 unless pyarrow is installed
+    (requirements-export.txt).
+    """
+    if dataset not in export.COLUMNS or file_format not in export.CONTENT_TYPES:
+        return Response({"error": "Unknown export"}, status=status.HTTP_404_NOT_FOUND)
+    if file_format != "csv" and not export.arrow_available():
+        return Response(
+            {"error": f"{file_format} export requires pyarrow"},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    bounds = {}
+    for name in ("from", "to"):
+        value = request.query_params.get(name)
+        try:
+            bounds[name] = parse_date(value) if value else None
+        except ValueError:
+            bounds[name] = None
+        if value and bounds[name] is None:
+            return Response(
+                {"error": f"Invalid date: {value}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+    symbols = [
+        symbol.strip().upper()
+        for symbol in request.query_params.get("symbols", "").split(",")
+        if symbol.strip()
+    ]
+
+    try:
+        chunks = export.stream_export(
+            dataset, file_format, symbols, bounds["from"], bounds["to"]
+        )
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    response = StreamingHttpResponse(
+        chunks, content_type=export.CONTENT_TYPES[file_format]
+    )
+    response["Content-Disposition"] = f'attachment; filename="{dataset}.{file_format}"'
+    return response
@@ -0,0 +1,33 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_notifications(apps, schema_editor):
+    """Set every counter from the actual number of unread notifications."""
+    User = apps.get_model("users", "User")
+    Notification = apps.get_model("notifications", "Notification")
+    User.objects.update(
+        unread_notifications=Coalesce(
+            Subquery(
+                Notification.objects.filter(user=OuterRef("pk"), read=False)
+                .order_by()
+                .values("user")
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            Value(0),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_user_unread_notifications"),
+        ("notifications", "0004_notification_archive_and_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_unread_notifications, migrations.RunPython.noop),
+    ]
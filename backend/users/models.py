@@ -20,6 +20,9 @@ class User(AbstractUser):
     wallet_address = models.CharField(max_length=42, blank=True, null=True, help_text="Ethereum wallet address")
     avatar = models.ImageField(upload_to="avatars/", blank=True, null=True)
     cash_balance = models.DecimalField(max_digits=15, decimal_places=2, default=10_000_000)
+    unread_notifications = models.PositiveIntegerField(
+        default=0, help_text="Denormalized unread notification count (notifications/counters.py)"
+    )
 
     # Use email as the login field
     USERNAME_FIELD = "email"
@@ -32,3 +35,22 @@ class User(AbstractUser):
 
     def __str__(self):
         return f"{self.get_full_name() or self.username} ({self.email})"
+
+    def save(self, *args, **kwargs):
+        # unread_notifications is only changed with F() updates
+        # (notifications/counters.py); a full-row save of an already loaded
+        # instance (profile update, admin, ...) would write back a stale count
+        if (
+            not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name != "unread_notifications"
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
@@ -158,7 +158,7 @@ def _get_or_create_siwe_user(eth_address):
     )
     # Wallet-only users can't log in with password
     user.set_unusable_password()
-    user.save()
+    user.save(update_fields=["password"])
 
     logger.info("SIWE login: created new user %s (%s)", user.email, eth_address)
     return user
@@ -11,6 +11,10 @@ pragma solidity ^0.8.24;
  *   - Tamper-proof transaction audit trail
  *   - Independent verification of trade execution
  *   - Regulatory transparency
+ *
+ * Alternatively, a whole window of trades can be anchored as a single Merkle
+ * root (anchorRoot). Only the root is stored; each trade keeps its inclusion
+ * proof off-chain and can be checked with verifyInclusion.
  */
 contract TransactionLedger {
     // -----------------------------------------------------------------------
@@ -29,6 +33,17 @@ contract TransactionLedger {
         bool exists; // Existence flag for mapping lookups
     }
 
+    /// @dev One element of a recordTrades() batch (same fields as recordTrade).
+    struct TradeInput {
+        bytes16 transactionId;
+        string stockSymbol;
+        uint256 price;
+        uint256 quantity;
+        uint256 totalValue;
+        bytes16 buyerId;
+        bytes16 sellerId;
+    }
+
     // -----------------------------------------------------------------------
     // State
     // -----------------------------------------------------------------------
@@ -39,6 +54,10 @@ contract TransactionLedger {
     mapping(bytes16 => Trade) public trades;
     bytes16[] public tradeIds;
 
+    /// @dev Merkle root => block timestamp it was anchored at (0 = unknown).
+    mapping(bytes32 => uint256) public rootAnchoredAt;
+    uint256 public rootCount;
+
     // -----------------------------------------------------------------------
     // Events
     // -----------------------------------------------------------------------
@@ -54,6 +73,11 @@ contract TransactionLedger {
         uint256 timestamp
     );
 
+    /// @dev A recordTrades() element that was skipped because it is invalid.
+    event TradeRejected(bytes16 indexed transactionId, string reason);
+
+    event RootAnchored(bytes32 indexed root, uint256 tradeCount, uint256 timestamp);
+
     // -----------------------------------------------------------------------
     // Modifiers
     // -----------------------------------------------------------------------
@@ -129,6 +153,117 @@ contract TransactionLedger {
         return _transactionId;
     }
 
+    /**
+     * @notice Record a batch of trades in a single transaction.
+     * @dev Trades that are already on the ledger are skipped instead of
+     *      reverting, so a batch that is resubmitted (e.g. after a lost
+     *      receipt) still records its remaining trades. Invalid trades (zero
+     *      price or quantity) are skipped with a TradeRejected event, so one
+     *      bad element cannot revert the batch. Every recorded trade emits
+     *      its own TradeRecorded event.
+     * @param _trades Trades to record (see TradeInput).
+     * @return recorded Number of trades newly recorded.
+     */
+    function recordTrades(
+        TradeInput[] calldata _trades
+    ) external onlyOwner returns (uint256 recorded) {
+        for (uint256 i = 0; i < _trades.length; i++) {
+            TradeInput calldata t = _trades[i];
+            if (trades[t.transactionId].exists) {
+                continue;
+            }
+            if (t.price == 0) {
+                emit TradeRejected(t.transactionId, "Price must be positive");
+                continue;
+            }
+            if (t.quantity == 0) {
+                emit TradeRejected(t.transactionId, "Quantity must be positive");
+                continue;
+            }
+
+            trades[t.transactionId] = Trade({
+                transactionId: t.transactionId,
+                stockSymbol: t.stockSymbol,
+                price: t.price,
+                quantity: t.quantity,
+                totalValue: t.totalValue,
+                buyerId: t.buyerId,
+                sellerId: t.sellerId,
+                timestamp: block.timestamp,
+                exists: true
+            });
+            tradeIds.push(t.transactionId);
+
+            emit TradeRecorded(
+                t.transactionId,
+                t.stockSymbol,
+                t.price,
+                t.quantity,
+                t.totalValue,
+                t.buyerId,
+                t.sellerId,
+                block.timestamp
+            );
+            recorded++;
+        }
+        tradeCount += recorded;
+        return recorded;
+    }
+
+    /**
+     * @notice Anchor the Merkle root of a window of trades.
+     * @dev Leaves are keccak256(abi.encode(transactionId, stockSymbol, price,
+     *      quantity, totalValue, buyerId, sellerId)); parent nodes hash the
+     *      sorted pair of children. Re-anchoring a known root is a no-op.
+     * @param _root       Merkle root of the window.
+     * @param _tradeCount Number of trades (leaves) in the window.
+     */
+    function anchorRoot(bytes32 _root, uint256 _tradeCount) external onlyOwner {
+        require(_root != bytes32(0), "Root must be non-zero");
+        if (rootAnchoredAt[_root] != 0) {
+            return;
+        }
+        rootAnchoredAt[_root] = block.timestamp;
+        rootCount++;
+        emit RootAnchored(_root, _tradeCount, block.timestamp);
+    }
+
+    /**
+     * @notice Was a Merkle root anchored, and when?
+     * @return anchored  Whether the root is known.
+     * @return timestamp Block timestamp of the anchoring (0 if not found).
+     */
+    function verifyRoot(
+        bytes32 _root
+    ) external view returns (bool anchored, uint256 timestamp) {
+        timestamp = rootAnchoredAt[_root];
+        return (timestamp != 0, timestamp);
+    }
+
+    /**
+     * @notice Check a trade leaf's inclusion proof against an anchored root.
+     * @param _leaf  Leaf hash of the trade (see anchorRoot).
+     * @param _proof Sibling hashes from the leaf up to the root.
+     * @param _root  Anchored Merkle root.
+     */
+    function verifyInclusion(
+        bytes32 _leaf,
+        bytes32[] calldata _proof,
+        bytes32 _root
+    ) external view returns (bool) {
+        if (rootAnchoredAt[_root] == 0) {
+            return false;
+        }
+        bytes32 node = _leaf;
+        for (uint256 i = 0; i < _proof.length; i++) {
+            bytes32 sibling = _proof[i];
+            node = node < sibling
+                ? keccak256(abi.encodePacked(node, sibling))
+                : keccak256(abi.encodePacked(sibling, node));
+        }
+        return node == _root;
+    }
+
     /**
      * @notice Retrieve full details of a recorded trade.
      * @param _transactionId UUID bytes of the transaction to look up.
@@ -174,6 +309,21 @@ contract TransactionLedger {
         return (t.exists, t.timestamp);
     }
 
+    /**
+     * @notice Bulk lookup of trades in a single read.
+     * @dev Unknown ids come back with exists == false instead of reverting.
+     * @param _transactionIds UUID bytes of the transactions.
+     */
+    function getTrades(
+        bytes16[] calldata _transactionIds
+    ) external view returns (Trade[] memory result) {
+        result = new Trade[](_transactionIds.length);
+        for (uint256 i = 0; i < _transactionIds.length; i++) {
+            result[i] = trades[_transactionIds[i]];
+        }
+        return result;
+    }
+
     /**
      * @notice Return all recorded trade IDs.
      */
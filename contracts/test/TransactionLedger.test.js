@@ -163,6 +163,28 @@ describe("TransactionLedger", function () {
     });
   });
 
+  describe("getTrades", function () {
+    it("should return several trades in one call", async function () {
+      const known = ethers.randomBytes(16);
+      const unknown = ethers.randomBytes(16);
+      await ledger.recordTrade(
+        known,
+        "FOLD1",
+        50000,
+        10,
+        500000,
+        ethers.randomBytes(16),
+        ethers.randomBytes(16)
+      );
+
+      const [found, missing] = await ledger.getTrades([known, unknown]);
+      expect(found.exists).to.equal(true);
+      expect(found.stockSymbol).to.equal("FOLD1");
+      expect(found.price).to.equal(50000n);
+      expect(missing.exists).to.equal(false);
+    });
+  });
+
   describe("getAllTradeIds", function () {
     it("should return all recorded trade IDs", async function () {
       const txId1 = ethers.randomBytes(16);
@@ -194,6 +216,175 @@ describe("TransactionLedger", function () {
     });
   });
 
+  describe("recordTrades", function () {
+    function tradeInput(symbol, price, quantity) {
+      return {
+        transactionId: ethers.randomBytes(16),
+        stockSymbol: symbol,
+        price: price,
+        quantity: quantity,
+        totalValue: price * quantity,
+        buyerId: ethers.randomBytes(16),
+        sellerId: ethers.randomBytes(16),
+      };
+    }
+
+    it("should record a batch in one transaction", async function () {
+      const batch = [
+        tradeInput("FOLD1", 50000, 10),
+        tradeInput("SAPA1", 30000, 5),
+        tradeInput("FOLD1", 50100, 2),
+      ];
+
+      await expect(ledger.recordTrades(batch))
+        .to.emit(ledger, "TradeRecorded")
+        .withArgs(
+          ethers.hexlify(batch[1].transactionId),
+          "SAPA1",
+          30000,
+          5,
+          150000,
+          ethers.hexlify(batch[1].buyerId),
+          ethers.hexlify(batch[1].sellerId),
+          (value) => value > 0n
+        );
+
+      expect(await ledger.tradeCount()).to.equal(3);
+      const trade = await ledger.getTrade(batch[2].transactionId);
+      expect(trade.price).to.equal(50100n);
+      expect(trade.quantity).to.equal(2n);
+    });
+
+    it("should skip trades that are already recorded", async function () {
+      const first = tradeInput("FOLD1", 50000, 10);
+      await ledger.recordTrades([first]);
+
+      const second = tradeInput("SAPA1", 30000, 5);
+      expect(
+        await ledger.recordTrades.staticCall([first, second])
+      ).to.equal(1n);
+      await ledger.recordTrades([first, second]);
+
+      expect(await ledger.tradeCount()).to.equal(2);
+      const ids = await ledger.getAllTradeIds();
+      expect(ids.length).to.equal(2);
+    });
+
+    it("should skip invalid trades without reverting the batch", async function () {
+      const bad = tradeInput("FOLD1", 0, 10);
+      const good = tradeInput("SAPA1", 30000, 5);
+      expect(
+        await ledger.recordTrades.staticCall([bad, good])
+      ).to.equal(1n);
+
+      await expect(ledger.recordTrades([bad, good]))
+        .to.emit(ledger, "TradeRejected")
+        .withArgs(ethers.hexlify(bad.transactionId), "Price must be positive");
+
+      expect(await ledger.tradeCount()).to.equal(1);
+      const [exists] = await ledger.verifyTrade(bad.transactionId);
+      expect(exists).to.equal(false);
+    });
+
+    it("should skip zero quantity in a batch", async function () {
+      const bad = tradeInput("FOLD1", 50000, 0);
+      await expect(ledger.recordTrades([bad]))
+        .to.emit(ledger, "TradeRejected")
+        .withArgs(ethers.hexlify(bad.transactionId), "Quantity must be positive");
+      expect(await ledger.tradeCount()).to.equal(0);
+    });
+
+    it("should only allow owner to record batches", async function () {
+      await expect(
+        ledger.connect(other).recordTrades([tradeInput("FOLD1", 50000, 10)])
+      ).to.be.revertedWith("Only owner can call this function");
+    });
+  });
+
+  describe("anchorRoot", function () {
+    function leafOf(trade) {
+      return ethers.keccak256(
+        ethers.AbiCoder.defaultAbiCoder().encode(
+          ["bytes16", "string", "uint256", "uint256", "uint256", "bytes16", "bytes16"],
+          [
+            trade.transactionId,
+            trade.stockSymbol,
+            trade.price,
+            trade.quantity,
+            trade.totalValue,
+            trade.buyerId,
+            trade.sellerId,
+          ]
+        )
+      );
+    }
+
+    function hashPair(a, b) {
+      return a < b
+        ? ethers.solidityPackedKeccak256(["bytes32", "bytes32"], [a, b])
+        : ethers.solidityPackedKeccak256(["bytes32", "bytes32"], [b, a]);
+    }
+
+    function trade(symbol, price, quantity) {
+      return {
+        transactionId: ethers.hexlify(ethers.randomBytes(16)),
+        stockSymbol: symbol,
+        price: price,
+        quantity: quantity,
+        totalValue: price * quantity,
+        buyerId: ethers.hexlify(ethers.randomBytes(16)),
+        sellerId: ethers.hexlify(ethers.randomBytes(16)),
+      };
+    }
+
+    it("should anchor a root and verify inclusion proofs", async function () {
+      const leaves = [
+        trade("FOLD1", 50000, 10),
+        trade("SAPA1", 30000, 5),
+        trade("FOLD1", 50100, 2),
+      ].map(leafOf);
+      // Odd node is carried up unchanged
+      const left = hashPair(leaves[0], leaves[1]);
+      const root = hashPair(left, leaves[2]);
+
+      await expect(ledger.anchorRoot(root, 3))
+        .to.emit(ledger, "RootAnchored")
+        .withArgs(root, 3, (value) => value > 0n);
+
+      const [anchored, timestamp] = await ledger.verifyRoot(root);
+      expect(anchored).to.equal(true);
+      expect(timestamp).to.be.greaterThan(0n);
+      expect(await ledger.rootCount()).to.equal(1);
+      expect(await ledger.tradeCount()).to.equal(0);
+
+      expect(
+        await ledger.verifyInclusion(leaves[1], [leaves[0], leaves[2]], root)
+      ).to.equal(true);
+      expect(await ledger.verifyInclusion(leaves[2], [left], root)).to.equal(true);
+      expect(
+        await ledger.verifyInclusion(leaves[2], [leaves[0]], root)
+      ).to.equal(false);
+    });
+
+    it("should ignore re-anchoring the same root", async function () {
+      const root = ethers.keccak256("0x1234");
+      await ledger.anchorRoot(root, 1);
+      await ledger.anchorRoot(root, 1);
+      expect(await ledger.rootCount()).to.equal(1);
+    });
+
+    it("should not verify against an unknown root", async function () {
+      const leaf = leafOf(trade("FOLD1", 50000, 10));
+      expect(await ledger.verifyInclusion(leaf, [], leaf)).to.equal(false);
+    });
+
+    it("should only allow owner to anchor roots", async function () {
+      await expect(
+        ledger.connect(other).anchorRoot(ethers.keccak256("0x1234"), 1)
+      ).to.be.revertedWith("Only owner can call this function");
+    });
+  });
+
   describe("Multiple trades", function () {
     it("should correctly count multiple trades", async function () {
       const buyerId = ethers.randomBytes(16);
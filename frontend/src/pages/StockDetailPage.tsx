@@ -66,7 +66,7 @@ export default function StockDetailPage() {
   useEffect(() => {
     if (!symbol || !stock) return;
     stockService
-      .getPriceHistory(symbol, 30, timeframe)
+      .getPriceHistory(symbol, timeframe)
       .then((data) => {
         if (data.length > 0) {
           setPriceHistory(data.map((p) => ({
@@ -16,13 +16,22 @@ export const stockService = {
     return normalizeStock(data);
   },
 
+  /**
+   * Without a range the newest candles of the interval's default window are
+   * returned; `from`/`to` (ISO date or datetime) or `days` select a range,
+   * `maxPoints` bounds the payload (server-side OHLC downsampling).
+   */
   async getPriceHistory(
     symbol: string,
-    days = 30,
-    interval?: "1m" | "5m" | "15m" | "1h" | "4h" | "1D" | "1W"
+    interval?: "1m" | "5m" | "15m" | "1h" | "4h" | "1D" | "1W" | "1M",
+    range: { from?: string; to?: string; days?: number; maxPoints?: number } = {}
   ): Promise<PriceHistory[]> {
-    const params: Record<string, number | string> = { days };
+    const params: Record<string, number | string> = {};
     if (interval) params.interval = interval;
+    if (range.from) params.from = range.from;
+    if (range.to) params.to = range.to;
+    if (range.days) params.days = range.days;
+    if (range.maxPoints) params.max_points = range.maxPoints;
     const { data } = await api.get<PriceHistory[]>(
       `/stocks/${symbol}/history/`,
       { params }
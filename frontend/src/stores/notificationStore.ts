@@ -72,6 +72,9 @@ export const useNotificationStore = create<NotificationState>((set, get) => ({
     wsManager.onNotification((message) => {
       if (message.type === "notification" && message.data) {
         get().addNotification(message.data as Notification);
+      } else if (message.type === "unread_count" && message.data) {
+        // Server-side unread counter (pushed on new notifications and reads)
+        set({ unreadCount: message.data.unreadCount });
       }
     });
 